@@ -0,0 +1,22 @@
+# Generated by Django 5.0 on 2026-10-17 06:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appointments', '0001_initial'),
+        ('core', '0007_tenant_usage_and_entitlement_version'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='appointment',
+            name='appointment_tenant__30227b_idx',
+        ),
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(fields=['tenant', 'date', 'start_time'], name='appointment_tenant__901ffa_idx'),
+        ),
+    ]
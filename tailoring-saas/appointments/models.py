@@ -57,7 +57,8 @@ class Appointment(models.Model):
     class Meta:
         ordering = ['date', 'start_time']
         indexes = [
-            models.Index(fields=['tenant', 'date']),
+            # List ordering / keyset pagination (core.pagination)
+            models.Index(fields=['tenant', 'date', 'start_time']),
             models.Index(fields=['tenant', 'phone']),
             models.Index(fields=['tenant', 'status']),
         ]
@@ -2,6 +2,8 @@ from rest_framework import viewsets, filters
 from rest_framework.permissions import IsAuthenticated
 from django_filters.rest_framework import DjangoFilterBackend
 
+from core.pagination import OptInCursorPagination
+
 from .models import Appointment
 from .serializers import (
     AppointmentListSerializer,
@@ -12,6 +14,8 @@ from .serializers import (
 class AppointmentViewSet(viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated]
     filter_backends = [DjangoFilterBackend, filters.SearchFilter]
+    pagination_class = OptInCursorPagination
+    cursor_ordering = ('date', 'start_time')
     filterset_fields = ['status', 'date']
     search_fields = ['name', 'phone', 'service']
 
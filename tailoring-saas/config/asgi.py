@@ -1,5 +1,11 @@
 """
 ASGI config for Tailoring SaaS project.
+
+Run with an ASGI server, e.g.:
+    uvicorn config.asgi:application --workers 4
+
+Tenant scoping uses contextvars (core.middleware), so async views such as
+dashboard/stats/async/ and customers/{id}/360/ are safe to serve here.
 """
 
 import os
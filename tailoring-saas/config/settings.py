@@ -60,6 +60,7 @@ MIDDLEWARE = [
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'core.middleware.TenantMiddleware',
+    'core.metrics.RequestMetricsMiddleware',  # Per-endpoint query/latency stats
 ]
 
 ROOT_URLCONF = 'config.urls'
@@ -134,7 +135,8 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # REST Framework Configuration
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        # JWT + one joined query for user/employee/tenant/subscription/plan
+        'core.authentication.PrincipalJWTAuthentication',
         'rest_framework.authentication.SessionAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
@@ -145,6 +147,11 @@ REST_FRAMEWORK = {
         'rest_framework.filters.SearchFilter',
         'rest_framework.filters.OrderingFilter',
     ),
+    'DEFAULT_RENDERER_CLASSES': (
+        # JSONRenderer that records serialization time (core.metrics)
+        'core.metrics.TimedJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 20,
     'DATETIME_FORMAT': '%Y-%m-%d %H:%M:%S',
@@ -169,6 +176,49 @@ SIMPLE_JWT = {
     'TOKEN_TYPE_CLAIM': 'token_type',
 }
 
+# Document numbering (core.sequences)
+# Numbers reserved per DB round-trip for each sequence key, e.g. {'ORD': 20}
+# Reserved blocks may leave gaps on restart; INV is always gapless (block size 1)
+DOCUMENT_SEQUENCE_BLOCK_SIZES = {}
+
+# Background jobs (core.jobs) - processed by `python manage.py run_jobs`
+# Eager mode runs jobs in-process right after commit (no worker needed, slower requests)
+BACKGROUND_JOBS_EAGER = os.getenv('BACKGROUND_JOBS_EAGER', 'False') == 'True'
+BACKGROUND_JOB_RETRY_DELAY = 30  # seconds, doubled after every failed attempt
+BACKGROUND_JOB_STALE_AFTER = 600  # seconds before a RUNNING job from a dead worker is retried
+
+# Request metrics (core.metrics) - admin endpoint: /api/auth/metrics/
+REQUEST_METRICS_ENABLED = os.getenv('REQUEST_METRICS_ENABLED', 'True') == 'True'
+REQUEST_METRICS_WINDOW = 300  # seconds per rolling window
+REQUEST_METRICS_HEADERS = DEBUG  # X-Query-Count / Server-Timing response headers
+DEFAULT_REQUEST_QUERY_BUDGET = 25  # queries per request before it is flagged (None = off)
+REQUEST_QUERY_BUDGETS = {
+    # 'ViewSet.action': max queries
+    'CustomerViewSet.list': 10,
+    'OrderViewSet.list': 10,
+    'InvoiceViewSet.list': 10,
+    'CustomerViewSet.statement': 10,
+    # A few queries per 1000-row chunk (orders.importer)
+    'CustomerViewSet.import_file': None,
+}
+
+# Customer lifetime stats (orders.customer_stats)
+# True: customer lists read the cached Customer columns (backfill first with
+# `python manage.py refresh_customer_stats`); False: computed live per page
+CUSTOMER_STATS_COUNTERS = os.getenv('CUSTOMER_STATS_COUNTERS', 'False') == 'True'
+
+# Master-data delta sync (masters.sync): seconds re-read before each client's
+# watermark, so rows committed by a slow transaction are not skipped
+SYNC_WATERMARK_OVERLAP = 5
+
+# Change feed (core.changes): entries older than this are dropped by
+# `python manage.py prune_change_log`; clients behind it re-list and reset
+CHANGE_LOG_RETENTION_DAYS = int(os.getenv('CHANGE_LOG_RETENTION_DAYS', '30'))
+
+# Purchase dashboard (purchase_management.overview): seconds each worker
+# process caches a tenant's overview (0 = off); local writes drop it at once
+PURCHASE_OVERVIEW_CACHE_SECONDS = 30
+
 # CORS Settings (for Flutter app)
 CORS_ALLOWED_ORIGINS = os.getenv(
     'CORS_ALLOWED_ORIGINS',
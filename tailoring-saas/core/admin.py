@@ -4,7 +4,7 @@ Django Admin configuration for core app
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django.utils.html import format_html
-from .models import Tenant, User, SubscriptionPlan, TenantSubscription
+from .models import Tenant, User, SubscriptionPlan, TenantSubscription, DocumentSequence, BackgroundJob, TenantUsage, ChangeLogEntry, DailyStats, DailyStatsTotal
 
 
 @admin.register(Tenant)
@@ -164,4 +164,53 @@ class TenantSubscriptionAdmin(admin.ModelAdmin):
         if days > 0:
             return f"{days} days"
         return "Expired"
-    days_remaining_display.short_description = 'Days Left'
\ No newline at end of file
+    days_remaining_display.short_description = 'Days Left'
+
+@admin.register(DocumentSequence)
+class DocumentSequenceAdmin(admin.ModelAdmin):
+    """Admin interface for document number counters"""
+    list_display = ['tenant', 'key', 'period', 'last_number', 'updated_at']
+    list_filter = ['key']
+    search_fields = ['tenant__name', 'key', 'period']
+    readonly_fields = ['created_at', 'updated_at']
+
+
+@admin.register(BackgroundJob)
+class BackgroundJobAdmin(admin.ModelAdmin):
+    """Admin interface for background jobs"""
+    list_display = ['job_type', 'object_id', 'tenant', 'status', 'attempts', 'run_after', 'completed_at']
+    list_filter = ['job_type', 'status']
+    search_fields = ['object_id', 'tenant__name', 'last_error']
+    readonly_fields = ['locked_by', 'locked_at', 'created_at', 'updated_at', 'completed_at']
+
+
+@admin.register(TenantUsage)
+class TenantUsageAdmin(admin.ModelAdmin):
+    """Admin interface for resource usage counters (maintained automatically)"""
+    list_display = ['tenant', 'employees', 'customers', 'users', 'updated_at']
+    search_fields = ['tenant__name']
+    readonly_fields = ['employees', 'customers', 'users', 'updated_at']
+
+
+@admin.register(ChangeLogEntry)
+class ChangeLogEntryAdmin(admin.ModelAdmin):
+    """Admin interface for the offline change feed (written automatically)"""
+    list_display = ['seq', 'tenant', 'collection', 'object_id', 'op', 'created_at']
+    list_filter = ['collection', 'op']
+    search_fields = ['tenant__name']
+
+
+@admin.register(DailyStats)
+class DailyStatsAdmin(admin.ModelAdmin):
+    """Admin interface for the dashboard rollups (maintained automatically)"""
+    list_display = ['tenant', 'date', 'new_customers', 'invoices_issued', 'invoiced_amount', 'outstanding_amount', 'updated_at']
+    list_filter = ['date']
+    search_fields = ['tenant__name']
+    date_hierarchy = 'date'
+
+
+@admin.register(DailyStatsTotal)
+class DailyStatsTotalAdmin(admin.ModelAdmin):
+    """Admin interface for the dashboard running totals (maintained automatically)"""
+    list_display = ['tenant', 'new_customers', 'invoices_issued', 'invoiced_amount', 'outstanding_amount', 'updated_at']
+    search_fields = ['tenant__name']
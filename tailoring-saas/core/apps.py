@@ -8,3 +8,7 @@ class CoreConfig(AppConfig):
     def ready(self):
         """Import signals when Django starts"""
         import core.signals
+        
+        from django.db.backends.signals import connection_created
+        from core.metrics import install_request_counter
+        connection_created.connect(install_request_counter, dispatch_uid='request_metrics_counter')
@@ -0,0 +1,89 @@
+"""
+Helpers for async (ASGI) read endpoints
+Date: 2026-10-17
+
+DRF views are sync-only, so async endpoints are plain Django views:
+- @async_api_view authenticates the JWT, sets the tenant context and
+  returns JSON errors like the DRF views do
+- gather_queries() runs independent ORM queries concurrently, each on its
+  own worker thread and DB connection (the tenant context is copied along)
+"""
+
+import asyncio
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.db import close_old_connections
+from django.http import JsonResponse
+
+from .middleware import tenant_context
+
+
+def _authenticate(request):
+    """Resolve the JWT user (and tenant) for a plain Django request"""
+    from rest_framework.exceptions import AuthenticationFailed
+    from .authentication import PrincipalJWTAuthentication
+
+    try:
+        result = PrincipalJWTAuthentication().authenticate(request)
+    except AuthenticationFailed:
+        return None
+    if result is None:
+        return None
+
+    # Tenant, employee and subscription are already joined in - no lazy
+    # FK access (not allowed from async code) later on
+    return result[0]
+
+
+def async_api_view(view):
+    """
+    Decorator for async GET endpoints that need an authenticated tenant user
+
+    The view is called as view(request, *args, **kwargs) with request.user
+    set and queries scoped to the user's tenant
+    """
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        if request.method != 'GET':
+            return JsonResponse({'detail': f'Method "{request.method}" not allowed.'}, status=405)
+
+        user = await sync_to_async(_authenticate)(request)
+        if user is None:
+            return JsonResponse({'detail': 'Authentication credentials were not provided.'}, status=401)
+
+        tenant = getattr(user, 'tenant', None)
+        if tenant is None:
+            return JsonResponse({'error': 'User has no tenant'}, status=400)
+
+        request.user = user
+        with tenant_context(tenant):
+            return await view(request, *args, **kwargs)
+
+    return wrapper
+
+
+def _run_query(query):
+    try:
+        return query()
+    finally:
+        # Executor threads outlive the request - don't leak connections
+        close_old_connections()
+
+
+async def gather_queries(queries):
+    """
+    Run independent query callables concurrently
+
+    Args:
+        queries: {name: callable} - each callable runs sync ORM code
+
+    Returns:
+        {name: result}
+    """
+    names = list(queries)
+    results = await asyncio.gather(*(
+        sync_to_async(_run_query, thread_sensitive=False)(queries[name])
+        for name in names
+    ))
+    return dict(zip(names, results))
@@ -0,0 +1,123 @@
+"""
+Authentication with a preloaded request principal
+Date: 2026-10-17
+
+PrincipalJWTAuthentication loads the user together with employee profile,
+tenant, subscription and usage counters in ONE joined query. Permission
+classes (core.permissions) and subscription decorators
+(core.subscription_utils) read them through get_principal(request), so
+per-request overhead stays constant no matter how many checks a view stacks.
+The plan comes from the entitlement cache (core.entitlements).
+"""
+
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from .entitlements import get_entitlements
+
+
+PRINCIPAL_RELATED = (
+    'employee_profile',
+    'tenant__subscription',
+    'tenant__usage',
+)
+
+
+def load_principal_user(**lookup):
+    """User with employee profile, tenant, subscription and usage (one query)"""
+    from .models import User
+    return User.objects.select_related(*PRINCIPAL_RELATED).get(**lookup)
+
+
+class PrincipalJWTAuthentication(JWTAuthentication):
+    """JWTAuthentication that joins everything permission checks need"""
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken('Token contained no recognizable user identification')
+
+        from .models import User
+        try:
+            user = load_principal_user(**{api_settings.USER_ID_FIELD: user_id})
+        except User.DoesNotExist:
+            raise AuthenticationFailed('User not found', code='user_not_found')
+
+        if not user.is_active:
+            raise AuthenticationFailed('User is inactive', code='user_inactive')
+
+        # Same revocation check as JWTAuthentication (newer simplejwt versions)
+        if getattr(api_settings, 'CHECK_REVOKE_TOKEN', False):
+            from rest_framework_simplejwt.utils import get_md5_hash_password
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed("The user's password has been changed.", code='password_changed')
+
+        return user
+
+
+class RequestPrincipal:
+    """
+    Who is making the request: user, employee, tenant, subscription, plan
+    Missing relations are None (no employee profile, no subscription, ...)
+    """
+
+    __slots__ = ('user', 'employee', 'tenant', 'subscription', '_entitlements')
+
+    def __init__(self, user):
+        self.user = user
+        self.employee = None
+        self.tenant = None
+        self.subscription = None
+        self._entitlements = None
+
+        if not user or not user.is_authenticated:
+            return
+
+        try:
+            self.employee = user.employee_profile
+        except Exception:
+            self.employee = None
+
+        self.tenant = getattr(user, 'tenant', None)
+        if self.tenant is not None:
+            try:
+                self.subscription = self.tenant.subscription
+            except Exception:
+                self.subscription = None
+
+    @property
+    def entitlements(self):
+        """Cached plan entitlements (None without a subscription)"""
+        if self._entitlements is None and self.subscription is not None:
+            self._entitlements = get_entitlements(self.subscription)
+        return self._entitlements
+
+    @property
+    def plan(self):
+        entitlements = self.entitlements
+        return entitlements.plan if entitlements else None
+
+    @property
+    def role(self):
+        return self.employee.role if self.employee else None
+
+    @property
+    def is_superuser(self):
+        return bool(self.user and self.user.is_superuser)
+
+
+def get_principal(request):
+    """
+    RequestPrincipal for a DRF or Django request, built once per request
+    With PrincipalJWTAuthentication this runs no queries at all
+    """
+    # DRF Request wraps the HttpRequest - cache on the inner one so
+    # decorators and permission classes share it
+    raw = getattr(request, '_request', request)
+    principal = getattr(raw, '_principal', None)
+    if principal is None or principal.user is not request.user:
+        principal = RequestPrincipal(request.user)
+        raw._principal = principal
+    return principal
@@ -0,0 +1,263 @@
+"""
+Per-tenant change feed for offline clients
+Date: 2026-10-17
+
+Writes to the synced models (CHANGE_FEED below) append ChangeLogEntry rows
+with a monotonic sequence number, and clients pull what changed since the
+last sequence they applied:
+
+    GET /api/auth/changes/                      -> {'reset': true, 'next': seq}
+    GET /api/auth/changes/?since=<seq>&limit=500
+
+A client without a sequence (or one older than the retained log) gets
+reset=true: it re-lists through the normal endpoints, then follows the feed
+from 'next'. Each batch groups changes per collection as
+{'upserts': [list-serializer rows], 'deleted': [ids]}; has_more means
+call again with since=next.
+
+Entries are queued by core.signals (and invoicing.recalculation, which
+updates invoices without save) and written with one bulk INSERT at
+transaction.on_commit, so an order saved five times in one request logs
+once and sequence order follows commit order. The queue belongs to the
+transaction (or savepoint): a rollback discards it. Queryset update() and
+bulk_create() skip signals - callers of those must call record_change
+themselves. `python manage.py prune_change_log` drops old entries.
+"""
+
+from importlib import import_module
+
+from .transactions import queue_on_commit
+
+
+# collection -> model, list serializer, select_related / annotate (as its
+# list endpoint does), extra fields, permission, tenant lookup. Extra fields
+# are added to each row when the serializer leaves them out; the permission
+# (checked for a GET) hides a collection from roles that can't read it
+# through its own endpoint; the tenant lookup (default 'tenant') scopes the
+# rows served
+CHANGE_FEED = {
+    'customers': {
+        'model': 'orders.Customer',
+        'serializer': 'orders.serializers.CustomerListSerializer',
+        'annotate': 'orders.models.annotate_customer_stats',
+    },
+    'orders': {
+        'model': 'orders.Order',
+        'serializer': 'orders.serializers.OrderListSerializer',
+        'select_related': ('customer', 'invoice'),
+        'annotate': 'orders.models.annotate_total_paid',
+    },
+    'order_items': {
+        'model': 'orders.OrderItem',
+        'serializer': 'orders.serializers.OrderItemSerializer',
+        'select_related': ('item',),
+        'extra_fields': ('order_id',),
+        'tenant_lookup': 'order__tenant',
+    },
+    'invoices': {
+        'model': 'invoicing.Invoice',
+        'serializer': 'invoicing.serializers.InvoiceListSerializer',
+        'select_related': ('customer', 'order'),
+    },
+    'receipt_vouchers': {
+        'model': 'financials.ReceiptVoucher',
+        'serializer': 'financials.serializers.ReceiptVoucherListSerializer',
+        'select_related': ('customer', 'order'),
+        'permission': 'core.permissions.CanManagePayments',
+    },
+    'payments': {
+        'model': 'financials.Payment',
+        'serializer': 'financials.serializers.PaymentListSerializer',
+        'select_related': ('invoice__customer',),
+        'permission': 'core.permissions.CanManagePayments',
+    },
+    'appointments': {
+        'model': 'appointments.Appointment',
+        'serializer': 'appointments.serializers.AppointmentListSerializer',
+    },
+}
+
+# Entries per response
+DEFAULT_BATCH_SIZE = 500
+MAX_BATCH_SIZE = 2000
+
+
+def _import(path):
+    module, name = path.rsplit('.', 1)
+    return getattr(import_module(module), name)
+
+
+def _model(collection):
+    from django.apps import apps
+    return apps.get_model(CHANGE_FEED[collection]['model'])
+
+
+# ==================== RECORDING ====================
+
+def record_change(tenant_id, collection, object_id, deleted=False):
+    """Queue a change log entry, written when the current transaction commits"""
+    if tenant_id is None or object_id is None:
+        return
+
+    # Last write in the transaction wins (save then delete = delete);
+    # the queue belongs to the transaction - a rollback discards it
+    queue_on_commit(
+        'change_log', _write_changes,
+        lambda changes: changes.__setitem__((tenant_id, collection, object_id), deleted),
+    )
+
+
+def _write_changes(changes):
+    """Write queued entries in one INSERT"""
+    from .models import ChangeLogEntry
+
+    if not changes:
+        return
+
+    ChangeLogEntry.objects.bulk_create([
+        ChangeLogEntry(
+            tenant_id=tenant_id,
+            collection=collection,
+            object_id=object_id,
+            op=ChangeLogEntry.OP_DELETE if deleted else ChangeLogEntry.OP_UPSERT,
+        )
+        for (tenant_id, collection, object_id), deleted in changes.items()
+    ])
+
+
+# ==================== FEED ====================
+
+def latest_sequence():
+    from .models import ChangeLogEntry
+    return ChangeLogEntry.objects.order_by('-seq').values_list('seq', flat=True).first() or 0
+
+
+def prune_change_log(days):
+    """
+    Delete entries older than days, always keeping the newest entry
+    (is_sequence_retained reads the floor from it)
+
+    Returns:
+        Number of entries deleted
+    """
+    from datetime import timedelta
+    from django.utils import timezone
+    from .models import ChangeLogEntry
+
+    cutoff = (
+        ChangeLogEntry.objects
+        .filter(created_at__lt=timezone.now() - timedelta(days=days))
+        .order_by('-seq')
+        .values_list('seq', flat=True)
+        .first()
+    )
+    if cutoff is None:
+        return 0
+    cutoff = min(cutoff, latest_sequence() - 1)
+    deleted, _ = ChangeLogEntry.objects.filter(seq__lte=cutoff).delete()
+    return deleted
+
+
+def is_sequence_retained(since):
+    """False if entries after since were pruned - the client must reset"""
+    from .models import ChangeLogEntry
+
+    # prune_change_log always keeps the newest entry, so the floor exists
+    # once anything was logged
+    floor = ChangeLogEntry.objects.order_by('seq').values_list('seq', flat=True).first()
+    return floor is None or since >= floor - 1
+
+
+def readable_collections(request, view=None):
+    """Collections the requesting user may read"""
+    collections = []
+    for collection, spec in CHANGE_FEED.items():
+        permission = spec.get('permission')
+        if permission and not _import(permission)().has_permission(request, view):
+            continue
+        collections.append(collection)
+    return collections
+
+
+def _serialize(tenant, collection, ids, context):
+    """List-serializer rows for the tenant's ids, by id (missing rows were deleted)"""
+    spec = CHANGE_FEED[collection]
+    queryset = _model(collection)._base_manager.filter(
+        pk__in=ids, **{spec.get('tenant_lookup', 'tenant'): tenant}
+    )
+    if spec.get('select_related'):
+        queryset = queryset.select_related(*spec['select_related'])
+    if spec.get('annotate'):
+        queryset = _import(spec['annotate'])(queryset)
+
+    serializer_class = _import(spec['serializer'])
+    rows = {}
+    for obj in queryset:
+        row = dict(serializer_class(obj, context=context).data)
+        for field in spec.get('extra_fields', ()):
+            row.setdefault(field.removesuffix('_id'), getattr(obj, field))
+        rows[obj.pk] = row
+    return rows
+
+
+def changes_since(tenant, since, collections=None, limit=DEFAULT_BATCH_SIZE, context=None):
+    """
+    One batch of changes after sequence since
+
+    Returns:
+        {'since', 'next', 'has_more', 'reset', 'collections': {name: {'upserts', 'deleted'}}}
+    """
+    from .models import ChangeLogEntry
+
+    collections = list(CHANGE_FEED if collections is None else collections)
+    limit = max(1, min(limit, MAX_BATCH_SIZE))
+
+    if since is None or not is_sequence_retained(since):
+        return {
+            'since': since,
+            'next': latest_sequence(),
+            'has_more': False,
+            'reset': True,
+            'collections': {},
+        }
+
+    entries = list(
+        ChangeLogEntry.objects
+        .filter(tenant=tenant, seq__gt=since, collection__in=collections)
+        .order_by('seq')
+        .values_list('seq', 'collection', 'object_id', 'op')[:limit + 1]
+    )
+    has_more = len(entries) > limit
+    entries = entries[:limit]
+
+    # Only the newest op per object matters
+    latest = {}
+    for seq, collection, object_id, op in entries:
+        latest[(collection, object_id)] = op
+
+    upsert_ids = {}
+    deleted_ids = {}
+    for (collection, object_id), op in latest.items():
+        target = deleted_ids if op == ChangeLogEntry.OP_DELETE else upsert_ids
+        target.setdefault(collection, []).append(object_id)
+
+    result = {}
+    for collection in collections:
+        ids = upsert_ids.get(collection, [])
+        rows = _serialize(tenant, collection, ids, context or {}) if ids else {}
+        # Upserted then deleted without a delete entry (e.g. bulk delete)
+        deleted = deleted_ids.get(collection, []) + [pk for pk in ids if pk not in rows]
+        if rows or deleted:
+            result[collection] = {
+                'upserts': [rows[pk] for pk in ids if pk in rows],
+                'deleted': deleted,
+            }
+
+    return {
+        'since': since,
+        # With no new entries, stay put rather than jump to the global tail
+        'next': entries[-1][0] if entries else since,
+        'has_more': has_more,
+        'reset': False,
+        'collections': result,
+    }
@@ -0,0 +1,260 @@
+"""
+Per-tenant daily rollups for the dashboard (DailyStats)
+Date: 2026-10-17
+
+Every document counts towards the day it is dated (order_date,
+invoice_date, payment_date, ...). When one is written, core.signals
+queues its (tenant, day, source) and the day's figures for that source
+are recomputed once at transaction.on_commit - one grouped query per
+source plus an upsert - however many documents the transaction touched.
+Invoice totals changed by invoicing.recalculation queue their day the
+same way.
+
+Each refresh also moves the tenant's running total (DailyStatsTotal) by
+what the recomputed days changed, so the dashboard reads two rows - the
+total and today's - however many days the shop has been open.
+`python manage.py rebuild_daily_stats` backfills or repairs the rollups
+and their total.
+"""
+
+from collections import defaultdict
+from datetime import datetime
+
+from django.apps import apps as django_apps
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .transactions import queue_on_commit
+
+
+# Invoices counted as billed (same as the dashboard's revenue)
+BILLED_INVOICE_STATUSES = ['ISSUED', 'PAID']
+
+ORDER_STATUS_FIELDS = {
+    'DRAFT': 'orders_draft',
+    'CONFIRMED': 'orders_confirmed',
+    'IN_PROGRESS': 'orders_in_progress',
+    'READY': 'orders_ready',
+    'COMPLETED': 'orders_completed',
+    'CANCELLED': 'orders_cancelled',
+}
+
+
+def _source_specs():
+    """source -> (model label, date lookup, {DailyStats field: aggregate})"""
+    return {
+        'orders': ('orders.Order', 'order_date', {
+            field: Count('pk', filter=Q(order_status=status)) for status, field in ORDER_STATUS_FIELDS.items()
+        }),
+        'customers': ('orders.Customer', 'created_at__date', {
+            'new_customers': Count('pk'),
+        }),
+        'invoices': ('invoicing.Invoice', 'invoice_date', {
+            'invoices_issued': Count('pk', filter=Q(status__in=BILLED_INVOICE_STATUSES)),
+            'invoiced_amount': Sum('grand_total', filter=Q(status__in=BILLED_INVOICE_STATUSES)),
+            'outstanding_amount': Sum('remaining_balance', filter=Q(status='ISSUED')),
+        }),
+        'payments': ('financials.Payment', 'payment_date', {
+            'payments_received': Sum('amount'),
+        }),
+        'receipts': ('financials.ReceiptVoucher', 'receipt_date', {
+            'advances_received': Sum('total_amount'),
+        }),
+        'refunds': ('financials.RefundVoucher', 'refund_date', {
+            'advance_refunds': Sum('total_refund'),
+        }),
+        'payment_refunds': ('financials.PaymentRefund', 'refund_date', {
+            'payment_refunds': Sum('refund_amount'),
+        }),
+    }
+
+
+SOURCES = _source_specs()
+
+# model label -> source
+SOURCE_MODELS = {label: source for source, (label, _, _) in SOURCES.items()}
+
+
+def rollup_fields():
+    return [field for _, _, aggregates in SOURCES.values() for field in aggregates]
+
+
+def document_date_field(model):
+    """The model field a document's day comes from"""
+    _, date_lookup, _ = SOURCES[SOURCE_MODELS[model._meta.label]]
+    return model._meta.get_field(date_lookup.split('__')[0])
+
+
+def document_date(instance):
+    """The day a document counts towards (local date for created_at)"""
+    field = document_date_field(instance)
+    # A DateField assigned a string ('2026-03-05') holds it until reloaded
+    value = getattr(instance, field.attname)
+    if isinstance(value, str):
+        value = field.to_python(value)
+    if isinstance(value, datetime):
+        # created_at, or a DateField still holding its timezone.now default
+        value = timezone.localdate(value) if timezone.is_aware(value) else value.date()
+    return value
+
+
+# ==================== COMPUTE ====================
+
+def compute_daily_stats(tenant_id, source, dates=None, apps=django_apps):
+    """
+    {date: {field: value}} for one source, grouped by day in one query
+    dates limits the days (default: all); apps is a migration's app registry
+    """
+    label, date_lookup, aggregates = SOURCES[source]
+    model = apps.get_model(label)
+
+    queryset = model._base_manager.filter(tenant_id=tenant_id)
+    if dates is not None:
+        queryset = queryset.filter(**{f'{date_lookup}__in': dates})
+    rows = queryset.values(day=_day_expression(date_lookup)).annotate(**aggregates).order_by()
+
+    return {
+        row.pop('day'): {field: value or 0 for field, value in row.items()}
+        for row in rows
+    }
+
+
+def _day_expression(date_lookup):
+    if date_lookup.endswith('__date'):
+        return TruncDate(date_lookup[:-len('__date')])
+    return F(date_lookup)
+
+
+def _zeros(source):
+    return {field: 0 for field in SOURCES[source][2]}
+
+
+def refresh_daily_stats(tenant_id, dates_by_source):
+    """
+    Recompute queued days for one tenant - {source: dates}
+    One grouped query per source; days that were recomputed for the same
+    sources share one upsert, which sets only those sources' fields.
+    The running total moves by the difference, in one UPDATE
+    """
+    from .models import DailyStats, DailyStatsTotal
+
+    with transaction.atomic():
+        # Locking the total serialises a tenant's refreshes, so no two
+        # apply their difference against the same old day values
+        total, _ = DailyStatsTotal._base_manager.select_for_update().get_or_create(tenant_id=tenant_id)
+
+        rows = defaultdict(dict)
+        for source, dates in dates_by_source.items():
+            computed = compute_daily_stats(tenant_id, source, dates)
+            for date in dates:
+                rows[date].update(computed.get(date) or _zeros(source))
+
+        stored = {
+            stats.date: stats
+            for stats in DailyStats._base_manager.filter(tenant_id=tenant_id, date__in=list(rows))
+        }
+        changes = defaultdict(int)
+        for date, values in rows.items():
+            for field, value in values.items():
+                changes[field] += value - (getattr(stored[date], field) if date in stored else 0)
+
+        by_fields = defaultdict(list)
+        for date, values in rows.items():
+            by_fields[tuple(sorted(values))].append(DailyStats(tenant_id=tenant_id, date=date, **values))
+
+        for fields, stats in by_fields.items():
+            DailyStats._base_manager.bulk_create(
+                stats,
+                update_conflicts=True,
+                unique_fields=['tenant', 'date'],
+                update_fields=[*fields, 'updated_at'],
+            )
+
+        changes = {field: change for field, change in changes.items() if change}
+        if changes:
+            DailyStatsTotal._base_manager.filter(pk=total.pk).update(
+                **{field: F(field) + change for field, change in changes.items()},
+                updated_at=timezone.now(),
+            )
+
+
+def rebuild_daily_stats(tenant_id, apps=django_apps):
+    """
+    Recompute every day of one tenant, and its running total, from the documents
+
+    Returns:
+        Number of days with activity
+    """
+    DailyStats = apps.get_model('core', 'DailyStats')
+    DailyStatsTotal = apps.get_model('core', 'DailyStatsTotal')
+
+    rows = defaultdict(dict)
+    for source in SOURCES:
+        for date, values in compute_daily_stats(tenant_id, source, apps=apps).items():
+            rows[date].update(values)
+
+    totals = defaultdict(int)
+    for values in rows.values():
+        for field, value in values.items():
+            totals[field] += value
+
+    with transaction.atomic():
+        DailyStatsTotal._base_manager.select_for_update().get_or_create(tenant_id=tenant_id)
+        DailyStats._base_manager.filter(tenant_id=tenant_id).delete()
+        DailyStats._base_manager.bulk_create(
+            [DailyStats(tenant_id=tenant_id, date=date, **values) for date, values in rows.items()],
+            batch_size=500,
+        )
+        DailyStatsTotal._base_manager.filter(tenant_id=tenant_id).update(
+            **{field: totals[field] for field in rollup_fields()},
+            updated_at=timezone.now(),
+        )
+    return len(rows)
+
+
+# ==================== WRITE-PATH QUEUE ====================
+
+def schedule_daily_stats_refresh(tenant_id, date, source):
+    """Queue a day's figures for one source, recomputed when the current transaction commits"""
+    if tenant_id is None or date is None:
+        return
+
+    # The queue belongs to the transaction - a rollback discards it
+    queue_on_commit(
+        'daily_stats', flush_daily_stats_refreshes,
+        lambda pending: pending[(tenant_id, source)].add(date),
+        factory=lambda: defaultdict(set),
+    )
+
+
+def flush_daily_stats_refreshes(pending):
+    """Recompute the queued days - {(tenant_id, source): dates}"""
+    by_tenant = defaultdict(dict)
+    for (tenant_id, source), dates in pending.items():
+        by_tenant[tenant_id][source] = dates
+
+    for tenant_id, dates_by_source in by_tenant.items():
+        refresh_daily_stats(tenant_id, dates_by_source)
+
+
+# ==================== READ ====================
+
+def dashboard_totals(tenant, today=None):
+    """
+    All-time figures (the running total) and today's rollup - two row reads
+
+    Returns:
+        {field: total, ..., 'today': {field: value}}
+    """
+    from .models import DailyStats, DailyStatsTotal
+
+    today = today or timezone.localdate()
+    fields = rollup_fields()
+    total = DailyStatsTotal._base_manager.filter(tenant=tenant).values(*fields).first() or {}
+    day = DailyStats._base_manager.filter(tenant=tenant, date=today).values(*fields).first() or {}
+
+    totals = {field: total.get(field) or 0 for field in fields}
+    totals['today'] = {field: day.get(field) or 0 for field in fields}
+    return totals
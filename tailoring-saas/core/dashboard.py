@@ -0,0 +1,62 @@
+"""
+Dashboard statistics queries
+Shared by the sync (dashboard_stats) and async (dashboard_stats_async) views.
+Each entry is an independent query, so the async view can run them concurrently.
+UPDATED: Figures come from the per-tenant daily rollups (core.daily_stats) -
+the running total and today's row, not scans of orders and invoices
+"""
+
+from .daily_stats import ORDER_STATUS_FIELDS, dashboard_totals
+
+
+PENDING_ORDER_STATUSES = ['DRAFT', 'CONFIRMED']
+ACTIVE_ORDER_STATUSES = ['CONFIRMED', 'IN_PROGRESS', 'READY']
+
+
+def dashboard_queries(tenant):
+    """{name: callable} of the independent dashboard queries for tenant"""
+    return {
+        'totals': lambda: dashboard_totals(tenant),
+    }
+
+
+def _orders(stats, statuses):
+    return sum(stats[ORDER_STATUS_FIELDS[status]] for status in statuses)
+
+
+def _money(stats):
+    """Billed / collected / refunded figures of a totals (or today) dict"""
+    return {
+        'invoiced': float(stats['invoiced_amount']),
+        'collections': float(stats['payments_received'] + stats['advances_received']),
+        'refunds': float(stats['advance_refunds'] + stats['payment_refunds']),
+    }
+
+
+def build_dashboard_stats(results):
+    """Response payload from dashboard_queries() results"""
+    totals = results['totals']
+    today = totals['today']
+    money = _money(totals)
+    today_money = _money(today)
+
+    return {
+        'total_orders': _orders(totals, ORDER_STATUS_FIELDS),
+        'total_customers': totals['new_customers'],
+        'total_revenue': money['invoiced'],
+        'pending_orders': _orders(totals, PENDING_ORDER_STATUSES),
+        'completed_orders': _orders(totals, ['COMPLETED']),
+        'active_orders': _orders(totals, ACTIVE_ORDER_STATUSES),
+        'orders_by_status': {status: totals[field] for status, field in ORDER_STATUS_FIELDS.items()},
+        'total_collections': money['collections'],
+        'total_refunds': money['refunds'],
+        'outstanding_amount': float(totals['outstanding_amount']),
+        'today': {
+            'orders': _orders(today, ORDER_STATUS_FIELDS),
+            'new_customers': today['new_customers'],
+            'invoices_issued': today['invoices_issued'],
+            'invoiced': today_money['invoiced'],
+            'collections': today_money['collections'],
+            'refunds': today_money['refunds'],
+        },
+    }
@@ -0,0 +1,184 @@
+"""
+Plan entitlement cache and resource usage counters
+Date: 2026-10-17
+
+Entitlements (plan flags and limits) are cached in-process per tenant, keyed by
+(subscription id, plan id, subscription version). The subscription row is
+loaded with the request principal anyway, so a version bump - on subscription
+save, or on plan save via core.signals - is seen by every worker process on
+its next request. A cache hit costs zero queries.
+
+Usage counters (TenantUsage) are moved by +1 / -1 when an employee, customer
+or user is created, deleted, activated or deactivated (core.signals) - one
+UPDATE at commit, instead of counting rows on every limit check or write.
+refresh_usage() recounts: it builds a tenant's row on first use and
+reconciles after writes that bypass the signals (bulk imports, raw SQL;
+`python manage.py refresh_usage`).
+"""
+
+from collections import defaultdict
+
+from django.core.exceptions import ObjectDoesNotExist
+from django.db import transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from .transactions import queue_on_commit
+
+
+# tenant_id -> Entitlements
+# Plain dict: single get/set/pop calls are atomic under the GIL, and a lost
+# race only means one extra plan query
+_entitlements_cache = {}
+
+
+class Entitlements:
+    """Snapshot of what a tenant's plan allows"""
+
+    __slots__ = ('plan', 'key')
+
+    def __init__(self, plan, key):
+        self.plan = plan
+        self.key = key
+
+    def allows(self, feature_flag):
+        """True if the plan enables feature_flag (bool flag or 'NONE'-style choice)"""
+        value = getattr(self.plan, feature_flag, False)
+        if isinstance(value, bool):
+            return value
+        if isinstance(value, str):
+            return value != 'NONE'
+        return True
+
+    def limit(self, limit_field):
+        """Plan limit for limit_field (0 = unlimited)"""
+        return getattr(self.plan, limit_field, 0) or 0
+
+
+def entitlements_key(subscription):
+    return (subscription.pk, subscription.plan_id, subscription.version)
+
+
+def get_entitlements(subscription):
+    """
+    Cached Entitlements for a TenantSubscription (None if no subscription)
+    Loads the plan only on a cache miss
+    """
+    if subscription is None:
+        return None
+
+    key = entitlements_key(subscription)
+    cached = _entitlements_cache.get(subscription.tenant_id)
+    if cached is not None and cached.key == key:
+        return cached
+
+    from .models import SubscriptionPlan
+    entitlements = Entitlements(SubscriptionPlan.objects.get(pk=subscription.plan_id), key)
+    _entitlements_cache[subscription.tenant_id] = entitlements
+    return entitlements
+
+
+def invalidate_entitlements(tenant_id=None):
+    """Drop cached entitlements for one tenant (or all tenants)"""
+    if tenant_id is None:
+        _entitlements_cache.clear()
+    else:
+        _entitlements_cache.pop(tenant_id, None)
+
+
+# ==================== USAGE COUNTERS ====================
+
+# Plan limit field -> TenantUsage field
+USAGE_COUNTERS = {
+    'max_employees': 'employees',
+    'max_customers': 'customers',
+    'max_users': 'users',
+}
+
+
+def _count_active(tenant_id, counter):
+    if counter == 'employees':
+        from employees.models import Employee
+        return Employee.all_objects.filter(tenant_id=tenant_id, is_active=True).count()
+    if counter == 'customers':
+        from orders.models import Customer
+        return Customer.all_objects.filter(tenant_id=tenant_id, is_active=True).count()
+    if counter == 'users':
+        from .models import User
+        return User.objects.filter(tenant_id=tenant_id, is_active=True).count()
+    raise KeyError(counter)
+
+
+def refresh_usage(tenant_id, *counters):
+    """
+    Recount the given counters (default: all) for one tenant
+
+    Returns:
+        TenantUsage
+    """
+    from .models import TenantUsage
+
+    counters = counters or tuple(USAGE_COUNTERS.values())
+    values = {counter: _count_active(tenant_id, counter) for counter in counters}
+    usage, _ = TenantUsage.objects.update_or_create(tenant_id=tenant_id, defaults=values)
+    return usage
+
+
+def schedule_usage_refresh(tenant_id, counter):
+    """Recount one counter after the current transaction commits"""
+    if tenant_id is None:
+        return
+    transaction.on_commit(lambda: refresh_usage(tenant_id, counter))
+
+
+def schedule_usage_change(tenant_id, counter, delta):
+    """Move one counter by delta when the current transaction commits"""
+    if tenant_id is None or not delta:
+        return
+
+    def add(changes):
+        changes[(tenant_id, counter)] += delta
+
+    # The queue belongs to the transaction - a rollback discards it
+    queue_on_commit('usage_changes', flush_usage_changes, add, factory=lambda: defaultdict(int))
+
+
+def flush_usage_changes(changes):
+    """Apply queued changes - {(tenant_id, counter): delta} - one UPDATE per tenant"""
+    from .models import TenantUsage
+
+    by_tenant = defaultdict(dict)
+    for (tenant_id, counter), delta in changes.items():
+        if delta:
+            by_tenant[tenant_id][counter] = delta
+
+    for tenant_id, deltas in by_tenant.items():
+        updated = TenantUsage.objects.filter(tenant_id=tenant_id).update(
+            # A counter that drifted below the truth never goes negative
+            **{counter: Greatest(F(counter) + delta, 0) for counter, delta in deltas.items()},
+            updated_at=timezone.now(),
+        )
+        if not updated:
+            # No row yet - build it by counting
+            refresh_usage(tenant_id)
+
+
+def current_usage(tenant, limit_field):
+    """
+    Current usage for a plan limit field
+    Reads TenantUsage (joined in by the request principal); resources
+    without a counter fall back to a live count
+    """
+    counter = USAGE_COUNTERS.get(limit_field)
+    if counter is None:
+        from .subscription_utils import get_current_count
+        return get_current_count(tenant, limit_field)
+
+    try:
+        usage = tenant.usage
+    except ObjectDoesNotExist:
+        # First check for this tenant - build the row
+        usage = refresh_usage(tenant.pk)
+        tenant.usage = usage
+    return getattr(usage, counter)
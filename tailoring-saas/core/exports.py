@@ -0,0 +1,301 @@
+"""
+Streaming data exports (CSV / XLSX)
+Date: 2026-10-17
+
+    GET /api/auth/exports/<dataset>/?file_format=csv|xlsx&from=YYYY-MM-DD&to=YYYY-MM-DD
+
+Datasets are listed in EXPORTS below. Rows are read as values_list tuples
+in keyset pages (pk > last, PAGE_SIZE at a time) rather than one long
+cursor - on SQLite an open read cursor would block every writer for the
+whole download - and written out page by page:
+
+- CSV is streamed; the first bytes leave after the first page
+- XLSX rows go into an openpyxl write-only workbook (rows spool to disk),
+  then the file is streamed from a spooled temp file
+
+Either way memory stays flat at 100k+ rows. Exports need the plan's
+allow_data_export feature (core.views.ExportView).
+"""
+
+import csv
+import io
+import tempfile
+
+from django.apps import apps
+from django.utils.dateparse import parse_date
+from django.utils.text import capfirst
+
+
+# Rows per query / per streamed CSV chunk
+PAGE_SIZE = 2000
+
+EXPORT_FORMATS = {
+    'csv': 'text/csv; charset=utf-8',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+}
+
+# Customer columns that are internal (search keys) rather than shop data
+CUSTOMER_EXCLUDED_FIELDS = {'id', 'tenant', 'phone_digits', 'whatsapp_digits', 'search_name'}
+
+
+class ExportRequestError(ValueError):
+    pass
+
+
+def customer_columns():
+    """Every customer field, measurements included, in model order"""
+    from orders.models import Customer
+
+    return [
+        (field.attname, capfirst(field.verbose_name))
+        for field in Customer._meta.concrete_fields
+        if field.name not in CUSTOMER_EXCLUDED_FIELDS
+    ]
+
+
+# dataset -> model, tenant lookup, date field for from/to, columns [(lookup, header)]
+EXPORTS = {
+    'customers': {
+        'model': 'orders.Customer',
+        'date_field': 'created_at__date',
+        'columns': customer_columns,
+    },
+    'orders': {
+        'model': 'orders.Order',
+        'date_field': 'order_date',
+        'columns': [
+            ('order_number', 'Order Number'),
+            ('order_date', 'Order Date'),
+            ('customer__name', 'Customer'),
+            ('customer__phone', 'Phone'),
+            ('order_status', 'Order Status'),
+            ('delivery_status', 'Delivery Status'),
+            ('priority', 'Priority'),
+            ('expected_delivery_date', 'Expected Delivery'),
+            ('actual_delivery_date', 'Delivered On'),
+            ('estimated_total', 'Estimated Total'),
+            ('invoice__invoice_number', 'Invoice Number'),
+            ('created_at', 'Created At'),
+        ],
+    },
+    'invoices': {
+        'model': 'invoicing.Invoice',
+        'date_field': 'invoice_date',
+        'columns': [
+            ('invoice_number', 'Invoice Number'),
+            ('invoice_date', 'Invoice Date'),
+            ('status', 'Status'),
+            ('order__order_number', 'Order Number'),
+            ('billing_name', 'Customer'),
+            ('billing_gstin', 'Customer GSTIN'),
+            ('billing_state', 'Place of Supply'),
+            ('tax_type', 'Tax Type'),
+            ('subtotal', 'Taxable Value'),
+            ('total_cgst', 'CGST'),
+            ('total_sgst', 'SGST'),
+            ('total_igst', 'IGST'),
+            ('grand_total', 'Invoice Total'),
+            ('total_advance_adjusted', 'Advance Adjusted'),
+            ('total_paid', 'Paid'),
+            ('remaining_balance', 'Balance'),
+            ('payment_status', 'Payment Status'),
+        ],
+    },
+    'receipts': {
+        'model': 'financials.ReceiptVoucher',
+        'date_field': 'receipt_date',
+        'columns': [
+            ('voucher_number', 'Voucher Number'),
+            ('receipt_date', 'Receipt Date'),
+            ('customer__name', 'Customer'),
+            ('order__order_number', 'Order Number'),
+            ('advance_amount', 'Advance Amount'),
+            ('tax_type', 'Tax Type'),
+            ('cgst_amount', 'CGST'),
+            ('sgst_amount', 'SGST'),
+            ('igst_amount', 'IGST'),
+            ('total_amount', 'Total Amount'),
+            ('payment_mode', 'Payment Mode'),
+            ('adjusted_amount', 'Adjusted'),
+            ('remaining_amount', 'Remaining'),
+            ('deposited_to_bank', 'Deposited'),
+        ],
+    },
+    'payments': {
+        'model': 'financials.Payment',
+        'date_field': 'payment_date',
+        'columns': [
+            ('payment_number', 'Payment Number'),
+            ('payment_date', 'Payment Date'),
+            ('invoice__invoice_number', 'Invoice Number'),
+            ('invoice__customer__name', 'Customer'),
+            ('amount', 'Amount'),
+            ('payment_mode', 'Payment Mode'),
+            ('transaction_reference', 'Reference'),
+            ('deposited_to_bank', 'Deposited'),
+            ('deposit_date', 'Deposit Date'),
+        ],
+    },
+    'attendance': {
+        'model': 'employees.Attendance',
+        'tenant_lookup': 'employee__tenant',
+        'date_field': 'date',
+        'columns': [
+            ('date', 'Date'),
+            ('employee__employee_code', 'Employee Code'),
+            ('employee__user__name', 'Employee'),
+            ('status', 'Status'),
+            ('clock_in', 'Clock In'),
+            ('clock_out', 'Clock Out'),
+            ('regular_hours', 'Regular Hours'),
+            ('overtime_hours', 'Overtime Hours'),
+            ('break_hours', 'Break Hours'),
+            ('total_working_hours', 'Total Hours'),
+        ],
+    },
+    'stock_transactions': {
+        'model': 'orders.StockTransaction',
+        'date_field': 'created_at__date',
+        'columns': [
+            ('created_at', 'Date'),
+            ('item__name', 'Item'),
+            ('transaction_type', 'Type'),
+            ('quantity', 'Quantity'),
+            ('stock_before', 'Stock Before'),
+            ('stock_after', 'Stock After'),
+            ('reference_type', 'Reference Type'),
+            ('reference_id', 'Reference'),
+            ('notes', 'Notes'),
+        ],
+    },
+}
+
+
+def parse_export_params(params):
+    """file_format / from / to query params -> (file format, date_from, date_to)"""
+    file_format = params.get('file_format', 'csv')
+    if file_format not in EXPORT_FORMATS:
+        raise ExportRequestError(f'file_format must be one of: {", ".join(EXPORT_FORMATS)}')
+
+    return (file_format, *parse_date_range(params))
+
+
+def parse_date_range(params):
+    """from / to query params -> (date_from, date_to)"""
+    dates = []
+    for key in ('from', 'to'):
+        value = params.get(key)
+        try:
+            parsed = parse_date(value) if value else None
+        except ValueError:  # well formed but not a real date (2026-13-01)
+            parsed = None
+        if value and parsed is None:
+            raise ExportRequestError(f'Invalid {key} date: {value} (use YYYY-MM-DD)')
+        dates.append(parsed)
+
+    return dates[0], dates[1]
+
+
+def export_filename(dataset, tenant, file_format, date_from=None, date_to=None):
+    period = '_'.join(str(value) for value in (date_from, date_to) if value) or 'all'
+    return f'{dataset}_{tenant.slug or tenant.pk}_{period}.{file_format}'
+
+
+def export_columns(dataset):
+    columns = EXPORTS[dataset]['columns']
+    return columns() if callable(columns) else columns
+
+
+def export_queryset(dataset, tenant, date_from=None, date_to=None):
+    spec = EXPORTS[dataset]
+    model = apps.get_model(spec['model'])
+    queryset = model._base_manager.filter(**{spec.get('tenant_lookup', 'tenant'): tenant})
+    if date_from:
+        queryset = queryset.filter(**{f"{spec['date_field']}__gte": date_from})
+    if date_to:
+        queryset = queryset.filter(**{f"{spec['date_field']}__lte": date_to})
+    return queryset
+
+
+# ==================== ROWS ====================
+
+def iter_rows(queryset, fields, page_size=PAGE_SIZE):
+    """values_list tuples for fields, in pk order, one short query per page"""
+    last_pk = None
+    while True:
+        page = queryset.order_by('pk')
+        if last_pk is not None:
+            page = page.filter(pk__gt=last_pk)
+        rows = list(page.values_list('pk', *fields)[:page_size])
+        if not rows:
+            return
+        for row in rows:
+            yield row[1:]
+        last_pk = rows[-1][0]
+
+
+def _cell(value):
+    """Excel has no timezone-aware datetimes"""
+    if getattr(value, 'tzinfo', None) is not None:
+        return value.replace(tzinfo=None)
+    return value
+
+
+# ==================== WRITERS ====================
+
+def write_csv(fileobj, headers, rows):
+    """Write rows as UTF-8 CSV (with BOM, so Excel detects the encoding) to a binary file"""
+    text = io.TextIOWrapper(fileobj, encoding='utf-8-sig', newline='')
+    writer = csv.writer(text)
+    writer.writerow(headers)
+    writer.writerows(rows)
+    text.flush()
+    text.detach()
+
+
+def write_xlsx(fileobj, headers, rows, title='Export'):
+    """Write rows to an XLSX file using openpyxl's write-only mode"""
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(title[:31])
+    sheet.append(headers)
+    for row in rows:
+        sheet.append([_cell(value) for value in row])
+    workbook.save(fileobj)
+
+
+def stream_csv(headers, rows, chunk_rows=PAGE_SIZE):
+    """Yield CSV bytes every chunk_rows rows"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    buffer.write('\ufeff')  # BOM, so Excel detects UTF-8
+    writer.writerow(headers)
+
+    for count, row in enumerate(rows, 1):
+        writer.writerow(row)
+        if count % chunk_rows == 0:
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode('utf-8')
+
+
+def stream_xlsx(headers, rows, title='Export', chunk_size=64 * 1024):
+    """Yield the XLSX file in chunks, built through a spooled temp file"""
+    with tempfile.SpooledTemporaryFile(max_size=8 * 1024 * 1024) as spool:
+        write_xlsx(spool, headers, rows, title)
+        spool.seek(0)
+        while chunk := spool.read(chunk_size):
+            yield chunk
+
+
+def stream_export(dataset, tenant, file_format='csv', date_from=None, date_to=None):
+    """Bytes of a dataset export, as a generator for StreamingHttpResponse"""
+    columns = export_columns(dataset)
+    headers = [header for _, header in columns]
+    rows = iter_rows(export_queryset(dataset, tenant, date_from, date_to), [field for field, _ in columns])
+
+    if file_format == 'xlsx':
+        return stream_xlsx(headers, rows, title=dataset.replace('_', ' ').title())
+    return stream_csv(headers, rows)
@@ -0,0 +1,259 @@
+"""
+Background job queue (BackgroundJob table)
+Slow artifacts - order/employee QR codes, invoice PDFs - are produced by
+`python manage.py run_jobs` instead of inside the request
+
+- enqueue_job() writes the job row in the caller's transaction, so a job
+  exists only if the order/employee/invoice it refers to was committed
+- Workers claim jobs with a conditional UPDATE (PENDING -> RUNNING), so two
+  workers never run the same job
+- Failed jobs are retried with exponential backoff up to max_attempts
+- BACKGROUND_JOBS_EAGER runs jobs in-process right after commit (dev/tests)
+"""
+
+import logging
+import os
+import socket
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.exceptions import ObjectDoesNotExist
+from django.core.files.base import ContentFile
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_STATUSES = ('PENDING', 'RUNNING')
+
+
+# ==================== HANDLERS ====================
+# Each handler receives the BackgroundJob. It may return (file_name, bytes)
+# to store the artifact in job.result_file, or the storage name of an
+# artifact it already stored.
+
+def _generate_order_qr(job):
+    from orders.models import Order
+
+    order = Order.all_objects.get(pk=job.object_id)
+    if order.qr_code:
+        return None
+    order.generate_qr_code()
+    # Only the QR column - don't overwrite edits made since the job was queued
+    Order.all_objects.filter(pk=order.pk).update(qr_code=order.qr_code.name)
+    return None
+
+
+def _generate_employee_qr(job):
+    from employees.models import Employee
+
+    employee = Employee.all_objects.select_related('tenant').get(pk=job.object_id)
+    if employee.qr_code:
+        return None
+    employee.generate_qr_code()
+    Employee.all_objects.filter(pk=employee.pk).update(qr_code=employee.qr_code.name)
+    return None
+
+
+def _generate_invoice_pdf(job):
+    from invoicing.pdf import get_invoice_pdf, invoice_pdf_queryset
+
+    # Content-hash cached - an unchanged invoice is not rendered again
+    return get_invoice_pdf(invoice_pdf_queryset().get(pk=job.object_id))
+
+
+JOB_HANDLERS = {
+    'ORDER_QR': _generate_order_qr,
+    'EMPLOYEE_QR': _generate_employee_qr,
+    'INVOICE_PDF': _generate_invoice_pdf,
+}
+
+
+# ==================== ENQUEUE ====================
+
+def enqueue_job(job_type, obj, tenant=None, max_attempts=None):
+    """
+    Queue a job for obj (model instance or pk)
+    Returns the already-queued job if one is pending/running for the same object
+    """
+    from .models import BackgroundJob
+
+    if job_type not in JOB_HANDLERS:
+        raise ValueError(f"Unknown job type: {job_type}")
+
+    object_id = getattr(obj, 'pk', obj)
+    if tenant is None:
+        tenant = getattr(obj, 'tenant_id', None)
+
+    existing = BackgroundJob.objects.filter(
+        job_type=job_type, object_id=object_id, status__in=ACTIVE_STATUSES
+    ).first()
+    if existing:
+        return existing
+
+    job = BackgroundJob(job_type=job_type, object_id=object_id)
+    job.tenant_id = getattr(tenant, 'pk', tenant)
+    if max_attempts:
+        job.max_attempts = max_attempts
+    job.save()
+
+    if getattr(settings, 'BACKGROUND_JOBS_EAGER', False):
+        transaction.on_commit(lambda: run_job_now(job.pk))
+
+    return job
+
+
+def latest_job(job_type, object_id):
+    """Most recent job for an object (None if never queued)"""
+    from .models import BackgroundJob
+    return BackgroundJob.objects.filter(job_type=job_type, object_id=object_id).order_by('-created_at', '-pk').first()
+
+
+def job_result_url(job):
+    """URL of the finished artifact, or None while it isn't ready"""
+    if job is None or job.status != 'DONE':
+        return None
+
+    if job.result_file:
+        return job.result_file.url
+
+    if job.job_type == 'ORDER_QR':
+        from orders.models import Order
+        order = Order.all_objects.filter(pk=job.object_id).only('qr_code').first()
+        return order.qr_code.url if order and order.qr_code else None
+
+    if job.job_type == 'EMPLOYEE_QR':
+        from employees.models import Employee
+        employee = Employee.all_objects.filter(pk=job.object_id).only('qr_code').first()
+        return employee.qr_code.url if employee and employee.qr_code else None
+
+    return None
+
+
+# ==================== WORKER ====================
+
+def default_worker_id():
+    return f'{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}'
+
+
+def claim_jobs(worker_id, limit=1):
+    """
+    Claim up to limit due jobs for worker_id
+    Uses a conditional UPDATE per job - works without SELECT ... SKIP LOCKED
+    """
+    from .models import BackgroundJob
+
+    now = timezone.now()
+    candidates = list(
+        BackgroundJob.objects.filter(status='PENDING', run_after__lte=now)
+        .order_by('run_after', 'pk')
+        .values_list('pk', flat=True)[:limit * 2]
+    )
+
+    claimed = []
+    for pk in candidates:
+        if len(claimed) >= limit:
+            break
+        if BackgroundJob.objects.filter(pk=pk, status='PENDING').update(
+            status='RUNNING',
+            locked_by=worker_id[:100],
+            locked_at=now,
+            attempts=F('attempts') + 1,
+            updated_at=now,
+        ):
+            claimed.append(pk)
+
+    return list(BackgroundJob.objects.filter(pk__in=claimed).order_by('run_after', 'pk'))
+
+
+def run_job(job):
+    """Run a claimed (RUNNING) job and record the outcome"""
+    from .models import BackgroundJob
+
+    handler = JOB_HANDLERS.get(job.job_type)
+    if handler is None:
+        # No handler will appear on retry - e.g. a type removed since it was queued
+        _record_failure(job, LookupError(f'Unknown job type: {job.job_type}'), permanent=True)
+        return False
+
+    try:
+        result = handler(job)
+    except Exception as e:
+        # A missing object will never appear - don't retry; anything else
+        # raised by the handler (KeyError included) follows the retry path
+        _record_failure(job, e, permanent=isinstance(e, ObjectDoesNotExist))
+        return False
+
+    now = timezone.now()
+    changes = {
+        'status': 'DONE',
+        'last_error': '',
+        'locked_by': '',
+        'locked_at': None,
+        'completed_at': now,
+        'updated_at': now,
+    }
+    if isinstance(result, str):
+        changes['result_file'] = result
+    elif result:
+        file_name, content = result
+        job.result_file.save(file_name, ContentFile(content), save=False)
+        changes['result_file'] = job.result_file.name
+
+    BackgroundJob.objects.filter(pk=job.pk).update(**changes)
+    return True
+
+
+def run_job_now(job_id):
+    """Claim and run one job in this process (eager mode)"""
+    from .models import BackgroundJob
+
+    now = timezone.now()
+    if not BackgroundJob.objects.filter(pk=job_id, status='PENDING').update(
+        status='RUNNING',
+        locked_by=default_worker_id()[:100],
+        locked_at=now,
+        attempts=F('attempts') + 1,
+        updated_at=now,
+    ):
+        return False
+    return run_job(BackgroundJob.objects.get(pk=job_id))
+
+
+def requeue_stale_jobs():
+    """Put RUNNING jobs from dead workers back in the queue"""
+    from .models import BackgroundJob
+
+    stale_after = getattr(settings, 'BACKGROUND_JOB_STALE_AFTER', 600)
+    cutoff = timezone.now() - timedelta(seconds=stale_after)
+    return BackgroundJob.objects.filter(status='RUNNING', locked_at__lt=cutoff).update(
+        status='PENDING', locked_by='', locked_at=None, updated_at=timezone.now()
+    )
+
+
+def _record_failure(job, error, permanent=False):
+    from .models import BackgroundJob
+
+    now = timezone.now()
+    message = f'{error.__class__.__name__}: {error}'
+    job.refresh_from_db(fields=['attempts', 'max_attempts'])
+
+    if permanent or job.attempts >= job.max_attempts:
+        status, run_after = 'FAILED', now
+        logger.error(f'Job {job.pk} {job.job_type} #{job.object_id} failed: {message}')
+    else:
+        delay = getattr(settings, 'BACKGROUND_JOB_RETRY_DELAY', 30) * (2 ** (job.attempts - 1))
+        status, run_after = 'PENDING', now + timedelta(seconds=delay)
+        logger.warning(f'Job {job.pk} {job.job_type} #{job.object_id} attempt {job.attempts} failed: {message}')
+
+    BackgroundJob.objects.filter(pk=job.pk).update(
+        status=status,
+        run_after=run_after,
+        last_error=message[:2000],
+        locked_by='',
+        locked_at=None,
+        updated_at=now,
+    )
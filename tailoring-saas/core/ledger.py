@@ -0,0 +1,210 @@
+"""
+Ledger queries - running balances over several document tables
+Date: 2026-10-17
+
+A ledger is a UNION ALL of values() querysets, one per document kind, each
+with the same columns (ledger_part):
+
+    entry_date, entry_rank, entry_id, entry_kind, entry_number, entry_detail, debit, credit
+
+The running balance is a window SUM() over the merged rows, computed before
+any date / page filter, so a page starting anywhere carries the balance of
+everything before it. Pages are keyset on (entry_date, entry_rank,
+entry_id) - entry_rank orders the kinds within a day - and cost one query.
+
+Used by the customer statement (orders.statement) and the vendor
+statement (purchase_management.payables).
+"""
+
+import base64
+import json
+from datetime import date
+from decimal import Decimal
+
+from django.db import connection, models
+from django.db.models import CharField, DecimalField, F, IntegerField, Value
+from django.db.models.functions import Cast
+
+
+# balance = SUM(<sign>) - receivable ledgers grow with debits, payable ones with credits
+DEBIT_BALANCE = 'debit - credit'
+CREDIT_BALANCE = 'credit - debit'
+
+CENT = Decimal('0.01')
+
+
+class LedgerCursorError(ValueError):
+    pass
+
+
+def ledger_part(queryset, rank, kind, date_field, number, detail, debit=None, credit=None):
+    """values() queryset of one document kind in ledger columns (debit / credit: expressions, default 0)"""
+    amount = DecimalField(max_digits=14, decimal_places=2)
+    zero = Value(Decimal('0.00'), output_field=amount)
+    return queryset.order_by().values(
+        entry_date=F(date_field),
+        entry_rank=Value(rank, output_field=IntegerField()),
+        entry_id=F('pk'),
+        entry_kind=Value(kind, output_field=CharField()),
+        entry_number=F(number),
+        entry_detail=Cast(detail, CharField()),
+        debit=Cast(debit if debit is not None else zero, amount),
+        credit=Cast(credit if credit is not None else zero, amount),
+    )
+
+
+def ledger_sql(parts):
+    """(sql, params) of the parts merged with UNION ALL"""
+    first, *rest = parts
+    return first.union(*rest, all=True).query.sql_with_params()
+
+
+def _date_param(value):
+    return connection.ops.adapt_datefield_value(value)
+
+
+def _decimal(value):
+    # SQLite returns SUM() of decimals as int / float
+    return Decimal(str(value or 0)).quantize(CENT)
+
+
+def _to_date(value):
+    return models.DateField().to_python(value)
+
+
+# ==================== QUERIES ====================
+
+def ledger_entries(ledger, date_from=None, date_to=None, after=None, limit=None, balance=DEBIT_BALANCE):
+    """
+    Ledger entries with running balances, in order (one query)
+
+    Args:
+        ledger: (sql, params) from ledger_sql()
+        after: position of the last entry already shown
+        limit: entries to return (None = all)
+
+    Returns:
+        [{'date', 'kind', 'number', 'detail', 'debit', 'credit', 'balance', 'position'}]
+    """
+    sql, params = ledger
+    params = list(params)
+
+    conditions = []
+    if date_from:
+        conditions.append('entry_date >= %s')
+        params.append(_date_param(date_from))
+    if date_to:
+        conditions.append('entry_date <= %s')
+        params.append(_date_param(date_to))
+    if after:
+        conditions.append('(entry_date, entry_rank, entry_id) > (%s, %s, %s)')
+        params += [_date_param(after[0]), after[1], after[2]]
+    where = f'WHERE {" AND ".join(conditions)}' if conditions else ''
+    limit_sql = ''
+    if limit is not None:
+        limit_sql = 'LIMIT %s'
+        params.append(limit)
+
+    query = f'''
+        SELECT entry_date, entry_rank, entry_id, entry_kind, entry_number, entry_detail, debit, credit, balance
+        FROM (
+            SELECT entries.*, SUM({balance}) OVER (
+                ORDER BY entry_date, entry_rank, entry_id ROWS BETWEEN UNBOUNDED PRECEDING AND CURRENT ROW
+            ) AS balance
+            FROM ({sql}) entries
+        ) ledger
+        {where}
+        ORDER BY entry_date, entry_rank, entry_id
+        {limit_sql}
+    '''
+    with connection.cursor() as cursor:
+        cursor.execute(query, params)
+        rows = cursor.fetchall()
+
+    entries = []
+    for entry_date, rank, entry_id, kind, number, detail, debit, credit, running in rows:
+        entry_date = _to_date(entry_date)
+        entries.append({
+            'date': entry_date,
+            'kind': kind,
+            'number': number,
+            'detail': detail or '',
+            'debit': _decimal(debit),
+            'credit': _decimal(credit),
+            'balance': _decimal(running),
+            'position': (entry_date, rank, entry_id),
+        })
+    return entries
+
+
+def ledger_summary(ledger, date_from=None, date_to=None, balance=DEBIT_BALANCE):
+    """
+    Opening balance, period debits / credits and closing balance (one query)
+    Opening is the balance before date_from (0 without one)
+    """
+    sql, ledger_params = ledger
+
+    before = 'entry_date < %s' if date_from else '1 = 0'
+    bounds = [('entry_date >= %s', date_from), ('entry_date <= %s', date_to)]
+    in_period = ' AND '.join(condition for condition, value in bounds if value) or '1 = 1'
+    period_params = [_date_param(value) for _, value in bounds if value]
+    before_params = [_date_param(date_from)] if date_from else []
+    params = [*before_params, *period_params, *period_params, *ledger_params]
+
+    query = f'''
+        SELECT
+            SUM(CASE WHEN {before} THEN {balance} ELSE 0 END),
+            SUM(CASE WHEN {in_period} THEN debit ELSE 0 END),
+            SUM(CASE WHEN {in_period} THEN credit ELSE 0 END)
+        FROM ({sql}) entries
+    '''
+    with connection.cursor() as cursor:
+        cursor.execute(query, params)
+        opening, debit, credit = (_decimal(value) for value in cursor.fetchone())
+
+    movement = debit - credit if balance == DEBIT_BALANCE else credit - debit
+    return {
+        'opening_balance': opening,
+        'debit': debit,
+        'credit': credit,
+        'closing_balance': opening + movement,
+    }
+
+
+def iter_ledger(ledger, date_from=None, date_to=None, page_size=2000, balance=DEBIT_BALANCE):
+    """All entries in the period, fetched page by page on the keyset"""
+    after = None
+    while True:
+        entries = ledger_entries(ledger, date_from, date_to, after=after, limit=page_size, balance=balance)
+        yield from entries
+        if len(entries) < page_size:
+            return
+        after = entries[-1]['position']
+
+
+def ledger_rows(ledger, columns, date_from=None, date_to=None, balance=DEBIT_BALANCE):
+    """Export rows: opening balance (when dated), the entries, closing balance"""
+    summary = ledger_summary(ledger, date_from, date_to, balance)
+    if date_from:
+        yield [date_from, 'OPENING', '', 'Opening balance', '', '', summary['opening_balance']]
+    for entry in iter_ledger(ledger, date_from, date_to, balance=balance):
+        yield [entry[field] for field, _ in columns]
+    yield [date_to or '', 'CLOSING', '', 'Closing balance', summary['debit'], summary['credit'],
+           summary['closing_balance']]
+
+
+# ==================== CURSOR ====================
+
+def encode_ledger_cursor(position):
+    entry_date, rank, entry_id = position
+    payload = json.dumps([entry_date.isoformat(), rank, entry_id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def decode_ledger_cursor(token):
+    """Cursor token -> (date, kind rank, id)"""
+    try:
+        entry_date, rank, entry_id = json.loads(base64.urlsafe_b64decode(token.encode()).decode())
+        return date.fromisoformat(entry_date), int(rank), int(entry_id)
+    except (TypeError, ValueError):
+        raise LedgerCursorError('Invalid cursor')
@@ -0,0 +1,285 @@
+"""
+Management command to benchmark the main app flows through the full API stack
+Usage:
+    python manage.py generate_synthetic_data --customers 5000     # once
+    python manage.py benchmark_api
+    python manage.py benchmark_api --tenant 12 --iterations 100 --output results.json
+    python manage.py benchmark_api --flows order_list,clock_in_storm --concurrency 20
+
+Requests go through the Django test client (middleware, JWT auth, DRF) in
+process, so latency excludes the network but includes everything the app does.
+Create flows write real rows - run it against a synthetic tenant only.
+
+Results (JSON) per flow: p50/p95/max latency, throughput and SQL query counts.
+"""
+import itertools
+import json
+import threading
+import time
+from collections import Counter
+from datetime import timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, close_old_connections
+from django.test import Client, override_settings
+from django.utils import timezone
+
+from core.metrics import count_queries
+from core.models import Tenant, User
+
+
+FLOWS = ['order_list', 'order_list_cursor', 'order_create', 'invoice_create', 'payment_entry', 'clock_in_storm']
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of a list of numbers"""
+    if not values:
+        return 0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(fraction * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def summarize(samples, elapsed):
+    """samples: [(status_code, ms, queries)]"""
+    latencies = [ms for _, ms, _ in samples]
+    queries = [count for _, _, count in samples]
+    return {
+        'requests': len(samples),
+        'errors': sum(1 for status, _, _ in samples if status >= 400),
+        'status_codes': dict(Counter(str(status) for status, _, _ in samples)),
+        'p50_ms': round(percentile(latencies, 0.50), 2),
+        'p95_ms': round(percentile(latencies, 0.95), 2),
+        'max_ms': round(max(latencies, default=0), 2),
+        'mean_ms': round(sum(latencies) / len(latencies), 2) if latencies else 0,
+        'throughput_rps': round(len(samples) / elapsed, 1) if elapsed else 0,
+        'avg_queries': round(sum(queries) / len(queries), 1) if queries else 0,
+        'max_queries': max(queries, default=0),
+    }
+
+
+class Command(BaseCommand):
+    help = 'Benchmark order/invoice/payment/attendance API flows (p50/p95, throughput, query counts)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tenant', type=int, help='Tenant id (default: newest synthetic tenant)')
+        parser.add_argument('--flows', default=','.join(FLOWS), help=f'Comma separated: {", ".join(FLOWS)}')
+        parser.add_argument('--iterations', type=int, default=50, help='Requests per flow')
+        parser.add_argument('--warmup', type=int, default=3, help='Unmeasured requests per flow')
+        parser.add_argument('--concurrency', type=int, default=10, help='Parallel clients for clock_in_storm')
+        parser.add_argument('--output', help='Write JSON results to this file (default: stdout)')
+
+    def handle(self, *args, **options):
+        flows = [flow.strip() for flow in options['flows'].split(',') if flow.strip()]
+        unknown = set(flows) - set(FLOWS)
+        if unknown:
+            raise CommandError(f'Unknown flow(s): {", ".join(sorted(unknown))}')
+
+        self.tenant = self._tenant(options['tenant'])
+        self.owner = self._owner()
+        self.iterations = options['iterations']
+        self.warmup = options['warmup']
+
+        from rest_framework_simplejwt.tokens import RefreshToken
+        self.auth_header = f'Bearer {RefreshToken.for_user(self.owner).access_token}'
+
+        results = {
+            'tenant': self.tenant.pk,
+            'database': connection.vendor,
+            'started_at': timezone.now().isoformat(),
+            'iterations': self.iterations,
+            'flows': {},
+        }
+
+        allowed_hosts = list(settings.ALLOWED_HOSTS) + ['testserver']
+        with override_settings(ALLOWED_HOSTS=allowed_hosts, REQUEST_METRICS_HEADERS=False):
+            for flow in flows:
+                self.stderr.write(f'⏱  {flow}...')
+                if flow == 'clock_in_storm':
+                    results['flows'][flow] = self._clock_in_storm(options['concurrency'])
+                else:
+                    results['flows'][flow] = self._run_flow(getattr(self, f'_{flow}'))
+                summary = results['flows'][flow]
+                self.stderr.write(
+                    f'   p50 {summary["p50_ms"]}ms  p95 {summary["p95_ms"]}ms  '
+                    f'{summary["throughput_rps"]} req/s  {summary["avg_queries"]} queries  '
+                    f'{summary["errors"]} errors'
+                )
+
+        output = json.dumps(results, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as handle:
+                handle.write(output + '\n')
+            self.stderr.write(self.style.SUCCESS(f'✅ Results written to {options["output"]}'))
+        else:
+            self.stdout.write(output)
+
+    # ==================== SETUP ====================
+
+    def _tenant(self, tenant_id):
+        if tenant_id:
+            try:
+                return Tenant.objects.get(pk=tenant_id)
+            except Tenant.DoesNotExist:
+                raise CommandError(f'Tenant {tenant_id} not found')
+        tenant = Tenant.objects.filter(name__startswith='Synthetic Shop').order_by('-pk').first()
+        if tenant is None:
+            raise CommandError('No synthetic tenant - run `python manage.py generate_synthetic_data` first')
+        return tenant
+
+    def _owner(self):
+        owner = User.objects.filter(tenant=self.tenant, employee_profile__role='OWNER', is_active=True).first()
+        if owner is None:
+            raise CommandError(f'Tenant {self.tenant.pk} has no active owner login')
+        return owner
+
+    def _client(self):
+        return Client(headers={'Authorization': self.auth_header})
+
+    def _timed(self, client, method, path, data=None):
+        """(status, ms, queries) for one request"""
+        start = time.perf_counter()
+        with count_queries() as counter:
+            if method == 'get':
+                response = client.get(path, data)
+            else:
+                response = client.post(path, json.dumps(data), content_type='application/json')
+        ms = (time.perf_counter() - start) * 1000
+        return response, (response.status_code, ms, counter.count)
+
+    def _run_flow(self, request_factory):
+        """Run a flow sequentially; request_factory(client) -> (method, path, data)"""
+        client = self._client()
+        for _ in range(self.warmup):
+            self._timed(client, *request_factory(client))
+
+        samples = []
+        started = time.perf_counter()
+        for _ in range(self.iterations):
+            _, sample = self._timed(client, *request_factory(client))
+            samples.append(sample)
+        return summarize(samples, time.perf_counter() - started)
+
+    # ==================== FLOWS ====================
+
+    def _order_list(self, client):
+        return 'get', '/api/orders/orders/', None
+
+    def _order_list_cursor(self, client):
+        return 'get', '/api/orders/orders/', {'pagination': 'cursor'}
+
+    def _order_payload(self):
+        from orders.models import Customer, Item
+
+        if not hasattr(self, '_catalog'):
+            self._catalog = list(Item.all_objects.filter(tenant=self.tenant, is_active=True)[:5])
+            self._customers = itertools.cycle(
+                Customer.all_objects.filter(tenant=self.tenant).values_list('pk', flat=True)[:200]
+            )
+        today = timezone.now().date()
+        return {
+            'customer': next(self._customers),
+            'order_date': today.isoformat(),
+            'expected_delivery_date': (today + timedelta(days=10)).isoformat(),
+            'order_status': 'CONFIRMED',
+            'items': [
+                {
+                    'item_type': item.item_type,
+                    'item': item.pk,
+                    'item_description': item.name,
+                    'quantity': '1.00',
+                    'unit_price': str(item.selling_price or Decimal('100.00')),
+                }
+                for item in self._catalog[:2]
+            ],
+        }
+
+    def _order_create(self, client):
+        return 'post', '/api/orders/orders/', self._order_payload()
+
+    def _invoice_create(self, client):
+        # Each invoice needs an order without one - create it unmeasured
+        payload = self._order_payload()
+        response, _ = self._timed(client, 'post', '/api/orders/orders/', payload)
+        order = response.json() if response.status_code == 201 else {}
+        return 'post', '/api/invoicing/invoices/', {
+            'customer': payload['customer'],
+            'order': order.get('id'),
+            'invoice_date': payload['order_date'],
+            'status': 'ISSUED',
+            'tax_type': 'ZERO',
+            'billing_name': 'Benchmark Customer',
+            'billing_address': '1, Benchmark Road',
+            'billing_state': self.tenant.state,
+            'items': [
+                {
+                    'item_type': line['item_type'],
+                    'item': line['item'],
+                    'item_description': line['item_description'],
+                    'quantity': line['quantity'],
+                    'unit_price': line['unit_price'],
+                    'gst_rate': '0.00',
+                }
+                for line in payload['items']
+            ],
+        }
+
+    def _payment_entry(self, client):
+        from invoicing.models import Invoice
+
+        if not getattr(self, '_unpaid_invoices', None):
+            self._unpaid_invoices = list(
+                Invoice.all_objects.filter(tenant=self.tenant, payment_status__in=['UNPAID', 'PARTIAL'])
+                .order_by('-invoice_date').values_list('pk', flat=True)[:self.iterations + self.warmup]
+            )
+        invoice_id = self._unpaid_invoices.pop() if self._unpaid_invoices else None
+        return 'post', '/api/financials/payments/', {
+            'invoice': invoice_id,
+            'payment_date': timezone.now().date().isoformat(),
+            'amount': '1.00',
+            'payment_mode': 'CASH',
+        }
+
+    def _clock_in_storm(self, concurrency):
+        """Every employee clocks in at once from `concurrency` parallel clients"""
+        from employees.models import Attendance, Employee
+
+        today = timezone.now().date()
+        employees = list(
+            Employee.all_objects.filter(tenant=self.tenant, is_active=True)
+            .exclude(role='OWNER').values_list('employee_code', flat=True)
+        )
+        Attendance.objects.filter(employee__tenant=self.tenant, date=today).delete()
+
+        queue = list(employees)
+        lock = threading.Lock()
+        barrier = threading.Barrier(max(1, concurrency))
+        samples = []
+
+        def worker():
+            client = self._client()
+            try:
+                barrier.wait()
+                while True:
+                    with lock:
+                        if not queue:
+                            return
+                        code = queue.pop()
+                    _, sample = self._timed(client, 'post', '/api/employees/attendance/clock_in/', {
+                        'qr_data': f'EMP:{code}:TENANT:{self.tenant.pk}',
+                    })
+                    with lock:
+                        samples.append(sample)
+            finally:
+                close_old_connections()
+                connection.close()
+
+        threads = [threading.Thread(target=worker) for _ in range(max(1, concurrency))]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return summarize(samples, time.perf_counter() - started)
@@ -0,0 +1,158 @@
+"""
+Management command to benchmark concurrent stock deductions
+Usage:
+    python manage.py benchmark_stock
+    python manage.py benchmark_stock --threads 8 --deductions 50 --opening-stock 300
+    python manage.py benchmark_stock --mode naive   # old read-modify-write, for comparison
+"""
+import threading
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import connection, close_old_connections
+from django.db.models import Sum
+
+from core.models import Tenant
+
+
+class Command(BaseCommand):
+    help = 'Benchmark concurrent stock deductions (lost updates, oversells, ledger consistency)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=8, help='Parallel workers')
+        parser.add_argument('--deductions', type=int, default=50, help='Deductions per worker')
+        parser.add_argument('--opening-stock', type=int, default=200, help='Opening stock of the test item')
+        parser.add_argument('--allow-negative', action='store_true', help='Allow stock to go below zero')
+        parser.add_argument(
+            '--mode',
+            choices=['ledger', 'naive'],
+            default='ledger',
+            help='ledger = orders.stock service, naive = read, subtract and save in Python'
+        )
+        parser.add_argument('--keep', action='store_true', help='Keep the benchmark tenant and its data')
+
+    def handle(self, *args, **options):
+        from orders.models import Item, StockTransaction
+
+        threads = options['threads']
+        deductions = options['deductions']
+        opening = Decimal(options['opening_stock'])
+        mode = options['mode']
+
+        tenant = Tenant.objects.create(
+            name=f'Stock Benchmark {int(time.time())}',
+            email='benchmark@example.com',
+            phone_number='9999999999',
+            city='Benchmark',
+            state='Benchmark'
+        )
+        item = Item.all_objects.create(
+            tenant=tenant,
+            name='Benchmark Fabric',
+            track_stock=True,
+            allow_negative_stock=options['allow_negative'],
+            opening_stock=opening,
+        )
+
+        succeeded = []
+        rejected = []
+        errors = []
+        lock = threading.Lock()
+
+        def worker():
+            done = rejections = 0
+            try:
+                for _ in range(deductions):
+                    try:
+                        if mode == 'ledger':
+                            self._deduct_ledger(tenant, item)
+                        else:
+                            self._deduct_naive(item.pk)
+                        done += 1
+                    except Exception as e:
+                        if e.__class__.__name__ == 'InsufficientStockError':
+                            rejections += 1
+                        else:
+                            with lock:
+                                errors.append(str(e))
+            finally:
+                with lock:
+                    succeeded.append(done)
+                    rejected.append(rejections)
+                connection.close()
+
+        self.stdout.write(
+            f'⏱  {threads} workers × {deductions} deductions, opening stock {opening}, '
+            f'mode={mode} ({connection.vendor})'
+        )
+
+        started = time.perf_counter()
+        pool = [threading.Thread(target=worker) for _ in range(threads)]
+        for thread in pool:
+            thread.start()
+        for thread in pool:
+            thread.join()
+        elapsed = time.perf_counter() - started
+        close_old_connections()
+
+        total = sum(succeeded)
+        item.refresh_from_db()
+        expected = opening - total
+        ledger_total = StockTransaction.all_objects.filter(
+            item=item, reference_type='ORDER'
+        ).aggregate(total=Sum('quantity'))['total'] or Decimal('0')
+        lost_updates = item.current_stock - expected
+
+        self.stdout.write(f'   deducted:      {total}')
+        self.stdout.write(f'   rejected:      {sum(rejected)} (insufficient stock)')
+        self.stdout.write(f'   errors:        {len(errors)}')
+        self.stdout.write(f'   final stock:   {item.current_stock} (expected {expected})')
+        self.stdout.write(f'   ledger total:  {ledger_total}')
+        self.stdout.write(f'   elapsed:       {elapsed:.3f}s')
+        self.stdout.write(f'   throughput:    {total / elapsed if elapsed else 0:.1f} deductions/s')
+        for message in sorted(set(errors))[:5]:
+            self.stdout.write(self.style.WARNING(f'   ! {message}'))
+
+        oversold = not options['allow_negative'] and item.current_stock < 0
+
+        if not options['keep']:
+            StockTransaction.all_objects.filter(tenant=tenant).delete()
+            Item.all_objects.filter(tenant=tenant).delete()
+            tenant.delete()
+
+        if lost_updates or oversold:
+            self.stdout.write(self.style.ERROR(f'❌ Lost updates: {lost_updates}, oversold: {oversold}'))
+        else:
+            self.stdout.write(self.style.SUCCESS('✅ No lost updates, no oversell'))
+
+    def _deduct_ledger(self, tenant, item):
+        from orders.stock import apply_stock_movements
+        apply_stock_movements(
+            tenant, {item.pk: Decimal('-1')},
+            reference_type='ORDER',
+            reference_id='BENCHMARK',
+            notes='Stock benchmark'
+        )
+
+    def _deduct_naive(self, item_id):
+        """The pre-ledger approach: read, change in Python, save"""
+        from orders.models import Item, StockTransaction
+
+        item = Item.all_objects.get(pk=item_id)
+        if not item.allow_negative_stock and item.current_stock < 1:
+            from orders.stock import InsufficientStockError
+            raise InsufficientStockError('Insufficient stock')
+        stock_before = item.current_stock
+        item.current_stock -= 1
+        item.save(update_fields=['current_stock'])
+        StockTransaction.all_objects.create(
+            tenant_id=item.tenant_id,
+            item=item,
+            transaction_type='OUT',
+            quantity=Decimal('-1'),
+            stock_before=stock_before,
+            stock_after=item.current_stock,
+            reference_type='ORDER',
+            reference_id='BENCHMARK',
+        )
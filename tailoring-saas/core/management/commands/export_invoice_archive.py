@@ -0,0 +1,61 @@
+"""
+Management command to write a tenant's invoice archive (invoicing.archive)
+Usage:
+    python manage.py export_invoice_archive --tenant 12 --from 2026-04-01 --to 2027-03-31
+    python manage.py export_invoice_archive --tenant 12 --from 2026-09-01 --to 2026-09-30 \\
+        --register xlsx --output sep.zip --workers 4
+
+Writes a ZIP with every invoice PDF plus the register, chunk by chunk.
+"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.models import Tenant
+from invoicing.archive import (
+    REGISTER_FORMATS,
+    ArchiveRequestError,
+    archive_filename,
+    archive_invoices,
+    parse_archive_params,
+    stream_invoice_archive,
+)
+
+
+class Command(BaseCommand):
+    help = 'Export a ZIP of invoice PDFs and the invoice register for a date range'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tenant', type=int, required=True, help='Tenant id')
+        parser.add_argument('--from', dest='from', help='Invoice date from (YYYY-MM-DD)')
+        parser.add_argument('--to', dest='to', help='Invoice date to (YYYY-MM-DD)')
+        parser.add_argument('--status', action='append', help='Invoice status (default: ISSUED and PAID)')
+        parser.add_argument('--register', choices=REGISTER_FORMATS, default='csv')
+        parser.add_argument('--workers', type=int, default=0, help='Processes (default: all cores)')
+        parser.add_argument('-o', '--output', help='Output file (default: invoices_<shop>_<period>.zip)')
+
+    def handle(self, *args, **options):
+        tenant = Tenant._base_manager.filter(pk=options['tenant']).first()
+        if tenant is None:
+            raise CommandError(f'Tenant {options["tenant"]} not found')
+
+        params = {key: options[key] for key in ('from', 'to', 'register') if options[key]}
+        params['status'] = options['status']
+        try:
+            filters, register = parse_archive_params(params)
+        except ArchiveRequestError as e:
+            raise CommandError(str(e))
+
+        invoices = archive_invoices(tenant, **filters)
+        output = options['output'] or archive_filename(tenant, filters['date_from'], filters['date_to'])
+        self.stdout.write(f'📦 {invoices.count()} invoices → {output}')
+
+        started = time.perf_counter()
+        size = 0
+        with open(output, 'wb') as archive:
+            for chunk in stream_invoice_archive(invoices, register, workers=options['workers'] or None):
+                archive.write(chunk)
+                size += len(chunk)
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(f'✅ Wrote {size / 1024 / 1024:.1f} MB in {elapsed:.1f}s'))
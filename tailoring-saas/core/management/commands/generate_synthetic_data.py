@@ -0,0 +1,528 @@
+"""
+Management command to generate large synthetic tenants for performance work
+Usage:
+    python manage.py generate_synthetic_data
+    python manage.py generate_synthetic_data --tenants 3 --customers 5000 --orders-per-customer 3
+    python manage.py generate_synthetic_data --seed 7 --months 24 --employees 40
+
+Each tenant gets an owner login (printed at the end), employees with
+attendance history, customers with measurements, orders with items,
+invoices, advance receipts, refunds, invoice payments and payment refunds.
+Rows are bulk inserted; document numbers are claimed from the real
+per-tenant counters (core.sequences) so the app keeps numbering after them.
+Run `python manage.py benchmark_api` against the result.
+"""
+import random
+import time
+from collections import defaultdict
+from datetime import datetime, time as dt_time, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from core.models import Tenant, User, SubscriptionPlan, TenantSubscription
+from core.sequences import reserve_numbers, month_period, financial_year_code
+
+
+SYNTHETIC_PASSWORD = 'synthetic-pass-123'
+
+FIRST_NAMES = [
+    'Aarav', 'Vivaan', 'Aditya', 'Arjun', 'Sai', 'Reyansh', 'Krishna', 'Ishaan', 'Rohan', 'Kabir',
+    'Ananya', 'Diya', 'Saanvi', 'Aadhya', 'Kavya', 'Meera', 'Priya', 'Lakshmi', 'Sneha', 'Pooja',
+]
+LAST_NAMES = [
+    'Sharma', 'Verma', 'Reddy', 'Nair', 'Iyer', 'Patel', 'Gupta', 'Rao', 'Menon', 'Kumar',
+    'Singh', 'Das', 'Joshi', 'Pillai', 'Shetty', 'Hegde', 'Bhat', 'Naidu', 'Kulkarni', 'Gowda',
+]
+CATALOG = [
+    # (name, item_type, price)
+    ('Blouse Stitching', 'SERVICE', 800),
+    ('Lehenga Stitching', 'SERVICE', 4500),
+    ('Salwar Suit Stitching', 'SERVICE', 1200),
+    ('Shirt Stitching', 'SERVICE', 700),
+    ('Trouser Stitching', 'SERVICE', 650),
+    ('Saree Fall & Pico', 'SERVICE', 250),
+    ('Embroidery Work', 'SERVICE', 1800),
+    ('Alteration', 'SERVICE', 200),
+    ('Cotton Fabric (m)', 'PRODUCT', 180),
+    ('Silk Fabric (m)', 'PRODUCT', 950),
+    ('Lining Fabric (m)', 'PRODUCT', 90),
+    ('Buttons Set', 'PRODUCT', 60),
+]
+MEASUREMENT_FIELDS = {
+    # field: (min, max) in inches
+    'bust_chest': (30, 46), 'waist': (24, 42), 'hip': (32, 48), 'shoulder': (13, 18),
+    'sleeve_length': (8, 24), 'armhole': (14, 22), 'garment_length': (14, 44),
+    'front_neck_depth': (5, 9), 'back_neck_depth': (5, 10), 'neck_round': (12, 17),
+}
+WORKER_ROLES = ['TAILOR', 'TAILOR', 'TAILOR', 'CUTTING_WORKER', 'EMBROIDERY_WORKER', 'FINISHING_WORKER', 'HELPER']
+PAYMENT_MODES = ['CASH', 'UPI', 'UPI', 'UPI', 'CARD', 'BANK_TRANSFER']
+
+
+class Command(BaseCommand):
+    help = 'Generate large synthetic tenants (customers, orders, invoices, payments, attendance) for benchmarking'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tenants', type=int, default=1, help='Tenants to create')
+        parser.add_argument('--customers', type=int, default=2000, help='Customers per tenant')
+        parser.add_argument('--orders-per-customer', type=float, default=2.5, help='Average orders per customer')
+        parser.add_argument('--employees', type=int, default=15, help='Employees per tenant')
+        parser.add_argument('--months', type=int, default=12, help='Months of order history')
+        parser.add_argument('--attendance-days', type=int, default=60, help='Days of attendance history')
+        parser.add_argument('--batch-size', type=int, default=1000, help='bulk_create batch size')
+        parser.add_argument('--seed', type=int, default=None, help='Random seed (repeatable data)')
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        self.plan = self._benchmark_plan()
+
+        for index in range(options['tenants']):
+            started = time.perf_counter()
+            with transaction.atomic():
+                tenant, owner, counts = self._generate_tenant(index, options)
+            elapsed = time.perf_counter() - started
+
+            self.stdout.write(self.style.SUCCESS(f'✅ {tenant.name} (id {tenant.pk}) in {elapsed:.1f}s'))
+            for name, count in counts.items():
+                self.stdout.write(f'   {name:<18} {count}')
+            self.stdout.write(f'   login: {owner.email} / {SYNTHETIC_PASSWORD}')
+
+    # ==================== TENANT ====================
+
+    def _benchmark_plan(self):
+        """Plan with every feature on and no limits"""
+        plan, _ = SubscriptionPlan.objects.get_or_create(
+            tier='ENTERPRISE',
+            defaults={
+                'name': 'Enterprise',
+                'price_monthly': Decimal('0.00'),
+                'price_yearly': Decimal('0.00'),
+                'max_orders_per_month': 0,
+                'max_customers': 0,
+                'max_employees': 0,
+                'max_users': 0,
+                'max_inventory_items': 0,
+                'max_vendors': 0,
+                'allow_employee_management': True,
+                'allow_attendance': 'QR_SCAN',
+                'allow_workflow': True,
+                'allow_task_assignment': True,
+                'allow_data_export': True,
+            }
+        )
+        return plan
+
+    def _generate_tenant(self, index, options):
+        stamp = int(time.time())
+        tenant = Tenant.objects.create(
+            name=f'Synthetic Shop {stamp}-{index + 1}',
+            email=f'shop{stamp}{index}@synthetic.test',
+            phone_number='9876543210',
+            city='Bengaluru',
+            state='Karnataka',
+        )
+        TenantSubscription.objects.update_or_create(
+            tenant=tenant,
+            defaults={'plan': self.plan, 'status': 'ACTIVE'}
+        )
+
+        owner = User.objects.create_user(
+            email=f'owner+{tenant.slug}@synthetic.test',
+            name='Synthetic Owner',
+            password=SYNTHETIC_PASSWORD,
+            tenant=tenant,
+        )
+
+        counts = {}
+        today = timezone.now().date()
+        counts['employees'] = self._employees(tenant, owner, options['employees'], options['attendance_days'], today, counts)
+        items = self._items(tenant)
+        customers = self._customers(tenant, options['customers'])
+        counts['customers'] = len(customers)
+
+        total_orders = int(len(customers) * options['orders_per_customer'])
+        orders, order_lines = self._orders(tenant, customers, items, total_orders, options['months'], today)
+        counts['orders'] = len(orders)
+        counts['order items'] = sum(len(lines) for lines in order_lines.values())
+
+        receipts = self._receipts(tenant, orders, order_lines)
+        counts['receipts'] = len(receipts)
+        counts['refunds'] = self._refunds(tenant, receipts)
+
+        invoices = self._invoices(tenant, orders, order_lines, today)
+        counts['invoices'] = len(invoices)
+        payments = self._payments(tenant, invoices, order_lines, receipts, today)
+        counts['payments'] = len(payments)
+        counts['payment refunds'] = self._payment_refunds(tenant, payments)
+
+        # Bulk inserts skip signals - bring derived data up to date
+        from invoicing.recalculation import recalculate_invoices
+        from orders.customer_stats import refresh_customer_stats
+        from orders.search import index_customers
+        from core.entitlements import refresh_usage
+        from core.daily_stats import rebuild_daily_stats
+        recalculate_invoices(Q(tenant=tenant))
+        refresh_customer_stats(tenant=tenant)
+        index_customers(tenant=tenant)
+        refresh_usage(tenant.pk)
+        rebuild_daily_stats(tenant.pk)
+
+        return tenant, owner, counts
+
+    # ==================== HELPERS ====================
+
+    def _person_name(self):
+        return f'{self.rng.choice(FIRST_NAMES)} {self.rng.choice(LAST_NAMES)}'
+
+    def _money(self, low, high):
+        return Decimal(self.rng.randrange(low * 100, high * 100)) / 100
+
+    def _numbers(self, tenant, key, prefix_format, periods, width=5):
+        """
+        {period: iterator of document numbers}, claimed in one block per period
+        periods: {period: count}
+        """
+        numbers = {}
+        for period, count in periods.items():
+            first = reserve_numbers(tenant, key, period, count)
+            prefix = prefix_format.format(period=period)
+            numbers[period] = iter([
+                f'{prefix}{n:0{width}d}' if width else f'{prefix}{n}'
+                for n in range(first, first + count)
+            ])
+        return numbers
+
+    def _bulk(self, model, rows):
+        return model.all_objects.bulk_create(rows, batch_size=self.batch_size)
+
+    # ==================== EMPLOYEES & ATTENDANCE ====================
+
+    def _employees(self, tenant, owner, count, attendance_days, today, counts):
+        from employees.models import Employee, Attendance
+
+        password = make_password(SYNTHETIC_PASSWORD)
+        users = User.objects.bulk_create([
+            User(
+                email=f'staff{n}+{tenant.slug}@synthetic.test',
+                name=self._person_name(),
+                password=password,
+                tenant=tenant,
+            )
+            for n in range(1, count + 1)
+        ], batch_size=self.batch_size)
+
+        joined = today - timedelta(days=attendance_days + 30)
+        employees = [Employee(
+            tenant=tenant, user=owner, employee_code=f'T{tenant.pk}-OWN', role='OWNER', date_joined=joined,
+        )]
+        employees += [
+            Employee(
+                tenant=tenant,
+                user=user,
+                employee_code=f'T{tenant.pk}-{n:03d}',
+                role=self.rng.choice(WORKER_ROLES),
+                date_joined=joined,
+            )
+            for n, user in enumerate(users, start=1)
+        ]
+        employees = self._bulk(Employee, employees)
+
+        # Attendance up to yesterday - today is left free for clock-in benchmarks
+        attendance = []
+        for offset in range(attendance_days, 0, -1):
+            day = today - timedelta(days=offset)
+            if day.weekday() == 6:
+                continue
+            for employee in employees[1:]:
+                roll = self.rng.random()
+                if roll < 0.05:
+                    attendance.append(Attendance(employee=employee, date=day, status='ABSENT'))
+                    continue
+                clock_in = timezone.make_aware(datetime.combine(day, dt_time(9, 0)) + timedelta(minutes=self.rng.randrange(-10, 45)))
+                clock_out = clock_in + timedelta(hours=self.rng.choice([8, 8, 9, 9, 10]), minutes=self.rng.randrange(0, 60))
+                hours = Decimal(str(round((clock_out - clock_in).total_seconds() / 3600, 2)))
+                attendance.append(Attendance(
+                    employee=employee,
+                    date=day,
+                    clock_in=clock_in,
+                    clock_out=clock_out,
+                    regular_hours=min(hours, Decimal('8.00')),
+                    overtime_hours=max(hours - Decimal('8.00'), Decimal('0.00')),
+                    total_working_hours=hours,
+                    status='LATE' if clock_in.time() > dt_time(9, 15) else 'PRESENT',
+                ))
+        Attendance.objects.bulk_create(attendance, batch_size=self.batch_size)
+        counts['attendance'] = len(attendance)
+        return len(employees)
+
+    # ==================== CATALOG & CUSTOMERS ====================
+
+    def _items(self, tenant):
+        from orders.models import Item
+        return self._bulk(Item, [
+            Item(tenant=tenant, name=name, item_type=item_type, selling_price=Decimal(price), track_stock=False)
+            for name, item_type, price in CATALOG
+        ])
+
+    def _customers(self, tenant, count):
+        from orders.models import Customer
+
+        phones = set()
+        while len(phones) < count:
+            phones.add(f'{self.rng.choice("6789")}{self.rng.randrange(10 ** 9):09d}')
+
+        customers = []
+        for phone in phones:
+            measurements = {
+                field: Decimal(self.rng.randrange(low * 4, high * 4)) / 4
+                for field, (low, high) in MEASUREMENT_FIELDS.items()
+                if self.rng.random() < 0.8
+            }
+            customers.append(Customer(
+                tenant=tenant,
+                name=self._person_name(),
+                phone=phone,
+                gender=self.rng.choice(['FEMALE', 'FEMALE', 'MALE']),
+                city='Bengaluru',
+                state='Karnataka',
+                **measurements,
+            ))
+        return self._bulk(Customer, customers)
+
+    # ==================== ORDERS ====================
+
+    def _orders(self, tenant, customers, items, count, months, today):
+        from orders.models import Order, OrderItem
+
+        history_days = months * 30
+        dates = sorted(today - timedelta(days=self.rng.randrange(history_days)) for _ in range(count))
+        numbers = self._numbers(
+            tenant, 'ORD', 'ORD-{period}-',
+            _period_counts(dates, month_period)
+        )
+
+        orders = []
+        for order_date in dates:
+            age = (today - order_date).days
+            if age > 30:
+                status = self.rng.choices(['COMPLETED', 'CANCELLED'], [95, 5])[0]
+            else:
+                status = self.rng.choice(['DRAFT', 'CONFIRMED', 'IN_PROGRESS', 'READY', 'COMPLETED'])
+            orders.append(Order(
+                tenant=tenant,
+                customer=self.rng.choice(customers),
+                order_number=next(numbers[month_period(order_date)]),
+                order_date=order_date,
+                expected_delivery_date=order_date + timedelta(days=self.rng.randrange(5, 21)),
+                order_status=status,
+                delivery_status='DELIVERED' if status == 'COMPLETED' else 'NOT_STARTED',
+                priority=self.rng.choices(['LOW', 'MEDIUM', 'HIGH'], [2, 6, 2])[0],
+            ))
+        orders = self._bulk(Order, orders)
+
+        lines = []
+        for order in orders:
+            for item in self.rng.sample(items, self.rng.randint(1, 4)):
+                lines.append(OrderItem(
+                    order=order,
+                    item=item,
+                    item_type=item.item_type,
+                    item_description=item.name,
+                    quantity=Decimal(self.rng.randint(1, 3)),
+                    unit_price=item.selling_price,
+                ))
+        lines = OrderItem.objects.bulk_create(lines, batch_size=self.batch_size)
+
+        order_lines = defaultdict(list)
+        for line in lines:
+            order_lines[line.order_id].append(line)
+
+        # Keep estimated_total in line with the items
+        for order in orders:
+            order.estimated_total = sum((l.quantity * l.unit_price for l in order_lines[order.pk]), Decimal('0.00'))
+        Order.all_objects.bulk_update(orders, ['estimated_total'], batch_size=self.batch_size)
+        return orders, order_lines
+
+    # ==================== ADVANCES ====================
+
+    def _receipts(self, tenant, orders, order_lines):
+        from financials.models import ReceiptVoucher
+
+        chosen = [order for order in orders if order.order_status != 'DRAFT' and self.rng.random() < 0.4]
+        numbers = self._numbers(tenant, 'RV', 'RV-{period}-', _period_counts([o.order_date for o in chosen], month_period))
+
+        receipts = []
+        for order in chosen:
+            total = order.estimated_total or Decimal('500.00')
+            advance = (total * Decimal(self.rng.choice([20, 30, 50])) / 100).quantize(Decimal('1'))
+            receipts.append(ReceiptVoucher(
+                tenant=tenant,
+                customer_id=order.customer_id,
+                order=order,
+                voucher_number=next(numbers[month_period(order.order_date)]),
+                receipt_date=order.order_date,
+                advance_amount=advance,
+                gst_rate=Decimal('0.00'),
+                tax_type='ZERO',
+                total_amount=advance,
+                remaining_amount=advance,
+                payment_mode=self.rng.choice(PAYMENT_MODES),
+            ))
+        return self._bulk(ReceiptVoucher, receipts)
+
+    def _refunds(self, tenant, receipts):
+        from financials.models import RefundVoucher
+
+        chosen = [receipt for receipt in receipts if self.rng.random() < 0.03]
+        numbers = self._numbers(tenant, 'RF', 'RF-{period}-', _period_counts([r.receipt_date for r in chosen], month_period))
+
+        refunds = []
+        for receipt in chosen:
+            amount = (receipt.advance_amount / 2).quantize(Decimal('1'))
+            refunds.append(RefundVoucher(
+                tenant=tenant,
+                receipt_voucher=receipt,
+                customer_id=receipt.customer_id,
+                refund_number=next(numbers[month_period(receipt.receipt_date)]),
+                refund_date=receipt.receipt_date + timedelta(days=2),
+                refund_amount=amount,
+                gst_rate=Decimal('0.00'),
+                tax_type='ZERO',
+                total_refund=amount,
+                refund_mode=self.rng.choice(['CASH', 'UPI', 'BANK_TRANSFER']),
+                reason='Order scope reduced',
+            ))
+        self._bulk(RefundVoucher, refunds)
+
+        # Advances are considered settled net of the refund
+        for refund in refunds:
+            refund.receipt_voucher.advance_amount -= refund.refund_amount
+        return len(refunds)
+
+    # ==================== INVOICES & PAYMENTS ====================
+
+    def _invoices(self, tenant, orders, order_lines, today):
+        from invoicing.models import Invoice, InvoiceItem
+        from orders.models import Customer
+
+        chosen = [
+            order for order in orders
+            if order.order_status in ('READY', 'COMPLETED')
+            or (order.order_status == 'IN_PROGRESS' and self.rng.random() < 0.3)
+        ]
+        for order in chosen:
+            order.invoice_date = min(order.expected_delivery_date, today)
+
+        customers = Customer.all_objects.in_bulk({order.customer_id for order in chosen})
+        # INV is gapless per financial year - claimed inside this transaction
+        numbers = self._numbers(
+            tenant, 'INV', 'INV{period}-',
+            _period_counts([o.invoice_date for o in chosen], financial_year_code),
+            width=0
+        )
+
+        invoices = []
+        for order in chosen:
+            customer = customers[order.customer_id]
+            invoices.append(Invoice(
+                tenant=tenant,
+                customer=customer,
+                order=order,
+                invoice_number=next(numbers[financial_year_code(order.invoice_date)]),
+                invoice_date=order.invoice_date,
+                status='ISSUED',
+                tax_type='ZERO',
+                billing_name=customer.name,
+                billing_address=f'{self.rng.randint(1, 999)}, {self.rng.randint(1, 40)}th Cross, Bengaluru',
+                billing_city=customer.city,
+                billing_state=customer.state,
+            ))
+        invoices = self._bulk(Invoice, invoices)
+
+        InvoiceItem.objects.bulk_create([
+            InvoiceItem(
+                invoice=invoice,
+                item_id=line.item_id,
+                item_type=line.item_type,
+                item_description=line.item_description,
+                quantity=line.quantity,
+                unit_price=line.unit_price,
+                gst_rate=Decimal('5.00') if line.item_type == 'PRODUCT' else Decimal('12.00'),
+            )
+            for invoice in invoices
+            for line in order_lines[invoice.order_id]
+        ], batch_size=self.batch_size)
+        return invoices
+
+    def _payments(self, tenant, invoices, order_lines, receipts, today):
+        from financials.models import Payment
+
+        advances = defaultdict(Decimal)
+        for receipt in receipts:
+            advances[receipt.order_id] += receipt.advance_amount
+
+        rows = []
+        for invoice in invoices:
+            # ZERO tax: the invoice total is the items subtotal
+            total = sum((l.quantity * l.unit_price for l in order_lines[invoice.order_id]), Decimal('0.00'))
+            due = total - advances[invoice.order_id]
+            if due <= 0:
+                continue
+            roll = self.rng.random()
+            if roll < 0.7:
+                parts = [due]
+            elif roll < 0.9:
+                first = (due * Decimal(self.rng.choice([30, 50, 70])) / 100).quantize(Decimal('1'))
+                parts = [first, due - first] if self.rng.random() < 0.5 else [first]
+            else:
+                continue  # Unpaid
+            payment_date = invoice.invoice_date
+            for amount in parts:
+                payment_date = min(payment_date + timedelta(days=self.rng.randrange(0, 15)), today)
+                rows.append((invoice, payment_date, amount))
+
+        numbers = self._numbers(tenant, 'PAY', 'PAY-{period}-', _period_counts([row[1] for row in rows], month_period))
+        return self._bulk(Payment, [
+            Payment(
+                tenant=tenant,
+                invoice=invoice,
+                payment_number=next(numbers[month_period(payment_date)]),
+                payment_date=payment_date,
+                amount=amount,
+                payment_mode=self.rng.choice(PAYMENT_MODES),
+            )
+            for invoice, payment_date, amount in rows
+        ])
+
+    def _payment_refunds(self, tenant, payments):
+        from financials.models import PaymentRefund
+
+        chosen = [payment for payment in payments if self.rng.random() < 0.02]
+        numbers = self._numbers(tenant, 'PREF', 'PREF-{period}-', _period_counts([p.payment_date for p in chosen], month_period))
+        self._bulk(PaymentRefund, [
+            PaymentRefund(
+                tenant=tenant,
+                payment=payment,
+                invoice_id=payment.invoice_id,
+                customer_id=payment.invoice.customer_id,
+                refund_number=next(numbers[month_period(payment.payment_date)]),
+                refund_date=payment.payment_date + timedelta(days=1),
+                refund_amount=(payment.amount / 10).quantize(Decimal('1')),
+                refund_mode=payment.payment_mode,
+                reason='Billing correction',
+            )
+            for payment in chosen
+        ])
+        return len(chosen)
+
+
+def _period_counts(dates, period_of):
+    counts = defaultdict(int)
+    for day in dates:
+        counts[period_of(day)] += 1
+    return counts
@@ -0,0 +1,62 @@
+"""
+Management command to bulk import customers + measurements (orders.importer)
+Usage:
+    python manage.py import_customers --tenant 12 customers.csv
+    python manage.py import_customers --tenant 12 customers.xlsx --dry-run
+    python manage.py import_customers --tenant 12 customers.xlsx --errors errors.csv
+
+Customers whose phone already exists for the tenant are updated. Rows that
+fail validation are skipped and listed (row number, field, message).
+"""
+import csv
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.models import Tenant
+from orders.importer import ImportFileError, import_customers_file, import_format
+
+
+class Command(BaseCommand):
+    help = 'Import customers and measurements for a tenant from a CSV or XLSX file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('file', help='CSV or XLSX file (header row first)')
+        parser.add_argument('--tenant', type=int, required=True, help='Tenant id')
+        parser.add_argument('--dry-run', action='store_true', help='Validate only, write nothing')
+        parser.add_argument('--errors', help='Write the error report to this CSV file')
+
+    def handle(self, *args, **options):
+        tenant = Tenant.objects.filter(pk=options['tenant']).first()
+        if tenant is None:
+            raise CommandError(f'Tenant {options["tenant"]} not found')
+
+        started = time.perf_counter()
+        try:
+            with open(options['file'], 'rb') as fileobj:
+                result = import_customers_file(
+                    tenant, fileobj, import_format(options['file']), dry_run=options['dry_run']
+                )
+        except (OSError, ImportFileError) as e:
+            raise CommandError(str(e))
+        elapsed = time.perf_counter() - started
+
+        if options['errors']:
+            with open(options['errors'], 'w', newline='', encoding='utf-8') as report:
+                writer = csv.writer(report)
+                writer.writerow(['row', 'field', 'error'])
+                for error in result['errors']:
+                    for field, messages in error['errors'].items():
+                        writer.writerow([error['row'], field, ' '.join(messages)])
+        else:
+            for error in result['errors'][:20]:
+                details = '; '.join(f'{field}: {" ".join(messages)}' for field, messages in error['errors'].items())
+                self.stdout.write(self.style.WARNING(f'   Row {error["row"]}: {details}'))
+            if result['failed'] > 20:
+                self.stdout.write(self.style.WARNING(f'   ... {result["failed"] - 20} more (use --errors FILE)'))
+
+        prefix = 'Dry run - nothing written: ' if options['dry_run'] else ''
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ {prefix}{result["created"]} new, {result["updated"]} updated, {result["unchanged"]} unchanged, '
+            f'{result["failed"]} failed of {result["rows"]} rows in {elapsed:.1f}s'
+        ))
@@ -0,0 +1,24 @@
+"""
+Management command to drop old change feed entries (core.changes)
+Usage:
+    python manage.py prune_change_log              # CHANGE_LOG_RETENTION_DAYS
+    python manage.py prune_change_log --days 7
+
+Clients whose last sequence was pruned get reset=true and re-list.
+"""
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.changes import prune_change_log
+
+
+class Command(BaseCommand):
+    help = 'Delete change feed entries older than the retention window'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=settings.CHANGE_LOG_RETENTION_DAYS,
+                            help='Keep entries newer than this many days')
+
+    def handle(self, *args, **options):
+        deleted = prune_change_log(options['days'])
+        self.stdout.write(self.style.SUCCESS(f'✅ Pruned {deleted} change log entries'))
@@ -0,0 +1,37 @@
+"""
+Management command to rebuild the customer search index (orders.search)
+Usage:
+    python manage.py rebuild_customer_search               # all tenants
+    python manage.py rebuild_customer_search --tenant 12
+
+Needed after bulk imports or raw SQL that bypassed Customer.save().
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from core.models import Tenant
+from orders.search import fts_enabled, index_customers
+
+
+class Command(BaseCommand):
+    help = 'Recompute normalized phone / name columns and FTS rows for customers'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tenant', type=int, help='Tenant id (default: all tenants)')
+
+    def handle(self, *args, **options):
+        tenants = Tenant.objects.order_by('pk')
+        if options['tenant']:
+            tenants = tenants.filter(pk=options['tenant'])
+            if not tenants.exists():
+                raise CommandError(f'Tenant {options["tenant"]} not found')
+
+        if not fts_enabled():
+            self.stdout.write(self.style.WARNING('⚠️  FTS5 table not available - rebuilding prefix columns only'))
+
+        total = 0
+        for tenant in tenants:
+            indexed = index_customers(tenant=tenant)
+            total += indexed
+            self.stdout.write(f'   {tenant.name}: {indexed} customers')
+
+        self.stdout.write(self.style.SUCCESS(f'✅ Indexed {total} customers'))
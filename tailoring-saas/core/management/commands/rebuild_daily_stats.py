@@ -0,0 +1,35 @@
+"""
+Management command to rebuild the dashboard daily rollups (core.daily_stats)
+Usage:
+    python manage.py rebuild_daily_stats               # all tenants
+    python manage.py rebuild_daily_stats --tenant 12
+
+Write paths keep the rollups current; needed after raw SQL or bulk writes
+that bypassed signals, or to repair drift.
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from core.daily_stats import rebuild_daily_stats
+from core.models import Tenant
+
+
+class Command(BaseCommand):
+    help = 'Recompute the per-tenant daily dashboard rollups from orders, invoices and payments'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tenant', type=int, help='Tenant id (default: all tenants)')
+
+    def handle(self, *args, **options):
+        tenants = Tenant.objects.order_by('pk')
+        if options['tenant']:
+            tenants = tenants.filter(pk=options['tenant'])
+            if not tenants.exists():
+                raise CommandError(f'Tenant {options["tenant"]} not found')
+
+        total = 0
+        for tenant in tenants:
+            days = rebuild_daily_stats(tenant.pk)
+            total += days
+            self.stdout.write(f'   {tenant.name}: {days} days')
+
+        self.stdout.write(self.style.SUCCESS(f'✅ Rebuilt {total} daily rollups'))
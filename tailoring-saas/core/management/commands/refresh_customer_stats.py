@@ -0,0 +1,35 @@
+"""
+Management command to recompute cached customer stats (orders.customer_stats)
+Usage:
+    python manage.py refresh_customer_stats               # all tenants
+    python manage.py refresh_customer_stats --tenant 12
+
+Run once before turning on CUSTOMER_STATS_COUNTERS, and after any bulk
+import or raw SQL change that bypassed the order/invoice write paths.
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from core.models import Tenant
+from orders.customer_stats import refresh_customer_stats
+
+
+class Command(BaseCommand):
+    help = 'Recompute cached order count, last order date, billed and outstanding per customer'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tenant', type=int, help='Tenant id (default: all tenants)')
+
+    def handle(self, *args, **options):
+        tenants = Tenant.objects.order_by('pk')
+        if options['tenant']:
+            tenants = tenants.filter(pk=options['tenant'])
+            if not tenants.exists():
+                raise CommandError(f'Tenant {options["tenant"]} not found')
+
+        total = 0
+        for tenant in tenants:
+            updated = refresh_customer_stats(tenant=tenant)
+            total += updated
+            self.stdout.write(f'   {tenant.name}: {updated} customers')
+
+        self.stdout.write(self.style.SUCCESS(f'✅ Refreshed stats for {total} customers'))
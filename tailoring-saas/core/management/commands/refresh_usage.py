@@ -0,0 +1,37 @@
+"""
+Management command to recount resource usage counters (core.entitlements)
+Usage:
+    python manage.py refresh_usage               # all tenants
+    python manage.py refresh_usage --tenant 12
+
+Write paths move the counters by +1 / -1; run this to reconcile them after
+a bulk change that bypassed the model signals (queryset update(), raw SQL).
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from core.entitlements import refresh_usage
+from core.models import Tenant
+
+
+class Command(BaseCommand):
+    help = 'Recount active employees, customers and users per tenant'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tenant', type=int, help='Tenant id (default: all tenants)')
+
+    def handle(self, *args, **options):
+        tenants = Tenant.objects.order_by('pk')
+        if options['tenant']:
+            tenants = tenants.filter(pk=options['tenant'])
+            if not tenants.exists():
+                raise CommandError(f'Tenant {options["tenant"]} not found')
+
+        count = 0
+        for tenant in tenants:
+            usage = refresh_usage(tenant.pk)
+            count += 1
+            self.stdout.write(
+                f'   {tenant.name}: {usage.employees} employees, {usage.customers} customers, {usage.users} users'
+            )
+
+        self.stdout.write(self.style.SUCCESS(f'✅ Recounted usage for {count} tenants'))
@@ -0,0 +1,51 @@
+"""
+Management command to render invoice PDFs in bulk (invoicing.pdf)
+Usage:
+    python manage.py render_invoice_pdfs --from 2026-09-01 --to 2026-09-30
+    python manage.py render_invoice_pdfs --tenant 12 --workers 4
+    python manage.py render_invoice_pdfs --status ISSUED --status PAID --status DRAFT
+
+Invoices whose current state was already rendered are skipped, so a rerun
+only renders what changed. Files are served by
+GET /api/invoicing/invoices/<id>/pdf/download/
+"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from invoicing.models import Invoice
+from invoicing.pdf import render_invoice_pdfs
+
+
+class Command(BaseCommand):
+    help = 'Render (or reuse cached) PDFs for many invoices using a process pool'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tenant', type=int, help='Tenant id (default: all tenants)')
+        parser.add_argument('--from', dest='date_from', help='Invoice date from (YYYY-MM-DD)')
+        parser.add_argument('--to', dest='date_to', help='Invoice date to (YYYY-MM-DD)')
+        parser.add_argument('--status', action='append', help='Invoice status (default: ISSUED and PAID)')
+        parser.add_argument('--workers', type=int, default=0, help='Processes (default: all cores)')
+
+    def handle(self, *args, **options):
+        invoices = Invoice.all_objects.filter(status__in=options['status'] or ['ISSUED', 'PAID'])
+        if options['tenant']:
+            invoices = invoices.filter(tenant_id=options['tenant'])
+
+        for option, lookup in (('date_from', 'invoice_date__gte'), ('date_to', 'invoice_date__lte')):
+            if options[option]:
+                value = parse_date(options[option])
+                if value is None:
+                    raise CommandError(f'Invalid date: {options[option]}')
+                invoices = invoices.filter(**{lookup: value})
+
+        self.stdout.write(f'🖨  {invoices.count()} invoices')
+
+        started = time.perf_counter()
+        result = render_invoice_pdfs(invoices, workers=options['workers'] or None)
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ Rendered {result["rendered"]}, reused {result["cached"]} in {elapsed:.1f}s'
+        ))
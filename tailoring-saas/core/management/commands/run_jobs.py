@@ -0,0 +1,68 @@
+"""
+Management command to process background jobs (QR codes, invoice PDFs)
+Usage:
+    python manage.py run_jobs                 # run forever, 2 worker threads
+    python manage.py run_jobs --workers 4
+    python manage.py run_jobs --once          # drain the queue and exit (cron)
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from core.jobs import claim_jobs, default_worker_id, requeue_stale_jobs, run_job
+
+
+class Command(BaseCommand):
+    help = 'Process queued background jobs (order/employee QR codes, invoice PDFs)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=2, help='Worker threads')
+        parser.add_argument('--poll', type=float, default=2.0, help='Seconds to sleep when the queue is empty')
+        parser.add_argument('--once', action='store_true', help='Exit when no job is due')
+        parser.add_argument('--max-jobs', type=int, default=0, help='Exit after this many jobs (0 = no limit)')
+
+    def handle(self, *args, **options):
+        workers = max(1, options['workers'])
+        max_jobs = options['max_jobs']
+        processed = failed = 0
+
+        self.stdout.write(f'🔧 Job worker started ({workers} threads)')
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            try:
+                while True:
+                    requeued = requeue_stale_jobs()
+                    if requeued:
+                        self.stdout.write(self.style.WARNING(f'   ↻ Requeued {requeued} stale job(s)'))
+
+                    jobs = claim_jobs(default_worker_id(), limit=workers)
+                    if not jobs:
+                        if options['once']:
+                            break
+                        close_old_connections()
+                        time.sleep(options['poll'])
+                        continue
+
+                    for job, ok in zip(jobs, pool.map(self._run, jobs)):
+                        processed += 1
+                        if ok:
+                            self.stdout.write(f'   ✓ {job.job_type} #{job.object_id}')
+                        else:
+                            failed += 1
+                            self.stdout.write(self.style.WARNING(f'   ✗ {job.job_type} #{job.object_id}'))
+
+                    if max_jobs and processed >= max_jobs:
+                        break
+            except KeyboardInterrupt:
+                self.stdout.write('Stopping...')
+
+        self.stdout.write(self.style.SUCCESS(f'✅ Processed {processed} job(s), {failed} failed'))
+
+    def _run(self, job):
+        try:
+            return run_job(job)
+        finally:
+            # Worker threads hold their own connections
+            close_old_connections()
@@ -0,0 +1,337 @@
+"""
+Per-endpoint request metrics
+Date: 2026-10-17
+
+RequestMetricsMiddleware records, per view and action (e.g.
+"CustomerViewSet.list"): latency, SQL query count, DB time, non-DB Python
+time (view code and serializers), serialization time (rendering the
+response data - TimedJSONRenderer) and response size. Samples go into a
+rolling in-memory histogram - two fixed windows of REQUEST_METRICS_WINDOW
+seconds - so memory stays flat and percentiles reflect recent traffic.
+
+Requests over their query budget (REQUEST_QUERY_BUDGETS, else
+DEFAULT_REQUEST_QUERY_BUDGET) are counted and logged.
+
+Cost per request: one DB execute wrapper call per query, a few clock reads
+and one locked dict update. Metrics are per process. The middleware runs in
+sync and async chains; under ASGI, queries count through a context variable
+that sync_to_async copies into executor threads, so those an async view
+runs there (gather_queries) are included.
+"""
+
+import bisect
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from rest_framework.renderers import JSONRenderer
+
+logger = logging.getLogger(__name__)
+
+
+# Latency histogram bucket upper bounds (ms); last bucket is open-ended
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class EndpointStats:
+    """Aggregates for one endpoint in one window"""
+
+    __slots__ = (
+        'count', 'errors', 'over_budget', 'latency_buckets',
+        'total_ms', 'max_ms', 'queries', 'max_queries', 'db_ms', 'python_ms', 'serialize_ms', 'bytes',
+    )
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.over_budget = 0
+        self.latency_buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.queries = 0
+        self.max_queries = 0
+        self.db_ms = 0.0
+        self.python_ms = 0.0
+        self.serialize_ms = 0.0
+        self.bytes = 0
+
+    def add(self, sample):
+        self.count += 1
+        self.errors += sample['status'] >= 500
+        self.over_budget += sample['over_budget']
+        self.latency_buckets[bisect.bisect_left(LATENCY_BUCKETS_MS, sample['total_ms'])] += 1
+        self.total_ms += sample['total_ms']
+        self.max_ms = max(self.max_ms, sample['total_ms'])
+        self.queries += sample['queries']
+        self.max_queries = max(self.max_queries, sample['queries'])
+        self.db_ms += sample['db_ms']
+        self.python_ms += sample['total_ms'] - sample['db_ms']
+        self.serialize_ms += sample['serialize_ms']
+        self.bytes += sample['bytes']
+
+    def merge(self, other):
+        merged = EndpointStats()
+        for name in self.__slots__:
+            if name == 'latency_buckets':
+                merged.latency_buckets = [a + b for a, b in zip(self.latency_buckets, other.latency_buckets)]
+            elif name.startswith('max_'):
+                setattr(merged, name, max(getattr(self, name), getattr(other, name)))
+            else:
+                setattr(merged, name, getattr(self, name) + getattr(other, name))
+        return merged
+
+    def percentile(self, fraction):
+        """Upper bound (ms) of the bucket holding the given fraction of requests"""
+        target = self.count * fraction
+        seen = 0
+        for index, bucket_count in enumerate(self.latency_buckets):
+            seen += bucket_count
+            if bucket_count and seen >= target:
+                return LATENCY_BUCKETS_MS[index] if index < len(LATENCY_BUCKETS_MS) else round(self.max_ms, 1)
+        return 0
+
+    def as_dict(self):
+        count = self.count or 1
+        return {
+            'requests': self.count,
+            'errors': self.errors,
+            'over_query_budget': self.over_budget,
+            'p50_ms': self.percentile(0.50),
+            'p95_ms': self.percentile(0.95),
+            'p99_ms': self.percentile(0.99),
+            'avg_ms': round(self.total_ms / count, 1),
+            'max_ms': round(self.max_ms, 1),
+            'avg_queries': round(self.queries / count, 1),
+            'max_queries': self.max_queries,
+            'avg_db_ms': round(self.db_ms / count, 1),
+            'avg_python_ms': round(self.python_ms / count, 1),
+            'avg_serialize_ms': round(self.serialize_ms / count, 1),
+            'avg_bytes': int(self.bytes / count),
+        }
+
+
+class MetricsRegistry:
+    """Rolling per-endpoint stats: current window + previous window"""
+
+    def __init__(self, window_seconds):
+        self.window_seconds = window_seconds
+        self._lock = threading.Lock()
+        self._window_start = time.monotonic()
+        self._current = {}
+        self._previous = {}
+
+    def _rotate(self, now):
+        elapsed = now - self._window_start
+        if elapsed < self.window_seconds:
+            return
+        # Skipped a whole window - nothing recent enough to keep
+        self._previous = self._current if elapsed < 2 * self.window_seconds else {}
+        self._current = {}
+        self._window_start = now
+
+    def record(self, key, sample):
+        with self._lock:
+            self._rotate(time.monotonic())
+            stats = self._current.get(key)
+            if stats is None:
+                stats = self._current[key] = EndpointStats()
+            stats.add(sample)
+
+    def snapshot(self):
+        """{endpoint: stats dict} over the last one to two windows"""
+        with self._lock:
+            self._rotate(time.monotonic())
+            keys = set(self._current) | set(self._previous)
+            merged = {
+                key: self._current.get(key, EndpointStats()).merge(self._previous.get(key, EndpointStats()))
+                for key in keys
+            }
+        return {key: stats.as_dict() for key, stats in sorted(merged.items())}
+
+    def reset(self):
+        with self._lock:
+            self._current = {}
+            self._previous = {}
+            self._window_start = time.monotonic()
+
+
+registry = MetricsRegistry(getattr(settings, 'REQUEST_METRICS_WINDOW', 300))
+
+
+def query_budget(key):
+    """Max queries allowed for an endpoint key (None = no budget)"""
+    budgets = getattr(settings, 'REQUEST_QUERY_BUDGETS', {})
+    if key in budgets:
+        return budgets[key]
+    return getattr(settings, 'DEFAULT_REQUEST_QUERY_BUDGET', None)
+
+
+def endpoint_key(request, view_func):
+    """'ViewSet.action' for DRF viewsets, 'View.method' / function name otherwise"""
+    cls = getattr(view_func, 'cls', None)
+    actions = getattr(view_func, 'actions', None)
+    method = request.method.lower()
+    if cls is not None and actions:
+        return f'{cls.__name__}.{actions.get(method, method)}'
+    if cls is not None:
+        return f'{cls.__name__}.{method}'
+    return getattr(view_func, '__name__', 'unknown')
+
+
+class QueryCounter:
+    """DB execute wrapper counting queries and time spent in the database"""
+
+    __slots__ = ('count', 'seconds')
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += time.perf_counter() - start
+            self.count += 1
+
+
+@contextmanager
+def count_queries():
+    """Count queries on every configured connection inside the block"""
+    counter = QueryCounter()
+    wrapped = []
+    try:
+        for alias in connections:
+            connection = connections[alias]
+            connection.execute_wrappers.append(counter)
+            wrapped.append(connection)
+        yield counter
+    finally:
+        for connection in wrapped:
+            connection.execute_wrappers.remove(counter)
+
+
+# Counter of the async request being served - sync_to_async copies it into
+# executor threads, so every query the request runs finds it
+_request_counter = ContextVar('request_query_counter', default=None)
+
+
+def _count_for_request(execute, sql, params, many, context):
+    counter = _request_counter.get()
+    if counter is None:
+        return execute(sql, params, many, context)
+    return counter(execute, sql, params, many, context)
+
+
+def install_request_counter(sender, connection, **kwargs):
+    """connection_created receiver (connected in CoreConfig.ready, before any connection opens)"""
+    if _count_for_request not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_count_for_request)
+
+
+class TimedJSONRenderer(JSONRenderer):
+    """JSONRenderer that adds the time spent serializing the response to the request's metrics"""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        start = time.perf_counter()
+        try:
+            return super().render(data, accepted_media_type, renderer_context)
+        finally:
+            request = (renderer_context or {}).get('request')
+            if request is not None:
+                request = getattr(request, '_request', request)
+                request._metrics_serialize_seconds = (
+                    getattr(request, '_metrics_serialize_seconds', 0.0) + time.perf_counter() - start
+                )
+
+
+class RequestMetricsMiddleware:
+    """
+    Records per-endpoint query count, DB time, serialization time, latency and response size
+
+    Works in both sync (WSGI) and async (ASGI) middleware chains
+
+    Settings:
+        REQUEST_METRICS_ENABLED       - turn the middleware off entirely
+        REQUEST_METRICS_WINDOW        - rolling window length (seconds)
+        REQUEST_QUERY_BUDGETS         - {'CustomerViewSet.list': 5, ...}
+        DEFAULT_REQUEST_QUERY_BUDGET  - budget for endpoints not listed (None = off)
+        REQUEST_METRICS_HEADERS       - add X-Query-Count / Server-Timing headers
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'REQUEST_METRICS_ENABLED', True):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.add_headers = getattr(settings, 'REQUEST_METRICS_HEADERS', settings.DEBUG)
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        start = time.perf_counter()
+        with count_queries() as counter:
+            response = self.get_response(request)
+        return self._record(request, response, start, counter)
+
+    async def __acall__(self, request):
+        """Process the request (async chain)"""
+        start = time.perf_counter()
+        counter = QueryCounter()
+        token = _request_counter.set(counter)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _request_counter.reset(token)
+        return self._record(request, response, start, counter)
+
+    def _record(self, request, response, start, counter):
+        total_ms = (time.perf_counter() - start) * 1000
+
+        key = getattr(request, '_metrics_key', None)
+        if key is None:
+            # Not routed to a view (404, static files)
+            return response
+
+        budget = query_budget(key)
+        over_budget = budget is not None and counter.count > budget
+        if over_budget:
+            logger.warning(
+                'Query budget exceeded: %s ran %d queries (budget %d) - %s %s',
+                key, counter.count, budget, request.method, request.path
+            )
+
+        db_ms = counter.seconds * 1000
+        serialize_ms = getattr(request, '_metrics_serialize_seconds', 0.0) * 1000
+        registry.record(key, {
+            'status': response.status_code,
+            'total_ms': total_ms,
+            'db_ms': db_ms,
+            'serialize_ms': serialize_ms,
+            'queries': counter.count,
+            'over_budget': over_budget,
+            'bytes': 0 if response.streaming else len(response.content),
+        })
+
+        if self.add_headers:
+            response['X-Query-Count'] = str(counter.count)
+            response['Server-Timing'] = (
+                f'db;dur={db_ms:.1f}, serialize;dur={serialize_ms:.1f}, app;dur={total_ms - db_ms:.1f}'
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request._metrics_key = endpoint_key(request, view_func)
+        return None
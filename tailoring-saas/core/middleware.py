@@ -1,71 +1,109 @@
 """
 Middleware for tenant isolation
-Sets current tenant in thread-local storage on every request
+Sets current tenant in a context variable on every request
+UPDATED: contextvars instead of thread-local storage - safe under ASGI/async
+views, where many requests share one thread. Each request (and every
+sync_to_async call made from it) sees its own tenant.
 """
 
-from threading import local
+from contextlib import contextmanager
+from contextvars import ContextVar
 
-# Thread-local storage for current tenant
-_thread_locals = local()
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+
+# Context-local storage for current tenant
+_current_tenant = ContextVar('current_tenant', default=None)
 
 
 def get_current_tenant():
     """
-    Get current tenant from thread-local storage
-    
+    Get current tenant for this request/context
+
     Returns:
         Tenant object or None
     """
-    return getattr(_thread_locals, 'tenant', None)
+    return _current_tenant.get()
 
 
 def set_current_tenant(tenant):
     """
-    Set current tenant in thread-local storage
-    
+    Set current tenant for this request/context
+
     Args:
         tenant: Tenant object or None
+
+    Returns:
+        Token that can be passed to reset_current_tenant()
+    """
+    return _current_tenant.set(tenant)
+
+
+def reset_current_tenant(token):
+    """Restore the tenant that was current before set_current_tenant()"""
+    _current_tenant.reset(token)
+
+
+@contextmanager
+def tenant_context(tenant):
+    """
+    Scope queries to tenant inside a block
+
+    Usage:
+        with tenant_context(user.tenant):
+            Order.objects.count()
     """
-    _thread_locals.tenant = tenant
+    token = set_current_tenant(tenant)
+    try:
+        yield tenant
+    finally:
+        reset_current_tenant(token)
+
+
+def _tenant_for_user(user):
+    """Tenant to scope queries to (None = unfiltered)"""
+    if not user.is_authenticated:
+        return None
+    # Superuser can see all data
+    if user.is_superuser:
+        return None
+    # Regular users only see their tenant's data
+    if hasattr(user, 'tenant') and user.tenant:
+        return user.tenant
+    return None
 
 
 class TenantMiddleware:
     """
     Middleware to automatically set current tenant from authenticated user
-    
+
     This runs on EVERY request and ensures:
     1. Current tenant is set from logged-in user
     2. All database queries are filtered by tenant
-    3. Thread-local storage is cleaned after request
+    3. The tenant is reset after the request (even on exceptions)
+
+    Works in both sync (WSGI) and async (ASGI) middleware chains
     """
-    
+
+    sync_capable = True
+    async_capable = True
+
     def __init__(self, get_response):
         self.get_response = get_response
-    
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
     def __call__(self, request):
         """Process the request"""
-        
-        # Reset tenant at start of each request
-        set_current_tenant(None)
-        
-        # Set tenant if user is authenticated
-        if request.user.is_authenticated:
-            # Superuser can see all data
-            if request.user.is_superuser:
-                set_current_tenant(None)
-            # Regular users only see their tenant's data
-            elif hasattr(request.user, 'tenant') and request.user.tenant:
-                set_current_tenant(request.user.tenant)
-        
-        # Process the request
-        response = self.get_response(request)
-        
-        # Clean up thread-local storage after request
-        set_current_tenant(None)
-        
-        return response
-    
-    def process_exception(self, request, exception):
-        """Clean up even if there's an exception"""
-        set_current_tenant(None)
-        return None
\ No newline at end of file
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        with tenant_context(_tenant_for_user(request.user)):
+            return self.get_response(request)
+
+    async def __acall__(self, request):
+        """Process the request (async chain)"""
+        user = await request.auser()
+        tenant = await sync_to_async(_tenant_for_user)(user)
+
+        with tenant_context(tenant):
+            return await self.get_response(request)
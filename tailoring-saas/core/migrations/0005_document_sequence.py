@@ -0,0 +1,32 @@
+# Generated by Django 5.0 on 2026-10-17 06:08
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_tenantsubscription_orders_created'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DocumentSequence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(help_text='ORD, RV, PAY, RF, PREF, INV, ...', max_length=20, verbose_name='Sequence Key')),
+                ('period', models.CharField(blank=True, default='', help_text='YYYYMM, FY code or YYYYMMDD', max_length=20, verbose_name='Period')),
+                ('last_number', models.PositiveBigIntegerField(default=0, verbose_name='Last Number Issued')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('tenant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='document_sequences', to='core.tenant')),
+            ],
+            options={
+                'verbose_name': 'Document Sequence',
+                'verbose_name_plural': 'Document Sequences',
+                'db_table': 'document_sequences',
+                'unique_together': {('tenant', 'key', 'period')},
+            },
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.0 on 2026-10-17 06:16
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_document_sequence'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BackgroundJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('job_type', models.CharField(choices=[('ORDER_QR', 'Order QR Code'), ('EMPLOYEE_QR', 'Employee QR Code'), ('INVOICE_PDF', 'Invoice PDF')], max_length=30, verbose_name='Job Type')),
+                ('object_id', models.PositiveBigIntegerField(verbose_name='Object ID')),
+                ('status', models.CharField(choices=[('PENDING', 'Pending'), ('RUNNING', 'Running'), ('DONE', 'Done'), ('FAILED', 'Failed')], default='PENDING', max_length=20, verbose_name='Status')),
+                ('attempts', models.PositiveIntegerField(default=0, verbose_name='Attempts')),
+                ('max_attempts', models.PositiveIntegerField(default=5, verbose_name='Max Attempts')),
+                ('run_after', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Run After')),
+                ('last_error', models.TextField(blank=True, verbose_name='Last Error')),
+                ('locked_by', models.CharField(blank=True, max_length=100, verbose_name='Locked By')),
+                ('locked_at', models.DateTimeField(blank=True, null=True, verbose_name='Locked At')),
+                ('result_file', models.FileField(blank=True, null=True, upload_to='jobs/%Y/%m/', verbose_name='Result File')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('completed_at', models.DateTimeField(blank=True, null=True)),
+                ('tenant', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='background_jobs', to='core.tenant')),
+            ],
+            options={
+                'verbose_name': 'Background Job',
+                'verbose_name_plural': 'Background Jobs',
+                'db_table': 'background_jobs',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['status', 'run_after'], name='background__status_ff06b6_idx'), models.Index(fields=['job_type', 'object_id'], name='background__job_typ_f51dba_idx')],
+            },
+        ),
+    ]
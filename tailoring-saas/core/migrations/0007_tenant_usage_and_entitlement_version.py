@@ -0,0 +1,35 @@
+# Generated by Django 5.0 on 2026-10-17 06:22
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_background_job'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tenantsubscription',
+            name='version',
+            field=models.PositiveIntegerField(default=1, verbose_name='Entitlement Version'),
+        ),
+        migrations.CreateModel(
+            name='TenantUsage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('employees', models.PositiveIntegerField(default=0, verbose_name='Active Employees')),
+                ('customers', models.PositiveIntegerField(default=0, verbose_name='Active Customers')),
+                ('users', models.PositiveIntegerField(default=0, verbose_name='Active Users')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('tenant', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='usage', to='core.tenant')),
+            ],
+            options={
+                'verbose_name': 'Tenant Usage',
+                'verbose_name_plural': 'Tenant Usage',
+                'db_table': 'tenant_usage',
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0 on 2026-10-17 06:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_tenant_usage_and_entitlement_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tenant',
+            name='measurement_form_version',
+            field=models.PositiveIntegerField(default=1, editable=False),
+        ),
+    ]
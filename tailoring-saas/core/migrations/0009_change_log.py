@@ -0,0 +1,32 @@
+# Generated by Django 5.0 on 2026-10-17 06:53
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_tenant_measurement_form_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChangeLogEntry',
+            fields=[
+                ('seq', models.BigAutoField(primary_key=True, serialize=False, verbose_name='Sequence')),
+                ('collection', models.CharField(help_text='customers, orders, invoices, ...', max_length=30, verbose_name='Collection')),
+                ('object_id', models.PositiveBigIntegerField(verbose_name='Object ID')),
+                ('op', models.CharField(choices=[('U', 'Upsert'), ('D', 'Delete')], max_length=1, verbose_name='Operation')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('tenant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='change_log', to='core.tenant')),
+            ],
+            options={
+                'verbose_name': 'Change Log Entry',
+                'verbose_name_plural': 'Change Log',
+                'db_table': 'change_log',
+                'ordering': ['seq'],
+                'indexes': [models.Index(fields=['tenant', 'seq'], name='change_log_tenant__444ee0_idx'), models.Index(fields=['created_at'], name='change_log_created_a94786_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.0 on 2026-10-17 07:21
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_change_log'),
+        ('orders', '0009_customer_search_index'),
+        ('invoicing', '0004_list_ordering_indexes'),
+        ('financials', '0004_list_ordering_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('orders_draft', models.PositiveIntegerField(default=0)),
+                ('orders_confirmed', models.PositiveIntegerField(default=0)),
+                ('orders_in_progress', models.PositiveIntegerField(default=0)),
+                ('orders_ready', models.PositiveIntegerField(default=0)),
+                ('orders_completed', models.PositiveIntegerField(default=0)),
+                ('orders_cancelled', models.PositiveIntegerField(default=0)),
+                ('new_customers', models.PositiveIntegerField(default=0)),
+                ('invoices_issued', models.PositiveIntegerField(default=0)),
+                ('invoiced_amount', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14)),
+                ('outstanding_amount', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14)),
+                ('payments_received', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14)),
+                ('advances_received', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14)),
+                ('advance_refunds', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14)),
+                ('payment_refunds', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('tenant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to='core.tenant')),
+            ],
+            options={
+                'verbose_name': 'Daily Stats',
+                'verbose_name_plural': 'Daily Stats',
+                'db_table': 'daily_stats',
+                'unique_together': {('tenant', 'date')},
+            },
+        ),
+        # Backfilled with the running totals (0011_daily_stats_total)
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 5.0 on 2026-10-17 08:25
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.db import migrations, models
+
+
+def backfill_daily_stats(apps, schema_editor):
+    from core.daily_stats import rebuild_daily_stats
+
+    Tenant = apps.get_model('core', 'Tenant')
+    for tenant_id in Tenant._base_manager.values_list('pk', flat=True):
+        rebuild_daily_stats(tenant_id, apps=apps)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_daily_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyStatsTotal',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('orders_draft', models.PositiveIntegerField(default=0)),
+                ('orders_confirmed', models.PositiveIntegerField(default=0)),
+                ('orders_in_progress', models.PositiveIntegerField(default=0)),
+                ('orders_ready', models.PositiveIntegerField(default=0)),
+                ('orders_completed', models.PositiveIntegerField(default=0)),
+                ('orders_cancelled', models.PositiveIntegerField(default=0)),
+                ('new_customers', models.PositiveIntegerField(default=0)),
+                ('invoices_issued', models.PositiveIntegerField(default=0)),
+                ('invoiced_amount', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14)),
+                ('outstanding_amount', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14)),
+                ('payments_received', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14)),
+                ('advances_received', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14)),
+                ('advance_refunds', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14)),
+                ('payment_refunds', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('tenant', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats_total', to='core.tenant')),
+            ],
+            options={
+                'verbose_name': 'Daily Stats Total',
+                'verbose_name_plural': 'Daily Stats Totals',
+                'db_table': 'daily_stats_total',
+            },
+        ),
+        migrations.RunPython(backfill_daily_stats, migrations.RunPython.noop),
+    ]
@@ -63,6 +63,10 @@ class Tenant(models.Model):
     # Status
     is_active = models.BooleanField(default=True)
     
+    # Bumped (with F()) when this tenant's measurement forms may have changed
+    # - masters.measurement_forms
+    measurement_form_version = models.PositiveIntegerField(default=1, editable=False)
+    
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -92,6 +96,12 @@ class Tenant(models.Model):
         """Auto-generate slug from name if not provided"""
         if not self.slug:
             self.slug = slugify(self.name)
+        if not self._state.adding and kwargs.get('update_fields') is None and not kwargs.get('force_insert'):
+            # Never write back a stale measurement_form_version
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != 'measurement_form_version'
+            ]
         super().save(*args, **kwargs)
 
 
@@ -808,9 +818,16 @@ class TenantSubscription(models.Model):
     orders_this_month = models.IntegerField(default=0)
     last_reset_date = models.DateField(default=timezone.now)
     
+    # Bumped whenever plan/status/dates change (or the plan itself is edited)
+    # Part of the core.entitlements cache key
+    version = models.PositiveIntegerField(default=1, verbose_name="Entitlement Version")
+    
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    # Fields that change what the tenant is entitled to
+    ENTITLEMENT_FIELDS = {'plan', 'status', 'start_date', 'end_date', 'trial_end_date', 'billing_cycle'}
+    
     class Meta:
         verbose_name = "Tenant Subscription"
         verbose_name_plural = "Tenant Subscriptions"
@@ -818,6 +835,14 @@ class TenantSubscription(models.Model):
     def __str__(self):
         return f"{self.tenant.name} - {self.plan.name}"
     
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if self.pk and (update_fields is None or self.ENTITLEMENT_FIELDS & set(update_fields)):
+            self.version = (self.version or 0) + 1
+            if update_fields is not None:
+                kwargs['update_fields'] = set(update_fields) | {'version'}
+        super().save(*args, **kwargs)
+    
     def is_trial(self):
         """Check if in trial period"""
         if self.status == 'TRIAL' and self.trial_end_date:
@@ -856,13 +881,16 @@ class TenantSubscription(models.Model):
         if self.last_reset_date.month != today.month:
             self.orders_this_month = 0
             self.last_reset_date = today
-            self.save()
+            self.save(update_fields=['orders_this_month', 'last_reset_date', 'updated_at'])
     
-    def can_create_order(self):
-        """Check if tenant can create more orders this month"""
+    def can_create_order(self, plan=None):
+        """
+        Check if tenant can create more orders this month
+        plan: pass the cached plan (core.entitlements) to skip loading it
+        """
         self.reset_monthly_limits()
         
-        max_orders = self.plan.max_orders_per_month
+        max_orders = (plan or self.plan).max_orders_per_month
         
         # 0 = unlimited
         if max_orders == 0:
@@ -876,5 +904,250 @@ class TenantSubscription(models.Model):
     def increment_order_count(self):
         """Increment order count for this month"""
         self.orders_this_month += 1
-        self.save()
+        self.save(update_fields=['orders_this_month', 'updated_at'])
+
+
+class TenantUsage(models.Model):
+    """
+    Resource usage counters per tenant (active employees, customers, users)
+    Moved by +1 / -1 in core.signals when those rows are created, deleted,
+    activated or deactivated, so plan limit checks (check_resource_limit)
+    read a counter instead of running COUNT(*) - recounted only to reconcile
+    """
+    
+    tenant = models.OneToOneField(
+        Tenant,
+        on_delete=models.CASCADE,
+        related_name='usage'
+    )
+    
+    employees = models.PositiveIntegerField(default=0, verbose_name="Active Employees")
+    customers = models.PositiveIntegerField(default=0, verbose_name="Active Customers")
+    users = models.PositiveIntegerField(default=0, verbose_name="Active Users")
+    
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'tenant_usage'
+        verbose_name = "Tenant Usage"
+        verbose_name_plural = "Tenant Usage"
+    
+    def __str__(self):
+        return f"{self.tenant.name} usage"
+
+
+class RollupFigures(models.Model):
+    """Dashboard figures shared by a day's rollup and a tenant's running total"""
+
+    # Orders, by current order_status
+    orders_draft = models.PositiveIntegerField(default=0)
+    orders_confirmed = models.PositiveIntegerField(default=0)
+    orders_in_progress = models.PositiveIntegerField(default=0)
+    orders_ready = models.PositiveIntegerField(default=0)
+    orders_completed = models.PositiveIntegerField(default=0)
+    orders_cancelled = models.PositiveIntegerField(default=0)
+
+    new_customers = models.PositiveIntegerField(default=0)
+
+    # Issued / paid invoices
+    invoices_issued = models.PositiveIntegerField(default=0)
+    invoiced_amount = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal('0.00'))
+    outstanding_amount = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal('0.00'))
+
+    # Money in (invoice payments, advance receipts) and out (refunds)
+    payments_received = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal('0.00'))
+    advances_received = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal('0.00'))
+    advance_refunds = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal('0.00'))
+    payment_refunds = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal('0.00'))
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        abstract = True
+
+
+class DailyStats(RollupFigures):
+    """
+    Per-tenant daily rollup read by the dashboard (core.daily_stats)
+    Each figure belongs to the day of its document (order date, invoice
+    date, payment date...) and reflects the document's current state -
+    a day is recomputed when one of its documents is written
+    """
+
+    tenant = models.ForeignKey(
+        Tenant,
+        on_delete=models.CASCADE,
+        related_name='daily_stats'
+    )
+    date = models.DateField()
+
+    class Meta:
+        db_table = 'daily_stats'
+        verbose_name = "Daily Stats"
+        verbose_name_plural = "Daily Stats"
+        unique_together = ['tenant', 'date']
+
+    def __str__(self):
+        return f"{self.tenant_id} {self.date}"
+
+
+class DailyStatsTotal(RollupFigures):
+    """
+    Running sum of a tenant's DailyStats rows - the dashboard's all-time figures
+    Moved by exactly what each day refresh changed (core.daily_stats)
+    """
+
+    tenant = models.OneToOneField(
+        Tenant,
+        on_delete=models.CASCADE,
+        related_name='daily_stats_total'
+    )
+
+    class Meta:
+        db_table = 'daily_stats_total'
+        verbose_name = "Daily Stats Total"
+        verbose_name_plural = "Daily Stats Totals"
+
+    def __str__(self):
+        return f"{self.tenant_id} total"
+
+
+
+# ==================== DOCUMENT SEQUENCES ====================
 
+class DocumentSequence(models.Model):
+    """
+    Per-tenant document number counter
+    One row per (tenant, key, period) - e.g. (shop, 'ORD', '202602'), (shop, 'INV', '2526')
+    Claimed atomically by core.sequences.allocate_number()
+    """
+    
+    tenant = models.ForeignKey(
+        Tenant,
+        on_delete=models.CASCADE,
+        related_name='document_sequences'
+    )
+    
+    key = models.CharField(max_length=20, verbose_name="Sequence Key", help_text="ORD, RV, PAY, RF, PREF, INV, ...")
+    period = models.CharField(max_length=20, blank=True, default='', verbose_name="Period", help_text="YYYYMM, FY code or YYYYMMDD")
+    last_number = models.PositiveBigIntegerField(default=0, verbose_name="Last Number Issued")
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'document_sequences'
+        verbose_name = "Document Sequence"
+        verbose_name_plural = "Document Sequences"
+        unique_together = [['tenant', 'key', 'period']]
+    
+    def __str__(self):
+        return f"{self.tenant_id} - {self.key} {self.period}: {self.last_number}"
+
+
+# ==================== BACKGROUND JOBS ====================
+
+class BackgroundJob(models.Model):
+    """
+    Database-backed job queue for slow artifacts (QR codes, invoice PDFs)
+    Enqueued by core.jobs.enqueue_job() in the caller's transaction,
+    processed by `python manage.py run_jobs`
+    """
+    
+    JOB_TYPE_CHOICES = [
+        ('ORDER_QR', 'Order QR Code'),
+        ('EMPLOYEE_QR', 'Employee QR Code'),
+        ('INVOICE_PDF', 'Invoice PDF'),
+    ]
+    
+    STATUS_CHOICES = [
+        ('PENDING', 'Pending'),
+        ('RUNNING', 'Running'),
+        ('DONE', 'Done'),
+        ('FAILED', 'Failed'),
+    ]
+    
+    tenant = models.ForeignKey(
+        Tenant,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='background_jobs'
+    )
+    
+    job_type = models.CharField(max_length=30, choices=JOB_TYPE_CHOICES, verbose_name="Job Type")
+    object_id = models.PositiveBigIntegerField(verbose_name="Object ID")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='PENDING', verbose_name="Status")
+    
+    # Retry
+    attempts = models.PositiveIntegerField(default=0, verbose_name="Attempts")
+    max_attempts = models.PositiveIntegerField(default=5, verbose_name="Max Attempts")
+    run_after = models.DateTimeField(default=timezone.now, verbose_name="Run After")
+    last_error = models.TextField(blank=True, verbose_name="Last Error")
+    
+    # Worker claim
+    locked_by = models.CharField(max_length=100, blank=True, verbose_name="Locked By")
+    locked_at = models.DateTimeField(null=True, blank=True, verbose_name="Locked At")
+    
+    # Result - stored here for artifacts without a model field (invoice PDF)
+    result_file = models.FileField(upload_to='jobs/%Y/%m/', null=True, blank=True, verbose_name="Result File")
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        db_table = 'background_jobs'
+        verbose_name = "Background Job"
+        verbose_name_plural = "Background Jobs"
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'run_after']),
+            models.Index(fields=['job_type', 'object_id']),
+        ]
+    
+    def __str__(self):
+        return f"{self.job_type} #{self.object_id} ({self.status})"
+
+
+# ==================== CHANGE FEED ====================
+
+class ChangeLogEntry(models.Model):
+    """
+    One committed write to a synced model (core.changes.CHANGE_FEED)
+    seq is monotonic across tenants; clients pull entries after the last
+    seq they applied from GET /api/auth/changes/?since=<seq>
+    """
+    
+    OP_UPSERT = 'U'
+    OP_DELETE = 'D'
+    OP_CHOICES = [
+        (OP_UPSERT, 'Upsert'),
+        (OP_DELETE, 'Delete'),
+    ]
+    
+    seq = models.BigAutoField(primary_key=True, verbose_name="Sequence")
+    tenant = models.ForeignKey(
+        Tenant,
+        on_delete=models.CASCADE,
+        related_name='change_log'
+    )
+    
+    collection = models.CharField(max_length=30, verbose_name="Collection", help_text="customers, orders, invoices, ...")
+    object_id = models.PositiveBigIntegerField(verbose_name="Object ID")
+    op = models.CharField(max_length=1, choices=OP_CHOICES, verbose_name="Operation")
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        db_table = 'change_log'
+        verbose_name = "Change Log Entry"
+        verbose_name_plural = "Change Log"
+        ordering = ['seq']
+        indexes = [
+            models.Index(fields=['tenant', 'seq']),
+            models.Index(fields=['created_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.seq}: {self.collection} #{self.object_id} ({self.op})"
@@ -0,0 +1,191 @@
+"""
+Pagination classes
+Date: 2026-10-17
+
+Page-number pagination runs COUNT(*) plus an OFFSET scan that grows with
+history depth. KeysetPagination seeks past the last row of the previous page
+on the view's ordering (plus pk as tie-breaker), so every page costs one
+indexed query of page_size + 1 rows however deep the client scrolls.
+
+OptInCursorPagination keeps the page-number response by default and switches
+to keyset pagination when the client asks for it:
+    GET /api/orders/?pagination=cursor        first page
+    GET /api/orders/?cursor=<next cursor>     following pages
+"""
+
+import base64
+import json
+from urllib import parse
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination over a composite ordering
+
+    The view declares the ordering, e.g.
+        cursor_ordering = ('-order_date', '-created_at')
+    pk is appended so the position is always unique. Ordering fields must be
+    non-null.
+    """
+
+    page_size = api_settings.PAGE_SIZE
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(view)
+
+        position, reverse = self.decode_cursor(request, queryset.model)
+        if position is not None:
+            queryset = queryset.filter(self._seek_filter(position, reverse))
+
+        ordering = [self._invert(field) for field in self.ordering] if reverse else self.ordering
+        rows = list(queryset.order_by(*ordering)[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        page = rows[:self.page_size]
+        if reverse:
+            page.reverse()
+
+        # Going forward there is a previous page if we came from a cursor;
+        # going back there is always a next page (the one we came from)
+        self.has_next = has_more if not reverse else True
+        self.has_previous = (position is not None) if not reverse else has_more
+        self.page = page
+        return page
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    # ==================== ORDERING ====================
+
+    def get_ordering(self, view):
+        ordering = list(getattr(view, 'cursor_ordering', None) or ('-created_at',))
+        if not any(field.lstrip('-') in ('pk', 'id') for field in ordering):
+            # Tie-breaker follows the direction of the leading field
+            ordering.append('-pk' if ordering[0].startswith('-') else 'pk')
+        return ordering
+
+    @staticmethod
+    def _invert(field):
+        return field[1:] if field.startswith('-') else f'-{field}'
+
+    def _seek_filter(self, position, reverse):
+        """
+        Rows strictly after position in the (possibly reversed) ordering:
+        (a > x) OR (a = x AND b > y) OR (a = x AND b = y AND c > z) ...
+        """
+        condition = Q()
+        equal = {}
+        for field, value in zip(self.ordering, position):
+            name = field.lstrip('-')
+            descending = field.startswith('-') != reverse
+            lookup = f'{name}__lt' if descending else f'{name}__gt'
+            condition |= Q(**equal, **{lookup: value})
+            equal[name] = value
+        return condition
+
+    def _position(self, instance):
+        return [getattr(instance, field.lstrip('-')) for field in self.ordering]
+
+    # ==================== CURSOR ENCODING ====================
+
+    def encode_cursor(self, position, reverse):
+        values = [value.isoformat() if hasattr(value, 'isoformat') else value for value in position]
+        payload = json.dumps({'p': values, 'r': int(reverse)}, separators=(',', ':'))
+        encoded = base64.urlsafe_b64encode(payload.encode()).decode()
+        url = self.request.build_absolute_uri()
+        url = remove_query_param(url, 'pagination')
+        return replace_query_param(url, self.cursor_query_param, encoded)
+
+    def decode_cursor(self, request, model):
+        """(position values or None, reverse)"""
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(parse.unquote(encoded).encode()).decode())
+            raw = payload['p']
+            if len(raw) != len(self.ordering):
+                raise ValueError
+            position = [
+                model._meta.pk.to_python(value) if field.lstrip('-') == 'pk'
+                else model._meta.get_field(field.lstrip('-')).to_python(value)
+                for field, value in zip(self.ordering, raw)
+            ]
+            return position, bool(payload.get('r'))
+        except (TypeError, ValueError, KeyError, DjangoValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self._position(self.page[-1]), reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self._position(self.page[0]), reverse=True)
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+            if size > 0:
+                return min(size, self.max_page_size)
+        except (KeyError, ValueError):
+            pass
+        return self.page_size
+
+
+class OptInCursorPagination(PageNumberPagination):
+    """
+    Page-number pagination unless the request opts in to keyset pagination
+    (?pagination=cursor or a ?cursor= token) - lets clients migrate one
+    screen at a time
+    """
+
+    cursor_class = KeysetPagination
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.wants_cursor(request):
+            self.cursor_paginator = self.cursor_class()
+            return self.cursor_paginator.paginate_queryset(queryset, request, view)
+        self.cursor_paginator = None
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    @staticmethod
+    def wants_cursor(request):
+        params = request.query_params
+        return params.get('pagination') == 'cursor' or KeysetPagination.cursor_query_param in params
@@ -1,10 +1,14 @@
 """
 Custom permission classes for role-based access control
 Uses Employee role from employee profile to determine permissions
+UPDATED: Employee is read from the request principal (core.authentication),
+loaded once per request with the user
 """
 
 from rest_framework import permissions
 
+from .authentication import get_principal
+
 
 class IsAuthenticated(permissions.BasePermission):
     """User must be authenticated"""
@@ -21,7 +25,7 @@ class HasEmployeeProfile(permissions.BasePermission):
             return False
         
         try:
-            return hasattr(request.user, 'employee_profile') and request.user.employee_profile is not None
+            return get_principal(request).employee is not None
         except:
             return False
 
@@ -39,7 +43,7 @@ class IsOwner(permissions.BasePermission):
         
         # Check through employee profile
         try:
-            return request.user.employee_profile.role == 'OWNER'
+            return get_principal(request).employee.role == 'OWNER'
         except:
             return False
 
@@ -57,7 +61,7 @@ class IsManagement(permissions.BasePermission):
         
         # Check through employee profile
         try:
-            return request.user.employee_profile.is_management
+            return get_principal(request).employee.is_management
         except:
             return False
 
@@ -82,7 +86,7 @@ class CanManageOrders(permissions.BasePermission):
         
         # Allow write for specific roles
         try:
-            return request.user.employee_profile.can_manage_orders
+            return get_principal(request).employee.can_manage_orders
         except:
             return False
 
@@ -107,7 +111,7 @@ class CanManageInventory(permissions.BasePermission):
         
         # Allow write for specific roles
         try:
-            return request.user.employee_profile.can_manage_inventory
+            return get_principal(request).employee.can_manage_inventory
         except:
             return False
 
@@ -129,13 +133,13 @@ class CanManageEmployees(permissions.BasePermission):
         # Allow read for management
         if request.method in permissions.SAFE_METHODS:
             try:
-                return request.user.employee_profile.is_management
+                return get_principal(request).employee.is_management
             except:
                 return False
         
         # Allow write only for HR roles
         try:
-            return request.user.employee_profile.can_manage_employees
+            return get_principal(request).employee.can_manage_employees
         except:
             return False
 
@@ -157,13 +161,13 @@ class CanManagePayments(permissions.BasePermission):
         # Allow read for management
         if request.method in permissions.SAFE_METHODS:
             try:
-                return request.user.employee_profile.is_management
+                return get_principal(request).employee.is_management
             except:
                 return False
         
         # Allow write for payment roles
         try:
-            return request.user.employee_profile.can_manage_payments
+            return get_principal(request).employee.can_manage_payments
         except:
             return False
 
@@ -183,7 +187,7 @@ class CanAssignTasks(permissions.BasePermission):
             return True
         
         try:
-            return request.user.employee_profile.can_assign_tasks
+            return get_principal(request).employee.can_assign_tasks
         except:
             return False
 
@@ -205,7 +209,7 @@ class IsOwnerOrReadOnly(permissions.BasePermission):
         
         # Allow write only for owners
         try:
-            return request.user.employee_profile.role == 'OWNER'
+            return get_principal(request).employee.role == 'OWNER'
         except:
             return False
 
@@ -225,7 +229,7 @@ class CanViewReports(permissions.BasePermission):
             return True
         
         try:
-            return request.user.employee_profile.is_management
+            return get_principal(request).employee.is_management
         except:
             return False
 
@@ -245,7 +249,7 @@ class IsDepartmentMaster(permissions.BasePermission):
             return True
         
         try:
-            employee = request.user.employee_profile
+            employee = get_principal(request).employee
             return employee.role == 'DEPARTMENT_MASTER' or employee.is_management
         except:
             return False
@@ -266,7 +270,7 @@ class CanAccessWorkshopTablet(permissions.BasePermission):
             return True
         
         try:
-            return request.user.employee_profile.needs_workshop_pin
+            return get_principal(request).employee.needs_workshop_pin
         except:
             return False
 
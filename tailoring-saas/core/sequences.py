@@ -0,0 +1,174 @@
+"""
+Document number allocation (ORD / RV / PAY / RF / PREF / INV / purchase PAY)
+One counter row per (tenant, key, period) in DocumentSequence
+
+- Numbers are claimed with an atomic UPDATE ... SET last_number = last_number + n
+  (no ordered prefix scan per insert, no duplicate numbers under concurrency)
+- New counter rows are seeded once from the highest number already issued
+- Non-gapless keys can reserve numbers in blocks (DOCUMENT_SEQUENCE_BLOCK_SIZES)
+- INV is gapless per financial year: always claimed one at a time, inside the
+  caller's transaction, so a failed insert rolls the counter back
+"""
+
+import threading
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+
+# Keys that must never skip a number (GST invoice series)
+GAPLESS_KEYS = {'INV'}
+
+# Process-local reserved blocks: {(tenant_id, key, period): [[next, last], ...]}
+_reserved_blocks = {}
+_reserved_lock = threading.Lock()
+
+
+def get_block_size(key):
+    """Block size configured for a sequence key (1 = no reservation)"""
+    if key in GAPLESS_KEYS:
+        return 1
+    block_sizes = getattr(settings, 'DOCUMENT_SEQUENCE_BLOCK_SIZES', {})
+    return max(1, int(block_sizes.get(key, 1)))
+
+
+def max_existing_suffix(queryset, field, prefix):
+    """
+    Highest numeric suffix already issued for prefix
+    Used only to seed a new counter row from legacy data
+
+    Example: max_existing_suffix(Order.all_objects.filter(tenant=t), 'order_number', 'ORD-202602-')
+    """
+    highest = 0
+    values = queryset.filter(**{f'{field}__startswith': prefix}).values_list(field, flat=True)
+    for value in values.iterator():
+        try:
+            highest = max(highest, int(value[len(prefix):]))
+        except (ValueError, TypeError):
+            continue
+    return highest
+
+
+def allocate_number(tenant, key, period='', seed=None, block_size=None):
+    """
+    Claim the next number for (tenant, key, period)
+
+    Args:
+        tenant: Tenant instance or id
+        key: Sequence key, e.g. 'ORD', 'INV'
+        period: Period code, e.g. '202602' (month) or '2526' (financial year)
+        seed: Optional callable returning the highest number already issued
+              (called only when the counter row does not exist yet)
+        block_size: Override configured block size
+
+    Returns:
+        int: the allocated number
+    """
+    tenant_id = getattr(tenant, 'pk', tenant)
+    if key in GAPLESS_KEYS:
+        block_size = 1
+    elif block_size is None:
+        block_size = get_block_size(key)
+
+    pool_key = (tenant_id, key, period)
+
+    if block_size > 1:
+        number = _take_reserved(pool_key)
+        if number is not None:
+            return number
+
+    with transaction.atomic():
+        last = _claim(tenant_id, key, period, block_size, seed)
+
+    first = last - block_size + 1
+
+    # Hand out the rest of the block only once the claim is committed,
+    # so a rollback can never lead to a number being issued twice
+    if block_size > 1:
+        transaction.on_commit(lambda: _add_reserved(pool_key, first + 1, last))
+
+    return first
+
+
+def reserve_numbers(tenant, key, period='', count=1, seed=None):
+    """
+    Claim count consecutive numbers in one UPDATE and return the first
+    For bulk inserts (data generators, imports) - the numbers are handed to
+    the caller, not to the process-local reserve pool
+
+    Must run in the caller's transaction for gapless keys (INV)
+    """
+    tenant_id = getattr(tenant, 'pk', tenant)
+    with transaction.atomic():
+        last = _claim(tenant_id, key, period, count, seed)
+    return last - count + 1
+
+
+def _claim(tenant_id, key, period, count, seed):
+    """Atomically advance the counter by count and return the new last_number"""
+    from .models import DocumentSequence
+
+    counter = DocumentSequence.objects.filter(tenant_id=tenant_id, key=key, period=period)
+    advance = {'last_number': F('last_number') + count, 'updated_at': timezone.now()}
+
+    if not counter.update(**advance):
+        start = seed() if seed else 0
+        try:
+            with transaction.atomic():
+                DocumentSequence.objects.create(
+                    tenant_id=tenant_id,
+                    key=key,
+                    period=period,
+                    last_number=start + count
+                )
+            return start + count
+        except IntegrityError:
+            # Another request created the row first - claim from it
+            counter.update(**advance)
+
+    return counter.values_list('last_number', flat=True).get()
+
+
+def _take_reserved(pool_key):
+    with _reserved_lock:
+        ranges = _reserved_blocks.get(pool_key)
+        while ranges:
+            current = ranges[0]
+            if current[0] <= current[1]:
+                number = current[0]
+                current[0] += 1
+                return number
+            ranges.pop(0)
+    return None
+
+
+def _add_reserved(pool_key, first, last):
+    if first > last:
+        return
+    with _reserved_lock:
+        _reserved_blocks.setdefault(pool_key, []).append([first, last])
+
+
+def clear_reserved_blocks():
+    """Drop process-local reservations (tests / benchmarks)"""
+    with _reserved_lock:
+        _reserved_blocks.clear()
+
+
+# ==================== PERIOD HELPERS ====================
+
+def month_period(when=None):
+    """YYYYMM period code"""
+    return (when or timezone.now()).strftime('%Y%m')
+
+
+def financial_year_code(day=None):
+    """
+    Indian financial year code (April 1 to March 31)
+    Feb 2026 → '2526', Apr 2026 → '2627'
+    """
+    day = day or timezone.now().date()
+    fy_start = day.year if day.month >= 4 else day.year - 1
+    return f"{fy_start % 100:02d}{(fy_start + 1) % 100:02d}"
@@ -3,7 +3,7 @@ Serializers for Core app
 """
 from rest_framework import serializers
 from django.contrib.auth.password_validation import validate_password
-from .models import User, Tenant
+from .models import User, Tenant, BackgroundJob
 # ← REMOVED: SubscriptionPlan, TenantSubscription imports
 
 
@@ -95,4 +95,26 @@ class LoginSerializer(serializers.Serializer):
     )
 
 # ← DELETED OLD SubscriptionPlanSerializer and TenantSubscriptionSerializer
-# ← They're now in core/subscription_serializers.py with correct fields
\ No newline at end of file
+# ← They're now in core/subscription_serializers.py with correct fields
+
+
+class BackgroundJobSerializer(serializers.ModelSerializer):
+    """Status of a background job - result_url is set once the artifact is ready"""
+    result_url = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = BackgroundJob
+        fields = [
+            'id', 'job_type', 'object_id', 'status', 'attempts', 'max_attempts',
+            'last_error', 'result_url', 'created_at', 'completed_at'
+        ]
+        read_only_fields = fields
+    
+    def get_result_url(self, obj):
+        from .jobs import job_result_url
+        
+        url = job_result_url(obj)
+        request = self.context.get('request')
+        if url and request:
+            return request.build_absolute_uri(url)
+        return url
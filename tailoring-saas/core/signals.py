@@ -1,11 +1,19 @@
 """
 Signals for automatic subscription creation
+UPDATED: Entitlement cache invalidation and usage counter refresh
+(core.entitlements)
+UPDATED: Customer stats refresh on order/invoice writes (orders.customer_stats)
+UPDATED: Customer search index sync (orders.search)
+UPDATED: Change feed entries for offline clients (core.changes)
+UPDATED: Dashboard daily rollups (core.daily_stats)
 """
-from django.db.models.signals import post_save
+from django.db.models import F
+from django.db.models.signals import post_init, post_save, post_delete, pre_save
 from django.dispatch import receiver
 from django.utils import timezone
 from datetime import timedelta
 from .models import Tenant, SubscriptionPlan, TenantSubscription
+from .entitlements import invalidate_entitlements, schedule_usage_change, schedule_usage_refresh
 
 
 @receiver(post_save, sender=Tenant)
@@ -65,3 +73,234 @@ def create_tenant_subscription(sender, instance, created, **kwargs):
             
         except Exception as e:
             print(f"❌ Error creating subscription for tenant {instance.name}: {str(e)}")
+
+
+# ==================== ENTITLEMENT CACHE ====================
+
+@receiver(post_save, sender=TenantSubscription)
+@receiver(post_delete, sender=TenantSubscription)
+def invalidate_subscription_entitlements(sender, instance, **kwargs):
+    """Subscription changed - its version was bumped in save()"""
+    invalidate_entitlements(instance.tenant_id)
+
+
+@receiver(post_save, sender=SubscriptionPlan)
+def invalidate_plan_entitlements(sender, instance, created, **kwargs):
+    """
+    Plan edited - bump every subscription on it so other worker
+    processes miss their cached copy too
+    """
+    if created:
+        return
+    TenantSubscription.objects.filter(plan=instance).update(version=F('version') + 1)
+    invalidate_entitlements()
+
+
+# ==================== USAGE COUNTERS ====================
+
+# Model label -> TenantUsage counter (rows counted while is_active)
+USAGE_COUNTER_MODELS = {
+    'employees.Employee': 'employees',
+    'orders.Customer': 'customers',
+    'core.User': 'users',
+}
+
+# (tenant_id, is_active) of a counted row when it was loaded (or last saved)
+LOADED_USAGE_ATTR = '_usage_state'
+
+
+def _affects_usage(kwargs):
+    """Skip partial saves that can't change the active count (e.g. last_login)"""
+    update_fields = kwargs.get('update_fields')
+    return not update_fields or bool({'is_active', 'tenant'} & set(update_fields))
+
+
+def _count_usage(counter, state, delta):
+    tenant_id, is_active = state
+    if is_active:
+        schedule_usage_change(tenant_id, counter, delta)
+
+
+@receiver(post_init, sender='employees.Employee')
+@receiver(post_init, sender='orders.Customer')
+@receiver(post_init, sender='core.User')
+def remember_usage_state(sender, instance, **kwargs):
+    """Keep what a loaded row counts towards, so a save moves the counter without a recount"""
+    if instance.pk is not None and {'tenant_id', 'is_active'} <= instance.__dict__.keys():
+        setattr(instance, LOADED_USAGE_ATTR, (instance.tenant_id, instance.is_active))
+
+
+@receiver(post_save, sender='employees.Employee')
+@receiver(post_save, sender='orders.Customer')
+@receiver(post_save, sender='core.User')
+def count_usage_on_save(sender, instance, created, **kwargs):
+    counter = USAGE_COUNTER_MODELS[sender._meta.label]
+    if not created and not _affects_usage(kwargs):
+        return
+    
+    state = (instance.tenant_id, instance.is_active)
+    if created:
+        _count_usage(counter, state, 1)
+    elif not hasattr(instance, LOADED_USAGE_ATTR):
+        # Loaded with tenant / is_active deferred - recount
+        schedule_usage_refresh(instance.tenant_id, counter)
+    elif getattr(instance, LOADED_USAGE_ATTR) != state:
+        _count_usage(counter, getattr(instance, LOADED_USAGE_ATTR), -1)
+        _count_usage(counter, state, 1)
+    setattr(instance, LOADED_USAGE_ATTR, state)
+
+
+@receiver(post_delete, sender='employees.Employee')
+@receiver(post_delete, sender='orders.Customer')
+@receiver(post_delete, sender='core.User')
+def count_usage_on_delete(sender, instance, **kwargs):
+    counter = USAGE_COUNTER_MODELS[sender._meta.label]
+    state = getattr(instance, LOADED_USAGE_ATTR, (instance.tenant_id, instance.is_active))
+    _count_usage(counter, state, -1)
+
+
+# ==================== CUSTOMER STATS ====================
+
+def _affects_customer_stats(kwargs, fields):
+    """Skip partial saves that can't change the cached customer stats (e.g. qr_code)"""
+    update_fields = kwargs.get('update_fields')
+    return not update_fields or bool(set(fields) & set(update_fields))
+
+
+@receiver(post_save, sender='orders.Order')
+@receiver(post_delete, sender='orders.Order')
+def refresh_stats_on_order_change(sender, instance, **kwargs):
+    from orders.customer_stats import schedule_customer_stats_refresh
+    if _affects_customer_stats(kwargs, ('customer', 'order_date')):
+        schedule_customer_stats_refresh(instance.customer_id)
+
+
+@receiver(post_save, sender='invoicing.Invoice')
+@receiver(post_delete, sender='invoicing.Invoice')
+def refresh_stats_on_invoice_change(sender, instance, **kwargs):
+    """Status changes (e.g. cancel); total changes arrive via invoice recalculation"""
+    from orders.customer_stats import schedule_customer_stats_refresh
+    if _affects_customer_stats(kwargs, ('customer', 'status', 'grand_total', 'remaining_balance', 'payment_status')):
+        schedule_customer_stats_refresh(instance.customer_id)
+
+
+# ==================== CUSTOMER SEARCH ====================
+
+@receiver(post_save, sender='orders.Customer')
+def index_customer_on_save(sender, instance, **kwargs):
+    from orders.search import index_customer
+    index_customer(instance)
+
+
+@receiver(post_delete, sender='orders.Customer')
+def unindex_customer_on_delete(sender, instance, **kwargs):
+    from orders.search import unindex_customer
+    unindex_customer(instance.pk)
+
+
+
+# ==================== CHANGE FEED ====================
+
+# model label -> core.changes collection
+CHANGE_COLLECTIONS = {
+    'orders.Customer': 'customers',
+    'orders.Order': 'orders',
+    'invoicing.Invoice': 'invoices',
+    'financials.ReceiptVoucher': 'receipt_vouchers',
+    'financials.Payment': 'payments',
+    'appointments.Appointment': 'appointments',
+}
+
+
+@receiver(post_save, sender='orders.Customer')
+@receiver(post_save, sender='orders.Order')
+@receiver(post_save, sender='invoicing.Invoice')
+@receiver(post_save, sender='financials.ReceiptVoucher')
+@receiver(post_save, sender='financials.Payment')
+@receiver(post_save, sender='appointments.Appointment')
+@receiver(post_delete, sender='orders.Customer')
+@receiver(post_delete, sender='orders.Order')
+@receiver(post_delete, sender='invoicing.Invoice')
+@receiver(post_delete, sender='financials.ReceiptVoucher')
+@receiver(post_delete, sender='financials.Payment')
+@receiver(post_delete, sender='appointments.Appointment')
+def log_tenant_change(sender, instance, signal, **kwargs):
+    from .changes import record_change
+    collection = CHANGE_COLLECTIONS[sender._meta.label]
+    record_change(instance.tenant_id, collection, instance.pk, deleted=signal is post_delete)
+
+
+@receiver(post_save, sender='orders.OrderItem')
+@receiver(post_delete, sender='orders.OrderItem')
+def log_order_item_change(sender, instance, signal, **kwargs):
+    """Items have no tenant column - it's the order's"""
+    from .changes import record_change
+    record_change(instance.order.tenant_id, 'order_items', instance.pk, deleted=signal is post_delete)
+
+
+# ==================== DAILY STATS ====================
+
+# Day a document counted towards when it was loaded (or last saved)
+LOADED_DATE_ATTR = '_daily_stats_date'
+
+
+@receiver(post_init, sender='orders.Order')
+@receiver(post_init, sender='invoicing.Invoice')
+@receiver(post_init, sender='financials.ReceiptVoucher')
+@receiver(post_init, sender='financials.Payment')
+@receiver(post_init, sender='financials.RefundVoucher')
+@receiver(post_init, sender='financials.PaymentRefund')
+def remember_daily_stats_date(sender, instance, **kwargs):
+    """Keep a loaded document's day, so a redate is seen without reading it again"""
+    from .daily_stats import document_date_field, document_date
+    
+    if instance.pk is not None and document_date_field(sender).attname in instance.__dict__:
+        setattr(instance, LOADED_DATE_ATTR, document_date(instance))
+
+
+@receiver(pre_save, sender='orders.Order')
+@receiver(pre_save, sender='invoicing.Invoice')
+@receiver(pre_save, sender='financials.ReceiptVoucher')
+@receiver(pre_save, sender='financials.Payment')
+@receiver(pre_save, sender='financials.RefundVoucher')
+@receiver(pre_save, sender='financials.PaymentRefund')
+def refresh_daily_stats_on_redate(sender, instance, **kwargs):
+    """A document moved to another day - its old day is recomputed too"""
+    from .daily_stats import SOURCE_MODELS, document_date_field, document_date, schedule_daily_stats_refresh
+    
+    date_field = document_date_field(sender).name
+    update_fields = kwargs.get('update_fields')
+    if instance.pk is None or (update_fields is not None and date_field not in update_fields):
+        return
+    
+    source = SOURCE_MODELS[sender._meta.label]
+    try:
+        previous = getattr(instance, LOADED_DATE_ATTR)
+    except AttributeError:
+        # Loaded with the date deferred - read it
+        previous = sender._base_manager.filter(pk=instance.pk).values_list(date_field, flat=True).first()
+    if previous is not None and previous != document_date(instance):
+        schedule_daily_stats_refresh(instance.tenant_id, previous, source)
+
+
+@receiver(post_save, sender='orders.Order')
+@receiver(post_save, sender='orders.Customer')
+@receiver(post_save, sender='invoicing.Invoice')
+@receiver(post_save, sender='financials.ReceiptVoucher')
+@receiver(post_save, sender='financials.Payment')
+@receiver(post_save, sender='financials.RefundVoucher')
+@receiver(post_save, sender='financials.PaymentRefund')
+@receiver(post_delete, sender='orders.Order')
+@receiver(post_delete, sender='orders.Customer')
+@receiver(post_delete, sender='invoicing.Invoice')
+@receiver(post_delete, sender='financials.ReceiptVoucher')
+@receiver(post_delete, sender='financials.Payment')
+@receiver(post_delete, sender='financials.RefundVoucher')
+@receiver(post_delete, sender='financials.PaymentRefund')
+def refresh_daily_stats_on_change(sender, instance, signal, **kwargs):
+    from .daily_stats import SOURCE_MODELS, document_date, schedule_daily_stats_refresh
+    date = document_date(instance)
+    schedule_daily_stats_refresh(instance.tenant_id, date, SOURCE_MODELS[sender._meta.label])
+    if signal is post_save:
+        # The next save of this instance redates from here
+        setattr(instance, LOADED_DATE_ATTR, date)
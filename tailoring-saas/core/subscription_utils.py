@@ -1,5 +1,9 @@
 """
 Subscription & Feature Check Utilities
+UPDATED: Tenant, subscription and plan come from the request principal
+(core.authentication) - stacked decorators don't re-query them
+UPDATED: Plan flags/limits come from the entitlement cache and resource usage
+from TenantUsage counters (core.entitlements) - no queries on a cache hit
 """
 
 from functools import wraps
@@ -7,6 +11,9 @@ from rest_framework.response import Response
 from rest_framework import status
 from django.utils import timezone
 
+from .authentication import get_principal
+from .entitlements import current_usage
+
 
 def require_active_subscription(view_func):
     """
@@ -14,16 +21,15 @@ def require_active_subscription(view_func):
     """
     @wraps(view_func)
     def wrapper(self, request, *args, **kwargs):
-        tenant = request.user.tenant
+        principal = get_principal(request)
         
-        if not tenant:
+        if not principal.tenant:
             return Response({
                 'error': 'No tenant associated with user'
             }, status=status.HTTP_403_FORBIDDEN)
         
-        try:
-            subscription = tenant.subscription
-        except:
+        subscription = principal.subscription
+        if subscription is None:
             return Response({
                 'error': 'No active subscription',
                 'message': 'Please subscribe to a plan to continue',
@@ -55,22 +61,16 @@ def require_feature(feature_flag):
     def decorator(view_func):
         @wraps(view_func)
         def wrapper(self, request, *args, **kwargs):
-            tenant = request.user.tenant
+            principal = get_principal(request)
             
             try:
-                subscription = tenant.subscription
-                plan = subscription.plan
-                
-                # Check if feature is allowed
-                feature_value = getattr(plan, feature_flag, False)
+                entitlements = principal.entitlements
+                if entitlements is None:
+                    raise ValueError('No active subscription')
                 
-                # Handle different feature types
-                if isinstance(feature_value, bool):
-                    if not feature_value:
-                        return feature_not_allowed_response(feature_flag, plan)
-                elif isinstance(feature_value, str):
-                    if feature_value == 'NONE':
-                        return feature_not_allowed_response(feature_flag, plan)
+                # Check if feature is allowed (bool flag or 'NONE' choice)
+                if not entitlements.allows(feature_flag):
+                    return feature_not_allowed_response(feature_flag, entitlements.plan)
                 
             except Exception as e:
                 return Response({
@@ -90,14 +90,16 @@ def check_order_limit(view_func):
     """
     @wraps(view_func)
     def wrapper(self, request, *args, **kwargs):
-        tenant = request.user.tenant
+        principal = get_principal(request)
         
         try:
-            subscription = tenant.subscription
-            can_create, error_msg = subscription.can_create_order()
+            subscription = principal.subscription
+            if subscription is None:
+                raise ValueError('No active subscription')
+            plan = principal.plan
+            can_create, error_msg = subscription.can_create_order(plan=plan)
             
             if not can_create:
-                plan = subscription.plan
                 return Response({
                     'error': 'Order limit reached',
                     'message': error_msg,
@@ -130,19 +132,22 @@ def check_resource_limit(limit_field):
     def decorator(view_func):
         @wraps(view_func)
         def wrapper(self, request, *args, **kwargs):
-            tenant = request.user.tenant
+            principal = get_principal(request)
+            tenant = principal.tenant
             
             try:
-                subscription = tenant.subscription
-                plan = subscription.plan
-                max_limit = getattr(plan, limit_field, 0)
+                entitlements = principal.entitlements
+                if entitlements is None:
+                    raise ValueError('No active subscription')
+                plan = entitlements.plan
+                max_limit = entitlements.limit(limit_field)
                 
                 # 0 means unlimited
                 if max_limit == 0:
                     return view_func(self, request, *args, **kwargs)
                 
-                # Get current count
-                current_count = get_current_count(tenant, limit_field)
+                # Get current count (usage counter, no COUNT(*))
+                current_count = current_usage(tenant, limit_field)
                 
                 if current_count >= max_limit:
                     resource_name = limit_field.replace('max_', '').replace('_', ' ')
@@ -169,7 +174,10 @@ def check_resource_limit(limit_field):
 
 
 def get_current_count(tenant, limit_field):
-    """Get current count for a limit field"""
+    """
+    Get current count for a limit field (live COUNT)
+    Limit checks use core.entitlements.current_usage() instead
+    """
     
     if limit_field == 'max_employees':
         from employees.models import Employee
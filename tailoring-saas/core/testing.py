@@ -0,0 +1,19 @@
+"""
+Shared test fixtures
+Date: 2026-10-17
+"""
+
+from django.utils.text import slugify
+
+
+def create_tenant(name='Test Shop', **fields):
+    """Tenant with the contact details every test shop uses (slug comes from name)"""
+    from .models import Tenant
+
+    defaults = {
+        'email': f'{slugify(name)}@shop.com',
+        'phone_number': '9876543210',
+        'city': 'Bangalore',
+        'state': 'Karnataka',
+    }
+    return Tenant.objects.create(name=name, **{**defaults, **fields})
@@ -3,7 +3,8 @@ Tests for core app
 """
 from django.test import TestCase
 from django.contrib.auth import get_user_model
-from .models import Tenant, SubscriptionPlan, TenantSubscription
+from .models import Tenant, SubscriptionPlan, TenantSubscription, DocumentSequence, BackgroundJob
+from .testing import create_tenant
 
 User = get_user_model()
 
@@ -106,3 +107,443 @@ class SubscriptionTest(TestCase):
         self.assertFalse(subscription.can_create_order())
 
 # Add more tests as needed
+
+
+class DocumentSequenceTest(TestCase):
+    """Test document number allocation"""
+    
+    @classmethod
+    def setUpTestData(cls):
+        cls.tenant = create_tenant("Sequence Shop")
+    
+    def test_sequential_numbers(self):
+        """Numbers increase by one per (tenant, key, period)"""
+        from .sequences import allocate_number
+        
+        numbers = [allocate_number(self.tenant, 'ORD', '202602') for _ in range(3)]
+        self.assertEqual(numbers, [1, 2, 3])
+        self.assertEqual(allocate_number(self.tenant, 'ORD', '202603'), 1)
+    
+    def test_seed_from_existing_numbers(self):
+        """A new counter continues after the highest number already issued"""
+        from .sequences import allocate_number
+        
+        self.assertEqual(allocate_number(self.tenant, 'INV', '2526', seed=lambda: 41), 42)
+        self.assertEqual(allocate_number(self.tenant, 'INV', '2526', seed=lambda: 0), 43)
+    
+    def test_block_reservation(self):
+        """Reserved blocks hand out numbers without duplicates"""
+        from .sequences import allocate_number, clear_reserved_blocks
+        
+        clear_reserved_blocks()
+        numbers = []
+        for _ in range(7):
+            # Reserved numbers are released to the pool on commit
+            with self.captureOnCommitCallbacks(execute=True):
+                numbers.append(allocate_number(self.tenant, 'RV', '202602', block_size=5))
+        self.assertEqual(numbers, list(range(1, 8)))
+        self.assertEqual(
+            DocumentSequence.objects.get(tenant=self.tenant, key='RV', period='202602').last_number,
+            10
+        )
+    
+    def test_document_numbers_unique_per_tenant(self):
+        """Every tenant numbers from 1; a number repeats across tenants, never within one"""
+        from django.db import IntegrityError, transaction
+        from invoicing.models import Invoice
+        from orders.models import Customer, Order
+        
+        other_tenant = create_tenant("Second Shop")
+        orders = []
+        invoices = []
+        for tenant in (self.tenant, other_tenant):
+            customer = Customer.all_objects.create(tenant=tenant, name="Asha", phone="9876500001")
+            orders.append(Order.all_objects.create(tenant=tenant, customer=customer, order_date='2026-03-05'))
+            invoices.append(Invoice.all_objects.create(
+                tenant=tenant, customer=customer, invoice_date='2026-03-05',
+                billing_name="Asha", billing_address="1, MG Road", billing_state="Karnataka"
+            ))
+        self.assertEqual(orders[0].order_number, orders[1].order_number)
+        self.assertEqual(invoices[0].invoice_number, invoices[1].invoice_number)
+        
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Order.all_objects.create(
+                tenant=self.tenant, customer=orders[0].customer, order_number=orders[0].order_number
+            )
+
+
+class BackgroundJobTest(TestCase):
+    """Test the background job queue"""
+    
+    @classmethod
+    def setUpTestData(cls):
+        cls.tenant = create_tenant("Job Shop")
+    
+    def test_enqueue_is_deduplicated(self):
+        """An object has at most one pending job per type"""
+        from .jobs import enqueue_job
+        
+        first = enqueue_job('ORDER_QR', 123, tenant=self.tenant)
+        second = enqueue_job('ORDER_QR', 123, tenant=self.tenant)
+        self.assertEqual(first.pk, second.pk)
+        self.assertEqual(BackgroundJob.objects.count(), 1)
+    
+    def test_claimed_job_runs_once(self):
+        """A claimed job is not handed to a second worker; missing objects fail without retry"""
+        from .jobs import enqueue_job, claim_jobs, run_job
+        
+        enqueue_job('ORDER_QR', 123, tenant=self.tenant)
+        jobs = claim_jobs('worker-1', limit=5)
+        self.assertEqual(len(jobs), 1)
+        self.assertEqual(claim_jobs('worker-2', limit=5), [])
+        
+        self.assertFalse(run_job(jobs[0]))
+        job = BackgroundJob.objects.get()
+        self.assertEqual(job.status, 'FAILED')
+        self.assertEqual(job.attempts, 1)
+    
+    def test_handler_key_error_is_retried(self):
+        """Only an unknown job type fails at once; a KeyError raised inside a handler is retried"""
+        from unittest import mock
+        from .jobs import JOB_HANDLERS, claim_jobs, enqueue_job, run_job
+        
+        enqueue_job('ORDER_QR', 123, tenant=self.tenant)
+        job, = claim_jobs('worker-1')
+        with mock.patch.dict(JOB_HANDLERS, {'ORDER_QR': mock.Mock(side_effect=KeyError('template'))}):
+            self.assertFalse(run_job(job))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), ('PENDING', 1))
+        
+        BackgroundJob.objects.filter(pk=job.pk).update(job_type='RETIRED', status='RUNNING')
+        job.refresh_from_db()
+        self.assertFalse(run_job(job))
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'FAILED')
+        self.assertIn('Unknown job type', job.last_error)
+
+
+class RequestMetricsTest(TestCase):
+    """Test per-endpoint request metrics"""
+    
+    @classmethod
+    def setUpTestData(cls):
+        from orders.models import Customer
+        
+        cls.tenant = create_tenant("Metrics Shop")
+        cls.user = User.objects.create(email="owner@metrics.com", tenant=cls.tenant, is_superuser=True)
+        Customer.all_objects.create(tenant=cls.tenant, name="Asha", phone="9876500001")
+    
+    async def test_async_chain_counts_queries_and_serialization(self):
+        """Under ASGI the middleware runs natively and still sees the view's queries and rendering"""
+        from asgiref.sync import sync_to_async
+        from django.test import AsyncClient
+        from .metrics import registry
+        
+        registry.reset()
+        client = AsyncClient()
+        await sync_to_async(client.force_login)(self.user)
+        response = await client.get('/api/orders/customers/')
+        
+        self.assertEqual(response.status_code, 200)
+        stats = registry.snapshot()['CustomerViewSet.list']
+        self.assertEqual(stats['requests'], 1)
+        self.assertGreater(stats['max_queries'], 0)
+        self.assertIn('avg_serialize_ms', stats)
+
+
+class EntitlementCacheTest(TestCase):
+    """Test the plan entitlement cache"""
+    
+    @classmethod
+    def setUpTestData(cls):
+        cls.tenant = create_tenant("Plan Shop")
+        cls.plan = SubscriptionPlan.objects.create(
+            name="Cache Plan",
+            tier="BASIC",
+            price_monthly=0,
+            price_yearly=0,
+            allow_workflow=False
+        )
+        cls.subscription = TenantSubscription.objects.create(
+            tenant=cls.tenant,
+            plan=cls.plan,
+            status='ACTIVE'
+        )
+    
+    def test_plan_edit_invalidates_cache(self):
+        """Cache hits run no queries; editing the plan bumps the subscription version"""
+        from .entitlements import get_entitlements
+        
+        self.assertFalse(get_entitlements(self.subscription).allows('allow_workflow'))
+        with self.assertNumQueries(0):
+            get_entitlements(self.subscription)
+        
+        self.plan.allow_workflow = True
+        self.plan.save()
+        self.subscription.refresh_from_db()
+        self.assertTrue(get_entitlements(self.subscription).allows('allow_workflow'))
+
+
+class ChangeFeedTest(TestCase):
+    """Test the offline change feed"""
+    
+    @classmethod
+    def setUpTestData(cls):
+        from orders.models import Customer
+        
+        cls.tenant = create_tenant("Feed Shop")
+        cls.customer = Customer.all_objects.create(tenant=cls.tenant, name="Asha", phone="9876500001")
+    
+    def test_feed_returns_latest_state_per_object(self):
+        """Writes in one transaction log once; the feed returns upserts and deletes after since"""
+        from .changes import changes_since
+        from orders.models import Customer, Order
+        
+        start = changes_since(self.tenant, None)
+        self.assertTrue(start['reset'])
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            order = Order.all_objects.create(tenant=self.tenant, customer=self.customer, order_date='2026-03-05')
+            order.priority = 'HIGH'
+            order.save()
+            other = Customer.all_objects.create(tenant=self.tenant, name="Ravi", phone="9876500002")
+        other_id = other.pk
+        with self.captureOnCommitCallbacks(execute=True):
+            other.delete()
+        
+        feed = changes_since(self.tenant, start['next'])
+        self.assertFalse(feed['reset'])
+        self.assertEqual([row['id'] for row in feed['collections']['orders']['upserts']], [order.pk])
+        self.assertEqual(feed['collections']['customers']['deleted'], [other_id])
+        self.assertEqual(changes_since(self.tenant, feed['next'])['collections'], {})
+    
+    def test_rolled_back_changes_never_reach_another_tenant(self):
+        """A rolled-back write logs nothing; rows are only served to their own tenant"""
+        from django.db import transaction
+        from .changes import changes_since, record_change
+        from orders.models import Customer
+        
+        other_tenant = create_tenant("Other Shop")
+        start = changes_since(self.tenant, 0)
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    Customer.all_objects.create(tenant=self.tenant, name="Gone", phone="9876500003")
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+            bob = Customer.all_objects.create(tenant=other_tenant, name="Bob", phone="9876500004")
+        self.assertEqual(changes_since(self.tenant, start['next'])['collections'], {})
+        
+        # A stale entry pointing at another tenant's row reads as deleted
+        with self.captureOnCommitCallbacks(execute=True):
+            record_change(self.tenant.pk, 'customers', bob.pk)
+        feed = changes_since(self.tenant, start['next'])['collections']['customers']
+        self.assertEqual(feed, {'upserts': [], 'deleted': [bob.pk]})
+
+
+class DataExportTest(TestCase):
+    """Test the streaming CSV / XLSX exports"""
+    
+    @classmethod
+    def setUpTestData(cls):
+        from orders.models import Customer
+        
+        cls.tenant = create_tenant("Export Shop")
+        for i in range(3):
+            Customer.all_objects.create(tenant=cls.tenant, name=f"Customer {i}", phone=f"987650000{i}", bust_chest=36 + i)
+    
+    def test_exports_include_measurements_in_both_formats(self):
+        """Rows are read in keyset pages; CSV and XLSX carry the measurement columns"""
+        import csv
+        import io
+        from openpyxl import load_workbook
+        from .exports import export_queryset, iter_rows, stream_export
+        
+        self.assertEqual(len(list(iter_rows(export_queryset('customers', self.tenant), ['name'], page_size=2))), 3)
+        
+        text = b''.join(stream_export('customers', self.tenant, 'csv')).decode('utf-8-sig')
+        rows = list(csv.reader(io.StringIO(text)))
+        self.assertIn('Bust/Chest', rows[0])
+        self.assertEqual([row[rows[0].index('Bust/Chest')] for row in rows[1:]], ['36.00', '37.00', '38.00'])
+        
+        sheet = load_workbook(io.BytesIO(b''.join(stream_export('customers', self.tenant, 'xlsx')))).active
+        self.assertEqual(sheet.max_row, 4)
+        self.assertEqual(list(sheet.iter_rows(max_row=1, values_only=True))[0], tuple(rows[0]))
+
+
+class UsageCounterTest(TestCase):
+    """Test the resource usage counters"""
+    
+    @classmethod
+    def setUpTestData(cls):
+        from .entitlements import refresh_usage
+        
+        cls.tenant = create_tenant("Usage Shop")
+        refresh_usage(cls.tenant.pk)
+    
+    def test_writes_move_counters_without_counting(self):
+        """Create, deactivate and delete step the counter; no write runs COUNT(*), and a recount agrees"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from orders.models import Customer
+        from .entitlements import refresh_usage
+        from .models import TenantUsage
+        
+        def customers():
+            return TenantUsage.objects.get(tenant=self.tenant).customers
+        
+        with CaptureQueriesContext(connection) as queries:
+            with self.captureOnCommitCallbacks(execute=True):
+                asha, ravi, meera = [
+                    Customer.all_objects.create(tenant=self.tenant, name=name, phone=f"98765000{i:02}")
+                    for i, name in enumerate(["Asha", "Ravi", "Meera"])
+                ]
+            self.assertEqual(customers(), 3)
+            
+            with self.captureOnCommitCallbacks(execute=True):
+                ravi = Customer.all_objects.get(pk=ravi.pk)
+                ravi.is_active = False
+                ravi.save()
+                Customer.all_objects.get(pk=meera.pk).delete()
+                asha.name = "Asha Rao"
+                asha.save()
+            self.assertEqual(customers(), 1)
+        self.assertFalse([query for query in queries if 'COUNT(' in query['sql'] and '"is_active"' in query['sql']])
+        
+        self.assertEqual(refresh_usage(self.tenant.pk).customers, 1)
+    
+    def test_rolled_back_writes_change_nothing(self):
+        """A rolled-back create leaves the counter alone"""
+        from django.db import transaction
+        from orders.models import Customer
+        from .models import TenantUsage
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    Customer.all_objects.create(tenant=self.tenant, name="Asha", phone="9876500001")
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+        
+        self.assertEqual(TenantUsage.objects.get(tenant=self.tenant).customers, 0)
+
+
+class DailyStatsTest(TestCase):
+    """Test the dashboard's daily rollups"""
+    
+    @classmethod
+    def setUpTestData(cls):
+        cls.tenant = create_tenant("Rollup Shop")
+    
+    def test_writes_keep_rollups_equal_to_rebuild(self):
+        """Status changes and redated documents update the right days"""
+        from datetime import date
+        from orders.models import Customer, Order
+        from .daily_stats import dashboard_totals, rebuild_daily_stats
+        from .models import DailyStats
+        
+        def rows():
+            return {
+                stats.date: (stats.orders_draft, stats.orders_confirmed, stats.new_customers)
+                for stats in DailyStats.objects.filter(tenant=self.tenant)
+                if stats.orders_draft or stats.orders_confirmed or stats.new_customers
+            }
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            customer = Customer.all_objects.create(tenant=self.tenant, name="Asha", phone="9876500001")
+            order = Order.all_objects.create(tenant=self.tenant, customer=customer, order_date='2026-03-05')
+            Order.all_objects.create(tenant=self.tenant, customer=customer, order_date='2026-03-05')
+        with self.captureOnCommitCallbacks(execute=True):
+            order.order_status = 'CONFIRMED'
+            order.order_date = date(2026, 3, 1)
+            order.save()
+        
+        self.assertEqual(rows()[date(2026, 3, 5)], (1, 0, 0))
+        self.assertEqual(rows()[date(2026, 3, 1)], (0, 1, 0))
+        totals = dashboard_totals(self.tenant)
+        self.assertEqual((totals['orders_draft'], totals['orders_confirmed'], totals['new_customers']), (1, 1, 1))
+        
+        incremental = rows()
+        rebuild_daily_stats(self.tenant.pk)
+        self.assertEqual(rows(), incremental)
+    
+    def test_running_total_follows_the_days(self):
+        """The total moves with every refresh, equals the days' sum and is read without scanning them"""
+        from datetime import date
+        from django.db.models import Sum
+        from orders.models import Customer, Order
+        from .daily_stats import dashboard_totals, rebuild_daily_stats, rollup_fields
+        from .models import DailyStats, DailyStatsTotal
+        
+        def summed():
+            row = DailyStats.objects.filter(tenant=self.tenant).aggregate(**{field: Sum(field) for field in rollup_fields()})
+            return {field: row[field] or 0 for field in rollup_fields()}
+        
+        def total():
+            return DailyStatsTotal.objects.filter(tenant=self.tenant).values(*rollup_fields()).get()
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            customer = Customer.all_objects.create(tenant=self.tenant, name="Asha", phone="9876500001")
+            for day in (3, 4, 5):
+                Order.all_objects.create(tenant=self.tenant, customer=customer, order_date=date(2026, 3, day))
+        order = Order.all_objects.get(tenant=self.tenant, order_date=date(2026, 3, 5))
+        with self.captureOnCommitCallbacks(execute=True):
+            order.order_status = 'COMPLETED'
+            order.order_date = date(2026, 3, 3)
+            order.save()
+        
+        self.assertEqual(total(), summed())
+        self.assertEqual((total()['orders_draft'], total()['orders_completed'], total()['new_customers']), (2, 1, 1))
+        with self.assertNumQueries(2):
+            totals = dashboard_totals(self.tenant, today=date(2026, 3, 3))
+        self.assertEqual((totals['orders_completed'], totals['today']['orders_draft']), (1, 1))
+        
+        incremental = total()
+        rebuild_daily_stats(self.tenant.pk)
+        self.assertEqual(total(), incremental)
+    
+    def test_redate_uses_the_loaded_date(self):
+        """Saving a loaded document reads no date back; moving it still refreshes its old day"""
+        from datetime import date
+        from unittest import mock
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from orders.models import Customer, Order
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            customer = Customer.all_objects.create(tenant=self.tenant, name="Asha", phone="9876500001")
+            Order.all_objects.create(tenant=self.tenant, customer=customer, order_date=date(2026, 3, 5))
+        order = Order.all_objects.get(tenant=self.tenant)
+        
+        with self.captureOnCommitCallbacks() as callbacks, CaptureQueriesContext(connection) as queries:
+            order.order_date = date(2026, 3, 1)
+            order.save()
+        date_read = f'SELECT "{Order._meta.db_table}"."order_date" FROM'
+        self.assertFalse([query for query in queries if query['sql'].startswith(date_read)])
+        
+        refreshed = {}
+        with mock.patch('core.daily_stats.refresh_daily_stats', side_effect=lambda tenant_id, dates: refreshed.update(dates)):
+            for callback in callbacks:
+                callback()
+        self.assertEqual(refreshed['orders'], {date(2026, 3, 1), date(2026, 3, 5)})
+    
+    def test_rolled_back_writes_queue_nothing(self):
+        """Days queued in a rolled-back transaction are dropped, not refreshed by the next commit"""
+        from django.db import transaction
+        from orders.models import Customer
+        from .models import DailyStats
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    gone = create_tenant("Gone Shop")
+                    Customer.all_objects.create(tenant=gone, name="Gone", phone="9876500003")
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+            Customer.all_objects.create(tenant=self.tenant, name="Asha", phone="9876500001")
+        
+        self.assertEqual(list(DailyStats.objects.values_list('tenant_id', flat=True).distinct()), [self.tenant.pk])
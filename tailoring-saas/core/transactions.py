@@ -0,0 +1,66 @@
+"""
+Per-transaction on_commit queues
+Date: 2026-10-17
+
+Write paths collect work (change log entries, rollup days, invoice
+recalculations) and run it once when the transaction commits. A queue
+belongs to the transaction - or savepoint - it was filled in and is flushed
+by its own on_commit callback, so a rollback drops the callback and the
+queued work together: nothing is left behind for the next commit on the
+thread.
+
+Outside a transaction the work runs at once, as on_commit would.
+"""
+
+import threading
+
+from django.db import transaction
+
+
+class _Queue:
+    __slots__ = ('savepoint_ids', 'flush', 'items', 'flushed')
+
+    def __init__(self, savepoint_ids, flush, items):
+        self.savepoint_ids = savepoint_ids
+        self.flush = flush
+        self.items = items
+        self.flushed = False
+
+    def is_open(self, connection):
+        """Still collecting for the current transaction / savepoint"""
+        if self.flushed or self.savepoint_ids != connection.savepoint_ids:
+            return False
+        # Gone from run_on_commit once its transaction or savepoint rolled back
+        return any(func == self.run for _, func, _ in reversed(connection.run_on_commit))
+
+    def run(self):
+        self.flushed = True
+        self.flush(self.items)
+
+
+_queues = threading.local()
+
+
+def queue_on_commit(name, flush, add, factory=dict):
+    """
+    Add work to the named queue of the current transaction
+
+    Args:
+        name: queue name (one queue per name and transaction)
+        flush: flush(items) - runs once when the transaction commits
+        add: add(items) - puts this call's work into the queue's container
+        factory: builds an empty container
+    """
+    connection = transaction.get_connection()
+    if not connection.in_atomic_block:
+        items = factory()
+        add(items)
+        flush(items)
+        return
+
+    queue = getattr(_queues, name, None)
+    if queue is None or not queue.is_open(connection):
+        queue = _Queue(list(connection.savepoint_ids), flush, factory())
+        setattr(_queues, name, queue)
+        transaction.on_commit(queue.run)
+    add(queue.items)
@@ -12,6 +12,7 @@ from .views import RegistrationView, LoginView, ProfileView, dashboard_stats
 # Router for staff management
 router = DefaultRouter()
 router.register(r'staff', views.StaffViewSet, basename='staff')
+router.register(r'jobs', views.BackgroundJobViewSet, basename='background-job')
 
 # Router for subscriptions
 subscription_router = DefaultRouter()
@@ -27,6 +28,10 @@ urlpatterns = [
     path('token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
     path('profile/', views.ProfileView.as_view(), name='profile'),
     path('dashboard/stats/', views.dashboard_stats, name='dashboard-stats'),
+    path('dashboard/stats/async/', views.dashboard_stats_async, name='dashboard-stats-async'),
+    path('metrics/', views.request_metrics, name='request-metrics'),
+    path('changes/', views.changes, name='changes'),
+    path('exports/<str:dataset>/', views.ExportView.as_view(), name='export'),
     # Staff management routes
     path('', include(router.urls)),
 
@@ -6,7 +6,7 @@ from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.permissions import AllowAny, IsAuthenticated, IsAdminUser
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
@@ -15,16 +15,27 @@ from django.db import transaction
 from datetime import timedelta
 from django.utils import timezone
 from employees.models import Employee
-from django.db.models import Sum, Count, Q
-from orders.models import Order,Customer
+from django.db.models import Count, Q
+from orders.models import Customer
 
 
-from .models import User, Tenant, SubscriptionPlan, TenantSubscription
+from django.http import JsonResponse, StreamingHttpResponse
+from .async_utils import async_api_view, gather_queries
+from .changes import DEFAULT_BATCH_SIZE, changes_since, readable_collections
+from .dashboard import dashboard_queries, build_dashboard_stats
+from .exports import (
+    EXPORTS, EXPORT_FORMATS, ExportRequestError, export_filename, parse_export_params, stream_export,
+)
+from .metrics import registry as metrics_registry
+from .models import User, Tenant, SubscriptionPlan, TenantSubscription, BackgroundJob
+from .permissions import IsManagement
+from .subscription_utils import require_feature
 from .serializers import (
     UserSerializer,
     TenantSerializer,
     RegistrationSerializer,
-    LoginSerializer
+    LoginSerializer,
+    BackgroundJobSerializer
 )
 
 class RegistrationView(APIView):
@@ -273,6 +284,32 @@ class StaffViewSet(viewsets.ModelViewSet):
         """
         designers = self.get_queryset().filter(role__in=['STAFF', 'SPECIALIST', 'WORKSHOP_MANAGER'])
         return Response(UserSerializer(designers, many=True).data)
+
+
+class BackgroundJobViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Poll background jobs (QR codes, invoice PDFs) for the current tenant
+    GET /api/auth/jobs/{id}/ → status, result_url once DONE
+    """
+    permission_classes = [IsAuthenticated]
+    serializer_class = BackgroundJobSerializer
+    
+    def get_queryset(self):
+        user = self.request.user
+        
+        if not hasattr(user, 'tenant') or user.tenant is None:
+            return BackgroundJob.objects.none()
+        
+        queryset = BackgroundJob.objects.filter(tenant=user.tenant)
+        
+        job_type = self.request.query_params.get('job_type')
+        if job_type:
+            queryset = queryset.filter(job_type=job_type)
+        object_id = self.request.query_params.get('object_id')
+        if object_id:
+            queryset = queryset.filter(object_id=object_id)
+        
+        return queryset.order_by('-created_at')
     
 
 @api_view(['GET'])
@@ -280,6 +317,7 @@ class StaffViewSet(viewsets.ModelViewSet):
 def dashboard_stats(request):
     """
     Get dashboard statistics for the authenticated user's tenant
+    (see dashboard_stats_async for the concurrent ASGI variant)
     """
     user = request.user
     tenant = user.tenant
@@ -289,32 +327,95 @@ def dashboard_stats(request):
             'error': 'User has no tenant'
         }, status=400)
     
-    # Get all orders for this tenant
-    orders = Order.objects.filter(tenant=tenant)
+    queries = dashboard_queries(tenant)
+    results = {name: query() for name, query in queries.items()}
     
-    # Calculate stats
-    total_orders = orders.count()
-    pending_orders = orders.filter(status='PENDING').count()
-    completed_orders = orders.filter(status='DELIVERED').count()
-    active_orders = orders.filter(
-        status__in=['PENDING', 'IN_PROGRESS', 'READY_FOR_DELIVERY']
-    ).count()
+    return Response(build_dashboard_stats(results))
+
+
+@api_view(['GET', 'DELETE'])
+@permission_classes([IsAdminUser])
+def request_metrics(request):
+    """
+    Per-endpoint request metrics of this process (core.metrics)
+    GET: stats over the rolling window, DELETE: reset
+    """
+    if request.method == 'DELETE':
+        metrics_registry.reset()
+        return Response(status=status.HTTP_204_NO_CONTENT)
     
-    # Calculate total revenue (from delivered orders)
-    total_revenue = orders.filter(
-        status='DELIVERED'
-    ).aggregate(
-        total=Sum('grand_total')
-    )['total'] or 0
+    return Response({
+        'window_seconds': metrics_registry.window_seconds,
+        'endpoints': metrics_registry.snapshot(),
+    })
+
+
+@api_view(['GET'])
+def changes(request):
+    """
+    Change feed for offline clients (core.changes)
+    GET /api/auth/changes/?since=<seq>&limit=500&collections=orders,invoices
+    """
+    tenant = request.user.tenant
+    if not tenant:
+        return Response({
+            'error': 'No tenant associated with user'
+        }, status=status.HTTP_403_FORBIDDEN)
     
-    # Set customers to 0 for now (we'll add this feature later)
-    total_customers = 0
+    try:
+        since = request.query_params.get('since')
+        since = int(since) if since not in (None, '') else None
+        limit = int(request.query_params.get('limit', DEFAULT_BATCH_SIZE))
+    except ValueError:
+        return Response({'error': 'since and limit must be integers'}, status=status.HTTP_400_BAD_REQUEST)
     
-    return Response({
-        'total_orders': total_orders,
-        'total_customers': total_customers,
-        'total_revenue': float(total_revenue),
-        'pending_orders': pending_orders,
-        'completed_orders': completed_orders,
-        'active_orders': active_orders,
-    })
\ No newline at end of file
+    collections = readable_collections(request)
+    requested = request.query_params.get('collections')
+    if requested:
+        requested = {name.strip() for name in requested.split(',')}
+        collections = [name for name in collections if name in requested]
+    
+    return Response(changes_since(tenant, since, collections, limit, context={'request': request}))
+
+
+class ExportView(APIView):
+    """
+    Streaming CSV / XLSX export of a dataset (core.exports)
+    GET /api/auth/exports/<dataset>/?file_format=csv|xlsx&from=YYYY-MM-DD&to=YYYY-MM-DD
+    """
+    permission_classes = [IsAuthenticated, IsManagement]
+    
+    @require_feature('allow_data_export')
+    def get(self, request, dataset):
+        tenant = request.user.tenant
+        if tenant is None:
+            return Response({'error': 'No tenant associated with user'}, status=status.HTTP_403_FORBIDDEN)
+        
+        if dataset not in EXPORTS:
+            return Response({
+                'error': f'Unknown dataset: {dataset}',
+                'datasets': list(EXPORTS),
+            }, status=status.HTTP_404_NOT_FOUND)
+        
+        try:
+            file_format, date_from, date_to = parse_export_params(request.query_params)
+        except ExportRequestError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        response = StreamingHttpResponse(
+            stream_export(dataset, tenant, file_format, date_from, date_to),
+            content_type=EXPORT_FORMATS[file_format]
+        )
+        filename = export_filename(dataset, tenant, file_format, date_from, date_to)
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
+
+@async_api_view
+async def dashboard_stats_async(request):
+    """
+    Dashboard statistics - async variant
+    Runs the independent aggregate queries concurrently
+    """
+    results = await gather_queries(dashboard_queries(request.user.tenant))
+    return JsonResponse(build_dashboard_stats(results))
\ No newline at end of file
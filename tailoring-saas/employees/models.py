@@ -1,4 +1,4 @@
-from django.db import models
+from django.db import models, transaction
 from django.core.validators import MinValueValidator
 from django.utils import timezone
 from decimal import Decimal
@@ -524,10 +524,14 @@ class Employee(models.Model):
         return f"{self.employee_code} - {self.user.get_full_name()}"
     
     def save(self, *args, **kwargs):
-        # Generate QR code if doesn't exist
-        if not self.qr_code:
-            self.generate_qr_code()
-        super().save(*args, **kwargs)
+        from core.jobs import enqueue_job
+        
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            
+            # QR code is rendered by the job worker (core.jobs) - not in the request
+            if not self.qr_code:
+                enqueue_job('EMPLOYEE_QR', self)
     
     def generate_qr_code(self):
         """Generate QR code for employee"""
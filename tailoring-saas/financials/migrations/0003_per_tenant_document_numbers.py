@@ -0,0 +1,62 @@
+# Generated by Django 5.0 on 2026-10-17 06:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_document_sequence'),
+        ('financials', '0002_paymentrefund'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='payment',
+            name='financials__tenant__747bf3_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='receiptvoucher',
+            name='financials__tenant__d8da8b_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='refundvoucher',
+            name='financials__tenant__03909f_idx',
+        ),
+        migrations.AlterField(
+            model_name='payment',
+            name='payment_number',
+            field=models.CharField(max_length=50, verbose_name='Payment Number'),
+        ),
+        migrations.AlterField(
+            model_name='paymentrefund',
+            name='refund_number',
+            field=models.CharField(blank=True, max_length=50, verbose_name='Payment Refund Number'),
+        ),
+        migrations.AlterField(
+            model_name='receiptvoucher',
+            name='voucher_number',
+            field=models.CharField(max_length=50, verbose_name='Receipt Voucher Number'),
+        ),
+        migrations.AlterField(
+            model_name='refundvoucher',
+            name='refund_number',
+            field=models.CharField(max_length=50, verbose_name='Refund Voucher Number'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='payment',
+            unique_together={('tenant', 'payment_number')},
+        ),
+        migrations.AlterUniqueTogether(
+            name='paymentrefund',
+            unique_together={('tenant', 'refund_number')},
+        ),
+        migrations.AlterUniqueTogether(
+            name='receiptvoucher',
+            unique_together={('tenant', 'voucher_number')},
+        ),
+        migrations.AlterUniqueTogether(
+            name='refundvoucher',
+            unique_together={('tenant', 'refund_number')},
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.0 on 2026-10-17 06:24
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_tenant_usage_and_entitlement_version'),
+        ('financials', '0003_per_tenant_document_numbers'),
+        ('invoicing', '0004_list_ordering_indexes'),
+        ('orders', '0007_list_ordering_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='payment',
+            name='financials__tenant__cbd527_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='receiptvoucher',
+            name='financials__tenant__ecd820_idx',
+        ),
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['tenant', '-payment_date', '-created_at'], name='financials__tenant__d3e28d_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='receiptvoucher',
+            index=models.Index(fields=['tenant', '-receipt_date', '-created_at'], name='financials__tenant__5d8301_idx'),
+        ),
+    ]
@@ -12,8 +12,10 @@ from django.db import models
 from django.utils import timezone
 from django.core.validators import MinValueValidator
 from django.core.exceptions import ValidationError
+from django.db import transaction
 from decimal import Decimal
 from core.managers import TenantManager
+from core.sequences import allocate_number, max_existing_suffix, month_period
 
 
 # ==================== RECEIPT VOUCHER MODEL ====================
@@ -31,7 +33,7 @@ class ReceiptVoucher(models.Model):
     )
     
     # Voucher Identity
-    voucher_number = models.CharField(max_length=50, unique=True, verbose_name='Receipt Voucher Number')
+    voucher_number = models.CharField(max_length=50, verbose_name='Receipt Voucher Number')
     receipt_date = models.DateField(default=timezone.now, verbose_name='Receipt Date')
     
     # Customer
@@ -186,10 +188,12 @@ class ReceiptVoucher(models.Model):
         verbose_name = "Receipt Voucher"
         verbose_name_plural = "Receipt Vouchers"
         ordering = ['-receipt_date', '-created_at']
+        # Numbers are allocated per tenant (core.sequences)
+        unique_together = ['tenant', 'voucher_number']
         indexes = [
-            models.Index(fields=['tenant', 'voucher_number']),
             models.Index(fields=['tenant', 'customer']),
-            models.Index(fields=['tenant', 'receipt_date']),
+            # List ordering / keyset pagination (core.pagination)
+            models.Index(fields=['tenant', '-receipt_date', '-created_at']),
         ]
     
     def __str__(self):
@@ -201,22 +205,21 @@ class ReceiptVoucher(models.Model):
         return self.adjusted_amount > Decimal('0.00')
     
     def save(self, *args, **kwargs):
+        with transaction.atomic():
+            self._save(*args, **kwargs)
+    
+    def _save(self, *args, **kwargs):
         # Auto-generate voucher number if not provided
         if not self.voucher_number:
-            from django.utils import timezone
-            year_month = timezone.now().strftime('%Y%m')
-            last_voucher = ReceiptVoucher.objects.filter(
-                tenant=self.tenant,
-                voucher_number__startswith=f'RV-{year_month}'
-            ).order_by('-voucher_number').first()
-            
-            if last_voucher:
-                last_num = int(last_voucher.voucher_number.split('-')[-1])
-                new_num = last_num + 1
-            else:
-                new_num = 1
-            
-            self.voucher_number = f'RV-{year_month}-{new_num:05d}'
+            year_month = month_period()
+            prefix = f'RV-{year_month}-'
+            new_num = allocate_number(
+                self.tenant, 'RV', year_month,
+                seed=lambda: max_existing_suffix(
+                    ReceiptVoucher.all_objects.filter(tenant=self.tenant), 'voucher_number', prefix
+                )
+            )
+            self.voucher_number = f'{prefix}{new_num:05d}'
         
         # Determine tax type based on states
         if self.customer.state and hasattr(self.tenant, 'state'):
@@ -270,7 +273,7 @@ class Payment(models.Model):
     )
     
     # Payment Identity
-    payment_number = models.CharField(max_length=50, unique=True, verbose_name='Payment Number')
+    payment_number = models.CharField(max_length=50, verbose_name='Payment Number')
     payment_date = models.DateField(default=timezone.now, verbose_name='Payment Date')
     
     # Invoice Link
@@ -345,10 +348,12 @@ class Payment(models.Model):
         verbose_name = "Payment"
         verbose_name_plural = "Payments"
         ordering = ['-payment_date', '-created_at']
+        # Numbers are allocated per tenant (core.sequences)
+        unique_together = ['tenant', 'payment_number']
         indexes = [
-            models.Index(fields=['tenant', 'payment_number']),
             models.Index(fields=['tenant', 'invoice']),
-            models.Index(fields=['tenant', 'payment_date']),
+            # List ordering / keyset pagination (core.pagination)
+            models.Index(fields=['tenant', '-payment_date', '-created_at']),
         ]
     
     def __str__(self):
@@ -372,30 +377,22 @@ class Payment(models.Model):
         return self.total_refunded >= self.amount
     
     def save(self, *args, **kwargs):
-        # Auto-generate payment number if not provided
-        if not self.payment_number:
-            from django.utils import timezone
-            year_month = timezone.now().strftime('%Y%m')
-            last_payment = Payment.objects.filter(
-                tenant=self.tenant,
-                payment_number__startswith=f'PAY-{year_month}'
-            ).order_by('-payment_number').first()
-            
-            if last_payment:
-                last_num = int(last_payment.payment_number.split('-')[-1])
-                new_num = last_num + 1
-            else:
-                new_num = 1
+        with transaction.atomic():
+            # Auto-generate payment number if not provided
+            if not self.payment_number:
+                year_month = month_period()
+                prefix = f'PAY-{year_month}-'
+                new_num = allocate_number(
+                    self.tenant, 'PAY', year_month,
+                    seed=lambda: max_existing_suffix(
+                        Payment.all_objects.filter(tenant=self.tenant), 'payment_number', prefix
+                    )
+                )
+                self.payment_number = f'{prefix}{new_num:05d}'
             
-            self.payment_number = f'PAY-{year_month}-{new_num:05d}'
-        
-        super().save(*args, **kwargs)
+            super().save(*args, **kwargs)
         
-        # Update invoice payment tracking
-        self.invoice.total_paid = self.invoice.payments.aggregate(
-            total=models.Sum('amount')
-        )['total'] or Decimal('0.00')
-        self.invoice.calculate_totals()
+        # Invoice totals are recalculated at commit (financials.signals)
 
 
 # ==================== REFUND VOUCHER MODEL ====================
@@ -413,7 +410,7 @@ class RefundVoucher(models.Model):
     )
     
     # Voucher Identity
-    refund_number = models.CharField(max_length=50, unique=True, verbose_name='Refund Voucher Number')
+    refund_number = models.CharField(max_length=50, verbose_name='Refund Voucher Number')
     refund_date = models.DateField(default=timezone.now, verbose_name='Refund Date')
     
     # Original Receipt Voucher
@@ -526,8 +523,9 @@ class RefundVoucher(models.Model):
         verbose_name = "Refund Voucher"
         verbose_name_plural = "Refund Vouchers"
         ordering = ['-refund_date', '-created_at']
+        # Numbers are allocated per tenant (core.sequences)
+        unique_together = ['tenant', 'refund_number']
         indexes = [
-            models.Index(fields=['tenant', 'refund_number']),
             models.Index(fields=['tenant', 'customer']),
             models.Index(fields=['tenant', 'refund_date']),
         ]
@@ -536,22 +534,21 @@ class RefundVoucher(models.Model):
         return f"{self.refund_number} - {self.customer.name} - ₹{self.total_refund}"
     
     def save(self, *args, **kwargs):
+        with transaction.atomic():
+            self._save(*args, **kwargs)
+    
+    def _save(self, *args, **kwargs):
         # Auto-generate refund number if not provided
         if not self.refund_number:
-            from django.utils import timezone
-            year_month = timezone.now().strftime('%Y%m')
-            last_refund = RefundVoucher.objects.filter(
-                tenant=self.tenant,
-                refund_number__startswith=f'RF-{year_month}'
-            ).order_by('-refund_number').first()
-            
-            if last_refund:
-                last_num = int(last_refund.refund_number.split('-')[-1])
-                new_num = last_num + 1
-            else:
-                new_num = 1
-            
-            self.refund_number = f'RF-{year_month}-{new_num:05d}'
+            year_month = month_period()
+            prefix = f'RF-{year_month}-'
+            new_num = allocate_number(
+                self.tenant, 'RF', year_month,
+                seed=lambda: max_existing_suffix(
+                    RefundVoucher.all_objects.filter(tenant=self.tenant), 'refund_number', prefix
+                )
+            )
+            self.refund_number = f'{prefix}{new_num:05d}'
         
         # Copy tax details from receipt voucher
         self.gst_rate = self.receipt_voucher.gst_rate
@@ -606,7 +603,6 @@ class PaymentRefund(models.Model):
     
     refund_number = models.CharField(
         max_length=50,
-        unique=True,
         blank=True,
         verbose_name='Payment Refund Number'
     )
@@ -692,6 +688,8 @@ class PaymentRefund(models.Model):
         verbose_name = "Payment Refund"
         verbose_name_plural = "Payment Refunds"
         ordering = ['-refund_date', '-created_at']
+        # Numbers are allocated per tenant (core.sequences)
+        unique_together = ['tenant', 'refund_number']
         indexes = [
             models.Index(fields=['tenant', 'refund_date']),
             models.Index(fields=['tenant', 'payment']),
@@ -727,43 +725,31 @@ class PaymentRefund(models.Model):
             raise ValidationError("Reason for refund is required")
     
     def save(self, *args, **kwargs):
-        # Auto-generate refund number
-        if not self.refund_number:
-            self.refund_number = self._generate_refund_number()
-        
-        # Run validation
-        self.full_clean()
-        
-        super().save(*args, **kwargs)
+        with transaction.atomic():
+            # Auto-generate refund number
+            if not self.refund_number:
+                self.refund_number = self._generate_refund_number()
+            
+            # Run validation
+            self.full_clean()
+            
+            super().save(*args, **kwargs)
         
-        # Update invoice totals
-        if self.invoice:
-            self.invoice.calculate_totals()
+        # Invoice totals are recalculated at commit (financials.signals)
     
     def _generate_refund_number(self):
         """Generate unique refund number: PREF-YYYYMM-00001"""
-        from django.utils import timezone
-        
-        today = timezone.now().date()
-        prefix = f"PREF-{today.strftime('%Y%m')}"
-        
-        # Get last refund number for this month
-        last_refund = PaymentRefund.objects.filter(
-            tenant=self.tenant,
-            refund_number__startswith=prefix
-        ).order_by('-refund_number').first()
+        year_month = month_period()
+        prefix = f"PREF-{year_month}-"
         
-        if last_refund:
-            # Extract sequence number
-            try:
-                last_seq = int(last_refund.refund_number.split('-')[-1])
-                new_seq = last_seq + 1
-            except (ValueError, IndexError):
-                new_seq = 1
-        else:
-            new_seq = 1
+        new_seq = allocate_number(
+            self.tenant, 'PREF', year_month,
+            seed=lambda: max_existing_suffix(
+                PaymentRefund.all_objects.filter(tenant=self.tenant), 'refund_number', prefix
+            )
+        )
         
-        return f"{prefix}-{new_seq:05d}"
+        return f"{prefix}{new_seq:05d}"
     
     @property
     def refund_mode_display(self):
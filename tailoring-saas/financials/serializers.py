@@ -6,7 +6,6 @@ PERMANENT FIX: Dynamic validation + flexible field names
 
 from rest_framework import serializers
 from .models import ReceiptVoucher, Payment, RefundVoucher, PaymentRefund
-from decimal import Decimal
 from datetime import datetime
 
 # ==================== RECEIPT VOUCHER SERIALIZERS ====================
@@ -114,43 +113,24 @@ class PaymentCreateSerializer(serializers.ModelSerializer):
         ]
     
     def validate_amount(self, value):
-        """✅ FIXED: Validate payment amount using DYNAMIC balance calculation"""
+        """✅ FIXED: Validate payment amount using DYNAMIC balance calculation (one aggregate query)"""
         invoice_id = self.initial_data.get('invoice')
         if invoice_id:
-            from invoicing.models import Invoice
-            from financials.models import ReceiptVoucher, Payment as PaymentModel, RefundVoucher
+            from invoicing.models import Invoice, annotate_invoice_totals
             
-            try:
-                invoice = Invoice.objects.get(pk=invoice_id)
-                
-                # ✅ Calculate dynamic remaining balance
-                grand_total = invoice.grand_total
-                
-                # Get advances (minus refunds)
-                advances = Decimal('0.00')
-                if invoice.order:
-                    receipts = ReceiptVoucher.objects.filter(order=invoice.order, tenant=invoice.tenant)
-                    for receipt in receipts:
-                        advances += receipt.total_amount
-                    
-                    # Subtract refunds
-                    refunds = RefundVoucher.objects.filter(receipt_voucher__order=invoice.order, tenant=invoice.tenant)
-                    for refund in refunds:
-                        advances -= refund.total_refund
-                
-                # Get invoice payments
-                payments = PaymentModel.objects.filter(invoice=invoice, tenant=invoice.tenant)
-                invoice_payments = sum(p.amount for p in payments)
-                
-                # Calculate dynamic remaining balance
-                remaining = grand_total - advances - invoice_payments
+            totals = annotate_invoice_totals(
+                Invoice.objects.filter(pk=invoice_id)
+            ).values('grand_total', 'receipts_total', 'refunds_total', 'payments_total').first()
+            
+            if totals:
+                # Advances (receipts - refunds) and invoice payments
+                advances = totals['receipts_total'] - totals['refunds_total']
+                remaining = totals['grand_total'] - advances - totals['payments_total']
                 
                 if value > remaining:
                     raise serializers.ValidationError(
                         f"Payment amount (₹{value}) exceeds remaining balance (₹{remaining})"
                     )
-            except Invoice.DoesNotExist:
-                pass
         
         return value
 
@@ -1,50 +1,60 @@
 """
 Financials app signals - Auto-recalculate invoice when payments change
 Date: 2026-01-27
+UPDATED: Recalculation is queued and coalesced per transaction (invoicing.recalculation)
 """
 
 from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
-from .models import ReceiptVoucher, Payment, RefundVoucher
+from invoicing.recalculation import schedule_invoice_recalculation
+from .models import ReceiptVoucher, Payment, RefundVoucher, PaymentRefund
 
 
 @receiver(post_save, sender=ReceiptVoucher)
 def recalculate_invoice_on_receipt_save(sender, instance, created, **kwargs):
     """Recalculate invoice when receipt voucher is created"""
-    if instance.order and hasattr(instance.order, 'invoice') and instance.order.invoice:
-        instance.order.invoice.calculate_totals()
+    if instance.order_id:
+        schedule_invoice_recalculation(order_id=instance.order_id)
 
 
 @receiver(post_delete, sender=ReceiptVoucher)
 def recalculate_invoice_on_receipt_delete(sender, instance, **kwargs):
     """Recalculate invoice when receipt voucher is deleted"""
-    if instance.order and hasattr(instance.order, 'invoice') and instance.order.invoice:
-        instance.order.invoice.calculate_totals()
+    if instance.order_id:
+        schedule_invoice_recalculation(order_id=instance.order_id)
 
 
 @receiver(post_save, sender=Payment)
 def recalculate_invoice_on_payment_save(sender, instance, created, **kwargs):
     """Recalculate invoice when payment is created"""
-    if instance.invoice:
-        instance.invoice.calculate_totals()
+    if instance.invoice_id:
+        schedule_invoice_recalculation(invoice_id=instance.invoice_id)
 
 
 @receiver(post_delete, sender=Payment)
 def recalculate_invoice_on_payment_delete(sender, instance, **kwargs):
     """Recalculate invoice when payment is deleted"""
-    if instance.invoice:
-        instance.invoice.calculate_totals()
+    if instance.invoice_id:
+        schedule_invoice_recalculation(invoice_id=instance.invoice_id)
 
 
 @receiver(post_save, sender=RefundVoucher)
 def recalculate_invoice_on_refund_save(sender, instance, created, **kwargs):
     """Recalculate invoice when refund is created"""
-    if instance.receipt_voucher.order and hasattr(instance.receipt_voucher.order, 'invoice') and instance.receipt_voucher.order.invoice:
-        instance.receipt_voucher.order.invoice.calculate_totals()
+    if instance.receipt_voucher.order_id:
+        schedule_invoice_recalculation(order_id=instance.receipt_voucher.order_id)
 
 
 @receiver(post_delete, sender=RefundVoucher)
 def recalculate_invoice_on_refund_delete(sender, instance, **kwargs):
     """Recalculate invoice when refund is deleted"""
-    if instance.receipt_voucher.order and hasattr(instance.receipt_voucher.order, 'invoice') and instance.receipt_voucher.order.invoice:
-        instance.receipt_voucher.order.invoice.calculate_totals()
\ No newline at end of file
+    if instance.receipt_voucher.order_id:
+        schedule_invoice_recalculation(order_id=instance.receipt_voucher.order_id)
+
+
+@receiver(post_save, sender=PaymentRefund)
+@receiver(post_delete, sender=PaymentRefund)
+def recalculate_invoice_on_payment_refund_change(sender, instance, **kwargs):
+    """Recalculate invoice when a payment refund is created or deleted"""
+    if instance.invoice_id:
+        schedule_invoice_recalculation(invoice_id=instance.invoice_id)
@@ -10,6 +10,7 @@ from rest_framework.permissions import IsAuthenticated
 from django_filters.rest_framework import DjangoFilterBackend
 from django.db.models import Q, Sum
 
+from core.pagination import OptInCursorPagination
 from core.permissions import CanManageOrders, CanManagePayments
 from .models import ReceiptVoucher, Payment, RefundVoucher, PaymentRefund
 from .serializers import (
@@ -35,6 +36,8 @@ class ReceiptVoucherViewSet(viewsets.ModelViewSet):
     
     permission_classes = [IsAuthenticated, CanManagePayments]
     filter_backends = [DjangoFilterBackend, filters.SearchFilter]
+    pagination_class = OptInCursorPagination
+    cursor_ordering = ('-receipt_date', '-created_at')
     filterset_fields = ['payment_mode', 'deposited_to_bank', 'order', 'customer']
     search_fields = ['voucher_number', 'customer__name', 'customer__phone', 'transaction_reference']
     
@@ -114,6 +117,8 @@ class PaymentViewSet(viewsets.ModelViewSet):
     
     permission_classes = [IsAuthenticated, CanManagePayments]
     filter_backends = [DjangoFilterBackend, filters.SearchFilter]
+    pagination_class = OptInCursorPagination
+    cursor_ordering = ('-payment_date', '-created_at')
     filterset_fields = ['payment_mode', 'deposited_to_bank', 'invoice']
     search_fields = ['payment_number', 'invoice__invoice_number', 'transaction_reference']
     
@@ -353,18 +358,13 @@ class PaymentRefundViewSet(viewsets.ModelViewSet):
     def destroy(self, request, *args, **kwargs):
         """
         Delete payment refund
-        Note: This will recalculate invoice totals automatically
+        Note: Invoice totals are recalculated at commit (financials.signals)
         """
         instance = self.get_object()
-        invoice = instance.invoice
         
         # Delete the refund
         self.perform_destroy(instance)
         
-        # Recalculate invoice totals
-        if invoice:
-            invoice.calculate_totals()
-        
         return Response(
             {"message": "Payment refund deleted successfully"},
             status=status.HTTP_204_NO_CONTENT
@@ -0,0 +1,253 @@
+"""
+Receivables aging
+Date: 2026-10-17
+
+    GET /api/invoicing/invoices/aging/?as_of=YYYY-MM-DD                  per-customer summary
+    GET /api/invoicing/invoices/aging/?mode=invoices&customer=12         drill-down (paginated)
+    GET /api/invoicing/invoices/aging/export/?mode=summary|invoices&file_format=csv|xlsx
+
+Receivables are the invoices InvoiceViewSet.unpaid lists (issued, unpaid or
+partially paid). Their remaining_balance is bucketed by age - days since
+invoice_date (invoices carry no due date) - into 0-30, 31-60, 61-90 and 90+.
+
+The summary is one grouped query: the buckets are Sum(filter=) over date
+cutoffs worked out from as_of, per customer, and the tenant totals are added
+up from those rows. Both modes read the (tenant, payment_status,
+invoice_date) index. Exports stream: the drill-down is read in keyset pages
+and never builds the whole report in memory or holds a read cursor open
+for the whole download.
+"""
+
+from datetime import timedelta
+
+from django.db.models import Count, F, Min, Q, Sum
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+
+RECEIVABLE_PAYMENT_STATUSES = ['UNPAID', 'PARTIAL']
+
+# (key, label, min days, max days)
+AGING_BUCKETS = (
+    ('days_0_30', '0-30 days', 0, 30),
+    ('days_31_60', '31-60 days', 31, 60),
+    ('days_61_90', '61-90 days', 61, 90),
+    ('days_90_plus', '90+ days', 91, None),
+)
+
+AGING_MODES = ('summary', 'invoices')
+
+SUMMARY_COLUMNS = [
+    ('customer_id', 'Customer ID'),
+    ('customer_name', 'Customer'),
+    ('customer_phone', 'Phone'),
+    ('invoices', 'Invoices'),
+    ('oldest_invoice_date', 'Oldest Invoice'),
+    *[(key, label) for key, label, _, _ in AGING_BUCKETS],
+    ('total', 'Total Outstanding'),
+]
+
+INVOICE_COLUMNS = [
+    ('invoice_number', 'Invoice Number'),
+    ('invoice_date', 'Invoice Date'),
+    ('customer_name', 'Customer'),
+    ('customer_phone', 'Phone'),
+    ('age_days', 'Age (days)'),
+    ('bucket', 'Bucket'),
+    ('grand_total', 'Invoice Total'),
+    ('remaining_balance', 'Outstanding'),
+]
+
+
+class AgingRequestError(ValueError):
+    pass
+
+
+def parse_aging_params(params):
+    """mode / as_of / customer query params -> (mode, as_of, customer_id)"""
+    mode = params.get('mode', 'summary')
+    if mode not in AGING_MODES:
+        raise AgingRequestError(f'mode must be one of: {", ".join(AGING_MODES)}')
+
+    as_of = params.get('as_of')
+    try:
+        parsed = parse_date(as_of) if as_of else timezone.localdate()
+    except ValueError:
+        parsed = None
+    if parsed is None:
+        raise AgingRequestError(f'Invalid as_of date: {as_of} (use YYYY-MM-DD)')
+
+    customer_id = params.get('customer')
+    if customer_id is not None:
+        if not customer_id.isdigit():
+            raise AgingRequestError(f'Invalid customer: {customer_id}')
+        customer_id = int(customer_id)
+
+    return mode, parsed, customer_id
+
+
+def receivables(tenant, as_of, customer_id=None):
+    """Invoices with money still due, dated on or before as_of"""
+    from .models import Invoice
+
+    queryset = Invoice.all_objects.filter(
+        tenant=tenant,
+        payment_status__in=RECEIVABLE_PAYMENT_STATUSES,
+        invoice_date__lte=as_of,
+        status='ISSUED',
+    )
+    if customer_id is not None:
+        queryset = queryset.filter(customer_id=customer_id)
+    return queryset
+
+
+def bucket_conditions(as_of, date_field='invoice_date'):
+    """{bucket key: Q on date_field} - age cutoffs as dates, so the index range applies"""
+    conditions = {}
+    for key, _, min_days, max_days in AGING_BUCKETS:
+        condition = Q(**{f'{date_field}__lte': as_of - timedelta(days=min_days)})
+        if max_days is not None:
+            condition &= Q(**{f'{date_field}__gte': as_of - timedelta(days=max_days)})
+        conditions[key] = condition
+    return conditions
+
+
+def aging_bucket(age_days):
+    for key, _, min_days, max_days in AGING_BUCKETS:
+        if age_days >= min_days and (max_days is None or age_days <= max_days):
+            return key
+    return AGING_BUCKETS[0][0]
+
+
+# ==================== SUMMARY ====================
+
+def aging_summary_rows(tenant, as_of, customer_id=None):
+    """Per-customer bucket totals, largest outstanding first (one grouped query)"""
+    buckets = {
+        key: Sum('remaining_balance', filter=condition)
+        for key, condition in bucket_conditions(as_of).items()
+    }
+    return (
+        receivables(tenant, as_of, customer_id)
+        .values('customer_id')
+        .annotate(
+            customer_name=F('customer__name'),
+            customer_phone=F('customer__phone'),
+            invoices=Count('pk'),
+            oldest_invoice_date=Min('invoice_date'),
+            total=Sum('remaining_balance'),
+            **buckets,
+        )
+        .order_by('-total', 'customer_id')
+    )
+
+
+def _fill_buckets(row):
+    """Empty buckets come back as NULL"""
+    for key, _, _, _ in AGING_BUCKETS:
+        row[key] = row[key] or 0
+    return row
+
+
+def aging_summary(tenant, as_of, customer_id=None):
+    """
+    Summary report
+
+    Returns:
+        {'as_of', 'buckets': [{key, label}], 'totals': {bucket: amount, 'total', 'invoices', 'customers'},
+         'customers': [row]}
+    """
+    customers = []
+    totals = {key: 0 for key, _, _, _ in AGING_BUCKETS}
+    totals.update(total=0, invoices=0, customers=0)
+    for row in map(_fill_buckets, aging_summary_rows(tenant, as_of, customer_id)):
+        for key, _, _, _ in AGING_BUCKETS:
+            totals[key] += row[key]
+        totals['total'] += row['total']
+        totals['invoices'] += row['invoices']
+        totals['customers'] += 1
+        customers.append(row)
+
+    return {
+        'as_of': as_of,
+        'buckets': [{'key': key, 'label': label} for key, label, _, _ in AGING_BUCKETS],
+        'totals': totals,
+        'customers': customers,
+    }
+
+
+# ==================== DRILL-DOWN ====================
+
+def aging_invoices(tenant, as_of, customer_id=None):
+    """Receivable invoices for the drill-down, oldest first"""
+    return (
+        receivables(tenant, as_of, customer_id)
+        .select_related('customer')
+        .only(
+            'invoice_number', 'invoice_date', 'grand_total', 'remaining_balance', 'created_at',
+            'customer', 'customer__name', 'customer__phone',
+        )
+        .order_by('invoice_date', 'created_at')
+    )
+
+
+def iter_aging_invoices(tenant, as_of, customer_id=None, page_size=None):
+    """
+    Drill-down invoices oldest first, in keyset pages on (invoice_date, pk)
+    Each page is one short query - no read cursor held open for the whole
+    download, which on SQLite would block writers (as core.exports.iter_rows)
+    """
+    from core.exports import PAGE_SIZE
+
+    queryset = aging_invoices(tenant, as_of, customer_id).order_by('invoice_date', 'pk')
+    last = None
+    while True:
+        page = queryset
+        if last is not None:
+            page = page.filter(Q(invoice_date__gt=last[0]) | Q(invoice_date=last[0], pk__gt=last[1]))
+        invoices = list(page[:page_size or PAGE_SIZE])
+        if not invoices:
+            return
+        yield from invoices
+        last = (invoices[-1].invoice_date, invoices[-1].pk)
+
+
+def aging_invoice_row(invoice, as_of):
+    age_days = (as_of - invoice.invoice_date).days
+    return {
+        'id': invoice.pk,
+        'invoice_number': invoice.invoice_number,
+        'invoice_date': invoice.invoice_date,
+        'customer_id': invoice.customer_id,
+        'customer_name': invoice.customer.name,
+        'customer_phone': invoice.customer.phone,
+        'age_days': age_days,
+        'bucket': aging_bucket(age_days),
+        'grand_total': invoice.grand_total,
+        'remaining_balance': invoice.remaining_balance,
+    }
+
+
+# ==================== EXPORT ====================
+
+def aging_filename(tenant, mode, as_of, file_format):
+    return f'aging_{mode}_{tenant.slug or tenant.pk}_{as_of}.{file_format}'
+
+
+def stream_aging(tenant, mode, as_of, customer_id=None, file_format='csv'):
+    """Bytes of the aging report, as a generator for StreamingHttpResponse"""
+    from core.exports import stream_csv, stream_xlsx
+
+    if mode == 'invoices':
+        columns = INVOICE_COLUMNS
+        rows = (aging_invoice_row(invoice, as_of) for invoice in iter_aging_invoices(tenant, as_of, customer_id))
+    else:
+        columns = SUMMARY_COLUMNS
+        # One row per customer owing money - read in one go rather than through an open cursor
+        rows = map(_fill_buckets, list(aging_summary_rows(tenant, as_of, customer_id)))
+
+    headers = [header for _, header in columns]
+    values = ([row[key] for key, _ in columns] for row in rows)
+    if file_format == 'xlsx':
+        return stream_xlsx(headers, values, title='Aging')
+    return stream_csv(headers, values)
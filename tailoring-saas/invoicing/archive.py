@@ -0,0 +1,179 @@
+"""
+Streaming invoice archive (ZIP of PDFs + register)
+Date: 2026-10-17
+
+For accountants' month-end / year-end: one ZIP with every invoice PDF in a
+date range plus a register (CSV or XLSX) of the same invoices.
+
+    GET /api/invoicing/invoices/archive/?from=2026-04-01&to=2027-03-31&register=xlsx
+    python manage.py export_invoice_archive --tenant 12 --from ... --to ... -o fy.zip
+
+The ZIP is written to the response as it is built: PDFs come from the
+content-hash cache (invoicing.pdf) and missing ones are rendered as their
+entries are reached. A web request renders them in its own process - it
+never forks a pool - while the management command renders in a process
+pool. Only one PDF and the current register page are in memory at a time.
+"""
+
+import io
+import zipfile
+
+from django.db.models import Q
+from django.utils.dateparse import parse_date
+
+from core.exports import write_csv, write_xlsx
+
+from .pdf import iter_invoice_pdfs
+
+
+REGISTER_COLUMNS = [
+    ('invoice_number', 'Invoice Number'),
+    ('invoice_date', 'Invoice Date'),
+    ('status', 'Status'),
+    ('billing_name', 'Customer'),
+    ('billing_gstin', 'Customer GSTIN'),
+    ('billing_state', 'Place of Supply'),
+    ('tax_type', 'Tax Type'),
+    ('subtotal', 'Taxable Value'),
+    ('total_cgst', 'CGST'),
+    ('total_sgst', 'SGST'),
+    ('total_igst', 'IGST'),
+    ('grand_total', 'Invoice Total'),
+    ('total_advance_adjusted', 'Advance Adjusted'),
+    ('total_paid', 'Paid'),
+    ('remaining_balance', 'Balance'),
+    ('payment_status', 'Payment Status'),
+]
+
+REGISTER_FORMATS = ('csv', 'xlsx')
+
+# Register rows read per query
+REGISTER_PAGE_SIZE = 2000
+
+
+class ArchiveRequestError(ValueError):
+    pass
+
+
+def archive_invoices(tenant, date_from=None, date_to=None, statuses=None):
+    """Invoices for an archive - issued and paid by default"""
+    from .models import Invoice
+
+    invoices = Invoice.all_objects.filter(tenant=tenant, status__in=statuses or ['ISSUED', 'PAID'])
+    if date_from:
+        invoices = invoices.filter(invoice_date__gte=date_from)
+    if date_to:
+        invoices = invoices.filter(invoice_date__lte=date_to)
+    return invoices
+
+
+def parse_archive_params(params):
+    """from / to / status / register query params -> archive_invoices kwargs + register format"""
+    dates = {}
+    for key in ('from', 'to'):
+        value = params.get(key)
+        if value:
+            dates[key] = parse_date(value)
+            if dates[key] is None:
+                raise ArchiveRequestError(f'Invalid {key} date: {value} (use YYYY-MM-DD)')
+
+    register = params.get('register', 'csv')
+    if register not in REGISTER_FORMATS:
+        raise ArchiveRequestError(f'register must be one of: {", ".join(REGISTER_FORMATS)}')
+
+    statuses = params.getlist('status') if hasattr(params, 'getlist') else params.get('status')
+    return {
+        'date_from': dates.get('from'),
+        'date_to': dates.get('to'),
+        'statuses': statuses or None,
+    }, register
+
+
+def archive_filename(tenant, date_from=None, date_to=None):
+    period = '_'.join(str(value) for value in (date_from, date_to) if value) or 'all'
+    return f'invoices_{tenant.slug or tenant.pk}_{period}.zip'
+
+
+# ==================== REGISTER ====================
+
+def iter_register_rows(invoices):
+    """Register rows in invoice order, read in keyset pages"""
+    fields = [field for field, _ in REGISTER_COLUMNS]
+    last = None
+    while True:
+        page = invoices.order_by('invoice_date', 'pk')
+        if last is not None:
+            page = page.filter(Q(invoice_date__gt=last[0]) | Q(invoice_date=last[0], pk__gt=last[1]))
+        rows = list(page.values_list(*fields, 'pk')[:REGISTER_PAGE_SIZE])
+        if not rows:
+            return
+        for row in rows:
+            yield row[:-1]
+        last = (rows[-1][1], rows[-1][-1])
+
+
+def write_register_csv(invoices, fileobj):
+    write_csv(fileobj, [label for _, label in REGISTER_COLUMNS], iter_register_rows(invoices))
+
+
+def write_register_xlsx(invoices, fileobj):
+    write_xlsx(fileobj, [label for _, label in REGISTER_COLUMNS], iter_register_rows(invoices), 'Invoice Register')
+
+
+REGISTER_WRITERS = {
+    'csv': write_register_csv,
+    'xlsx': write_register_xlsx,
+}
+
+
+# ==================== ZIP STREAM ====================
+
+class _ZipStream(io.RawIOBase):
+    """Write-only, unseekable sink for ZipFile; drain() hands over what was written"""
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def stream_invoice_archive(invoices, register='csv', workers=None):
+    """
+    Yield the ZIP archive of invoices (queryset) in chunks:
+    invoices/<number>.pdf for each invoice, then register.<csv|xlsx>
+
+    workers as for iter_invoice_pdfs - pass 1 inside a web request
+    """
+    from django.core.files.storage import default_storage
+
+    stream = _ZipStream()
+    # PDFs are mostly text streams - deflate shrinks them well
+    with zipfile.ZipFile(stream, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        # Invoice numbers are unique per tenant, so entry names don't collide
+        for invoice_id, invoice_number, path in iter_invoice_pdfs(invoices, workers):
+            name = f'invoices/{invoice_number}.pdf'
+            with default_storage.open(path, 'rb') as pdf, archive.open(name, 'w', force_zip64=True) as entry:
+                while chunk := pdf.read(64 * 1024):
+                    entry.write(chunk)
+            yield stream.drain()
+
+        with archive.open(f'register.{register}', 'w', force_zip64=True) as entry:
+            REGISTER_WRITERS[register](invoices, entry)
+        yield stream.drain()
+
+    yield stream.drain()
@@ -0,0 +1,27 @@
+# Generated by Django 5.0 on 2026-10-17 06:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_document_sequence'),
+        ('invoicing', '0002_alter_invoiceitem_item_type'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='invoice',
+            name='invoicing_i_tenant__e88abd_idx',
+        ),
+        migrations.AlterField(
+            model_name='invoice',
+            name='invoice_number',
+            field=models.CharField(max_length=50, verbose_name='Invoice Number'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='invoice',
+            unique_together={('tenant', 'invoice_number')},
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.0 on 2026-10-17 06:24
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_tenant_usage_and_entitlement_version'),
+        ('invoicing', '0003_per_tenant_document_numbers'),
+        ('orders', '0007_list_ordering_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='invoice',
+            name='invoicing_i_tenant__c8d3fa_idx',
+        ),
+        migrations.AddIndex(
+            model_name='invoice',
+            index=models.Index(fields=['tenant', '-invoice_date', '-created_at'], name='invoicing_i_tenant__bbd28b_idx'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.0 on 2026-10-17 07:30
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_daily_stats'),
+        ('invoicing', '0004_list_ordering_indexes'),
+        ('orders', '0009_customer_search_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='invoice',
+            index=models.Index(fields=['tenant', 'payment_status', 'invoice_date'], name='invoicing_i_tenant__a3c430_idx'),
+        ),
+    ]
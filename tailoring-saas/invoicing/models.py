@@ -2,21 +2,24 @@
 Invoicing app models - With Dynamic Balance Calculation + DISCOUNT SUPPORT
 Date: 2026-02-02
 UPDATED: Added discount field to InvoiceItem + Added PRODUCT to item_type choices
+UPDATED: calculate_totals() uses SQL aggregates; recalculation deferred to commit
 """
 
 from django.db import models
 from django.utils import timezone
 from django.core.validators import MinValueValidator
 from django.core.exceptions import ValidationError
+from django.db import transaction
 from decimal import Decimal
 from core.managers import TenantManager
+from core.sequences import allocate_number, max_existing_suffix, financial_year_code
 
 
 class Invoice(models.Model):
     """GST-Compliant Invoice"""
     
     tenant = models.ForeignKey('core.Tenant', on_delete=models.CASCADE, related_name='invoices')
-    invoice_number = models.CharField(max_length=50, unique=True, verbose_name='Invoice Number')
+    invoice_number = models.CharField(max_length=50, verbose_name='Invoice Number')
     invoice_date = models.DateField(default=timezone.now, verbose_name='Invoice Date')
     customer = models.ForeignKey('orders.Customer', on_delete=models.PROTECT, related_name='invoices')
     
@@ -77,11 +80,15 @@ class Invoice(models.Model):
         verbose_name = "Invoice"
         verbose_name_plural = "Invoices"
         ordering = ['-invoice_date', '-created_at']
+        # Numbers are allocated per tenant (core.sequences)
+        unique_together = ['tenant', 'invoice_number']
         indexes = [
-            models.Index(fields=['tenant', 'invoice_number']),
             models.Index(fields=['tenant', 'customer']),
             models.Index(fields=['tenant', 'status']),
-            models.Index(fields=['tenant', 'invoice_date']),
+            # List ordering / keyset pagination (core.pagination)
+            models.Index(fields=['tenant', '-invoice_date', '-created_at']),
+            # Receivables aging (invoicing.aging)
+            models.Index(fields=['tenant', 'payment_status', 'invoice_date']),
         ]
     
     def __str__(self):
@@ -96,43 +103,28 @@ class Invoice(models.Model):
             Example:
             - Feb 2026 → FY 2025-26 → INV2526-1
             - Apr 2026 → FY 2026-27 → INV2627-1
+            
+            Numbering is gapless per FY: the counter is claimed in the same
+            transaction as the insert, so a failed save rolls it back
             """
+            with transaction.atomic():
+                self._save(*args, **kwargs)
+    
+    def _save(self, *args, **kwargs):
             if not self.invoice_number:
-                from django.utils import timezone
-                
-                today = timezone.now().date()
-                
-                # Calculate Financial Year
-                if today.month >= 4:  # April or later
-                    fy_start = today.year
-                    fy_end = today.year + 1
-                else:  # January to March
-                    fy_start = today.year - 1
-                    fy_end = today.year
-                
                 # Format: Last 2 digits of each year (e.g., 2526 for 2025-26)
-                fy_code = f"{fy_start % 100}{fy_end % 100}"
-                
-                # Get last invoice for this FY
-                last_invoice = Invoice.objects.filter(
-                    tenant=self.tenant,
-                    invoice_number__startswith=f'INV{fy_code}-'
-                ).order_by('-invoice_number').first()
+                fy_code = financial_year_code()
+                prefix = f'INV{fy_code}-'
                 
-                # Calculate next sequence number
-                if last_invoice:
-                    # Extract sequence from "INV2526-15" → 15
-                    try:
-                        last_seq = int(last_invoice.invoice_number.split('-')[-1])
-                        new_seq = last_seq + 1
-                    except (ValueError, IndexError):
-                        new_seq = 1
-                else:
-                    # First invoice of this FY
-                    new_seq = 1
+                new_seq = allocate_number(
+                    self.tenant, 'INV', fy_code,
+                    seed=lambda: max_existing_suffix(
+                        Invoice.all_objects.filter(tenant=self.tenant), 'invoice_number', prefix
+                    )
+                )
                 
                 # Generate invoice number: INV2526-1
-                self.invoice_number = f'INV{fy_code}-{new_seq}'
+                self.invoice_number = f'{prefix}{new_seq}'
             
             # Auto-detect tax type from billing state
             if self.billing_state and hasattr(self.tenant, 'state'):
@@ -148,35 +140,48 @@ class Invoice(models.Model):
             super().save(*args, **kwargs)
             
     def calculate_totals(self):
-        """✅ FIXED: Calculate all totals dynamically including advances and refunds"""
-        from financials.models import ReceiptVoucher, Payment, RefundVoucher
+        """
+        ✅ Recalculate all totals with database aggregates (one read + one UPDATE)
+        Includes advances (receipts - refunds) and invoice payments
         
-        # Calculate from items
-        items = self.items.all()
-        self.subtotal = sum(item.subtotal for item in items)
-        self.total_cgst = sum(item.cgst_amount for item in items)
-        self.total_sgst = sum(item.sgst_amount for item in items)
-        self.total_igst = sum(item.igst_amount for item in items)
-        self.grand_total = self.subtotal + self.total_cgst + self.total_sgst + self.total_igst
+        Prefer invoicing.recalculation.schedule_invoice_recalculation() from
+        write paths - it coalesces repeated requests into one run at commit
+        """
+        totals = annotate_invoice_totals(
+            Invoice.all_objects.filter(pk=self.pk)
+        ).values(*INVOICE_TOTAL_ANNOTATIONS).first()
         
-        # Calculate advances (receipts - refunds)
-        advances = Decimal('0.00')
-        if self.order:
-            receipts = ReceiptVoucher.objects.filter(order=self.order, tenant=self.tenant)
-            for receipt in receipts:
-                advances += receipt.total_amount
-            
-            # ✅ Subtract refunds
-            refunds = RefundVoucher.objects.filter(receipt_voucher__order=self.order, tenant=self.tenant)
-            for refund in refunds:
-                advances -= refund.total_refund
+        if totals is None:
+            return
+        
+        changes = self.apply_totals(totals)
+        Invoice.all_objects.filter(pk=self.pk).update(updated_at=timezone.now(), **changes)
+    
+    def apply_totals(self, totals):
+        """
+        Set total fields from aggregated values and return them as a dict
+        totals: row from annotate_invoice_totals()
+        """
+        subtotal = totals['items_subtotal']
+        taxable_rate_sum = totals['items_taxable_rate_sum']
         
-        self.total_advance_adjusted = advances
+        self.subtotal = subtotal
+        self.total_cgst = Decimal('0.00')
+        self.total_sgst = Decimal('0.00')
+        self.total_igst = Decimal('0.00')
+        if self.tax_type == 'INTRASTATE':
+            self.total_cgst = taxable_rate_sum / Decimal('200')
+            self.total_sgst = taxable_rate_sum / Decimal('200')
+        elif self.tax_type == 'INTERSTATE':
+            self.total_igst = taxable_rate_sum / Decimal('100')
+        self.grand_total = self.subtotal + self.total_cgst + self.total_sgst + self.total_igst
+        
+        # Advances (receipts - refunds)
+        self.total_advance_adjusted = totals['receipts_total'] - totals['refunds_total']
         self.balance_due = self.grand_total - self.total_advance_adjusted
         
-        # Calculate invoice payments
-        payments = Payment.objects.filter(invoice=self, tenant=self.tenant)
-        self.total_paid = sum(p.amount for p in payments)
+        # Invoice payments
+        self.total_paid = totals['payments_total']
         
         # Calculate remaining balance
         self.remaining_balance = self.balance_due - self.total_paid
@@ -191,7 +196,70 @@ class Invoice(models.Model):
             if self.status == 'ISSUED':
                 self.status = 'PAID'
         
-        self.save()
+        return {
+            field: getattr(self, field)
+            for field in (
+                'subtotal', 'total_cgst', 'total_sgst', 'total_igst', 'grand_total',
+                'total_advance_adjusted', 'balance_due', 'total_paid', 'remaining_balance',
+                'payment_status', 'status',
+            )
+        }
+
+
+# ==================== INVOICE TOTAL AGGREGATES ====================
+
+INVOICE_TOTAL_ANNOTATIONS = (
+    'items_subtotal', 'items_taxable_rate_sum',
+    'receipts_total', 'refunds_total', 'payments_total',
+)
+
+
+def annotate_invoice_totals(queryset):
+    """
+    Annotate invoices with everything calculate_totals() needs, as SQL aggregates:
+    - items_subtotal: Σ (qty × price - discount)
+    - items_taxable_rate_sum: Σ (qty × price - discount) × gst_rate  (÷200 = CGST/SGST, ÷100 = IGST)
+    - receipts_total / refunds_total: advances against the linked order
+    - payments_total: payments against the invoice
+    """
+    from django.db.models import DecimalField, ExpressionWrapper, F, OuterRef, Subquery, Sum, Value
+    from django.db.models.functions import Coalesce
+    from financials.models import ReceiptVoucher, Payment, RefundVoucher
+    
+    amount_field = DecimalField(max_digits=14, decimal_places=2)
+    # qty (2dp) × price (2dp) × rate (2dp) is exact at 6dp
+    weighted_field = DecimalField(max_digits=20, decimal_places=6)
+    
+    line_subtotal = ExpressionWrapper(
+        F('quantity') * F('unit_price') - F('discount'),
+        output_field=weighted_field
+    )
+    line_taxable_rate = ExpressionWrapper(
+        (F('quantity') * F('unit_price') - F('discount')) * F('gst_rate'),
+        output_field=weighted_field
+    )
+    
+    def summed(qs, group_by, expression, output_field):
+        return Coalesce(
+            Subquery(
+                qs.order_by().values(group_by).annotate(total=Sum(expression)).values('total'),
+                output_field=output_field
+            ),
+            Value(Decimal('0.00'), output_field=output_field)
+        )
+    
+    items = InvoiceItem.objects.filter(invoice=OuterRef('pk'))
+    receipts = ReceiptVoucher.all_objects.filter(order=OuterRef('order'), tenant=OuterRef('tenant'))
+    refunds = RefundVoucher.all_objects.filter(receipt_voucher__order=OuterRef('order'), tenant=OuterRef('tenant'))
+    payments = Payment.all_objects.filter(invoice=OuterRef('pk'), tenant=OuterRef('tenant'))
+    
+    return queryset.annotate(
+        items_subtotal=summed(items, 'invoice', line_subtotal, weighted_field),
+        items_taxable_rate_sum=summed(items, 'invoice', line_taxable_rate, weighted_field),
+        receipts_total=summed(receipts, 'order', 'total_amount', amount_field),
+        refunds_total=summed(refunds, 'receipt_voucher__order', 'total_refund', amount_field),
+        payments_total=summed(payments, 'invoice', 'amount', amount_field),
+    )
 
 
 class InvoiceItem(models.Model):
@@ -252,5 +320,7 @@ class InvoiceItem(models.Model):
         return self.subtotal + self.total_tax
     
     def save(self, *args, **kwargs):
+        from .recalculation import schedule_invoice_recalculation
+        
         super().save(*args, **kwargs)
-        self.invoice.calculate_totals()
\ No newline at end of file
+        schedule_invoice_recalculation(invoice_id=self.invoice_id)
\ No newline at end of file
@@ -0,0 +1,199 @@
+"""
+Content-hash cached invoice PDFs
+Date: 2026-10-17
+
+A rendered PDF is stored under a hash of everything it prints
+(orders.utils.invoice_generator.invoice_print_state):
+
+    invoices/pdf/<tenant>/<invoice>/<hash>.pdf
+
+An unchanged invoice is never rendered twice - repeat downloads are a
+storage read, and any printed change (payment, item, customer address,
+layout version) gives a new hash, so there is nothing to invalidate.
+Older versions of an invoice's PDF are deleted when a new one is stored.
+
+iter_invoice_pdfs() / render_invoice_pdfs() render many invoices in a
+process pool (`python manage.py render_invoice_pdfs` for month-end
+printing, `export_invoice_archive` for the ZIP export). The pool forks, so
+it is for management commands only: web requests pass workers=1.
+"""
+
+import hashlib
+import json
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connections
+from django.db.models import Prefetch
+
+
+PDF_ROOT = 'invoices/pdf'
+
+# Invoices per worker task, and per query when walking a batch
+BATCH_CHUNK_SIZE = 20
+BATCH_PAGE_SIZE = 200
+
+
+def invoice_pdf_queryset():
+    """Invoices with everything the PDF prints, for rendering many at once"""
+    from .models import Invoice, InvoiceItem
+
+    return Invoice.all_objects.select_related('tenant', 'customer', 'order').prefetch_related(
+        Prefetch('items', queryset=InvoiceItem.objects.select_related('item__unit'))
+    )
+
+
+def _prefetched_items(invoice):
+    if 'items' in getattr(invoice, '_prefetched_objects_cache', {}):
+        return list(invoice.items.all())
+    return None
+
+
+def invoice_pdf_digest(invoice, items=None):
+    from orders.utils.invoice_generator import invoice_print_state
+
+    state = invoice_print_state(invoice, items)
+    payload = json.dumps(state, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(payload.encode()).hexdigest()[:32]
+
+
+def invoice_pdf_dir(invoice):
+    return f'{PDF_ROOT}/{invoice.tenant_id}/{invoice.pk}'
+
+
+def invoice_pdf_path(invoice, items=None):
+    """Storage name of the PDF for the invoice's current printable state"""
+    return f'{invoice_pdf_dir(invoice)}/{invoice_pdf_digest(invoice, items)}.pdf'
+
+
+def get_invoice_pdf(invoice, items=None):
+    """
+    Storage name of the invoice's PDF, rendering it only if this state
+    wasn't rendered before
+    """
+    from orders.utils.invoice_generator import generate_invoice_pdf, invoice_print_items
+
+    if items is None:
+        items = _prefetched_items(invoice)
+    if items is None:
+        items = invoice_print_items(invoice)
+
+    path = invoice_pdf_path(invoice, items)
+    if default_storage.exists(path):
+        return path
+
+    buffer = generate_invoice_pdf(invoice, items)
+    name = default_storage.save(path, ContentFile(buffer.getvalue()))
+    _delete_stale_versions(invoice, keep=name)
+    return name
+
+
+def _delete_stale_versions(invoice, keep):
+    directory = invoice_pdf_dir(invoice)
+    try:
+        _, files = default_storage.listdir(directory)
+    except (FileNotFoundError, NotImplementedError):
+        return
+    for file_name in files:
+        name = f'{directory}/{file_name}'
+        if name != keep:
+            default_storage.delete(name)
+
+
+# ==================== BATCH RENDERING ====================
+
+def _init_worker():
+    """Spawned workers (non-fork platforms) start without Django set up"""
+    import django
+    from django.apps import apps
+
+    if not apps.ready:
+        django.setup()
+
+
+def _render_chunk(invoice_ids):
+    """Worker task: render a chunk of invoices, return [(invoice_id, invoice_number, storage name)]"""
+    invoices = invoice_pdf_queryset().filter(pk__in=invoice_ids)
+    return [(invoice.pk, invoice.invoice_number, get_invoice_pdf(invoice)) for invoice in invoices]
+
+
+def iter_invoice_pdfs(invoices, workers=None, rendered=None):
+    """
+    Yield (invoice_id, invoice_number, storage name) for every invoice in
+    the queryset, rendering missing PDFs in a process pool
+
+    Invoices are read in keyset pages and at most 2 × workers chunks are in
+    flight, so memory stays flat however many invoices there are. Results
+    come as they are ready, not in invoice order.
+
+    Args:
+        workers: processes to use (default: all cores; 1 = in this process,
+            as web requests must)
+        rendered: optional list - the ids that had to be rendered are appended
+    """
+    workers = workers or os.cpu_count() or 1
+    pool = None
+    in_flight = deque()
+
+    def submit(chunk):
+        nonlocal pool
+        if pool is None:
+            # Children must not share the parent's database connections
+            connections.close_all()
+            method = 'fork' if 'fork' in multiprocessing.get_all_start_methods() else None
+            pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context(method),
+                initializer=_init_worker,
+            )
+        in_flight.append(pool.submit(_render_chunk, chunk))
+
+    try:
+        last_pk = 0
+        while True:
+            page_ids = list(invoices.filter(pk__gt=last_pk).order_by('pk').values_list('pk', flat=True)[:BATCH_PAGE_SIZE])
+            if not page_ids:
+                break
+            last_pk = page_ids[-1]
+            page = invoice_pdf_queryset().filter(pk__in=page_ids).order_by('pk')
+
+            missing = []
+            for invoice in page:
+                path = invoice_pdf_path(invoice, _prefetched_items(invoice))
+                if default_storage.exists(path):
+                    yield invoice.pk, invoice.invoice_number, path
+                else:
+                    missing.append(invoice.pk)
+            if rendered is not None:
+                rendered.extend(missing)
+
+            for i in range(0, len(missing), BATCH_CHUNK_SIZE):
+                chunk = missing[i:i + BATCH_CHUNK_SIZE]
+                if workers <= 1:
+                    yield from _render_chunk(chunk)
+                    continue
+                submit(chunk)
+                while len(in_flight) > workers * 2:
+                    yield from in_flight.popleft().result()
+
+        while in_flight:
+            yield from in_flight.popleft().result()
+    finally:
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+
+def render_invoice_pdfs(invoices, workers=None):
+    """
+    Render PDFs for every invoice in the queryset; already-rendered states are skipped
+
+    Returns:
+        {'cached': n, 'rendered': n}
+    """
+    rendered = []
+    total = sum(1 for _ in iter_invoice_pdfs(invoices, workers, rendered))
+    return {'cached': total - len(rendered), 'rendered': len(rendered)}
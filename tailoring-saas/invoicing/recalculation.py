@@ -0,0 +1,81 @@
+"""
+Deferred, coalesced invoice recalculation
+Date: 2026-10-17
+
+Write paths (receipts, payments, refunds, invoice items) call
+schedule_invoice_recalculation() instead of Invoice.calculate_totals().
+Requests are collected for the current transaction and run once per
+affected invoice at transaction.on_commit - so entering 20 payments or
+20 invoice items in one transaction costs one recalculation, not 20.
+The queue belongs to the transaction (core.transactions): a rollback
+discards it, so nothing rolled back is recalculated later.
+
+Outside a transaction the recalculation runs immediately, which keeps the
+old behaviour for single autocommit writes. Recalculated invoices also
+refresh their customers' cached stats (orders.customer_stats) and their
+day's dashboard rollup (core.daily_stats).
+"""
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from core.transactions import queue_on_commit
+
+
+def schedule_invoice_recalculation(invoice_id=None, order_id=None):
+    """
+    Queue recalculation of an invoice (by id, or by its order id)
+    Runs once per invoice when the current transaction commits
+    """
+    if invoice_id is None and order_id is None:
+        return
+
+    def add(pending):
+        if invoice_id is not None:
+            pending['invoice_ids'].add(invoice_id)
+        if order_id is not None:
+            pending['order_ids'].add(order_id)
+
+    queue_on_commit(
+        'invoice_recalculation', flush_invoice_recalculations, add,
+        factory=lambda: {'invoice_ids': set(), 'order_ids': set()},
+    )
+
+
+def flush_invoice_recalculations(pending):
+    """Recalculate the queued invoices - {'invoice_ids', 'order_ids'} (one read + one UPDATE per invoice)"""
+    if pending['invoice_ids'] or pending['order_ids']:
+        recalculate_invoices(Q(pk__in=pending['invoice_ids']) | Q(order_id__in=pending['order_ids']))
+
+
+def recalculate_invoices(condition):
+    """Recalculate totals for invoices matching condition (Q object) in one query"""
+    from core.changes import record_change
+    from core.daily_stats import schedule_daily_stats_refresh
+    from orders.customer_stats import refresh_customer_stats
+    from .models import Invoice, annotate_invoice_totals
+
+    invoices = annotate_invoice_totals(Invoice.all_objects.filter(condition))
+    customer_ids = set()
+
+    with transaction.atomic():
+        for invoice in invoices:
+            customer_ids.add(invoice.customer_id)
+            changes = invoice.apply_totals({
+                'items_subtotal': invoice.items_subtotal,
+                'items_taxable_rate_sum': invoice.items_taxable_rate_sum,
+                'receipts_total': invoice.receipts_total,
+                'refunds_total': invoice.refunds_total,
+                'payments_total': invoice.payments_total,
+            })
+            Invoice.all_objects.filter(pk=invoice.pk).update(updated_at=timezone.now(), **changes)
+            # update() skips signals - log the new totals and customer stats for synced clients
+            record_change(invoice.tenant_id, 'invoices', invoice.pk)
+            record_change(invoice.tenant_id, 'customers', invoice.customer_id)
+            # ... and the dashboard rollup of the invoice's day
+            schedule_daily_stats_refresh(invoice.tenant_id, invoice.invoice_date, 'invoices')
+
+        # Billed / outstanding figures cached on the customer
+        if customer_ids:
+            refresh_customer_stats(pk__in=customer_ids)
@@ -4,8 +4,10 @@ Date: 2026-02-02
 UPDATED: Made GST fields writable to accept frontend calculations
 """
 
+from django.db import transaction
 from rest_framework import serializers
 from .models import Invoice, InvoiceItem
+from .recalculation import schedule_invoice_recalculation
 from decimal import Decimal
 
 
@@ -109,6 +111,14 @@ class InvoiceCreateSerializer(serializers.ModelSerializer):
         ]
     
     def create(self, validated_data):
+        # Items queue one invoice recalculation, run when this block commits
+        with transaction.atomic():
+            invoice = self._create(validated_data)
+        
+        invoice.refresh_from_db()
+        return invoice
+    
+    def _create(self, validated_data):
         items_data = validated_data.pop('items', [])
         order = validated_data.get('order')
         
@@ -167,12 +177,18 @@ class InvoiceCreateSerializer(serializers.ModelSerializer):
                 
                 InvoiceItem.objects.create(invoice=invoice, **item_data)
         
-        # ✅ Calculate totals using model's @property methods
-        invoice.calculate_totals()
-        
         return invoice
     
     def update(self, instance, validated_data):
+        with transaction.atomic():
+            instance = self._update(instance, validated_data)
+            # Item deletes don't pass through InvoiceItem.save
+            schedule_invoice_recalculation(invoice_id=instance.pk)
+        
+        instance.refresh_from_db()
+        return instance
+    
+    def _update(self, instance, validated_data):
         items_data = validated_data.pop('items', None)
         
         # ✅ Remove frontend totals
@@ -203,7 +219,4 @@ class InvoiceCreateSerializer(serializers.ModelSerializer):
                 
                 InvoiceItem.objects.create(invoice=instance, **item_data)
         
-        # Recalculate totals
-        instance.calculate_totals()
-        
         return instance
\ No newline at end of file
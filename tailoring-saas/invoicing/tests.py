@@ -1,3 +1,249 @@
+"""
+Tests for invoicing app
+"""
 from django.test import TestCase
 
-# Create your tests here.
+from core.testing import create_tenant
+
+
+class InvoicePDFCacheTest(TestCase):
+    """Test the content-hash invoice PDF cache"""
+    
+    @classmethod
+    def setUpTestData(cls):
+        from .models import Invoice
+        from orders.models import Customer
+        
+        cls.tenant = create_tenant("PDF Shop")
+        customer = Customer.all_objects.create(tenant=cls.tenant, name="Asha", phone="9876500001")
+        cls.invoice = Invoice.all_objects.create(
+            tenant=cls.tenant, customer=customer, status='ISSUED',
+            billing_name="Asha", billing_address="1, MG Road", billing_state="Karnataka"
+        )
+    
+    def test_unchanged_invoice_reuses_pdf(self):
+        """The same printable state maps to the same file; a printed change to a new one"""
+        import tempfile
+        from django.test import override_settings
+        from .pdf import get_invoice_pdf, invoice_pdf_queryset
+        
+        with tempfile.TemporaryDirectory() as media_root, override_settings(MEDIA_ROOT=media_root):
+            first = get_invoice_pdf(invoice_pdf_queryset().get(pk=self.invoice.pk))
+            self.assertEqual(get_invoice_pdf(invoice_pdf_queryset().get(pk=self.invoice.pk)), first)
+            
+            self.invoice.notes = "Deliver by Friday"
+            self.invoice.save()
+            second = get_invoice_pdf(invoice_pdf_queryset().get(pk=self.invoice.pk))
+            self.assertNotEqual(second, first)
+            
+            from django.core.files.storage import default_storage
+            self.assertFalse(default_storage.exists(first))
+    
+    def test_archive_streams_pdfs_and_register(self):
+        """The archive holds one PDF per issued invoice plus the register"""
+        import io
+        import tempfile
+        import zipfile
+        from django.test import override_settings
+        from .archive import archive_invoices, stream_invoice_archive
+        
+        with tempfile.TemporaryDirectory() as media_root, override_settings(MEDIA_ROOT=media_root):
+            data = b''.join(stream_invoice_archive(archive_invoices(self.tenant), workers=1))
+        
+        archive = zipfile.ZipFile(io.BytesIO(data))
+        self.assertEqual(archive.namelist(), [f'invoices/{self.invoice.invoice_number}.pdf', 'register.csv'])
+        self.assertTrue(archive.read(archive.namelist()[0]).startswith(b'%PDF'))
+        self.assertIn(self.invoice.invoice_number, archive.read('register.csv').decode('utf-8-sig'))
+    
+    def test_archive_endpoint_is_gated_like_exports(self):
+        """The bulk archive needs management and the data export feature, as the other exports do"""
+        from django.contrib.auth import get_user_model
+        from rest_framework.test import APIClient
+        
+        client = APIClient()
+        client.force_authenticate(get_user_model().objects.create(email="staff@pdf.com", tenant=self.tenant))
+        self.assertEqual(client.get('/api/invoicing/invoices/archive/').status_code, 403)
+        
+        # Management, but this tenant's plan has no data export
+        client.force_authenticate(
+            get_user_model().objects.create(email="owner@pdf.com", tenant=self.tenant, is_superuser=True)
+        )
+        response = client.get('/api/invoicing/invoices/archive/')
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(response.streaming)
+    
+    def test_archive_request_renders_in_process(self):
+        """A web request renders missing PDFs itself - it never forks a process pool"""
+        import io
+        import tempfile
+        import zipfile
+        from unittest import mock
+        from django.contrib.auth import get_user_model
+        from django.test import override_settings
+        from rest_framework.test import APIClient
+        from core.models import SubscriptionPlan, TenantSubscription
+        from . import pdf
+        
+        plan = SubscriptionPlan.objects.create(
+            name="Export Plan", tier="BUSINESS", price_monthly=0, price_yearly=0, allow_data_export=True
+        )
+        TenantSubscription.objects.create(tenant=self.tenant, plan=plan, status='ACTIVE')
+        client = APIClient()
+        client.force_authenticate(
+            get_user_model().objects.create(email="owner@pdf.com", tenant=self.tenant, is_superuser=True)
+        )
+        
+        with tempfile.TemporaryDirectory() as media_root, override_settings(MEDIA_ROOT=media_root), \
+                mock.patch.object(pdf, 'ProcessPoolExecutor', side_effect=AssertionError('forked a pool')):
+            response = client.get('/api/invoicing/invoices/archive/')
+            self.assertEqual(response.status_code, 200)
+            data = b''.join(response.streaming_content)
+        
+        names = zipfile.ZipFile(io.BytesIO(data)).namelist()
+        self.assertEqual(names, [f'invoices/{self.invoice.invoice_number}.pdf', 'register.csv'])
+
+
+class InvoiceRecalculationTest(TestCase):
+    """Test the deferred, coalesced invoice recalculation"""
+    
+    @classmethod
+    def setUpTestData(cls):
+        from orders.models import Customer
+        from .models import Invoice
+        
+        cls.tenant = create_tenant("Totals Shop")
+        customer = Customer.all_objects.create(tenant=cls.tenant, name="Asha", phone="9876500001")
+        cls.invoice, cls.other = [
+            Invoice.all_objects.create(
+                tenant=cls.tenant, customer=customer, status='ISSUED',
+                billing_name="Asha", billing_address="1, MG Road", billing_state="Karnataka"
+            )
+            for _ in range(2)
+        ]
+    
+    def test_item_writes_in_one_transaction_recalculate_once(self):
+        """Several item writes cost one recalculation at commit, with the final totals"""
+        from decimal import Decimal
+        from unittest import mock
+        from . import recalculation
+        from .models import Invoice, InvoiceItem
+        
+        with mock.patch.object(recalculation, 'recalculate_invoices', wraps=recalculation.recalculate_invoices) as recalculate:
+            with self.captureOnCommitCallbacks(execute=True):
+                for description, quantity, price in (("Blouse", 2, 750), ("Lehenga", 1, 2500), ("Alteration", 1, 250)):
+                    InvoiceItem.objects.create(invoice=self.invoice, item_description=description, quantity=quantity, unit_price=price)
+                # Not recalculated before commit
+                self.assertEqual(Invoice.all_objects.get(pk=self.invoice.pk).grand_total, Decimal('0.00'))
+        
+        self.assertEqual(recalculate.call_count, 1)
+        invoice = Invoice.all_objects.get(pk=self.invoice.pk)
+        self.assertEqual((invoice.subtotal, invoice.grand_total, invoice.balance_due, invoice.payment_status),
+                         (Decimal('4250.00'), Decimal('4250.00'), Decimal('4250.00'), 'UNPAID'))
+    
+    def test_rolled_back_writes_queue_nothing(self):
+        """Invoices queued in a rolled-back transaction are dropped, not recalculated by the next commit"""
+        from unittest import mock
+        from django.db import transaction
+        from . import recalculation
+        from .models import Invoice, InvoiceItem
+        
+        with mock.patch.object(recalculation, 'recalculate_invoices', wraps=recalculation.recalculate_invoices) as recalculate:
+            with self.captureOnCommitCallbacks(execute=True):
+                try:
+                    with transaction.atomic():
+                        InvoiceItem.objects.create(invoice=self.invoice, item_description="Blouse", quantity=1, unit_price=750)
+                        raise RuntimeError
+                except RuntimeError:
+                    pass
+                InvoiceItem.objects.create(invoice=self.other, item_description="Blouse", quantity=1, unit_price=750)
+        
+        recalculated = [set(Invoice.all_objects.filter(call.args[0]).values_list('pk', flat=True))
+                        for call in recalculate.call_args_list]
+        self.assertEqual(recalculated, [{self.other.pk}])
+
+
+class ReceivablesAgingTest(TestCase):
+    """Test the receivables aging report"""
+    
+    @classmethod
+    def setUpTestData(cls):
+        from orders.models import Customer
+        
+        cls.tenant = create_tenant("Aging Shop")
+        cls.customer = Customer.all_objects.create(tenant=cls.tenant, name="Asha", phone="9876500001")
+    
+    def test_balances_fall_into_age_buckets(self):
+        """Outstanding balances are bucketed by days since invoice date; drafts and paid invoices are left out"""
+        from datetime import date
+        from decimal import Decimal
+        from .aging import aging_summary
+        from .models import Invoice
+        
+        def invoice(invoice_date, balance, **fields):
+            Invoice.all_objects.create(
+                tenant=self.tenant, customer=self.customer, invoice_date=invoice_date,
+                remaining_balance=balance, billing_name="Asha", billing_address="1, MG Road",
+                billing_state="Karnataka", **{'status': 'ISSUED', **fields}
+            )
+        
+        invoice('2026-03-31', 100)
+        invoice('2026-03-01', 200, payment_status='PARTIAL')
+        invoice('2026-01-20', 300)
+        invoice('2025-12-01', 400)
+        invoice('2026-03-30', 500, status='DRAFT')
+        invoice('2026-03-30', 600, payment_status='PAID')
+        invoice('2026-04-02', 700)
+        
+        report = aging_summary(self.tenant, date(2026, 3, 31))
+        totals = report['totals']
+        self.assertEqual(
+            [totals[key] for key in ('days_0_30', 'days_31_60', 'days_61_90', 'days_90_plus', 'total')],
+            [Decimal('300'), Decimal('0'), Decimal('300'), Decimal('400'), Decimal('1000')]
+        )
+        self.assertEqual((totals['invoices'], totals['customers']), (4, 1))
+        self.assertEqual(report['customers'][0]['oldest_invoice_date'], date(2025, 12, 1))
+    
+    def test_drilldown_export_pages_on_date_and_id(self):
+        """Keyset pages cover every receivable once, oldest first, across invoices sharing a date"""
+        from datetime import date
+        from .aging import iter_aging_invoices, stream_aging
+        from .models import Invoice
+        
+        for invoice_date in ('2026-03-02', '2026-03-01', '2026-03-02', '2026-03-01'):
+            Invoice.all_objects.create(
+                tenant=self.tenant, customer=self.customer, invoice_date=invoice_date, status='ISSUED',
+                remaining_balance=100, billing_name="Asha", billing_address="1, MG Road", billing_state="Karnataka"
+            )
+        expected = list(
+            Invoice.all_objects.filter(tenant=self.tenant).order_by('invoice_date', 'pk').values_list('pk', flat=True)
+        )
+        
+        as_of = date(2026, 3, 31)
+        paged = [invoice.pk for invoice in iter_aging_invoices(self.tenant, as_of, page_size=1)]
+        self.assertEqual(paged, expected)
+        
+        text = b''.join(stream_aging(self.tenant, 'invoices', as_of)).decode('utf-8-sig')
+        self.assertEqual(len(text.strip().splitlines()), 5)
+    
+    def test_export_endpoint_is_gated_like_exports(self):
+        """The aging download needs management and the data export feature; staff roles get 403"""
+        from datetime import date
+        from django.contrib.auth import get_user_model
+        from rest_framework.test import APIClient
+        from employees.models import Employee
+        
+        client = APIClient()
+        tailor = get_user_model().objects.create(email="tailor@aging.com", tenant=self.tenant)
+        Employee.objects.create(
+            tenant=self.tenant, user=tailor, employee_code='TLR', role='TAILOR', date_joined=date(2026, 1, 1)
+        )
+        client.force_authenticate(tailor)
+        self.assertEqual(client.get('/api/invoicing/invoices/aging/export/').status_code, 403)
+        
+        # Management, but this tenant's plan has no data export
+        client.force_authenticate(
+            get_user_model().objects.create(email="owner@aging.com", tenant=self.tenant, is_superuser=True)
+        )
+        response = client.get('/api/invoicing/invoices/aging/export/')
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(response.streaming)
@@ -3,15 +3,36 @@ Invoicing app views - Invoice API views
 Date: 2026-01-03
 """
 
+import os
+
 from rest_framework import viewsets, status, filters
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django_filters.rest_framework import DjangoFilterBackend
+from django.core.files.storage import default_storage
 from django.db.models import Q
+from django.http import FileResponse, StreamingHttpResponse
 
-from core.permissions import CanManageOrders
+from core.exports import EXPORT_FORMATS
+from core.jobs import enqueue_job, latest_job
+from core.pagination import OptInCursorPagination
+from core.permissions import CanManageOrders, IsManagement
+from core.serializers import BackgroundJobSerializer
+from core.subscription_utils import require_feature
 from .models import Invoice, InvoiceItem
+from .aging import (
+    AgingRequestError, aging_filename, aging_invoice_row, aging_invoices, aging_summary, parse_aging_params,
+    stream_aging,
+)
+from .archive import (
+    ArchiveRequestError,
+    archive_filename,
+    archive_invoices,
+    parse_archive_params,
+    stream_invoice_archive,
+)
+from .pdf import invoice_pdf_path
 from .serializers import (
     InvoiceListSerializer,
     InvoiceDetailSerializer,
@@ -27,6 +48,8 @@ class InvoiceViewSet(viewsets.ModelViewSet):
     
     permission_classes = [IsAuthenticated, CanManageOrders]
     filter_backends = [DjangoFilterBackend, filters.SearchFilter]
+    pagination_class = OptInCursorPagination
+    cursor_ordering = ('-invoice_date', '-created_at')
     filterset_fields = ['status', 'payment_status', 'tax_type', 'customer', 'order']
     search_fields = ['invoice_number', 'customer__name', 'customer__phone', 'billing_name']
     
@@ -111,6 +134,87 @@ class InvoiceViewSet(viewsets.ModelViewSet):
             'status': invoice.status
         })
     
+    @action(detail=True, methods=['get', 'post'])
+    def pdf(self, request, pk=None):
+        """
+        Invoice PDF (rendered by the job worker)
+        POST → queue rendering, returns the job (202)
+        GET  → latest job; result_url is set once the PDF is ready
+        """
+        invoice = self.get_object()
+        
+        if request.method == 'POST':
+            job = enqueue_job('INVOICE_PDF', invoice)
+            serializer = BackgroundJobSerializer(job, context={'request': request})
+            return Response(serializer.data, status=status.HTTP_202_ACCEPTED)
+        
+        job = latest_job('INVOICE_PDF', invoice.pk)
+        if job is None:
+            return Response(
+                {'error': 'PDF not requested yet. POST to this URL to generate it.'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        
+        serializer = BackgroundJobSerializer(job, context={'request': request})
+        return Response(serializer.data)
+    
+    @action(detail=True, methods=['get'], url_path='pdf/download')
+    def pdf_download(self, request, pk=None):
+        """
+        The PDF file itself, if the invoice's current state was rendered
+        (invoicing.pdf) - ETag is the content hash, If-None-Match gets 304.
+        Otherwise queues rendering and returns the job (202).
+        """
+        invoice = self.get_object()
+        path = invoice_pdf_path(invoice)
+        etag = f'"{os.path.splitext(os.path.basename(path))[0]}"'
+        
+        if not default_storage.exists(path):
+            job = enqueue_job('INVOICE_PDF', invoice)
+            serializer = BackgroundJobSerializer(job, context={'request': request})
+            return Response(serializer.data, status=status.HTTP_202_ACCEPTED)
+        
+        if etag in [tag.strip() for tag in request.headers.get('If-None-Match', '').split(',')]:
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+        
+        response = FileResponse(
+            default_storage.open(path, 'rb'),
+            content_type='application/pdf',
+            filename=f'invoice_{invoice.invoice_number}.pdf'
+        )
+        response['ETag'] = etag
+        response['Cache-Control'] = 'private, no-cache'
+        return response
+    
+    @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated, IsManagement])
+    @require_feature('allow_data_export')
+    def archive(self, request):
+        """
+        ZIP of invoice PDFs + register for a date range (invoicing.archive)
+        GET /api/invoicing/invoices/archive/?from=YYYY-MM-DD&to=YYYY-MM-DD&status=ISSUED&register=csv|xlsx
+        Streamed - the download starts before all PDFs are rendered
+        Management only, on plans with data export (as core.views.ExportView)
+        """
+        tenant = request.user.tenant
+        if tenant is None:
+            return Response({'error': 'No tenant associated with user'}, status=status.HTTP_403_FORBIDDEN)
+        
+        try:
+            filters, register = parse_archive_params(request.query_params)
+        except ArchiveRequestError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        invoices = archive_invoices(tenant, **filters)
+        # Missing PDFs render in this process: forking a pool from a
+        # (threaded) web worker is unsafe, and would close its DB connections
+        response = StreamingHttpResponse(
+            stream_invoice_archive(invoices, register, workers=1),
+            content_type='application/zip'
+        )
+        filename = archive_filename(tenant, filters['date_from'], filters['date_to'])
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+    
     @action(detail=False, methods=['get'])
     def unpaid(self, request):
         """Get all unpaid/partially paid invoices"""
@@ -121,6 +225,62 @@ class InvoiceViewSet(viewsets.ModelViewSet):
         
         serializer = self.get_serializer(invoices, many=True)
         return Response(serializer.data)
+    
+    @action(detail=False, methods=['get'])
+    def aging(self, request):
+        """
+        Receivables aging - outstanding balances in 0-30 / 31-60 / 61-90 / 90+ day buckets (invoicing.aging)
+        GET /api/invoicing/invoices/aging/?as_of=YYYY-MM-DD&customer=12       per-customer summary
+        GET /api/invoicing/invoices/aging/?mode=invoices&customer=12         invoice drill-down (paginated)
+        """
+        tenant = request.user.tenant
+        if tenant is None:
+            return Response({'error': 'No tenant associated with user'}, status=status.HTTP_403_FORBIDDEN)
+        
+        try:
+            mode, as_of, customer_id = parse_aging_params(request.query_params)
+        except AgingRequestError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        if mode == 'summary':
+            return Response(aging_summary(tenant, as_of, customer_id))
+        
+        # Oldest first with ?pagination=cursor too (core.pagination reads the view's ordering)
+        self.cursor_ordering = ('invoice_date', 'created_at')
+        page = self.paginate_queryset(aging_invoices(tenant, as_of, customer_id))
+        return self.get_paginated_response([aging_invoice_row(invoice, as_of) for invoice in page])
+    
+    @action(
+        detail=False, methods=['get'], url_path='aging/export', permission_classes=[IsAuthenticated, IsManagement]
+    )
+    @require_feature('allow_data_export')
+    def aging_export(self, request):
+        """
+        Receivables aging as a streamed CSV / XLSX download
+        GET /api/invoicing/invoices/aging/export/?mode=summary|invoices&file_format=csv|xlsx&as_of=YYYY-MM-DD
+        Management only, on plans with data export (as core.views.ExportView)
+        """
+        tenant = request.user.tenant
+        if tenant is None:
+            return Response({'error': 'No tenant associated with user'}, status=status.HTTP_403_FORBIDDEN)
+        
+        file_format = request.query_params.get('file_format', 'csv')
+        if file_format not in EXPORT_FORMATS:
+            return Response(
+                {'error': f'file_format must be one of: {", ".join(EXPORT_FORMATS)}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            mode, as_of, customer_id = parse_aging_params(request.query_params)
+        except AgingRequestError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        response = StreamingHttpResponse(
+            stream_aging(tenant, mode, as_of, customer_id, file_format),
+            content_type=EXPORT_FORMATS[file_format]
+        )
+        response['Content-Disposition'] = f'attachment; filename="{aging_filename(tenant, mode, as_of, file_format)}"'
+        return response
 
 
 # ==================== INVOICE ITEM VIEWSET ====================
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class MastersConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'masters'
+
+    def ready(self):
+        """Import signals when app is ready"""
+        import masters.signals  # noqa
@@ -0,0 +1,81 @@
+"""
+Compiled measurement forms
+Date: 2026-10-17
+
+The measurement form for a category (system + tenant custom fields, with the
+tenant's visibility, labels, required and display order overrides applied)
+is compiled once and cached in-process per (tenant, category).
+
+The cache is keyed by Tenant.measurement_form_version. masters.signals bumps
+it with F() whenever a MeasurementField, TenantMeasurementConfig or
+ItemCategory is saved or deleted - for that tenant, or for every tenant when
+the row is system-wide. The tenant row is loaded with the request user, so
+a cache hit costs no queries and every worker process sees a bump on its
+next request.
+
+The version is also the form's ETag: clients send If-None-Match and get a
+304 for forms that haven't changed.
+"""
+
+from django.db.models import F, Q
+
+
+# (tenant_id, category_id) -> (version, form dict or None)
+# Plain dict as in core.entitlements - a lost race only means one extra compile
+_form_cache = {}
+
+# Entries are dropped wholesale beyond this (tenants × categories in use)
+MAX_CACHED_FORMS = 10000
+
+
+def bump_measurement_form_version(tenant_id=None):
+    """Invalidate compiled forms for one tenant (or all tenants for system-wide changes)"""
+    from core.models import Tenant
+
+    tenants = Tenant._base_manager.all()
+    if tenant_id is not None:
+        tenants = tenants.filter(pk=tenant_id)
+    tenants.update(measurement_form_version=F('measurement_form_version') + 1)
+
+
+def measurement_form_etag(tenant, category_id):
+    return f'"mf-{tenant.pk}-{category_id}-{tenant.measurement_form_version}"'
+
+
+def compile_measurement_form(category, tenant):
+    """Form dict for a category as the tenant sees it (two queries)"""
+    from .serializers import CategoryWithMeasurementsSerializer
+
+    return dict(CategoryWithMeasurementsSerializer(category, context={'tenant': tenant}).data)
+
+
+def get_measurement_form(tenant, category_id):
+    """
+    Cached compiled form for an active category available to the tenant
+
+    Returns:
+        form dict, or None if the category doesn't exist / isn't available
+    """
+    from .models import ItemCategory
+
+    key = (tenant.pk, category_id)
+    version = tenant.measurement_form_version
+    cached = _form_cache.get(key)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+
+    category = ItemCategory.objects.filter(
+        Q(is_system_wide=True) | Q(tenant=tenant),
+        id=category_id,
+        is_active=True
+    ).first()
+    form = compile_measurement_form(category, tenant) if category else None
+
+    if len(_form_cache) >= MAX_CACHED_FORMS:
+        _form_cache.clear()
+    _form_cache[key] = (version, form)
+    return form
+
+
+def clear_measurement_form_cache():
+    _form_cache.clear()
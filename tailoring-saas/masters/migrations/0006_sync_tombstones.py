@@ -0,0 +1,40 @@
+# Generated by Django 5.0 on 2026-10-17 06:51
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_tenant_measurement_form_version'),
+        ('masters', '0005_itemunit'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='itemunit',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='unit',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.CreateModel(
+            name='SyncTombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('collection', models.CharField(max_length=40)),
+                ('object_id', models.BigIntegerField()),
+                ('deleted_at', models.DateTimeField(auto_now_add=True)),
+                ('tenant', models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='core.tenant')),
+            ],
+            options={
+                'db_table': 'sync_tombstones',
+                'ordering': ['deleted_at'],
+                'indexes': [models.Index(fields=['tenant', 'deleted_at'], name='sync_tombst_tenant__96f3ec_idx')],
+            },
+        ),
+    ]
@@ -91,6 +91,7 @@ class Unit(models.Model):
     symbol = models.CharField(max_length=10, help_text="Unit symbol (e.g., in, cm)")
     is_active = models.BooleanField(default=True)
     display_order = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         db_table = 'units'
@@ -471,6 +472,7 @@ class ItemUnit(models.Model):
     is_active = models.BooleanField(default=True)
     display_order = models.IntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         db_table = 'item_units'
@@ -481,3 +483,33 @@ class ItemUnit(models.Model):
 
     def __str__(self):
         return f"{self.name} ({self.code})"
+
+
+class SyncTombstone(models.Model):
+    """
+    Deleted master-data row, so the client's delta sync (masters.sync) can
+    drop it. tenant NULL = a system-wide row, deleted for every tenant
+    """
+    # No FK constraint: tombstones are written while a tenant's rows are
+    # being cascade-deleted, and outlive them harmlessly
+    tenant = models.ForeignKey(
+        Tenant,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        null=True,
+        blank=True,
+        related_name='+'
+    )
+    collection = models.CharField(max_length=40)
+    object_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        db_table = 'sync_tombstones'
+        ordering = ['deleted_at']
+        indexes = [
+            models.Index(fields=['tenant', 'deleted_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.collection} #{self.object_id} deleted {self.deleted_at:%Y-%m-%d %H:%M}"
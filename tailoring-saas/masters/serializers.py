@@ -1,6 +1,7 @@
 """
 Serializers for masters app
 """
+from django.db.models import Q
 from rest_framework import serializers
 from .models import ItemCategory, Unit, MeasurementField, TenantMeasurementConfig,ServiceItem
 from core.models import Tenant
@@ -68,30 +69,36 @@ class MeasurementFieldSerializer(serializers.ModelSerializer):
     
     def get_config(self, obj):
         """Get tenant-specific configuration if exists"""
+        if 'measurement_configs' in self.context:
+            # Preloaded by CategoryWithMeasurementsSerializer - {field id: config}
+            return self._merged_config(obj, self.context['measurement_configs'].get(obj.pk))
+        
+        config = None
         request = self.context.get('request')
         if request and request.user.tenant:
-            try:
-                config = TenantMeasurementConfig.objects.get(
-                    tenant=request.user.tenant,
-                    measurement_field=obj
-                )
-                return {
-                    'is_visible': config.is_visible,
-                    'custom_label': config.custom_label,
-                    'custom_help_text': config.custom_help_text,
-                    'is_required': config.is_required if config.is_required is not None else obj.is_required,
-                    'display_order': config.display_order if config.display_order is not None else obj.display_order
-                }
-            except TenantMeasurementConfig.DoesNotExist:
-                pass
-        
-        # Return default values
+            config = TenantMeasurementConfig.objects.filter(
+                tenant=request.user.tenant,
+                measurement_field=obj
+            ).first()
+        return self._merged_config(obj, config)
+    
+    @staticmethod
+    def _merged_config(obj, config):
+        """Field defaults with the tenant's overrides (config may be None)"""
+        if config is None:
+            return {
+                'is_visible': True,
+                'custom_label': None,
+                'custom_help_text': None,
+                'is_required': obj.is_required,
+                'display_order': obj.display_order
+            }
         return {
-            'is_visible': True,
-            'custom_label': None,
-            'custom_help_text': None,
-            'is_required': obj.is_required,
-            'display_order': obj.display_order
+            'is_visible': config.is_visible,
+            'custom_label': config.custom_label,
+            'custom_help_text': config.custom_help_text,
+            'is_required': config.is_required if config.is_required is not None else obj.is_required,
+            'display_order': config.display_order if config.display_order is not None else obj.display_order
         }
     
     def create(self, validated_data):
@@ -193,49 +200,47 @@ class CategoryWithMeasurementsSerializer(serializers.ModelSerializer):
         ]
     
     def get_measurement_fields(self, obj):
-        """Get all measurement fields for this category (system + custom)"""
-        request = self.context.get('request')
-        tenant = request.user.tenant if request and request.user.tenant else None
+        """
+        Get all measurement fields for this category (system + custom)
+        Two queries: fields, then the tenant's configs for them
+        Compiled and cached per tenant by masters.measurement_forms
+        """
+        tenant = self.context.get('tenant')
+        if tenant is None:
+            request = self.context.get('request')
+            tenant = request.user.tenant if request and request.user.tenant else None
         
-        # Get system-wide fields
-        system_fields = MeasurementField.objects.filter(
-            category=obj,
-            is_system_wide=True,
-            is_active=True
+        scope = Q(is_system_wide=True) | Q(tenant=tenant) if tenant else Q(is_system_wide=True)
+        all_fields = list(
+            MeasurementField.objects.filter(scope, category=obj, is_active=True).select_related('category')
         )
         
-        # Get tenant custom fields
+        configs = {}
         if tenant:
-            custom_fields = MeasurementField.objects.filter(
-                category=obj,
-                tenant=tenant,
-                is_active=True
-            )
-            all_fields = list(system_fields) + list(custom_fields)
-        else:
-            all_fields = list(system_fields)
+            configs = {
+                config.measurement_field_id: config
+                for config in TenantMeasurementConfig.objects.filter(
+                    tenant=tenant, measurement_field__category=obj
+                )
+            }
+        
+        # Apply tenant configuration (visibility, display order override)
+        filtered_fields = [
+            field for field in all_fields
+            if field.pk not in configs or configs[field.pk].is_visible
+        ]
         
-        # Apply tenant configuration (visibility, custom labels, etc.)
-        filtered_fields = []
-        for field in all_fields:
-            # Check if tenant has hidden this field
-            if tenant:
-                try:
-                    config = TenantMeasurementConfig.objects.get(
-                        tenant=tenant,
-                        measurement_field=field
-                    )
-                    if not config.is_visible:
-                        continue  # Skip hidden fields
-                except TenantMeasurementConfig.DoesNotExist:
-                    pass
-            
-            filtered_fields.append(field)
+        def display_order(field):
+            config = configs.get(field.pk)
+            if config is not None and config.display_order is not None:
+                return (config.display_order, field.field_name)
+            return (field.display_order, field.field_name)
         
-        # Sort by display order
-        filtered_fields.sort(key=lambda x: x.display_order)
+        filtered_fields.sort(key=display_order)
         
-        return MeasurementFieldSerializer(filtered_fields, many=True, context=self.context).data
+        return MeasurementFieldSerializer(
+            filtered_fields, many=True, context={**self.context, 'measurement_configs': configs}
+        ).data
     #this is used in ITEMS in order tables 
 
 class ItemUnitSerializer(serializers.ModelSerializer):
@@ -0,0 +1,36 @@
+"""
+Masters app signals - Invalidate compiled measurement forms, record sync tombstones
+Date: 2026-10-17
+"""
+
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .measurement_forms import bump_measurement_form_version
+from .models import ItemCategory, MeasurementField, TenantMeasurementConfig, ServiceItem, Unit, ItemUnit
+from .sync import record_tombstone
+
+
+@receiver(post_save, sender=ItemCategory)
+@receiver(post_delete, sender=ItemCategory)
+@receiver(post_save, sender=MeasurementField)
+@receiver(post_delete, sender=MeasurementField)
+def bump_form_version_on_master_change(sender, instance, **kwargs):
+    """System-wide rows (tenant NULL) change every tenant's forms"""
+    bump_measurement_form_version(instance.tenant_id)
+
+
+@receiver(post_save, sender=TenantMeasurementConfig)
+@receiver(post_delete, sender=TenantMeasurementConfig)
+def bump_form_version_on_config_change(sender, instance, **kwargs):
+    bump_measurement_form_version(instance.tenant_id)
+
+
+@receiver(post_delete, sender=ItemCategory)
+@receiver(post_delete, sender=MeasurementField)
+@receiver(post_delete, sender=TenantMeasurementConfig)
+@receiver(post_delete, sender=ServiceItem)
+@receiver(post_delete, sender=Unit)
+@receiver(post_delete, sender=ItemUnit)
+def record_sync_tombstone(sender, instance, **kwargs):
+    """Deleted rows reach syncing clients as 'deleted' ids"""
+    record_tombstone(instance)
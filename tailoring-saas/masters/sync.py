@@ -0,0 +1,175 @@
+"""
+Master-data delta sync
+Date: 2026-10-17
+
+One request returns what changed in every master collection since the
+client's last sync - system-wide rows included:
+
+    GET /api/masters/sync/                       cold start: all active rows
+    GET /api/masters/sync/?since=<token>         only changed / deleted rows
+    GET /api/masters/sync/?since=<token>&collections=units,item_units
+
+The response carries the next token. Each collection is sent columnar
+({'fields': [...], 'rows': [[...]], 'deleted': [ids]}) and left out when
+nothing changed. Deletions come from SyncTombstone rows written by
+masters.signals; deactivated rows are sent as changed rows (is_active false).
+
+Watermarks are server times taken before the queries. Each sync re-reads
+SYNC_WATERMARK_OVERLAP seconds before the watermark, so a transaction that
+committed late is not missed; clients upsert by id, so repeats are harmless.
+"""
+
+import base64
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+
+class InvalidSyncToken(ValueError):
+    pass
+
+
+# name -> (model name, fields, scope)
+# scope: 'shared' = system-wide rows + the tenant's own, 'tenant', 'system'
+COLLECTIONS = {
+    'item_categories': ('ItemCategory', (
+        'id', 'name', 'category_type', 'description', 'default_hsn_code',
+        'is_system_wide', 'is_active', 'display_order',
+    ), 'shared'),
+    'measurement_fields': ('MeasurementField', (
+        'id', 'category_id', 'field_name', 'field_label', 'field_type', 'unit_options',
+        'default_unit', 'dropdown_options', 'is_required', 'min_value', 'max_value',
+        'display_order', 'help_text', 'is_system_wide', 'is_active',
+    ), 'shared'),
+    'measurement_configs': ('TenantMeasurementConfig', (
+        'id', 'measurement_field_id', 'is_visible', 'custom_label', 'custom_help_text',
+        'is_required', 'display_order',
+    ), 'tenant'),
+    'service_items': ('ServiceItem', (
+        'id', 'name', 'description', 'service_category', 'default_price', 'min_price',
+        'max_price', 'unit', 'tax_rate', 'sac_code', 'estimated_days', 'display_order',
+        'is_system_wide', 'is_active',
+    ), 'shared'),
+    'units': ('Unit', (
+        'id', 'name', 'symbol', 'is_active', 'display_order',
+    ), 'system'),
+    'item_units': ('ItemUnit', (
+        'id', 'name', 'code', 'is_active', 'display_order',
+    ), 'tenant'),
+}
+
+# model name -> collection, for tombstones
+COLLECTION_BY_MODEL = {model_name: name for name, (model_name, _, _) in COLLECTIONS.items()}
+
+
+def _model(name):
+    from django.apps import apps
+    return apps.get_model('masters', COLLECTIONS[name][0])
+
+
+def _scope_filter(name, tenant):
+    scope = COLLECTIONS[name][2]
+    if scope == 'shared':
+        return Q(is_system_wide=True) | Q(tenant=tenant)
+    if scope == 'tenant':
+        return Q(tenant=tenant)
+    return Q()
+
+
+# ==================== TOKENS ====================
+
+def encode_token(watermarks):
+    """{collection: datetime} -> opaque token"""
+    payload = json.dumps({name: value.isoformat() for name, value in watermarks.items()}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def decode_token(token):
+    """Opaque token -> {collection: datetime}"""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(token.encode()).decode())
+        watermarks = {name: parse_datetime(value) for name, value in payload.items() if name in COLLECTIONS}
+    except (TypeError, ValueError, AttributeError):
+        raise InvalidSyncToken('Invalid sync token')
+    if any(value is None for value in watermarks.values()):
+        raise InvalidSyncToken('Invalid sync token')
+    return watermarks
+
+
+# ==================== TOMBSTONES ====================
+
+def record_tombstone(instance):
+    """Remember a deleted master row (called from post_delete)"""
+    from .models import SyncTombstone
+
+    collection = COLLECTION_BY_MODEL.get(type(instance).__name__)
+    if collection is None:
+        return
+    SyncTombstone.objects.create(
+        tenant_id=getattr(instance, 'tenant_id', None),
+        collection=collection,
+        object_id=instance.pk,
+    )
+
+
+# ==================== SYNC ====================
+
+def sync_changes(tenant, token=None, collections=None):
+    """
+    Changed and deleted rows per collection since token
+
+    Returns:
+        {'since': next token, 'full': bool, 'collections': {...}}
+    """
+    from .models import SyncTombstone
+
+    names = [name for name in (collections or COLLECTIONS) if name in COLLECTIONS]
+    watermarks = decode_token(token) if token else {}
+    overlap = timedelta(seconds=getattr(settings, 'SYNC_WATERMARK_OVERLAP', 5))
+    now = timezone.now()
+
+    result = {}
+
+    # Deletions for every incremental collection in one query
+    incremental = {name: watermarks[name] - overlap for name in names if name in watermarks}
+    deleted = {name: [] for name in incremental}
+    if incremental:
+        tombstones = SyncTombstone.objects.filter(
+            Q(tenant=tenant) | Q(tenant__isnull=True),
+            collection__in=list(incremental),
+            deleted_at__gt=min(incremental.values()),
+        ).values_list('collection', 'object_id', 'deleted_at')
+        for collection, object_id, deleted_at in tombstones:
+            if deleted_at > incremental[collection]:
+                deleted[collection].append(object_id)
+
+    for name in names:
+        fields = COLLECTIONS[name][1]
+        queryset = _model(name).objects.filter(_scope_filter(name, tenant))
+        if name in incremental:
+            queryset = queryset.filter(updated_at__gt=incremental[name])
+        elif 'is_active' in fields:
+            # Cold start: the client has nothing to deactivate
+            queryset = queryset.filter(is_active=True)
+
+        rows = [list(row) for row in queryset.order_by('id').values_list(*fields)]
+        if rows or deleted.get(name):
+            entry = {'deleted': deleted.get(name, [])}
+            if rows:
+                entry['fields'] = list(fields)
+                entry['rows'] = rows
+            result[name] = entry
+
+    # Collections not requested keep their old watermark
+    next_watermarks = dict(watermarks)
+    next_watermarks.update({name: now for name in names})
+
+    return {
+        'since': encode_token(next_watermarks),
+        'full': not incremental,
+        'collections': result,
+    }
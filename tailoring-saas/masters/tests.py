@@ -1,3 +1,93 @@
+"""
+Tests for masters app
+"""
 from django.test import TestCase
 
-# Create your tests here.
+from core.testing import create_tenant
+
+
+class MeasurementFormCacheTest(TestCase):
+    """Test the compiled measurement form cache"""
+    
+    @classmethod
+    def setUpTestData(cls):
+        from .models import ItemCategory, MeasurementField
+        
+        cls.tenant = create_tenant("Form Shop")
+        cls.category = ItemCategory.objects.create(name="Kurta", category_type='GARMENT', is_system_wide=True)
+        cls.chest = MeasurementField.objects.create(
+            category=cls.category, field_name='chest', field_label='Chest', is_system_wide=True, display_order=1
+        )
+        MeasurementField.objects.create(
+            category=cls.category, field_name='length', field_label='Length', tenant=cls.tenant, display_order=2
+        )
+    
+    def test_config_change_recompiles_form(self):
+        """Cache hits run no queries; a tenant override bumps the version and applies"""
+        from .measurement_forms import get_measurement_form
+        from .models import TenantMeasurementConfig
+        
+        self.tenant.refresh_from_db()
+        form = get_measurement_form(self.tenant, self.category.pk)
+        self.assertEqual([field['field_name'] for field in form['measurement_fields']], ['chest', 'length'])
+        with self.assertNumQueries(0):
+            get_measurement_form(self.tenant, self.category.pk)
+        
+        TenantMeasurementConfig.objects.create(tenant=self.tenant, measurement_field=self.chest, display_order=5)
+        self.tenant.refresh_from_db()
+        form = get_measurement_form(self.tenant, self.category.pk)
+        self.assertEqual([field['field_name'] for field in form['measurement_fields']], ['length', 'chest'])
+    
+    def test_measurements_endpoint_rejects_bad_category_ids(self):
+        """Unknown or non-numeric category ids are a 404, not a server error"""
+        from datetime import date
+        from django.contrib.auth import get_user_model
+        from rest_framework.test import APIClient
+        from employees.models import Employee
+        
+        owner = get_user_model().objects.create(email="owner@form.com", tenant=self.tenant)
+        Employee.objects.create(
+            tenant=self.tenant, user=owner, employee_code='OWN', role='OWNER', date_joined=date(2026, 1, 1)
+        )
+        client = APIClient()
+        client.force_authenticate(owner)
+        
+        for pk in ('abc', '²', '99999999999999999999999'):
+            response = client.get(f'/api/masters/categories/{pk}/measurements/')
+            self.assertEqual(response.status_code, 404, pk)
+        self.assertEqual(client.get(f'/api/masters/categories/{self.category.pk}/measurements/').status_code, 200)
+
+
+class MasterSyncTest(TestCase):
+    """Test the master-data delta sync"""
+    
+    @classmethod
+    def setUpTestData(cls):
+        from .models import ItemUnit
+        
+        cls.tenant = create_tenant("Sync Shop")
+        cls.pieces = ItemUnit.objects.create(tenant=cls.tenant, name="Pieces", code="PCS")
+        cls.meters = ItemUnit.objects.create(tenant=cls.tenant, name="Meters", code="MTR")
+    
+    def test_delta_returns_changes_and_deletions(self):
+        """A sync since the last token returns only changed rows and deleted ids"""
+        from django.test import override_settings
+        from .sync import sync_changes
+        
+        with override_settings(SYNC_WATERMARK_OVERLAP=0):
+            first = sync_changes(self.tenant, collections=['item_units'])
+            self.assertTrue(first['full'])
+            self.assertEqual(len(first['collections']['item_units']['rows']), 2)
+            
+            unchanged = sync_changes(self.tenant, first['since'])
+            self.assertFalse(unchanged['full'])
+            self.assertNotIn('item_units', unchanged['collections'])
+            
+            self.pieces.name = "Piece"
+            self.pieces.save()
+            meters_id = self.meters.pk
+            self.meters.delete()
+            delta = sync_changes(self.tenant, unchanged['since'])['collections']['item_units']
+        
+        self.assertEqual([row[0] for row in delta['rows']], [self.pieces.pk])
+        self.assertEqual(delta['deleted'], [meters_id])
@@ -23,6 +23,7 @@ urlpatterns = [
     path('categories/grouped/', views.get_categories_by_type, name='categories-grouped'),
     path('measurement-form/<int:category_id>/', views.get_measurement_form, name='measurement-form'),
     path('service-categories/', views.get_service_categories, name='service-categories'),
+    path('sync/', views.sync, name='sync'),
     # ViewSet routes
     path('', include(router.urls)),
     
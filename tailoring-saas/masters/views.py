@@ -12,6 +12,8 @@ from django.db.models import Q
 from core.permissions import IsManagement, IsOwner
 
 from .models import ItemCategory, Unit, MeasurementField, TenantMeasurementConfig,ServiceItem,ItemUnit
+from .measurement_forms import get_measurement_form as get_compiled_measurement_form, measurement_form_etag
+from .sync import InvalidSyncToken, sync_changes
 from .serializers import (
     ItemCategorySerializer,
     UnitSerializer,
@@ -78,6 +80,15 @@ class ItemCategoryViewSet(viewsets.ModelViewSet):
     @action(detail=True, methods=['get'])
     def measurements(self, request, pk=None):
         """Get all measurement fields for a category"""
+        if request.user.tenant and not request.user.is_superuser:
+            # The cached form applies get_queryset()'s filter itself (system or
+            # own, active), so a cache hit needs no get_object() query
+            if not pk.isdecimal():
+                return Response({
+                    'error': 'Category not found or access denied'
+                }, status=status.HTTP_404_NOT_FOUND)
+            return measurement_form_response(request, int(pk))
+        
         category = self.get_object()
         serializer = CategoryWithMeasurementsSerializer(category, context={'request': request})
         return Response(serializer.data)
@@ -251,16 +262,7 @@ def get_measurement_form(request, category_id):
                     'error': 'No tenant associated with user'
                 }, status=status.HTTP_403_FORBIDDEN)
             
-            category = ItemCategory.objects.filter(
-                Q(is_system_wide=True) | Q(tenant=request.user.tenant),
-                id=category_id,
-                is_active=True
-            ).first()
-            
-            if not category:
-                return Response({
-                    'error': 'Category not found or access denied'
-                }, status=status.HTTP_404_NOT_FOUND)
+            return measurement_form_response(request, category_id)
         
         serializer = CategoryWithMeasurementsSerializer(category, context={'request': request})
         return Response(serializer.data)
@@ -270,6 +272,49 @@ def get_measurement_form(request, category_id):
             'error': 'Category not found'
         }, status=status.HTTP_404_NOT_FOUND)
 
+
+def measurement_form_response(request, category_id):
+    """
+    Compiled measurement form for the user's tenant (masters.measurement_forms)
+    Sends an ETag; If-None-Match with the current one gets 304 Not Modified
+    """
+    tenant = request.user.tenant
+    etag = measurement_form_etag(tenant, category_id)
+    headers = {'ETag': etag, 'Cache-Control': 'private, no-cache'}
+    
+    if_none_match = request.headers.get('If-None-Match', '')
+    if etag in [tag.strip() for tag in if_none_match.split(',')]:
+        return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    
+    form = get_compiled_measurement_form(tenant, category_id)
+    if form is None:
+        return Response({
+            'error': 'Category not found or access denied'
+        }, status=status.HTTP_404_NOT_FOUND)
+    return Response(form, headers=headers)
+
+@api_view(['GET'])
+def sync(request):
+    """
+    Delta sync of all master data (masters.sync)
+    GET /api/masters/sync/?since=<token>&collections=units,item_units
+    """
+    tenant = request.user.tenant
+    if not tenant:
+        return Response({
+            'error': 'No tenant associated with user'
+        }, status=status.HTTP_403_FORBIDDEN)
+    
+    collections = request.query_params.get('collections')
+    if collections:
+        collections = [name.strip() for name in collections.split(',') if name.strip()]
+    
+    try:
+        data = sync_changes(tenant, request.query_params.get('since'), collections)
+    except InvalidSyncToken as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    return Response(data)
+
 # ========================================
 # ADD THIS TO masters/views.py
 # ========================================
@@ -0,0 +1,54 @@
+"""
+Cached customer lifetime stats
+Date: 2026-10-17
+
+Customer.order_count, last_order_date, lifetime_billed and outstanding_amount
+are refreshed from the order and invoice write paths:
+- order save/delete and invoice save/delete (core.signals) queue the customer
+- invoice recalculation (invoicing.recalculation) refreshes its customers
+
+Queued customers are refreshed once at transaction.on_commit with a single
+UPDATE, so an order with an invoice and five payments costs one refresh.
+The queue belongs to the transaction (core.transactions) - a rollback
+discards it. update() sends no signals, so the flush logs the refreshed
+customers to the change feed (core.changes) itself.
+Run `python manage.py refresh_customer_stats` to backfill or repair.
+"""
+
+from django.db import transaction
+
+from core.transactions import queue_on_commit
+
+
+def schedule_customer_stats_refresh(customer_id):
+    """Queue a stats refresh for one customer, run when the current transaction commits"""
+    if customer_id is None:
+        return
+
+    queue_on_commit('customer_stats', flush_customer_stats_refreshes, lambda ids: ids.add(customer_id), factory=set)
+
+
+def flush_customer_stats_refreshes(customer_ids):
+    """Refresh the queued customers in one UPDATE and log them for synced clients"""
+    from core.changes import record_change
+    from .models import Customer
+
+    with transaction.atomic():
+        # Customers deleted meanwhile are skipped, not logged back as upserts
+        customers = list(Customer.all_objects.filter(pk__in=customer_ids).values_list('tenant_id', 'pk'))
+        refresh_customer_stats(pk__in=customer_ids)
+        for tenant_id, customer_id in customers:
+            record_change(tenant_id, 'customers', customer_id)
+
+
+def refresh_customer_stats(**filters):
+    """
+    Recompute cached stats for customers matching filters in one UPDATE
+    e.g. refresh_customer_stats(pk__in=ids) or refresh_customer_stats(tenant=tenant)
+
+    Returns:
+        Number of customers updated
+    """
+    from .models import Customer, customer_stats_expressions
+
+    return Customer.all_objects.filter(**filters).update(**customer_stats_expressions())
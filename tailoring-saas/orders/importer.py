@@ -0,0 +1,317 @@
+"""
+Bulk customer + measurement import (CSV / XLSX)
+Date: 2026-10-17
+
+    POST /api/orders/customers/import/          (multipart: file=..., dry_run=1)
+    python manage.py import_customers --tenant 12 customers.xlsx --errors errors.csv
+
+Columns are matched by field name (`bust_chest`) or by the export header
+(`Bust/Chest`, core.exports), so an export can be edited and re-imported.
+name and phone are required; blank cells are ignored (an update never
+clears a stored measurement).
+
+Rows are validated with the model field rules (validate_phone_number for
+phone / whatsapp_number, choices, decimal places) and written in chunks:
+one SELECT on (tenant, phone) to find existing customers, then one
+executemany INSERT and UPDATE in a transaction per chunk. A row
+whose phone matches an existing customer updates it (rows that change
+nothing are skipped); a phone repeated within the file is an error.
+
+Bulk writes skip save() and signals, so each chunk also fills the search
+columns and FTS rows (orders.search), queues change feed entries
+(core.changes) and today's dashboard rollup (core.daily_stats), and the
+customers usage counter is refreshed at the end.
+Cached order stats are not touched - an import creates no orders.
+"""
+
+import csv
+import io
+
+from django.core.exceptions import ValidationError
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.text import capfirst
+
+from .search import index_customers, normalize_name, normalize_phone
+
+
+# Rows per validation / write transaction
+IMPORT_CHUNK_SIZE = 1000
+
+IMPORT_FORMATS = ('csv', 'xlsx')
+
+REQUIRED_FIELDS = ('name', 'phone')
+
+BOOLEAN_VALUES = {'yes': 'True', 'y': 'True', 'true': 'True', 'no': 'False', 'n': 'False', 'false': 'False'}
+
+
+class ImportFileError(ValueError):
+    pass
+
+
+def import_fields():
+    """Customer fields an import can set - the same fields as the create API"""
+    from .serializers import CustomerCreateSerializer
+    from .models import Customer
+
+    names = [name for name in CustomerCreateSerializer.Meta.fields if name != 'id']
+    return {name: Customer._meta.get_field(name) for name in names}
+
+
+def _header_key(value):
+    return ' '.join(str(value or '').split()).lower()
+
+
+def header_map(headers, fields):
+    """Column index -> field name, for columns that match a field name or label"""
+    lookup = {}
+    for name, field in fields.items():
+        lookup[_header_key(name)] = name
+        lookup[_header_key(capfirst(field.verbose_name))] = name
+
+    columns = {}
+    for index, header in enumerate(headers):
+        name = lookup.get(_header_key(header))
+        if name and name not in columns.values():
+            columns[index] = name
+
+    missing = [name for name in REQUIRED_FIELDS if name not in columns.values()]
+    if missing:
+        raise ImportFileError(f'Missing required column(s): {", ".join(missing)}')
+    return columns
+
+
+# ==================== READERS ====================
+
+def read_csv(fileobj):
+    text = io.TextIOWrapper(fileobj, encoding='utf-8-sig', newline='')
+    try:
+        yield from csv.reader(text)
+    except UnicodeDecodeError:
+        raise ImportFileError('CSV file must be UTF-8 encoded')
+    finally:
+        text.detach()
+
+
+def read_xlsx(fileobj):
+    from openpyxl import load_workbook
+
+    try:
+        workbook = load_workbook(fileobj, read_only=True, data_only=True)
+    except Exception:
+        raise ImportFileError('Not a valid XLSX file')
+    try:
+        yield from workbook.worksheets[0].iter_rows(values_only=True)
+    finally:
+        workbook.close()
+
+
+IMPORT_READERS = {
+    'csv': read_csv,
+    'xlsx': read_xlsx,
+}
+
+
+def import_format(filename, default='csv'):
+    extension = filename.rsplit('.', 1)[-1].lower() if '.' in filename else default
+    if extension not in IMPORT_FORMATS:
+        raise ImportFileError(f'File must be one of: {", ".join(IMPORT_FORMATS)}')
+    return extension
+
+
+# ==================== VALIDATION ====================
+
+def _raw(value):
+    """Spreadsheet cell -> text the model field can parse (9876543210.0 -> '9876543210')"""
+    if value is None:
+        return ''
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip()
+
+
+def clean_row(values, columns, fields):
+    """
+    Validate one row
+
+    Returns:
+        (data, errors) - data has only the non-blank columns
+    """
+    data, errors = {}, {}
+    for index, name in columns.items():
+        raw = _raw(values[index]) if index < len(values) else ''
+        if not raw:
+            if name in REQUIRED_FIELDS:
+                errors[name] = ['This field is required.']
+            continue
+        field = fields[name]
+        if field.get_internal_type() == 'BooleanField':
+            raw = BOOLEAN_VALUES.get(raw.lower(), raw)
+        elif field.choices:
+            raw = raw.upper()
+        try:
+            data[name] = field.clean(raw, None)
+        except ValidationError as e:
+            errors[name] = e.messages
+    return data, errors
+
+
+# ==================== IMPORT ====================
+
+def _db_value(field, customer):
+    value = getattr(customer, field.attname)
+    # Most measurement cells are empty - skip preparing NULLs
+    return None if value is None else field.get_db_prep_save(value, connection)
+
+
+def _insert_customers(customers):
+    """
+    One executemany INSERT for new customers
+
+    Used instead of bulk_create(): with ~80 columns, SQLite's parameter limit
+    splits bulk_create into 12-row statements and per-value pre_save() costs
+    more than the insert itself (about 10x slower at import sizes)
+    """
+    from .models import Customer
+
+    if not customers:
+        return
+    now = timezone.now()
+    fields = [field for field in Customer._meta.concrete_fields if not field.primary_key]
+    columns = ', '.join(connection.ops.quote_name(field.column) for field in fields)
+    placeholders = ', '.join(['%s'] * len(fields))
+    for customer in customers:
+        customer.created_at = customer.updated_at = now
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f'INSERT INTO {connection.ops.quote_name(Customer._meta.db_table)} ({columns}) VALUES ({placeholders})',
+            [[_db_value(field, customer) for field in fields] for customer in customers]
+        )
+
+
+def _update_customers(customers_by_fields):
+    """One executemany UPDATE per set of changed columns (bulk_update() builds a CASE per row and column)"""
+    from .models import Customer
+
+    table = connection.ops.quote_name(Customer._meta.db_table)
+    pk_column = connection.ops.quote_name(Customer._meta.pk.column)
+    with connection.cursor() as cursor:
+        for names, customers in customers_by_fields.items():
+            fields = [Customer._meta.get_field(name) for name in names]
+            assignments = ', '.join(f'{connection.ops.quote_name(field.column)} = %s' for field in fields)
+            cursor.executemany(
+                f'UPDATE {table} SET {assignments} WHERE {pk_column} = %s',
+                [[_db_value(field, customer) for field in fields] + [customer.pk] for customer in customers]
+            )
+
+
+def _write_chunk(tenant, chunk, seen, result, dry_run, created_limit):
+    """Match one chunk of (row number, data) pairs to existing customers and write it"""
+    from core.changes import record_change
+    from core.daily_stats import schedule_daily_stats_refresh
+    from .models import Customer
+
+    phones = {data['phone'] for _, data in chunk}
+    existing = {}
+    for customer in Customer.all_objects.filter(tenant=tenant, phone__in=phones).order_by('-pk'):
+        # Duplicates already in the database: the oldest customer is updated
+        existing[customer.phone] = customer
+
+    now = timezone.now()
+    to_create, to_update = [], {}
+    for row_number, data in chunk:
+        first_row = seen.setdefault(data['phone'], row_number)
+        if first_row != row_number:
+            result['errors'].append({'row': row_number, 'errors': {'phone': [f'Same phone as row {first_row}.']}})
+            continue
+
+        customer = existing.get(data['phone'])
+        if customer is None:
+            if created_limit is not None and result['created'] + len(to_create) >= created_limit:
+                result['errors'].append({'row': row_number, 'errors': {'__all__': ['Customer limit reached for your plan.']}})
+                continue
+            customer = Customer(tenant=tenant, **data)
+            to_create.append(customer)
+        else:
+            changed = tuple(name for name, value in data.items() if getattr(customer, name) != value)
+            if not changed:
+                result['unchanged'] += 1
+                continue
+            for name in changed:
+                setattr(customer, name, data[name])
+            customer.updated_at = now
+            to_update.setdefault(changed + ('phone_digits', 'whatsapp_digits', 'search_name', 'updated_at'), []).append(customer)
+
+        # save() is skipped - fill the search columns here
+        customer.phone_digits = normalize_phone(customer.phone)
+        customer.whatsapp_digits = normalize_phone(customer.whatsapp_number)
+        customer.search_name = normalize_name(customer.name, customer.business_name)
+
+    updated = [customer for customers in to_update.values() for customer in customers]
+    if not dry_run:
+        with transaction.atomic():
+            _insert_customers(to_create)
+            _update_customers(to_update)
+            ids = [customer.pk for customer in updated]
+            if to_create:
+                ids += Customer.all_objects.filter(
+                    tenant=tenant, phone__in=[customer.phone for customer in to_create]
+                ).values_list('pk', flat=True)
+            index_customers(pk__in=ids)
+            for customer_id in ids:
+                record_change(tenant.pk, 'customers', customer_id)
+            if to_create:
+                schedule_daily_stats_refresh(tenant.pk, timezone.localdate(), 'customers')
+
+    result['created'] += len(to_create)
+    result['updated'] += len(updated)
+
+
+def import_customers(tenant, rows, dry_run=False, created_limit=None, chunk_size=IMPORT_CHUNK_SIZE):
+    """
+    Import customers from rows (header row first, then values)
+
+    Args:
+        dry_run: validate and count only, write nothing
+        created_limit: most new customers allowed (plan limit; None = unlimited)
+
+    Returns:
+        {'rows', 'created', 'updated', 'unchanged', 'failed', 'errors': [{'row', 'errors': {field: [messages]}}]}
+        Row numbers are 1-based file rows (the header is row 1)
+    """
+    from core.entitlements import refresh_usage
+
+    rows = iter(rows)
+    fields = import_fields()
+    try:
+        columns = header_map(next(rows), fields)
+    except StopIteration:
+        raise ImportFileError('File is empty')
+
+    result = {'rows': 0, 'created': 0, 'updated': 0, 'unchanged': 0, 'failed': 0, 'errors': []}
+    seen, chunk = {}, []
+    for row_number, values in enumerate(rows, 2):
+        if not any(_raw(value) for value in values):
+            continue
+        result['rows'] += 1
+        data, errors = clean_row(values, columns, fields)
+        if errors:
+            result['errors'].append({'row': row_number, 'errors': errors})
+            continue
+        chunk.append((row_number, data))
+        if len(chunk) >= chunk_size:
+            _write_chunk(tenant, chunk, seen, result, dry_run, created_limit)
+            chunk = []
+    if chunk:
+        _write_chunk(tenant, chunk, seen, result, dry_run, created_limit)
+
+    result['errors'].sort(key=lambda error: error['row'])
+    result['failed'] = len(result['errors'])
+    if result['created'] and not dry_run:
+        refresh_usage(tenant.pk, 'customers')
+    return result
+
+
+def import_customers_file(tenant, fileobj, file_format, **kwargs):
+    """import_customers() for an uploaded / opened binary file"""
+    return import_customers(tenant, IMPORT_READERS[file_format](fileobj), **kwargs)
@@ -0,0 +1,27 @@
+# Generated by Django 5.0 on 2026-10-17 06:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_document_sequence'),
+        ('orders', '0005_remove_orderitem_priority_order_priority'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='order',
+            name='orders_orde_tenant__4de285_idx',
+        ),
+        migrations.AlterField(
+            model_name='order',
+            name='order_number',
+            field=models.CharField(max_length=50, verbose_name='Order Number'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='order',
+            unique_together={('tenant', 'order_number')},
+        ),
+    ]
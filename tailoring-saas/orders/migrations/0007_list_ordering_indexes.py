@@ -0,0 +1,20 @@
+# Generated by Django 5.0 on 2026-10-17 06:24
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_tenant_usage_and_entitlement_version'),
+        ('orders', '0006_per_tenant_document_numbers'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['tenant', '-order_date', '-created_at'], name='orders_orde_tenant__6ec0d8_idx'),
+        ),
+    ]
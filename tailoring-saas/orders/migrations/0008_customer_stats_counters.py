@@ -0,0 +1,34 @@
+# Generated by Django 5.0 on 2026-10-17 06:33
+
+from decimal import Decimal
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0007_list_ordering_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customer',
+            name='last_order_date',
+            field=models.DateField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='customer',
+            name='lifetime_billed',
+            field=models.DecimalField(decimal_places=2, default=Decimal('0.00'), editable=False, max_digits=12),
+        ),
+        migrations.AddField(
+            model_name='customer',
+            name='order_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='customer',
+            name='outstanding_amount',
+            field=models.DecimalField(decimal_places=2, default=Decimal('0.00'), editable=False, max_digits=12),
+        ),
+    ]
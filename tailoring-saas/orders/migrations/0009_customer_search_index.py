@@ -0,0 +1,80 @@
+# Generated by Django 5.0 on 2026-10-17 06:35
+
+from django.db import OperationalError, migrations, models
+
+
+def backfill_search_columns(apps, schema_editor):
+    from orders.search import normalize_name, normalize_phone
+
+    Customer = apps.get_model('orders', 'Customer')
+    customers = list(Customer._base_manager.only('pk', 'name', 'business_name', 'phone'))
+    for customer in customers:
+        customer.phone_digits = normalize_phone(customer.phone)
+        customer.search_name = normalize_name(customer.name, customer.business_name)
+    Customer._base_manager.bulk_update(customers, ['phone_digits', 'search_name'], batch_size=1000)
+
+
+def create_fts_table(apps, schema_editor):
+    """SQLite only; skipped where FTS5 isn't compiled in (search falls back to prefix lookups)"""
+    from orders.search import FTS_CREATE_SQL, FTS_TABLE, normalize_phone
+
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    try:
+        schema_editor.execute(FTS_CREATE_SQL)
+    except OperationalError:
+        return
+
+    Customer = apps.get_model('orders', 'Customer')
+    rows = [
+        (
+            pk, f't{tenant_id}', search_name,
+            ' '.join(filter(None, {phone_digits, normalize_phone(whatsapp_number)})),
+            email or '',
+        )
+        for pk, tenant_id, search_name, phone_digits, whatsapp_number, email in Customer._base_manager.values_list(
+            'pk', 'tenant_id', 'search_name', 'phone_digits', 'whatsapp_number', 'email'
+        )
+    ]
+    with schema_editor.connection.cursor() as cursor:
+        cursor.executemany(
+            f'INSERT INTO {FTS_TABLE}(rowid, tenant, name, phone, email) VALUES (%s, %s, %s, %s, %s)', rows
+        )
+
+
+def drop_fts_table(apps, schema_editor):
+    from orders.search import FTS_DROP_SQL
+
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute(FTS_DROP_SQL)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_tenant_usage_and_entitlement_version'),
+        ('orders', '0008_customer_stats_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customer',
+            name='phone_digits',
+            field=models.CharField(blank=True, default='', editable=False, max_length=15),
+        ),
+        migrations.AddField(
+            model_name='customer',
+            name='search_name',
+            field=models.CharField(blank=True, default='', editable=False, max_length=255),
+        ),
+        migrations.AddIndex(
+            model_name='customer',
+            index=models.Index(fields=['tenant', 'phone_digits'], name='orders_cust_tenant__d52f09_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='customer',
+            index=models.Index(fields=['tenant', 'search_name'], name='orders_cust_tenant__379285_idx'),
+        ),
+        migrations.RunPython(backfill_search_columns, migrations.RunPython.noop),
+        migrations.RunPython(create_fts_table, drop_fts_table),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.0 on 2026-10-17 08:18
+
+from django.db import migrations, models
+
+
+def backfill_whatsapp_digits(apps, schema_editor):
+    from orders.search import normalize_phone
+
+    Customer = apps.get_model('orders', 'Customer')
+    customers = list(Customer._base_manager.exclude(whatsapp_number='').only('pk', 'whatsapp_number'))
+    for customer in customers:
+        customer.whatsapp_digits = normalize_phone(customer.whatsapp_number)
+    Customer._base_manager.bulk_update(customers, ['whatsapp_digits'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_daily_stats'),
+        ('orders', '0009_customer_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customer',
+            name='whatsapp_digits',
+            field=models.CharField(blank=True, default='', editable=False, max_length=15),
+        ),
+        migrations.AddIndex(
+            model_name='customer',
+            index=models.Index(fields=['tenant', 'whatsapp_digits'], name='orders_cust_tenant__8072b3_idx'),
+        ),
+        migrations.RunPython(backfill_whatsapp_digits, migrations.RunPython.noop),
+    ]
@@ -10,8 +10,12 @@ from django.db import models
 from django.utils import timezone
 from django.core.validators import MinValueValidator
 from django.core.exceptions import ValidationError
+from django.db import transaction
 from decimal import Decimal
 from core.managers import TenantManager
+from core.jobs import enqueue_job
+from core.sequences import allocate_number, max_existing_suffix, month_period
+from .search import normalize_name, normalize_phone
 
 
 # ==================== VALIDATORS ====================
@@ -168,6 +172,18 @@ class Customer(models.Model):
     notes = models.TextField(blank=True, null=True, verbose_name="Notes")
     is_active = models.BooleanField(default=True, verbose_name="Active")
     
+    # Search columns (orders.search) - set in save()
+    phone_digits = models.CharField(max_length=15, blank=True, default='', editable=False)
+    whatsapp_digits = models.CharField(max_length=15, blank=True, default='', editable=False)
+    search_name = models.CharField(max_length=255, blank=True, default='', editable=False)
+    
+    # Cached lifetime stats - kept current by orders.customer_stats,
+    # read by the customer list when CUSTOMER_STATS_COUNTERS is on
+    order_count = models.PositiveIntegerField(default=0, editable=False)
+    last_order_date = models.DateField(null=True, blank=True, editable=False)
+    lifetime_billed = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal('0.00'), editable=False)
+    outstanding_amount = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal('0.00'), editable=False)
+    
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -181,11 +197,25 @@ class Customer(models.Model):
         indexes = [
             models.Index(fields=['tenant', 'phone']),
             models.Index(fields=['tenant', 'name']),
+            # Search prefix lookups (orders.search)
+            models.Index(fields=['tenant', 'phone_digits']),
+            models.Index(fields=['tenant', 'whatsapp_digits']),
+            models.Index(fields=['tenant', 'search_name']),
         ]
     
     def __str__(self):
         return f"{self.name} - {self.phone}"
     
+    def save(self, *args, **kwargs):
+        # Normalized search columns; the FTS row is synced by core.signals
+        self.phone_digits = normalize_phone(self.phone)
+        self.whatsapp_digits = normalize_phone(self.whatsapp_number)
+        self.search_name = normalize_name(self.name, self.business_name)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = set(update_fields) | {'phone_digits', 'whatsapp_digits', 'search_name'}
+        super().save(*args, **kwargs)
+    
     @property
     def display_name(self):
         """Display name with business name if applicable"""
@@ -221,7 +251,7 @@ class Order(models.Model):
     )
     
     # Order Identity
-    order_number = models.CharField(max_length=50, unique=True, verbose_name='Order Number')
+    order_number = models.CharField(max_length=50, verbose_name='Order Number')
     order_date = models.DateField(default=timezone.now, verbose_name='Order Date')
     
     # Delivery Tracking
@@ -332,40 +362,38 @@ class Order(models.Model):
         verbose_name = "Order"
         verbose_name_plural = "Orders"
         ordering = ['-order_date', '-created_at']
+        # Numbers are allocated per tenant (core.sequences)
+        unique_together = ['tenant', 'order_number']
         indexes = [
-            models.Index(fields=['tenant', 'order_number']),
             models.Index(fields=['tenant', 'customer']),
             models.Index(fields=['tenant', 'order_status']),
             models.Index(fields=['tenant', 'expected_delivery_date']),
+            # List ordering / keyset pagination (core.pagination)
+            models.Index(fields=['tenant', '-order_date', '-created_at']),
         ]
     
     def __str__(self):
         return f"{self.order_number} - {self.customer.name}"
     
     def save(self, *args, **kwargs):
-        # Auto-generate order number if not provided
-        if not self.order_number:
-            from django.utils import timezone
-            year_month = timezone.now().strftime('%Y%m')
-            last_order = Order.objects.filter(
-                tenant=self.tenant,
-                order_number__startswith=f'ORD-{year_month}'
-            ).order_by('-order_number').first()
+        with transaction.atomic():
+            # Auto-generate order number if not provided
+            if not self.order_number:
+                year_month = month_period()
+                prefix = f'ORD-{year_month}-'
+                new_num = allocate_number(
+                    self.tenant, 'ORD', year_month,
+                    seed=lambda: max_existing_suffix(
+                        Order.all_objects.filter(tenant=self.tenant), 'order_number', prefix
+                    )
+                )
+                self.order_number = f'{prefix}{new_num:05d}'
             
-            if last_order:
-                last_num = int(last_order.order_number.split('-')[-1])
-                new_num = last_num + 1
-            else:
-                new_num = 1
+            super().save(*args, **kwargs)
             
-            self.order_number = f'ORD-{year_month}-{new_num:05d}'
-        
-        super().save(*args, **kwargs)
-        
-        # Generate QR code after first save (when order_number is set)
-        if not self.qr_code and self.order_number:
-            self.generate_qr_code()
-            super().save(update_fields=['qr_code'])
+            # QR code is rendered by the job worker (core.jobs) - not in the request
+            if not self.qr_code and self.order_number:
+                enqueue_job('ORDER_QR', self)
     
     def generate_qr_code(self):
         """Generate QR code for order tracking"""
@@ -433,6 +461,125 @@ class Order(models.Model):
         return None
 
 
+# ==================== ORDER PAYMENT ANNOTATION ====================
+
+def annotate_total_paid(queryset):
+    """
+    Annotate orders with total_paid_amount in a single query
+    total_paid_amount = receipt vouchers - refund vouchers + invoice payments
+    Each part is a correlated SUM subquery, so cost stays flat per page
+    """
+    from django.db.models import DecimalField, OuterRef, Subquery, Sum, Value
+    from django.db.models.functions import Coalesce
+    from financials.models import ReceiptVoucher, RefundVoucher, Payment
+
+    amount_field = DecimalField(max_digits=12, decimal_places=2)
+    zero = Value(Decimal('0.00'), output_field=amount_field)
+
+    receipts = ReceiptVoucher.all_objects.filter(
+        order=OuterRef('pk'),
+        tenant=OuterRef('tenant')
+    ).order_by().values('order').annotate(total=Sum('total_amount')).values('total')
+
+    refunds = RefundVoucher.all_objects.filter(
+        receipt_voucher__order=OuterRef('pk'),
+        tenant=OuterRef('tenant')
+    ).order_by().values('receipt_voucher__order').annotate(total=Sum('total_refund')).values('total')
+
+    payments = Payment.all_objects.filter(
+        invoice__order=OuterRef('pk'),
+        tenant=OuterRef('tenant')
+    ).order_by().values('invoice__order').annotate(total=Sum('amount')).values('total')
+
+    return queryset.annotate(
+        total_paid_amount=(
+            Coalesce(Subquery(receipts, output_field=amount_field), zero)
+            - Coalesce(Subquery(refunds, output_field=amount_field), zero)
+            + Coalesce(Subquery(payments, output_field=amount_field), zero)
+        )
+    )
+
+
+# ==================== CUSTOMER STATS ANNOTATION ====================
+
+# Cached column -> annotation read by the customer serializers
+CUSTOMER_STATS = {
+    'order_count': 'stats_order_count',
+    'last_order_date': 'stats_last_order_date',
+    'lifetime_billed': 'stats_lifetime_billed',
+    'outstanding_amount': 'stats_outstanding_amount',
+}
+
+
+def customer_stats_expressions():
+    """
+    {cached column: correlated subquery} for customer lifetime stats
+    - order_count / last_order_date: all orders
+    - lifetime_billed: grand total of invoices that are not cancelled
+    - outstanding_amount: remaining balance of unpaid / partially paid invoices
+    Same figures as the customer 360 summary
+    """
+    from django.db.models import Count, DateField, DecimalField, IntegerField, Max, OuterRef, Subquery, Sum, Value
+    from django.db.models.functions import Coalesce
+    from invoicing.models import Invoice
+
+    amount_field = DecimalField(max_digits=12, decimal_places=2)
+    zero = Value(Decimal('0.00'), output_field=amount_field)
+
+    orders = Order.all_objects.filter(
+        customer=OuterRef('pk'),
+        tenant=OuterRef('tenant')
+    ).order_by().values('customer')
+
+    invoices = Invoice.all_objects.filter(
+        customer=OuterRef('pk'),
+        tenant=OuterRef('tenant')
+    ).exclude(status='CANCELLED').order_by().values('customer')
+
+    return {
+        'order_count': Coalesce(
+            Subquery(orders.annotate(total=Count('pk')).values('total'), output_field=IntegerField()),
+            Value(0)
+        ),
+        'last_order_date': Subquery(
+            orders.annotate(last=Max('order_date')).values('last'), output_field=DateField()
+        ),
+        'lifetime_billed': Coalesce(
+            Subquery(invoices.annotate(total=Sum('grand_total')).values('total'), output_field=amount_field),
+            zero
+        ),
+        'outstanding_amount': Coalesce(
+            Subquery(
+                invoices.filter(payment_status__in=['UNPAID', 'PARTIAL'])
+                .annotate(total=Sum('remaining_balance')).values('total'),
+                output_field=amount_field
+            ),
+            zero
+        ),
+    }
+
+
+def customer_stats_cached():
+    """True if customer lists read the cached stat columns (CUSTOMER_STATS_COUNTERS)"""
+    from django.conf import settings
+    return getattr(settings, 'CUSTOMER_STATS_COUNTERS', False)
+
+
+def annotate_customer_stats(queryset):
+    """
+    Annotate customers with stats_order_count, stats_last_order_date,
+    stats_lifetime_billed and stats_outstanding_amount in the same query
+    Reads the cached columns when CUSTOMER_STATS_COUNTERS is on, else
+    computes them live (four correlated subqueries, cost flat per page)
+    """
+    from django.db.models import F
+
+    if customer_stats_cached():
+        return queryset.annotate(**{alias: F(field) for field, alias in CUSTOMER_STATS.items()})
+    expressions = customer_stats_expressions()
+    return queryset.annotate(**{alias: expressions[field] for field, alias in CUSTOMER_STATS.items()})
+
+
 # ==================== ORDER ITEM MODEL ====================
 
 class OrderItem(models.Model):
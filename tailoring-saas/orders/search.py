@@ -0,0 +1,378 @@
+"""
+Customer / order / invoice search
+Date: 2026-10-17
+
+Search terms never hit icontains scans:
+- phone digits: prefix ranges on Customer.phone_digits and whatsapp_digits
+  (one (tenant, column) index each)
+- names and emails: SQLite FTS5 table (FTS_TABLE) with 2/3-char prefix
+  indexes; a tenant token is part of every row so a query only touches one
+  tenant's postings. The newest FTS_CANDIDATES matches are ranked in Python
+  (exact word > word prefix, name > phone / email) - bm25 would score every
+  match, which costs 10-20 ms for a common first name on 100k customers
+- typos: when a name token finds too little, candidates sharing its first
+  two letters are scored with difflib and the close ones are kept
+- order / invoice numbers: prefix range on the (tenant, number) unique index
+
+Customer.save() keeps the digits columns / search_name current and
+core.signals keeps the FTS row in sync. Bulk writes skip both - call
+index_customers() afterwards, or run `python manage.py rebuild_customer_search`.
+
+On databases without FTS5 the name search falls back to a prefix range on
+search_name plus a token scan.
+"""
+
+import difflib
+import re
+import unicodedata
+
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+
+FTS_TABLE = 'orders_customer_search'
+
+FTS_CREATE_SQL = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    "tenant, name, phone, email, "
+    "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+)
+
+FTS_DROP_SQL = f'DROP TABLE IF EXISTS {FTS_TABLE}'
+
+FTS_CANDIDATES = 200
+MIN_PHONE_DIGITS = 3
+FUZZY_MIN_TOKEN = 4
+FUZZY_CUTOFF = 0.75
+FUZZY_CANDIDATES = 300
+
+# None = not checked yet in this process
+_fts_available = None
+
+
+# ==================== NORMALIZATION ====================
+
+def normalize_phone(value):
+    """Digits only; a +91 / 0 prefix beyond 10 digits is dropped"""
+    digits = re.sub(r'\D', '', value or '')
+    return digits[-10:] if len(digits) > 10 else digits
+
+
+def name_tokens(*values):
+    """Lower-case ASCII-folded word tokens, e.g. ('Asha Rao', 'Rāo Silks') -> ['asha', 'rao', 'rao', 'silks']"""
+    text = ' '.join(value for value in values if value)
+    text = unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode()
+    return re.findall(r'[a-z0-9]+', text.lower())
+
+
+def normalize_name(*values):
+    """Space-joined name tokens, stored in Customer.search_name"""
+    return ' '.join(name_tokens(*values))[:255]
+
+
+def prefix_range(field, prefix):
+    """Index-friendly startswith: field >= prefix AND field < prefix + max char"""
+    return Q(**{f'{field}__gte': prefix, f'{field}__lt': prefix + '\U0010ffff'})
+
+
+def phone_prefix_condition(digits):
+    """Phone or WhatsApp number starting with digits - an OR of two index ranges"""
+    return prefix_range('phone_digits', digits) | prefix_range('whatsapp_digits', digits)
+
+
+# ==================== FTS INDEX ====================
+
+def fts_enabled():
+    """True if the FTS5 table exists (created by the orders migration on SQLite with FTS5)"""
+    global _fts_available
+    if _fts_available is None:
+        _fts_available = (
+            connection.vendor == 'sqlite'
+            and FTS_TABLE in connection.introspection.table_names()
+        )
+    return _fts_available
+
+
+def _fts_row(customer):
+    return (
+        customer.pk,
+        f't{customer.tenant_id}',
+        customer.search_name,
+        ' '.join(filter(None, {customer.phone_digits, customer.whatsapp_digits})),
+        customer.email or '',
+    )
+
+
+def index_customer(customer):
+    """Insert or replace one customer's FTS row"""
+    if not fts_enabled():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT OR REPLACE INTO {FTS_TABLE}(rowid, tenant, name, phone, email) VALUES (%s, %s, %s, %s, %s)',
+            _fts_row(customer)
+        )
+
+
+def unindex_customer(customer_id):
+    if not fts_enabled():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [customer_id])
+
+
+def index_customers(**filters):
+    """
+    Recompute the digits columns / search_name and rebuild FTS rows for customers
+    matching filters (e.g. tenant=tenant) - for bulk writes that skip save()
+
+    Returns:
+        Number of customers indexed
+    """
+    from .models import Customer
+
+    customers = list(Customer.all_objects.filter(**filters).only(
+        'pk', 'tenant_id', 'name', 'business_name', 'phone', 'whatsapp_number', 'email',
+        'phone_digits', 'whatsapp_digits', 'search_name'
+    ))
+    fields = ('phone_digits', 'whatsapp_digits', 'search_name')
+    changed = []
+    for customer in customers:
+        values = (
+            normalize_phone(customer.phone),
+            normalize_phone(customer.whatsapp_number),
+            normalize_name(customer.name, customer.business_name),
+        )
+        if values != tuple(getattr(customer, field) for field in fields):
+            for field, value in zip(fields, values):
+                setattr(customer, field, value)
+            changed.append(customer)
+    Customer.all_objects.bulk_update(changed, fields, batch_size=1000)
+
+    if fts_enabled() and customers:
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f'INSERT OR REPLACE INTO {FTS_TABLE}(rowid, tenant, name, phone, email) VALUES (%s, %s, %s, %s, %s)',
+                [_fts_row(customer) for customer in customers]
+            )
+    return len(customers)
+
+
+def _fts_query(tenant_id, tokens):
+    """MATCH expression: this tenant AND every token as a prefix"""
+    terms = ' AND '.join(f'"{token}"*' for token in tokens)
+    return f'tenant : "t{tenant_id}" AND {{name phone email}} : ({terms})'
+
+
+def _fts_candidates(tenant_id, tokens, limit):
+    """[(customer_id, search_name)] newest first - FTS5 stops after limit rows"""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'SELECT rowid, name FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s ORDER BY rowid DESC LIMIT %s',
+            [_fts_query(tenant_id, tokens), limit]
+        )
+        return cursor.fetchall()
+
+
+def _match_score(tokens, search_name):
+    """Per token: 3 exact word, 2 word prefix, 1 matched phone / email only; +1 if the name starts with the first token"""
+    words = search_name.split()
+    score = 0
+    for token in tokens:
+        if token in words:
+            score += 3
+        elif any(word.startswith(token) for word in words):
+            score += 2
+        else:
+            score += 1
+    if words and words[0].startswith(tokens[0]):
+        score += 1
+    return score
+
+
+def _fts_search(tenant_id, tokens, limit):
+    """[customer_id] best match first, newest first among equals"""
+    candidates = _fts_candidates(tenant_id, tokens, FTS_CANDIDATES)
+    # Candidates are already newest first and the sort is stable
+    candidates.sort(key=lambda row: _match_score(tokens, row[1]), reverse=True)
+    return [pk for pk, _ in candidates[:limit]]
+
+
+# ==================== CUSTOMER SEARCH ====================
+
+def customer_search_condition(tenant_id, term):
+    """
+    Q matching customers for a search term - used by the customer list
+    (?search=), which keeps its own ordering
+    """
+    term = (term or '').strip()
+    digits = normalize_phone(term)
+    if term and digits and len(digits) >= MIN_PHONE_DIGITS and not re.search(r'[A-Za-z]', term):
+        return phone_prefix_condition(digits)
+
+    tokens = name_tokens(term)
+    if not tokens:
+        return Q(pk__in=[])
+
+    if fts_enabled():
+        return Q(pk__in=RawSQL(
+            f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s',
+            [_fts_query(tenant_id, tokens)]
+        ))
+
+    condition = prefix_range('search_name', tokens[0]) | Q(search_name__contains=f' {tokens[0]}')
+    for token in tokens[1:]:
+        condition &= Q(search_name__contains=token)
+    return condition
+
+
+def _fuzzy_customer_ids(tenant_id, tokens, exclude, limit):
+    """Customers whose name tokens are close to every query token (typo tolerance)"""
+    from .models import Customer
+
+    long_tokens = [token for token in tokens if len(token) >= FUZZY_MIN_TOKEN]
+    if not long_tokens:
+        return []
+
+    # Candidates share the first two letters of the longest token
+    anchor = max(long_tokens, key=len)[:2]
+    if fts_enabled():
+        candidates = _fts_candidates(tenant_id, [anchor], FUZZY_CANDIDATES)
+    else:
+        candidates = Customer.all_objects.filter(
+            prefix_range('search_name', anchor), tenant_id=tenant_id
+        ).values_list('pk', 'search_name')[:FUZZY_CANDIDATES]
+
+    # Names repeat a lot - score each (token, word) pair once
+    similarity = {}
+
+    def similar(token, word):
+        key = (token, word)
+        if key not in similarity:
+            similarity[key] = difflib.SequenceMatcher(None, token, word).ratio()
+        return similarity[key]
+
+    scored = []
+    for pk, search_name in candidates:
+        if pk in exclude:
+            continue
+        words = search_name.split()
+        scores = [max((similar(token, word) for word in words), default=0) for token in tokens]
+        if min(scores) >= FUZZY_CUTOFF:
+            scored.append((sum(scores) / len(scores), pk))
+    scored.sort(reverse=True)
+    return [pk for _, pk in scored[:limit]]
+
+
+def search_customers(tenant_id, term, limit=10):
+    """
+    Ranked customer matches for a search box
+
+    Returns:
+        [(customer_id, match)] - match is 'phone', 'name' or 'fuzzy'
+    """
+    from .models import Customer
+
+    term = (term or '').strip()
+    digits = normalize_phone(term)
+    if digits and len(digits) >= MIN_PHONE_DIGITS and not re.search(r'[A-Za-z]', term):
+        # Phone matches, then WhatsApp-only ones - each read in index order,
+        # so the exact number comes first, then numbers starting with it
+        ids = []
+        for field in ('phone_digits', 'whatsapp_digits'):
+            ids += (
+                Customer.all_objects.filter(prefix_range(field, digits), tenant_id=tenant_id)
+                .exclude(pk__in=ids).order_by(field, '-created_at').values_list('pk', flat=True)[:limit - len(ids)]
+            )
+            if len(ids) >= limit:
+                break
+        return [(pk, 'phone') for pk in ids]
+
+    tokens = name_tokens(term)
+    if not tokens:
+        return []
+
+    if fts_enabled():
+        ids = _fts_search(tenant_id, tokens, limit)
+    else:
+        ids = list(
+            Customer.all_objects.filter(customer_search_condition(tenant_id, term), tenant_id=tenant_id)
+            .order_by('search_name').values_list('pk', flat=True)[:limit]
+        )
+    results = [(pk, 'name') for pk in ids]
+
+    if len(results) < limit:
+        fuzzy = _fuzzy_customer_ids(tenant_id, tokens, set(ids), limit - len(results))
+        results += [(pk, 'fuzzy') for pk in fuzzy]
+    return results
+
+
+# ==================== GLOBAL SEARCH ====================
+
+def search_documents(model, number_field, tenant_id, term, limit):
+    """Orders / invoices whose number starts with term (case-insensitive)"""
+    prefix = re.sub(r'\s+', '', term).upper()
+    if len(prefix) < 2:
+        return model.all_objects.none()
+    return model.all_objects.filter(
+        prefix_range(number_field, prefix), tenant_id=tenant_id
+    ).order_by(number_field)[:limit]
+
+
+def global_search(tenant_id, term, limit=10):
+    """
+    Customers, orders and invoices for one search term
+
+    Returns:
+        {'customers': [...], 'orders': [...], 'invoices': [...]}
+    """
+    from invoicing.models import Invoice
+    from .models import Customer, Order
+
+    matches = search_customers(tenant_id, term, limit)
+    customers = Customer.all_objects.only('name', 'business_name', 'phone', 'email').in_bulk(
+        [pk for pk, _ in matches]
+    )
+
+    orders = search_documents(Order, 'order_number', tenant_id, term, limit).select_related('customer').only(
+        'order_number', 'order_date', 'order_status', 'customer_id', 'customer__name'
+    )
+    invoices = search_documents(Invoice, 'invoice_number', tenant_id, term, limit)
+
+    return {
+        'customers': [
+            {
+                'id': pk,
+                'name': customers[pk].name,
+                'business_name': customers[pk].business_name,
+                'phone': customers[pk].phone,
+                'email': customers[pk].email,
+                'match': match,
+            }
+            for pk, match in matches if pk in customers
+        ],
+        'orders': [
+            {
+                'id': order.pk,
+                'order_number': order.order_number,
+                'order_date': order.order_date,
+                'order_status': order.order_status,
+                'customer_id': order.customer_id,
+                'customer_name': order.customer.name,
+            }
+            for order in orders
+        ],
+        'invoices': [
+            {
+                'id': invoice.pk,
+                'invoice_number': invoice.invoice_number,
+                'invoice_date': invoice.invoice_date,
+                'billing_name': invoice.billing_name,
+                'grand_total': invoice.grand_total,
+                'payment_status': invoice.payment_status,
+                'customer_id': invoice.customer_id,
+            }
+            for invoice in invoices
+        ],
+    }
@@ -2,38 +2,92 @@
 Orders app serializers - Complete with Inventory + Invoice Integration
 Date: 2026-01-27
 FIXED: Added refund subtraction in total_paid calculation
+UPDATED: total_paid read from annotated queryset (no per-order queries)
+UPDATED: Customer order count and lifetime stats read from annotate_customer_stats()
 """
 
+from django.db import transaction
 from rest_framework import serializers
-from .models import Customer, Order, OrderItem, Item
+from .models import (
+    Customer, Order, OrderItem, Item, CUSTOMER_STATS,
+    annotate_customer_stats, annotate_total_paid, customer_stats_cached
+)
+from .stock import InsufficientStockError, deduct_order_stock, replace_order_stock, stock_signals_suppressed
 from masters.models import ItemUnit
 from decimal import Decimal
 
 
+def get_order_total_paid(obj):
+    """
+    Read total_paid_amount annotated by annotate_total_paid()
+    Falls back to one annotated query for instances loaded without it
+    (e.g. freshly created orders)
+    """
+    total = getattr(obj, 'total_paid_amount', None)
+    if total is None and obj.pk:
+        total = annotate_total_paid(
+            Order.all_objects.filter(pk=obj.pk)
+        ).values_list('total_paid_amount', flat=True).first()
+    return total if total is not None else Decimal('0.00')
+
+
 # ==================== CUSTOMER SERIALIZERS ====================
 
-class CustomerListSerializer(serializers.ModelSerializer):
-    """Lightweight customer serializer for lists"""
+def get_customer_stats(obj):
+    """
+    {cached column: value} read from annotate_customer_stats()
+    Falls back to the cached columns, or one annotated query, for instances
+    loaded without it (e.g. the customer 360 profile)
+    """
+    if not hasattr(obj, 'stats_order_count') and obj.pk:
+        if customer_stats_cached():
+            row = {alias: getattr(obj, field) for field, alias in CUSTOMER_STATS.items()}
+        else:
+            row = annotate_customer_stats(
+                Customer.all_objects.filter(pk=obj.pk)
+            ).values(*CUSTOMER_STATS.values()).first() or {}
+        for alias, value in row.items():
+            setattr(obj, alias, value)
+    return {field: getattr(obj, alias, None) for field, alias in CUSTOMER_STATS.items()}
+
+
+class CustomerStatsMixin(serializers.Serializer):
+    """Order count, last order date, lifetime billed and outstanding amount"""
     
     total_orders = serializers.SerializerMethodField()
+    last_order_date = serializers.SerializerMethodField()
+    lifetime_billed = serializers.SerializerMethodField()
+    outstanding_amount = serializers.SerializerMethodField()
+    
+    def get_total_orders(self, obj):
+        return get_customer_stats(obj)['order_count'] or 0
+    
+    def get_last_order_date(self, obj):
+        return get_customer_stats(obj)['last_order_date']
+    
+    def get_lifetime_billed(self, obj):
+        return get_customer_stats(obj)['lifetime_billed'] or Decimal('0.00')
+    
+    def get_outstanding_amount(self, obj):
+        return get_customer_stats(obj)['outstanding_amount'] or Decimal('0.00')
+
+
+class CustomerListSerializer(CustomerStatsMixin, serializers.ModelSerializer):
+    """Lightweight customer serializer for lists"""
     
     class Meta:
         model = Customer
         fields = [
             'id', 'name', 'phone', 'whatsapp_number', 'email',
             'customer_type', 'business_name', 'gstin', 'gender',
-            'city', 'state', 'is_active', 'created_at', 'total_orders'
+            'city', 'state', 'is_active', 'created_at', 'total_orders',
+            'last_order_date', 'lifetime_billed', 'outstanding_amount'
         ]
-    
-    def get_total_orders(self, obj):
-        return obj.orders.count()
 
 
-class CustomerDetailSerializer(serializers.ModelSerializer):
+class CustomerDetailSerializer(CustomerStatsMixin, serializers.ModelSerializer):
     """Detailed customer serializer with measurements"""
     
-    total_orders = serializers.SerializerMethodField()
-    
     class Meta:
         model = Customer
         fields = [
@@ -59,11 +113,9 @@ class CustomerDetailSerializer(serializers.ModelSerializer):
             'custom_field_9', 'custom_field_10',
             'measurement_notes',
             # Meta
-            'notes', 'is_active', 'created_at', 'updated_at', 'total_orders'
+            'notes', 'is_active', 'created_at', 'updated_at', 'total_orders',
+            'last_order_date', 'lifetime_billed', 'outstanding_amount'
         ]
-    
-    def get_total_orders(self, obj):
-        return obj.orders.count()
 
 
 class CustomerCreateSerializer(serializers.ModelSerializer):
@@ -206,34 +258,8 @@ class OrderListSerializer(serializers.ModelSerializer):
         return None
     
     def get_total_paid(self, obj):
-        """Calculate total paid (receipts + invoice payments - refunds)"""
-        from financials.models import ReceiptVoucher, Payment, RefundVoucher
-        
-        total = Decimal('0.00')
-        
-        # Add receipt vouchers (advances)
-        receipts = ReceiptVoucher.objects.filter(order=obj, tenant=obj.tenant)
-        for receipt in receipts:
-            total += receipt.total_amount
-        
-        # ✅ CRITICAL: Subtract refunds
-        refunds = RefundVoucher.objects.filter(receipt_voucher__order=obj, tenant=obj.tenant)
-        for refund in refunds:
-            total -= refund.total_refund
-        
-        # Add invoice payments if invoice exists
-        try:
-            if hasattr(obj, 'invoice') and obj.invoice:
-                payments = Payment.objects.filter(
-                    invoice=obj.invoice, 
-                    tenant=obj.tenant
-                )
-                for payment in payments:
-                    total += payment.amount
-        except:
-            pass
-        
-        return total
+        """Total paid (receipts - refunds + invoice payments), annotated by OrderViewSet"""
+        return get_order_total_paid(obj)
 
 
 class OrderDetailSerializer(serializers.ModelSerializer):
@@ -252,10 +278,13 @@ class OrderDetailSerializer(serializers.ModelSerializer):
     invoice_number = serializers.SerializerMethodField()
     total_paid = serializers.SerializerMethodField()
     
+    # Rendered by the job worker - null until ready
+    qr_code_url = serializers.SerializerMethodField()
+    
     class Meta:
         model = Order
         fields = [
-            'id', 'order_number', 'customer', 'customer_name', 'customer_phone',
+            'id', 'order_number', 'customer', 'customer_name', 'customer_phone', 'qr_code_url',
             'order_date', 'expected_delivery_date', 'actual_delivery_date',
             'order_status', 'order_status_display',
             'delivery_status', 'delivery_status_display',
@@ -285,34 +314,16 @@ class OrderDetailSerializer(serializers.ModelSerializer):
         return None
     
     def get_total_paid(self, obj):
-        """Calculate total paid (receipts + invoice payments - refunds)"""
-        from financials.models import ReceiptVoucher, Payment, RefundVoucher
-        
-        total = Decimal('0.00')
-        
-        # Add receipt vouchers (advances)
-        receipts = ReceiptVoucher.objects.filter(order=obj, tenant=obj.tenant)
-        for receipt in receipts:
-            total += receipt.total_amount
-        
-        # ✅ CRITICAL: Subtract refunds
-        refunds = RefundVoucher.objects.filter(receipt_voucher__order=obj, tenant=obj.tenant)
-        for refund in refunds:
-            total -= refund.total_refund
-        
-        # Add invoice payments if invoice exists
-        try:
-            if hasattr(obj, 'invoice') and obj.invoice:
-                payments = Payment.objects.filter(
-                    invoice=obj.invoice, 
-                    tenant=obj.tenant
-                )
-                for payment in payments:
-                    total += payment.amount
-        except:
-            pass
-        
-        return total
+        """Total paid (receipts - refunds + invoice payments), annotated by OrderViewSet"""
+        return get_order_total_paid(obj)
+    
+    def get_qr_code_url(self, obj):
+        if obj.qr_code:
+            request = self.context.get('request')
+            if request:
+                return request.build_absolute_uri(obj.qr_code.url)
+            return obj.qr_code.url
+        return None
 
 
 class OrderCreateSerializer(serializers.ModelSerializer):
@@ -329,53 +340,42 @@ class OrderCreateSerializer(serializers.ModelSerializer):
         ]
     
     def create(self, validated_data):
-        from django.utils import timezone
-        
         items_data = validated_data.pop('items', [])
         
-        # Generate order_number
-        if 'order_number' not in validated_data or not validated_data.get('order_number'):
-            request = self.context.get('request')
-            if request and hasattr(request.user, 'tenant'):
-                tenant = request.user.tenant
-            else:
-                raise serializers.ValidationError("User tenant not found")
-            
-            year_month = timezone.now().strftime('%Y%m')
-            
-            last_order = Order.objects.filter(
-                tenant=tenant,
-                order_number__startswith=f'ORD-{year_month}'
-            ).order_by('-order_number').first()
-            
-            if last_order:
-                try:
-                    last_num = int(last_order.order_number.split('-')[-1])
-                    new_num = last_num + 1
-                except (ValueError, IndexError):
-                    new_num = 1
-            else:
-                new_num = 1
-            
-            validated_data['order_number'] = f'ORD-{year_month}-{new_num:05d}'
-        
-        order = Order.objects.create(**validated_data)
+        if not validated_data.get('tenant'):
+            raise serializers.ValidationError("User tenant not found")
         
-        for item_data in items_data:
-            OrderItem.objects.create(order=order, **item_data)
+        try:
+            with transaction.atomic(), stock_signals_suppressed():
+                # order_number is allocated by Order.save() (core.sequences)
+                order = Order.objects.create(**validated_data)
+                
+                lines = [OrderItem.objects.create(order=order, **item_data) for item_data in items_data]
+                
+                # One stock movement (and one ledger batch) for the whole order
+                deduct_order_stock(order, lines)
+        except InsufficientStockError as e:
+            raise serializers.ValidationError({'items': e.messages})
         
         return order
     
     def update(self, instance, validated_data):
         items_data = validated_data.pop('items', None)
         
-        for attr, value in validated_data.items():
-            setattr(instance, attr, value)
-        instance.save()
-        
-        if items_data is not None:
-            instance.items.all().delete()
-            for item_data in items_data:
-                OrderItem.objects.create(order=instance, **item_data)
+        try:
+            with transaction.atomic(), stock_signals_suppressed():
+                for attr, value in validated_data.items():
+                    setattr(instance, attr, value)
+                instance.save()
+                
+                if items_data is not None:
+                    old_lines = list(instance.items.only('item_id', 'quantity'))
+                    instance.items.all().delete()
+                    new_lines = [OrderItem.objects.create(order=instance, **item_data) for item_data in items_data]
+                    
+                    # Only the net change per item touches stock
+                    replace_order_stock(instance, old_lines, new_lines)
+        except InsufficientStockError as e:
+            raise serializers.ValidationError({'items': e.messages})
         
         return instance
\ No newline at end of file
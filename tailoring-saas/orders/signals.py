@@ -1,6 +1,7 @@
 """
 Orders App Signals - Stock Management & Auto-population
 Date: 2026-01-09
+UPDATED: Stock movements go through orders.stock (atomic F() updates + ledger)
 """
 
 from django.db.models.signals import post_save, post_delete, pre_save
@@ -10,6 +11,7 @@ from django.db import transaction
 from .models import OrderItem, Item, StockTransaction
 from core.models import Tenant
 from masters.models import ItemUnit
+from .stock import deduct_order_stock, restore_order_stock, stock_signals_are_suppressed
 
 
 # ==================== STOCK DEDUCTION ON ORDER ITEM CREATION ====================
@@ -18,47 +20,19 @@ from masters.models import ItemUnit
 def deduct_stock_on_order_item_save(sender, instance, created, **kwargs):
     """
     Deduct stock when OrderItem is created
-    Only if item has track_stock enabled
+    Only if item has track_stock enabled (orders.stock applies it atomically)
     """
     if not created:
         return  # Only handle new items, not updates
     
-    item = instance.item
-    if not item or not item.track_stock:
-        return  # No stock tracking needed
+    if stock_signals_are_suppressed():
+        return  # Caller applies the whole order in one movement
     
-    # Check stock availability
-    if not item.allow_negative_stock and item.current_stock < instance.quantity:
-        # This should be validated in serializer, but double-check here
-        from django.core.exceptions import ValidationError
-        raise ValidationError(
-            f"Insufficient stock for {item.name}. Available: {item.current_stock}, Required: {instance.quantity}"
-        )
+    if not instance.item_id:
+        return  # No stock tracking needed
     
-    # Deduct stock
-    with transaction.atomic():
-        stock_before = item.current_stock
-        item.current_stock -= instance.quantity
-        
-        # Mark item as used (lock critical fields)
-        if not item.has_been_used:
-            item.has_been_used = True
-        
-        item.save(update_fields=['current_stock', 'has_been_used'])
-        
-        # Create stock transaction record
-        StockTransaction.objects.create(
-            tenant=item.tenant,
-            item=item,
-            transaction_type='OUT',
-            quantity=-instance.quantity,  # Negative for OUT
-            stock_before=stock_before,
-            stock_after=item.current_stock,
-            reference_type='ORDER',
-            reference_id=instance.order.order_number,
-            notes=f"Stock deducted for Order {instance.order.order_number} - {instance.item_description}",
-            created_by=instance.order.created_by
-        )
+    # Raises InsufficientStockError if stock would go negative and that's not allowed
+    deduct_order_stock(instance.order, [instance])
 
 
 # ==================== RESTORE STOCK ON ORDER ITEM DELETION ====================
@@ -69,29 +43,13 @@ def restore_stock_on_order_item_delete(sender, instance, **kwargs):
     Restore stock when OrderItem is deleted
     Only if item has track_stock enabled
     """
-    item = instance.item
-    if not item or not item.track_stock:
+    if stock_signals_are_suppressed():
         return
     
-    # Restore stock
-    with transaction.atomic():
-        stock_before = item.current_stock
-        item.current_stock += instance.quantity
-        item.save(update_fields=['current_stock'])
-        
-        # Create stock transaction record
-        StockTransaction.objects.create(
-            tenant=item.tenant,
-            item=item,
-            transaction_type='IN',
-            quantity=instance.quantity,  # Positive for IN
-            stock_before=stock_before,
-            stock_after=item.current_stock,
-            reference_type='ADJUSTMENT',
-            reference_id=instance.order.order_number,
-            notes=f"Stock restored - Order Item deleted from Order {instance.order.order_number}",
-            created_by=None  # Deletion may not have user context
-        )
+    if not instance.item_id:
+        return
+    
+    restore_order_stock(instance.order, [instance])
 
 
 # ==================== AUTO-POPULATE ORDERITEM FROM ITEM MASTER ====================
@@ -0,0 +1,102 @@
+"""
+Customer statement (ledger)
+Date: 2026-10-17
+
+    GET /api/orders/customers/{id}/statement/?from=2026-04-01&to=2027-03-31
+    GET /api/orders/customers/{id}/statement/?cursor=<next cursor>
+    GET /api/orders/customers/{id}/statement/export/?file_format=csv|xlsx
+
+One chronological ledger of everything a customer has done with the shop:
+
+    ORDER           memo line (status, no amount)
+    RECEIPT         advance received             credit
+    INVOICE         billed (not cancelled)       debit
+    PAYMENT         payment against an invoice   credit
+    REFUND          advance refunded             debit
+    PAYMENT_REFUND  invoice payment refunded     debit
+
+The six tables are merged in SQL with UNION ALL and the running balance
+(debit - credit: positive = customer owes the shop) is a window SUM() over
+the merged rows (core.ledger), so one query returns a page with correct
+balances however deep it starts. Entries are ordered by (date, kind, id)
+and paged by keyset on that position. Invoices are counted as in the
+customer's cached stats (orders.customer_stats): everything except cancelled.
+"""
+
+from django.db.models import F
+
+from core.ledger import ledger_entries, ledger_part, ledger_rows, ledger_sql, ledger_summary
+
+
+STATEMENT_PAGE_SIZE = 50
+MAX_STATEMENT_PAGE_SIZE = 200
+
+# Kinds in the order they are listed within a day
+LEDGER_KINDS = ('ORDER', 'RECEIPT', 'INVOICE', 'PAYMENT', 'REFUND', 'PAYMENT_REFUND')
+
+STATEMENT_COLUMNS = [
+    ('date', 'Date'),
+    ('kind', 'Type'),
+    ('number', 'Number'),
+    ('detail', 'Details'),
+    ('debit', 'Debit'),
+    ('credit', 'Credit'),
+    ('balance', 'Balance'),
+]
+
+
+def customer_ledger(customer):
+    """(sql, params) of the customer's ledger rows - UNION ALL of every kind"""
+    from invoicing.models import Invoice
+    from financials.models import Payment, PaymentRefund, ReceiptVoucher, RefundVoucher
+    from .models import Order
+
+    scope = {'tenant_id': customer.tenant_id, 'customer_id': customer.pk}
+
+    def part(queryset, kind, *args, **kwargs):
+        return ledger_part(queryset, LEDGER_KINDS.index(kind), kind, *args, **kwargs)
+
+    return ledger_sql([
+        part(Order.all_objects.filter(**scope), 'ORDER', 'order_date', 'order_number', F('order_status')),
+        part(ReceiptVoucher.all_objects.filter(**scope), 'RECEIPT', 'receipt_date', 'voucher_number',
+             F('payment_mode'), credit=F('total_amount')),
+        part(Invoice.all_objects.filter(**scope).exclude(status='CANCELLED'), 'INVOICE', 'invoice_date',
+             'invoice_number', F('status'), debit=F('grand_total')),
+        part(Payment.all_objects.filter(tenant_id=customer.tenant_id, invoice__customer_id=customer.pk), 'PAYMENT',
+             'payment_date', 'payment_number', F('payment_mode'), credit=F('amount')),
+        part(RefundVoucher.all_objects.filter(**scope), 'REFUND', 'refund_date', 'refund_number',
+             F('refund_mode'), debit=F('total_refund')),
+        part(PaymentRefund.all_objects.filter(**scope), 'PAYMENT_REFUND', 'refund_date', 'refund_number',
+             F('refund_mode'), debit=F('refund_amount')),
+    ])
+
+
+def statement_entries(customer, date_from=None, date_to=None, after=None, limit=STATEMENT_PAGE_SIZE):
+    """
+    One page of ledger entries with running balances (one query)
+    after: position of the last entry already shown; limit None = all
+    """
+    return ledger_entries(customer_ledger(customer), date_from, date_to, after=after, limit=limit)
+
+
+def statement_summary(customer, date_from=None, date_to=None):
+    """Opening balance, period debits / credits and closing balance (one query)"""
+    return ledger_summary(customer_ledger(customer), date_from, date_to)
+
+
+# ==================== EXPORT ====================
+
+def statement_filename(customer, file_format, date_from=None, date_to=None):
+    period = '_'.join(str(value) for value in (date_from, date_to) if value) or 'all'
+    return f'statement_{customer.phone}_{period}.{file_format}'
+
+
+def stream_statement(customer, file_format='csv', date_from=None, date_to=None):
+    """Bytes of the statement as CSV / XLSX, as a generator for StreamingHttpResponse"""
+    from core.exports import stream_csv, stream_xlsx
+
+    headers = [header for _, header in STATEMENT_COLUMNS]
+    rows = ledger_rows(customer_ledger(customer), STATEMENT_COLUMNS, date_from, date_to)
+    if file_format == 'xlsx':
+        return stream_xlsx(headers, rows, title='Statement')
+    return stream_csv(headers, rows)
@@ -0,0 +1,200 @@
+"""
+Stock movement service - atomic stock ledger
+Date: 2026-10-17
+
+- Stock is changed with UPDATE ... SET current_stock = current_stock + delta
+  (no read-modify-write in Python, no lost updates under concurrent orders)
+- Items are locked with select_for_update in primary key order, so two orders
+  touching the same items can't deadlock (SQLite: the first UPDATE locks the database)
+- allow_negative_stock is enforced in the UPDATE's WHERE clause
+- All lines of one movement are written with a single bulk_create of
+  StockTransaction rows (one row per item, quantities summed)
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from decimal import Decimal
+
+from django.core.exceptions import ValidationError
+from django.db import connection, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+
+_suppressed = ContextVar('stock_signals_suppressed', default=False)
+
+
+class InsufficientStockError(ValidationError):
+    """Raised when a stock-out would take a non-negative item below zero"""
+
+
+# ==================== BATCHING ====================
+
+@contextmanager
+def stock_signals_suppressed():
+    """
+    Skip the per-line OrderItem stock signals inside this block
+    Used when the caller applies the whole order in one movement
+    """
+    token = _suppressed.set(True)
+    try:
+        yield
+    finally:
+        _suppressed.reset(token)
+
+
+def stock_signals_are_suppressed():
+    return _suppressed.get()
+
+
+def order_line_quantities(lines):
+    """
+    Sum quantities per item for order lines
+    lines: OrderItem instances or dicts with 'item' and 'quantity'
+    Returns {item_id: Decimal}
+    """
+    totals = {}
+    for line in lines:
+        if isinstance(line, dict):
+            item, quantity = line.get('item'), line.get('quantity')
+        else:
+            item, quantity = line.item_id, line.quantity
+        item_id = getattr(item, 'pk', item)
+        if not item_id or not quantity:
+            continue
+        totals[item_id] = totals.get(item_id, Decimal('0.00')) + Decimal(quantity)
+    return totals
+
+
+# ==================== MOVEMENTS ====================
+
+def apply_stock_movements(tenant, deltas, reference_type, reference_id=None, notes='', created_by=None):
+    """
+    Apply stock deltas and write the ledger in one batch
+
+    Args:
+        tenant: Tenant instance or id
+        deltas: {item_id: Decimal} - negative = stock out, positive = stock in
+        reference_type: StockTransaction.REFERENCE_TYPE_CHOICES value
+        reference_id: Order number etc.
+        notes: Ledger note (item name is appended)
+        created_by: User or None
+
+    Items without track_stock are ignored.
+
+    Raises:
+        InsufficientStockError: a stock-out exceeds available stock on an item
+        that does not allow negative stock (nothing is applied)
+
+    Returns:
+        list of created StockTransaction rows
+    """
+    from .models import Item, StockTransaction
+
+    tenant_id = getattr(tenant, 'pk', tenant)
+    deltas = {item_id: Decimal(qty) for item_id, qty in deltas.items() if item_id and qty}
+    if not deltas:
+        return []
+
+    with transaction.atomic():
+        tracked = Item.all_objects.filter(tenant_id=tenant_id, track_stock=True)
+
+        if connection.features.has_select_for_update:
+            # Lock in pk order - concurrent orders on the same items queue up instead of deadlocking
+            item_ids = list(
+                tracked.select_for_update().filter(pk__in=deltas.keys()).order_by('pk').values_list('pk', flat=True)
+            )
+        else:
+            # SQLite locks the whole database at the first UPDATE below;
+            # reading first would only turn waits into lock-upgrade failures
+            item_ids = sorted(deltas)
+
+        now = timezone.now()
+        applied = []
+        for item_id in item_ids:
+            delta = deltas[item_id]
+            target = tracked.filter(pk=item_id)
+            changes = {'current_stock': F('current_stock') + delta, 'updated_at': now}
+
+            if delta < 0:
+                # Enforced by the database, not by a value read earlier
+                target = target.filter(Q(allow_negative_stock=True) | Q(current_stock__gte=-delta))
+                changes['has_been_used'] = True
+
+            if target.update(**changes):
+                applied.append(item_id)
+                continue
+
+            current = tracked.filter(pk=item_id).values_list('name', 'current_stock').first()
+            if current is None:
+                continue  # Not a stock-tracked item
+            raise InsufficientStockError(
+                f"Insufficient stock for {current[0]}. Available: {current[1]}, Required: {-delta}"
+            )
+
+        if not applied:
+            return []
+
+        rows = []
+        for item_id, name, stock_after in Item.all_objects.filter(pk__in=applied).values_list('pk', 'name', 'current_stock'):
+            delta = deltas[item_id]
+            rows.append(StockTransaction(
+                tenant_id=tenant_id,
+                item_id=item_id,
+                transaction_type='OUT' if delta < 0 else 'IN',
+                quantity=delta,
+                stock_before=stock_after - delta,
+                stock_after=stock_after,
+                reference_type=reference_type,
+                reference_id=reference_id,
+                notes=f"{notes} - {name}" if notes else '',
+                created_by=created_by,
+            ))
+
+        return StockTransaction.all_objects.bulk_create(rows)
+
+
+def deduct_order_stock(order, lines, created_by=None):
+    """Stock out for new order lines (one ledger row per item)"""
+    deltas = {item_id: -qty for item_id, qty in order_line_quantities(lines).items()}
+    return apply_stock_movements(
+        order.tenant_id, deltas,
+        reference_type='ORDER',
+        reference_id=order.order_number,
+        notes=f"Stock deducted for Order {order.order_number}",
+        created_by=created_by if created_by is not None else order.created_by,
+    )
+
+
+def restore_order_stock(order, lines, created_by=None):
+    """Stock back in for removed order lines (one ledger row per item)"""
+    return apply_stock_movements(
+        order.tenant_id, order_line_quantities(lines),
+        reference_type='ADJUSTMENT',
+        reference_id=order.order_number,
+        notes=f"Stock restored - Order Item deleted from Order {order.order_number}",
+        created_by=created_by,
+    )
+
+
+def replace_order_stock(order, old_lines, new_lines, created_by=None):
+    """
+    Apply only the net difference when an order's lines are replaced
+    (e.g. OrderCreateSerializer.update deletes and recreates all items)
+    """
+    old = order_line_quantities(old_lines)
+    new = order_line_quantities(new_lines)
+
+    deltas = {}
+    for item_id in set(old) | set(new):
+        delta = old.get(item_id, Decimal('0.00')) - new.get(item_id, Decimal('0.00'))
+        if delta:
+            deltas[item_id] = delta
+
+    return apply_stock_movements(
+        order.tenant_id, deltas,
+        reference_type='ORDER',
+        reference_id=order.order_number,
+        notes=f"Stock adjusted for Order {order.order_number} items update",
+        created_by=created_by if created_by is not None else order.created_by,
+    )
@@ -1,3 +1,290 @@
+"""
+Tests for orders app
+"""
 from django.test import TestCase
 
-# Create your tests here.
+from core.testing import create_tenant
+
+
+class CustomerStatsTest(TestCase):
+    """Test the cached customer lifetime stats"""
+    
+    @classmethod
+    def setUpTestData(cls):
+        from .models import Customer
+        
+        cls.tenant = create_tenant("Stats Shop")
+        cls.customer = Customer.all_objects.create(tenant=cls.tenant, name="Asha", phone="9876500001")
+    
+    def test_write_paths_keep_counters_current(self):
+        """Order and invoice writes refresh the cached columns; they match the live annotation"""
+        from decimal import Decimal
+        from invoicing.models import Invoice, InvoiceItem
+        from .models import Customer, Order, annotate_customer_stats
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            order = Order.all_objects.create(tenant=self.tenant, customer=self.customer, order_date='2026-03-05')
+            Order.all_objects.create(tenant=self.tenant, customer=self.customer, order_date='2026-02-01')
+        with self.captureOnCommitCallbacks(execute=True):
+            invoice = Invoice.all_objects.create(
+                tenant=self.tenant, customer=self.customer, order=order, status='ISSUED',
+                billing_name="Asha", billing_address="1, MG Road", billing_state="Karnataka"
+            )
+            InvoiceItem.objects.create(invoice=invoice, item_description="Blouse", quantity=2, unit_price=750)
+        
+        self.customer.refresh_from_db()
+        self.assertEqual(self.customer.order_count, 2)
+        self.assertEqual(str(self.customer.last_order_date), '2026-03-05')
+        self.assertEqual(self.customer.lifetime_billed, Decimal('1500.00'))
+        self.assertEqual(self.customer.outstanding_amount, Decimal('1500.00'))
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            invoice.status = 'CANCELLED'
+            invoice.save(update_fields=['status'])
+        
+        live = annotate_customer_stats(Customer.all_objects.filter(pk=self.customer.pk)).get()
+        self.customer.refresh_from_db()
+        self.assertEqual(self.customer.lifetime_billed, Decimal('0.00'))
+        self.assertEqual(live.stats_lifetime_billed, self.customer.lifetime_billed)
+        self.assertEqual(live.stats_order_count, self.customer.order_count)
+    
+    def test_refreshed_customers_reach_the_change_feed(self):
+        """An order write changes the customer's cached stats, so the customer is logged for sync"""
+        from core.changes import latest_sequence
+        from core.models import ChangeLogEntry
+        from .models import Order
+        
+        since = latest_sequence()
+        with self.captureOnCommitCallbacks(execute=True):
+            Order.all_objects.create(tenant=self.tenant, customer=self.customer, order_date='2026-03-05')
+        
+        logged = ChangeLogEntry.objects.filter(seq__gt=since, collection='customers')
+        self.assertEqual(list(logged.values_list('object_id', 'op')), [(self.customer.pk, ChangeLogEntry.OP_UPSERT)])
+
+
+class CustomerSearchTest(TestCase):
+    """Test the customer search index"""
+    
+    @classmethod
+    def setUpTestData(cls):
+        from .models import Customer
+        
+        cls.tenant = create_tenant("Search Shop")
+        cls.asha = Customer.all_objects.create(tenant=cls.tenant, name="Asha Rāo", phone="9876500001")
+        cls.meera = Customer.all_objects.create(tenant=cls.tenant, name="Meera Sharma", phone="9123400002")
+    
+    def test_phone_name_and_typo_lookup(self):
+        """Phone prefixes, name prefixes (accent-folded) and near misses all find the customer"""
+        from .search import search_customers
+        
+        self.assertEqual(search_customers(self.tenant.pk, '98765'), [(self.asha.pk, 'phone')])
+        self.assertEqual(search_customers(self.tenant.pk, 'rao as'), [(self.asha.pk, 'name')])
+        self.assertEqual(search_customers(self.tenant.pk, 'shrama'), [(self.meera.pk, 'fuzzy')])
+        
+        # Renames are re-indexed on save
+        self.meera.name = "Meera Iyer"
+        self.meera.save()
+        self.assertEqual(search_customers(self.tenant.pk, 'iyer'), [(self.meera.pk, 'name')])
+        self.assertEqual(search_customers(self.tenant.pk, 'sharma'), [])
+    
+    def test_whatsapp_number_lookup(self):
+        """A WhatsApp number finds the customer in the search box and the customer list, after phone matches"""
+        from .models import Customer
+        from .search import customer_search_condition, search_customers
+        
+        ravi = Customer.all_objects.create(
+            tenant=self.tenant, name="Ravi", phone="9000000003", whatsapp_number="+91 98765 11111"
+        )
+        self.assertEqual(search_customers(self.tenant.pk, '9876511111'), [(ravi.pk, 'phone')])
+        self.assertEqual(search_customers(self.tenant.pk, '98765'), [(self.asha.pk, 'phone'), (ravi.pk, 'phone')])
+        self.assertEqual(
+            list(Customer.all_objects.filter(customer_search_condition(self.tenant.pk, '98765 11'), tenant=self.tenant)),
+            [ravi]
+        )
+
+
+class StockMovementTest(TestCase):
+    """Test the atomic stock movement service"""
+    
+    @classmethod
+    def setUpTestData(cls):
+        from .models import Customer, Item
+        
+        cls.tenant = create_tenant("Stock Shop")
+        cls.customer = Customer.all_objects.create(tenant=cls.tenant, name="Asha", phone="9876500001")
+        cls.fabric = Item.all_objects.create(
+            tenant=cls.tenant, name="Silk", item_type='PRODUCT', track_stock=True,
+            allow_negative_stock=False, opening_stock=10
+        )
+        cls.lining = Item.all_objects.create(
+            tenant=cls.tenant, name="Lining", item_type='PRODUCT', track_stock=True,
+            allow_negative_stock=False, opening_stock=2
+        )
+    
+    def test_stock_out_decrements_and_logs(self):
+        """A stock-out is applied in the database and logged with the before / after stock"""
+        from decimal import Decimal
+        from .models import StockTransaction
+        from .stock import apply_stock_movements
+        
+        rows = apply_stock_movements(self.tenant, {self.fabric.pk: Decimal('-3')}, 'ORDER', 'ORD-1')
+        
+        self.fabric.refresh_from_db()
+        self.assertEqual(self.fabric.current_stock, Decimal('7.00'))
+        self.assertTrue(self.fabric.has_been_used)
+        self.assertEqual(len(rows), 1)
+        ledger = StockTransaction.all_objects.get(item=self.fabric)
+        self.assertEqual((ledger.transaction_type, ledger.stock_before, ledger.stock_after),
+                         ('OUT', Decimal('10.00'), Decimal('7.00')))
+    
+    def test_over_draw_is_refused_and_nothing_applied(self):
+        """Taking a non-negative item below zero raises and leaves every item of the movement unchanged"""
+        from decimal import Decimal
+        from .models import StockTransaction
+        from .stock import InsufficientStockError, apply_stock_movements
+        
+        with self.assertRaises(InsufficientStockError):
+            apply_stock_movements(
+                self.tenant, {self.fabric.pk: Decimal('-3'), self.lining.pk: Decimal('-5')}, 'ORDER', 'ORD-1'
+            )
+        
+        self.fabric.refresh_from_db()
+        self.lining.refresh_from_db()
+        self.assertEqual((self.fabric.current_stock, self.lining.current_stock), (Decimal('10.00'), Decimal('2.00')))
+        self.assertFalse(StockTransaction.all_objects.exists())
+    
+    def test_order_api_returns_400_on_insufficient_stock(self):
+        """The order endpoint answers an over-draw with a 400 on items, not a 500, and creates nothing"""
+        from decimal import Decimal
+        from django.contrib.auth import get_user_model
+        from rest_framework.test import APIClient
+        from .models import Order
+        
+        client = APIClient()
+        client.force_authenticate(
+            get_user_model().objects.create(email="owner@stock.com", tenant=self.tenant, is_superuser=True)
+        )
+        response = client.post('/api/orders/orders/', {
+            'customer': self.customer.pk,
+            'order_date': '2026-03-05',
+            'items': [{'item_type': 'PRODUCT', 'item': self.lining.pk, 'item_description': "Lining",
+                       'quantity': '5', 'unit_price': '100'}],
+        }, format='json')
+        
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('Insufficient stock for Lining', str(response.data['items']))
+        self.lining.refresh_from_db()
+        self.assertEqual(self.lining.current_stock, Decimal('2.00'))
+        self.assertFalse(Order.all_objects.filter(tenant=self.tenant).exists())
+
+
+class CustomerImportTest(TestCase):
+    """Test the bulk customer import"""
+    
+    @classmethod
+    def setUpTestData(cls):
+        from .models import Customer
+        
+        cls.tenant = create_tenant("Import Shop")
+        cls.existing = Customer.all_objects.create(tenant=cls.tenant, name="Asha", phone="9876500001", waist=30)
+    
+    def test_import_creates_updates_and_reports_errors(self):
+        """New phones are created, known phones updated, bad rows reported by row number"""
+        import io
+        from .importer import import_customers_file
+        from .models import Customer
+        from .search import search_customers
+        from core.models import ChangeLogEntry
+        
+        ChangeLogEntry.objects.all().delete()
+        data = (
+            "Customer Name,Phone Number,Bust/Chest,waist\n"
+            "Asha R,9876500001,34.5,\n"
+            "Ravi,9876500002,40,32\n"
+            "Bad Phone,98765,,\n"
+            "Ravi Again,9876500002,41,\n"
+        ).encode()
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            result = import_customers_file(self.tenant, io.BytesIO(data), 'csv', chunk_size=2)
+        
+        self.assertEqual((result['rows'], result['created'], result['updated'], result['failed']), (4, 1, 1, 2))
+        self.assertEqual([error['row'] for error in result['errors']], [4, 5])
+        self.assertIn('phone', result['errors'][0]['errors'])
+        
+        self.existing.refresh_from_db()
+        self.assertEqual((self.existing.name, self.existing.bust_chest, self.existing.waist), ("Asha R", 34.5, 30))
+        ravi = Customer.all_objects.get(tenant=self.tenant, phone="9876500002")
+        self.assertEqual(ravi.search_name, 'ravi')
+        self.assertEqual(search_customers(self.tenant.pk, 'ravi'), [(ravi.pk, 'name')])
+        self.assertEqual(ChangeLogEntry.objects.filter(tenant=self.tenant, collection='customers').count(), 2)
+
+
+class CustomerStatementTest(TestCase):
+    """Test the customer ledger statement"""
+    
+    @classmethod
+    def setUpTestData(cls):
+        from .models import Customer
+        
+        cls.tenant = create_tenant("Ledger Shop")
+        cls.customer = Customer.all_objects.create(tenant=cls.tenant, name="Asha", phone="9876500001")
+    
+    def test_running_balance_pages_and_period(self):
+        """Entries merge in date order; balances carry across keyset pages and date filters"""
+        from datetime import date
+        from decimal import Decimal
+        from financials.models import Payment
+        from invoicing.models import Invoice, InvoiceItem
+        from .models import Order
+        from .statement import statement_entries, statement_summary
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            order = Order.all_objects.create(tenant=self.tenant, customer=self.customer, order_date='2026-03-05')
+            invoice = Invoice.all_objects.create(
+                tenant=self.tenant, customer=self.customer, order=order, status='ISSUED', invoice_date='2026-03-06',
+                billing_name="Asha", billing_address="1, MG Road", billing_state="Karnataka"
+            )
+            InvoiceItem.objects.create(invoice=invoice, item_description="Blouse", quantity=2, unit_price=750)
+        with self.captureOnCommitCallbacks(execute=True):
+            Payment.all_objects.create(
+                tenant=self.tenant, invoice=invoice, amount=1000, payment_mode='CASH', payment_date='2026-03-10'
+            )
+        
+        entries = statement_entries(self.customer, limit=None)
+        self.assertEqual([entry['kind'] for entry in entries], ['ORDER', 'INVOICE', 'PAYMENT'])
+        self.assertEqual([entry['balance'] for entry in entries], [Decimal('0.00'), Decimal('1500.00'), Decimal('500.00')])
+        
+        page = statement_entries(self.customer, limit=2)
+        self.assertEqual(statement_entries(self.customer, after=page[-1]['position']), entries[2:])
+        
+        summary = statement_summary(self.customer, date_from=date(2026, 3, 7))
+        self.assertEqual((summary['opening_balance'], summary['credit'], summary['closing_balance']),
+                         (Decimal('1500.00'), Decimal('1000.00'), Decimal('500.00')))
+    
+    def test_statement_endpoints_are_gated(self):
+        """The ledger needs payment read access; its export needs management and the data export feature"""
+        from datetime import date
+        from django.contrib.auth import get_user_model
+        from rest_framework.test import APIClient
+        from employees.models import Employee
+        
+        url = f'/api/orders/customers/{self.customer.pk}/statement/'
+        client = APIClient()
+        tailor = get_user_model().objects.create(email="tailor@ledger.com", tenant=self.tenant)
+        Employee.objects.create(
+            tenant=self.tenant, user=tailor, employee_code='TLR', role='TAILOR', date_joined=date(2026, 1, 1)
+        )
+        client.force_authenticate(tailor)
+        self.assertEqual(client.get(url).status_code, 403)
+        self.assertEqual(client.get(url + 'export/').status_code, 403)
+        
+        client.force_authenticate(
+            get_user_model().objects.create(email="owner@ledger.com", tenant=self.tenant, is_superuser=True)
+        )
+        # Not an export - file_format is not read
+        self.assertEqual(client.get(url, {'file_format': 'bad'}).status_code, 200)
+        # This tenant's plan has no data export
+        response = client.get(url + 'export/')
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(response.streaming)
@@ -18,6 +18,10 @@ router.register(r'item-units', views.ItemUnitViewSet, basename='itemunit')
 app_name = 'orders'
 
 urlpatterns = [
+    # Async read endpoints (before the router so they aren't shadowed)
+    path('customers/<int:pk>/360/', views.customer_360, name='customer-360'),
+    path('search/', views.search, name='search'),
+    
     # API routes
     path('', include(router.urls)),
 ]
@@ -2,6 +2,9 @@
 IMPROVED Invoice PDF Generator with GST Breakdown
 This displays GST details properly at the bottom
 Replace your orders/utils/invoice_generator.py with this file
+UPDATED: Field names follow invoicing.Invoice / InvoiceItem
+UPDATED: Styles built once per process; invoice_print_state() for the
+content-hash PDF cache (invoicing.pdf)
 """
 
 from reportlab.lib.pagesizes import A4
@@ -17,50 +20,161 @@ from django.conf import settings
 from io import BytesIO
 
 
+# Bump when the layout changes - cached PDFs (invoicing.pdf) are keyed by it
+PDF_LAYOUT_VERSION = 1
+
+# ==================== STYLES ====================
+# Built once per process - reportlab styles are read-only while rendering
+
+_SAMPLE_STYLES = getSampleStyleSheet()
+
+TITLE_STYLE = ParagraphStyle(
+    'CustomTitle',
+    parent=_SAMPLE_STYLES['Heading1'],
+    fontSize=24,
+    textColor=colors.HexColor('#2C3E50'),
+    spaceAfter=30,
+    alignment=TA_CENTER,
+    fontName='Helvetica-Bold'
+)
+
+HEADER_STYLE = ParagraphStyle(
+    'CustomHeader',
+    parent=_SAMPLE_STYLES['Heading2'],
+    fontSize=12,
+    textColor=colors.HexColor('#34495E'),
+    spaceAfter=12,
+    fontName='Helvetica-Bold'
+)
+
+NORMAL_STYLE = ParagraphStyle(
+    'CustomNormal',
+    parent=_SAMPLE_STYLES['Normal'],
+    fontSize=9,
+    spaceAfter=6
+)
+
+SMALL_STYLE = ParagraphStyle(
+    'CustomSmall',
+    parent=_SAMPLE_STYLES['Normal'],
+    fontSize=8,
+    textColor=colors.HexColor('#7F8C8D')
+)
+
+TAX_INVOICE_STYLE = ParagraphStyle(
+    'InvoiceType',
+    parent=HEADER_STYLE,
+    alignment=TA_CENTER,
+    fontSize=14,
+    textColor=colors.HexColor('#E74C3C')
+)
+
+BILL_OF_SUPPLY_STYLE = ParagraphStyle(
+    'InvoiceType',
+    parent=HEADER_STYLE,
+    alignment=TA_CENTER,
+    fontSize=14,
+    textColor=colors.HexColor('#27AE60')
+)
+
+AMOUNT_WORDS_STYLE = ParagraphStyle(
+    'AmountWords',
+    parent=NORMAL_STYLE,
+    fontSize=10,
+    textColor=colors.HexColor('#2C3E50')
+)
+
+FOOTER_STYLE = ParagraphStyle(
+    'Footer',
+    parent=SMALL_STYLE,
+    alignment=TA_CENTER,
+    fontSize=7,
+    textColor=colors.HexColor('#95A5A6')
+)
+
+INVOICE_INFO_TABLE_STYLE = TableStyle([
+    ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+    ('FONTNAME', (2, 0), (2, -1), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, -1), 9),
+    ('TEXTCOLOR', (0, 0), (0, -1), colors.HexColor('#34495E')),
+    ('TEXTCOLOR', (2, 0), (2, -1), colors.HexColor('#34495E')),
+    ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+])
+
+PARTIES_TABLE_STYLE = TableStyle([
+    ('BOX', (0, 0), (-1, -1), 1, colors.HexColor('#BDC3C7')),
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#ECF0F1')),
+    ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+    ('LEFTPADDING', (0, 0), (-1, -1), 10),
+    ('RIGHTPADDING', (0, 0), (-1, -1), 10),
+    ('TOPPADDING', (0, 0), (-1, -1), 10),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 10),
+])
+
+ITEMS_TABLE_STYLE = TableStyle([
+    # Header
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#34495E')),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 9),
+    ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
+    
+    # Body
+    ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+    ('FONTSIZE', (0, 1), (-1, -1), 8),
+    ('ALIGN', (0, 1), (0, -1), 'CENTER'),
+    ('ALIGN', (3, 1), (-1, -1), 'RIGHT'),
+    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+    
+    # Grid
+    ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#BDC3C7')),
+    ('BOX', (0, 0), (-1, -1), 1, colors.HexColor('#34495E')),
+    
+    # Padding
+    ('LEFTPADDING', (0, 0), (-1, -1), 5),
+    ('RIGHTPADDING', (0, 0), (-1, -1), 5),
+    ('TOPPADDING', (0, 0), (-1, -1), 6),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
+])
+
+SIGNATURE_TABLE_STYLE = TableStyle([
+    ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, -1), 9),
+    ('ALIGN', (0, -1), (0, -1), 'CENTER'),
+    ('ALIGN', (1, -1), (1, -1), 'CENTER'),
+    ('LINEABOVE', (0, -1), (0, -1), 1, colors.black),
+    ('LINEABOVE', (1, -1), (1, -1), 1, colors.black),
+    ('VALIGN', (0, 0), (-1, -1), 'BOTTOM'),
+])
+
+SUMMARY_BASE_STYLE = [
+    ('ALIGN', (0, 0), (0, -1), 'RIGHT'),
+    ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
+    ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
+    ('FONTSIZE', (0, 0), (-1, -1), 10),
+    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+    ('TOPPADDING', (0, 0), (-1, -1), 3),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 3),
+]
+
+ITEM_COL_WIDTHS = [8*mm, 60*mm, 15*mm, 12*mm, 12*mm, 20*mm, 12*mm, 12*mm, 24*mm]
+
+
 class InvoicePDFGenerator:
     """
     Generate GST-compliant invoice PDF for India
     """
     
-    def __init__(self, invoice):
+    def __init__(self, invoice, items=None):
         self.invoice = invoice
+        self.items = list(items) if items is not None else invoice_print_items(invoice)
         self.buffer = BytesIO()
         self.width, self.height = A4
-        self.styles = getSampleStyleSheet()
-        
-        # Custom styles
-        self.title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=self.styles['Heading1'],
-            fontSize=24,
-            textColor=colors.HexColor('#2C3E50'),
-            spaceAfter=30,
-            alignment=TA_CENTER,
-            fontName='Helvetica-Bold'
-        )
         
-        self.header_style = ParagraphStyle(
-            'CustomHeader',
-            parent=self.styles['Heading2'],
-            fontSize=12,
-            textColor=colors.HexColor('#34495E'),
-            spaceAfter=12,
-            fontName='Helvetica-Bold'
-        )
-        
-        self.normal_style = ParagraphStyle(
-            'CustomNormal',
-            parent=self.styles['Normal'],
-            fontSize=9,
-            spaceAfter=6
-        )
-        
-        self.small_style = ParagraphStyle(
-            'CustomSmall',
-            parent=self.styles['Normal'],
-            fontSize=8,
-            textColor=colors.HexColor('#7F8C8D')
-        )
+        self.title_style = TITLE_STYLE
+        self.header_style = HEADER_STYLE
+        self.normal_style = NORMAL_STYLE
+        self.small_style = SMALL_STYLE
     
     def generate(self):
         """Generate the complete invoice PDF"""
@@ -133,16 +247,11 @@ class InvoicePDFGenerator:
             company_details = Paragraph("<br/>".join(address_lines), self.normal_style)
             elements.append(company_details)
         
-        invoice_type_text = "TAX INVOICE" if self.invoice.invoice_type == 'TAX_INVOICE' else "BILL OF SUPPLY"
+        is_tax_invoice = self.invoice.tax_type != 'ZERO'
+        invoice_type_text = "TAX INVOICE" if is_tax_invoice else "BILL OF SUPPLY"
         invoice_type = Paragraph(
             f'<b>{invoice_type_text}</b>',
-            ParagraphStyle(
-                'InvoiceType',
-                parent=self.header_style,
-                alignment=TA_CENTER,
-                fontSize=14,
-                textColor=colors.HexColor('#E74C3C') if self.invoice.invoice_type == 'TAX_INVOICE' else colors.HexColor('#27AE60')
-            )
+            TAX_INVOICE_STYLE if is_tax_invoice else BILL_OF_SUPPLY_STYLE
         )
         elements.append(Spacer(1, 3*mm))
         elements.append(invoice_type)
@@ -156,18 +265,11 @@ class InvoicePDFGenerator:
         data = [
             ['Invoice Number:', self.invoice.invoice_number, 'Invoice Date:', self.invoice.invoice_date.strftime('%d-%b-%Y')],
             ['Order Number:', self.invoice.order.order_number if self.invoice.order else 'N/A', 
-             'Due Date:', self.invoice.due_date.strftime('%d-%b-%Y') if self.invoice.due_date else 'Immediate']
+             'Due Date:', 'Immediate']
         ]
         
         table = Table(data, colWidths=[35*mm, 50*mm, 30*mm, 50*mm])
-        table.setStyle(TableStyle([
-            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-            ('FONTNAME', (2, 0), (2, -1), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 9),
-            ('TEXTCOLOR', (0, 0), (0, -1), colors.HexColor('#34495E')),
-            ('TEXTCOLOR', (2, 0), (2, -1), colors.HexColor('#34495E')),
-            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-        ]))
+        table.setStyle(INVOICE_INFO_TABLE_STYLE)
         
         elements.append(table)
         return elements
@@ -215,15 +317,7 @@ class InvoicePDFGenerator:
         ]
         
         table = Table(data, colWidths=[170*mm])
-        table.setStyle(TableStyle([
-            ('BOX', (0, 0), (-1, -1), 1, colors.HexColor('#BDC3C7')),
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#ECF0F1')),
-            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-            ('LEFTPADDING', (0, 0), (-1, -1), 10),
-            ('RIGHTPADDING', (0, 0), (-1, -1), 10),
-            ('TOPPADDING', (0, 0), (-1, -1), 10),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 10),
-        ]))
+        table.setStyle(PARTIES_TABLE_STYLE)
         
         elements.append(table)
         return elements
@@ -232,51 +326,25 @@ class InvoicePDFGenerator:
         """Create invoice items table"""
         elements = []
         
-        header = ['#', 'Description', 'HSN', 'Qty', 'Unit', 'Rate', 'Disc%', 'Tax%', 'Amount']
+        header = ['#', 'Description', 'HSN', 'Qty', 'Unit', 'Rate', 'Disc', 'Tax%', 'Amount']
         data = [header]
         
-        items = self.invoice.items.all()
-        for idx, item in enumerate(items, 1):
+        for idx, item in enumerate(self.items, 1):
+            unit = item.item.unit.code if item.item and item.item.unit else '-'
             data.append([
                 str(idx),
-                item.description[:40],
-                item.hsn_code or '-',
+                item.item_description[:40],
+                item.hsn_sac_code or '-',
                 str(item.quantity),
-                item.unit,
+                unit,
                 f'₹{item.unit_price:,.2f}',
-                f'{item.discount_percentage}%' if item.discount_percentage > 0 else '-',
-                f'{item.tax_percentage}%' if item.tax_percentage > 0 else '-',
+                f'₹{item.discount:,.2f}' if item.discount > 0 else '-',
+                f'{item.gst_rate}%' if item.gst_rate > 0 else '-',
                 f'₹{item.total_amount:,.2f}'
             ])
         
-        col_widths = [8*mm, 60*mm, 15*mm, 12*mm, 12*mm, 20*mm, 12*mm, 12*mm, 24*mm]
-        table = Table(data, colWidths=col_widths, repeatRows=1)
-        
-        table.setStyle(TableStyle([
-            # Header
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#34495E')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 9),
-            ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
-            
-            # Body
-            ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 1), (-1, -1), 8),
-            ('ALIGN', (0, 1), (0, -1), 'CENTER'),
-            ('ALIGN', (3, 1), (-1, -1), 'RIGHT'),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            
-            # Grid
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#BDC3C7')),
-            ('BOX', (0, 0), (-1, -1), 1, colors.HexColor('#34495E')),
-            
-            # Padding
-            ('LEFTPADDING', (0, 0), (-1, -1), 5),
-            ('RIGHTPADDING', (0, 0), (-1, -1), 5),
-            ('TOPPADDING', (0, 0), (-1, -1), 6),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-        ]))
+        table = Table(data, colWidths=ITEM_COL_WIDTHS, repeatRows=1)
+        table.setStyle(ITEMS_TABLE_STYLE)
         
         elements.append(table)
         return elements
@@ -285,20 +353,21 @@ class InvoicePDFGenerator:
         """Create amount summary with GST breakdown - IMPROVED VERSION"""
         elements = []
         
-        # Calculate values - use invoice values directly
+        # Calculate values - use invoice values directly (subtotal is after line discounts)
         subtotal = float(self.invoice.subtotal) if self.invoice.subtotal else 0
-        discount = float(self.invoice.total_discount) if self.invoice.total_discount else 0
-        taxable = float(self.invoice.taxable_amount) if self.invoice.taxable_amount else subtotal - discount
+        discount = 0
+        taxable = subtotal
         
-        cgst = float(self.invoice.cgst_amount) if self.invoice.cgst_amount else 0
-        sgst = float(self.invoice.sgst_amount) if self.invoice.sgst_amount else 0
-        igst = float(self.invoice.igst_amount) if self.invoice.igst_amount else 0
+        cgst = float(self.invoice.total_cgst) if self.invoice.total_cgst else 0
+        sgst = float(self.invoice.total_sgst) if self.invoice.total_sgst else 0
+        igst = float(self.invoice.total_igst) if self.invoice.total_igst else 0
         total_tax = cgst + sgst + igst
         
-        round_off = float(self.invoice.round_off) if self.invoice.round_off else 0
+        round_off = 0
         grand_total = float(self.invoice.grand_total) if self.invoice.grand_total else 0
-        amount_paid = float(self.invoice.amount_paid) if self.invoice.amount_paid else 0
-        balance_due = float(self.invoice.balance_due) if self.invoice.balance_due else grand_total - amount_paid
+        # Advances adjusted + invoice payments
+        amount_paid = float(self.invoice.total_advance_adjusted or 0) + float(self.invoice.total_paid or 0)
+        balance_due = float(self.invoice.remaining_balance) if self.invoice.remaining_balance is not None else grand_total - amount_paid
         
         # Build summary data
         summary_data = []
@@ -352,15 +421,7 @@ class InvoicePDFGenerator:
         table = Table(summary_data, colWidths=[130*mm, 40*mm])
         
         # Apply styles
-        style_commands = [
-            ('ALIGN', (0, 0), (0, -1), 'RIGHT'),
-            ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
-            ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 0), (-1, -1), 10),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ('TOPPADDING', (0, 0), (-1, -1), 3),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 3),
-        ]
+        style_commands = list(SUMMARY_BASE_STYLE)
         
         # Add lines for specific rows
         for i, row in enumerate(summary_data):
@@ -394,12 +455,7 @@ class InvoicePDFGenerator:
         
         text = Paragraph(
             f'<b>Amount in Words:</b> {amount_words} Only',
-            ParagraphStyle(
-                'AmountWords',
-                parent=self.normal_style,
-                fontSize=10,
-                textColor=colors.HexColor('#2C3E50')
-            )
+            AMOUNT_WORDS_STYLE
         )
         
         elements.append(text)
@@ -425,27 +481,13 @@ class InvoicePDFGenerator:
         ]
         
         table = Table(signature_data, colWidths=[85*mm, 85*mm])
-        table.setStyle(TableStyle([
-            ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 9),
-            ('ALIGN', (0, -1), (0, -1), 'CENTER'),
-            ('ALIGN', (1, -1), (1, -1), 'CENTER'),
-            ('LINEABOVE', (0, -1), (0, -1), 1, colors.black),
-            ('LINEABOVE', (1, -1), (1, -1), 1, colors.black),
-            ('VALIGN', (0, 0), (-1, -1), 'BOTTOM'),
-        ]))
+        table.setStyle(SIGNATURE_TABLE_STYLE)
         
         elements.append(table)
         
         footer_text = Paragraph(
             '<i>This is a computer-generated invoice and does not require a physical signature.</i>',
-            ParagraphStyle(
-                'Footer',
-                parent=self.small_style,
-                alignment=TA_CENTER,
-                fontSize=7,
-                textColor=colors.HexColor('#95A5A6')
-            )
+            FOOTER_STYLE
         )
         elements.append(Spacer(1, 2*mm))
         elements.append(footer_text)
@@ -516,7 +558,47 @@ class InvoicePDFGenerator:
         return rupees_text
 
 
-def generate_invoice_pdf(invoice):
+def invoice_print_items(invoice):
+    """Invoice items as printed (one query)"""
+    return list(invoice.items.select_related('item__unit'))
+
+
+def invoice_print_state(invoice, items=None):
+    """
+    Everything the PDF prints, as plain values - equal states render equal PDFs
+    Hashed by invoicing.pdf to name the cached file
+    """
+    if items is None:
+        items = invoice_print_items(invoice)
+    tenant = invoice.tenant
+    customer = invoice.customer
+    
+    def values(obj, fields):
+        return [str(getattr(obj, field, None)) for field in fields] if obj else None
+    
+    return {
+        'layout': PDF_LAYOUT_VERSION,
+        'tenant': values(tenant, ['name', 'address', 'city', 'state', 'pincode', 'phone', 'email', 'gstin']),
+        'customer': values(customer, [
+            'name', 'customer_type', 'business_name', 'address_line1', 'address_line2',
+            'city', 'state', 'pincode', 'phone', 'email', 'gstin',
+        ]),
+        'invoice': values(invoice, [
+            'invoice_number', 'invoice_date', 'tax_type', 'subtotal', 'total_cgst', 'total_sgst',
+            'total_igst', 'grand_total', 'total_advance_adjusted', 'total_paid', 'remaining_balance',
+            'notes',
+        ]),
+        'order_number': invoice.order.order_number if invoice.order else None,
+        'draft': invoice.status == 'DRAFT',
+        'items': [
+            values(item, ['item_description', 'hsn_sac_code', 'quantity', 'unit_price', 'discount', 'gst_rate', 'total_amount'])
+            + [item.item.unit.code if item.item and item.item.unit else None]
+            for item in items
+        ],
+    }
+
+
+def generate_invoice_pdf(invoice, items=None):
     """Helper function to generate invoice PDF"""
-    generator = InvoicePDFGenerator(invoice)
-    return generator.generate()
\ No newline at end of file
+    generator = InvoicePDFGenerator(invoice, items)
+    return generator.generate()
@@ -5,15 +5,33 @@ FIXED: OrderViewSet.create() returns OrderDetailSerializer
 """
 
 from rest_framework import viewsets, status, filters
-from rest_framework.decorators import action
+from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django_filters.rest_framework import DjangoFilterBackend
-from django.db.models import Q
+from django.db.models import Q, Count, Max, Sum
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils import timezone
 from rest_framework.parsers import MultiPartParser
+from rest_framework.utils.urls import replace_query_param
 
-from core.permissions import CanManageOrders
-from .models import Customer, Order, OrderItem, Item, OrderReferencePhoto
+from core.async_utils import async_api_view, gather_queries
+from core.authentication import get_principal
+from core.entitlements import current_usage
+from core.exports import EXPORT_FORMATS, ExportRequestError, parse_date_range, parse_export_params
+from core.ledger import LedgerCursorError, decode_ledger_cursor, encode_ledger_cursor
+from core.pagination import OptInCursorPagination
+from core.permissions import CanManageOrders, CanManagePayments, IsManagement
+from core.subscription_utils import require_feature
+from .importer import ImportFileError, import_customers_file, import_format
+from .search import customer_search_condition, global_search
+from .statement import (
+    MAX_STATEMENT_PAGE_SIZE, STATEMENT_PAGE_SIZE, statement_entries, statement_filename, statement_summary,
+    stream_statement,
+)
+from .models import (
+    Customer, Order, OrderItem, Item, OrderReferencePhoto, annotate_customer_stats, annotate_total_paid
+)
 from masters.models import ItemUnit
 from .serializers import (
     CustomerListSerializer,
@@ -34,9 +52,9 @@ class CustomerViewSet(viewsets.ModelViewSet):
     """Customer management with tenant isolation"""
     
     permission_classes = [IsAuthenticated, CanManageOrders]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter]
+    filter_backends = [DjangoFilterBackend]
     filterset_fields = ['customer_type', 'is_active', 'gender']
-    search_fields = ['name', 'phone', 'email', 'whatsapp_number']
+    # ?search= goes through the search index (orders.search), not icontains
     
     def get_serializer_class(self):
         if self.action == 'list':
@@ -56,12 +74,11 @@ class CustomerViewSet(viewsets.ModelViewSet):
         
         search = self.request.query_params.get('search', None)
         if search:
-            queryset = queryset.filter(
-                Q(name__icontains=search) |
-                Q(phone__icontains=search) |
-                Q(email__icontains=search) |
-                Q(whatsapp_number__icontains=search)
-            )
+            queryset = queryset.filter(customer_search_condition(user.tenant_id, search))
+        
+        if self.action in ('list', 'retrieve'):
+            # Order count and lifetime figures in the same query (no per-row COUNT)
+            queryset = annotate_customer_stats(queryset)
         
         return queryset.order_by('-created_at')
     
@@ -74,6 +91,104 @@ class CustomerViewSet(viewsets.ModelViewSet):
             from rest_framework.exceptions import PermissionDenied
             raise PermissionDenied("You don't have permission to edit this customer.")
         serializer.save()
+    
+    @action(detail=False, methods=['post'], url_path='import', parser_classes=[MultiPartParser])
+    def import_file(self, request):
+        """
+        Bulk import customers + measurements from CSV / XLSX (orders.importer)
+        POST /api/orders/customers/import/  file=<.csv|.xlsx>  dry_run=1 (validate only)
+        Existing customers (same phone) are updated; returns a per-row error report
+        """
+        tenant = request.user.tenant
+        if tenant is None:
+            return Response({'error': 'No tenant associated with user'}, status=status.HTTP_403_FORBIDDEN)
+        
+        upload = request.FILES.get('file')
+        if not upload:
+            return Response({'error': 'No file provided'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        # New customers stop at the plan's customer limit (0 = unlimited)
+        created_limit = None
+        entitlements = get_principal(request).entitlements
+        if entitlements is not None and entitlements.limit('max_customers'):
+            created_limit = max(entitlements.limit('max_customers') - current_usage(tenant, 'max_customers'), 0)
+        
+        try:
+            result = import_customers_file(
+                tenant, upload, import_format(upload.name),
+                dry_run=str(request.data.get('dry_run', '')).lower() in ('1', 'true'),
+                created_limit=created_limit,
+            )
+        except ImportFileError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        return Response(result)
+    
+    @action(detail=True, methods=['get'], permission_classes=[IsAuthenticated, CanManagePayments])
+    def statement(self, request, pk=None):
+        """
+        Customer ledger - orders, invoices, advances, payments and refunds with a running balance
+        GET /api/orders/customers/{id}/statement/?from=YYYY-MM-DD&to=YYYY-MM-DD&page_size=50
+        Follow `next` (keyset cursor) for the following pages (orders.statement)
+        Lists receipts and payments, so readable by the same roles as those
+        """
+        customer = self.get_object()
+        try:
+            date_from, date_to = parse_date_range(request.query_params)
+            after = request.query_params.get('cursor')
+            after = decode_ledger_cursor(after) if after else None
+        except (ExportRequestError, LedgerCursorError) as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        try:
+            page_size = int(request.query_params.get('page_size', STATEMENT_PAGE_SIZE))
+        except ValueError:
+            page_size = STATEMENT_PAGE_SIZE
+        page_size = min(max(page_size, 1), MAX_STATEMENT_PAGE_SIZE)
+        
+        entries = statement_entries(customer, date_from, date_to, after=after, limit=page_size + 1)
+        next_link = None
+        if len(entries) > page_size:
+            entries = entries[:page_size]
+            next_link = replace_query_param(
+                request.build_absolute_uri(), 'cursor', encode_ledger_cursor(entries[-1]['position'])
+            )
+        
+        return Response({
+            'customer': {'id': customer.pk, 'name': customer.name, 'phone': customer.phone},
+            'from': date_from,
+            'to': date_to,
+            **statement_summary(customer, date_from, date_to),
+            'next': next_link,
+            'results': [
+                {field: value for field, value in entry.items() if field != 'position'}
+                for entry in entries
+            ],
+        })
+    
+    @action(
+        detail=True, methods=['get'], url_path='statement/export', permission_classes=[IsAuthenticated, IsManagement]
+    )
+    @require_feature('allow_data_export')
+    def statement_export(self, request, pk=None):
+        """
+        Customer ledger as a streamed CSV / XLSX download
+        GET /api/orders/customers/{id}/statement/export/?file_format=csv|xlsx&from=YYYY-MM-DD&to=YYYY-MM-DD
+        Management only, on plans with data export (as core.views.ExportView)
+        """
+        customer = self.get_object()
+        try:
+            file_format, date_from, date_to = parse_export_params(request.query_params)
+        except ExportRequestError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        response = StreamingHttpResponse(
+            stream_statement(customer, file_format, date_from, date_to),
+            content_type=EXPORT_FORMATS[file_format]
+        )
+        filename = statement_filename(customer, file_format, date_from, date_to)
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
 
 
 # ==================== ITEM UNIT VIEWSET ====================
@@ -127,6 +242,8 @@ class OrderViewSet(viewsets.ModelViewSet):
     
     permission_classes = [IsAuthenticated, CanManageOrders]
     filter_backends = [DjangoFilterBackend, filters.SearchFilter]
+    pagination_class = OptInCursorPagination
+    cursor_ordering = ('-order_date', '-created_at')
     filterset_fields = ['order_status', 'delivery_status', 'is_locked']
     search_fields = ['order_number', 'customer__name', 'customer__phone']
     
@@ -144,7 +261,12 @@ class OrderViewSet(viewsets.ModelViewSet):
         if not hasattr(user, 'tenant') or user.tenant is None:
             return Order.objects.none()
         
-        queryset = Order.objects.filter(tenant=user.tenant).select_related('customer')
+        queryset = Order.objects.filter(tenant=user.tenant).select_related('customer', 'invoice')
+        
+        # receipts - refunds + payments as one subquery column (no N+1 in serializers)
+        if self.action in ['list', 'retrieve']:
+            queryset = annotate_total_paid(queryset)
+        
         return queryset.order_by('-order_date', '-created_at')
     
     def perform_create(self, serializer):
@@ -289,4 +411,105 @@ class OrderItemViewSet(viewsets.ModelViewSet):
         if not hasattr(user, 'tenant') or user.tenant is None:
             return OrderItem.objects.none()
         
-        return OrderItem.objects.filter(order__tenant=user.tenant)
\ No newline at end of file
+        return OrderItem.objects.filter(order__tenant=user.tenant)
+
+
+# ==================== CUSTOMER 360 (ASYNC) ====================
+
+def customer_360_queries(customer):
+    """{name: callable} of the independent queries behind the customer 360 view"""
+    from invoicing.models import Invoice
+    from financials.models import ReceiptVoucher, RefundVoucher
+    from appointments.models import Appointment
+    
+    orders = Order.objects.filter(tenant_id=customer.tenant_id, customer=customer)
+    
+    def order_summary():
+        return orders.aggregate(
+            total_orders=Count('id'),
+            open_orders=Count('id', filter=Q(order_status__in=['CONFIRMED', 'IN_PROGRESS', 'READY'])),
+            last_order_date=Max('order_date'),
+            estimated_value=Sum('estimated_total'),
+        )
+    
+    def recent_orders():
+        return list(
+            orders.order_by('-order_date', '-created_at')
+            .values('id', 'order_number', 'order_date', 'expected_delivery_date', 'order_status', 'estimated_total')[:5]
+        )
+    
+    def invoice_summary():
+        return Invoice.objects.filter(tenant_id=customer.tenant_id, customer=customer).exclude(
+            status='CANCELLED'
+        ).aggregate(
+            total_invoices=Count('id'),
+            total_billed=Sum('grand_total'),
+            outstanding=Sum('remaining_balance', filter=Q(payment_status__in=['UNPAID', 'PARTIAL'])),
+        )
+    
+    def advances():
+        received = ReceiptVoucher.objects.filter(
+            tenant_id=customer.tenant_id, customer=customer
+        ).aggregate(total=Sum('total_amount'))['total']
+        refunded = RefundVoucher.objects.filter(
+            tenant_id=customer.tenant_id, customer=customer
+        ).aggregate(total=Sum('total_refund'))['total']
+        return {'received': received or 0, 'refunded': refunded or 0}
+    
+    def upcoming_appointments():
+        return list(
+            Appointment.objects.filter(
+                tenant_id=customer.tenant_id,
+                phone=customer.phone,
+                date__gte=timezone.localdate(),
+                status__in=['SCHEDULED', 'RESCHEDULED'],
+            ).order_by('date', 'start_time').values('id', 'date', 'start_time', 'service', 'status')[:5]
+        )
+    
+    return {
+        'profile': lambda: CustomerDetailSerializer(customer).data,
+        'orders': order_summary,
+        'recent_orders': recent_orders,
+        'invoices': invoice_summary,
+        'advances': advances,
+        'upcoming_appointments': upcoming_appointments,
+    }
+
+
+@async_api_view
+async def customer_360(request, pk):
+    """
+    Customer 360 - profile, orders, invoices, advances and appointments in one call
+    GET /api/orders/customers/{id}/360/
+    The independent queries run concurrently
+    """
+    customer = await Customer.objects.filter(tenant=request.user.tenant, pk=pk).afirst()
+    if customer is None:
+        return JsonResponse({'detail': 'Not found.'}, status=404)
+    
+    results = await gather_queries(customer_360_queries(customer))
+    return JsonResponse(results)
+
+
+# ==================== SEARCH ====================
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated, CanManageOrders])
+def search(request):
+    """
+    Search box lookup - customers (phone / name, typo tolerant), order and invoice numbers
+    GET /api/orders/search/?q=asha&limit=10
+    """
+    tenant = request.user.tenant
+    if tenant is None:
+        return Response({'error': 'User has no tenant'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    term = request.query_params.get('q', '').strip()
+    try:
+        limit = min(max(int(request.query_params.get('limit', 10)), 1), 50)
+    except ValueError:
+        limit = 10
+    
+    if not term:
+        return Response({'query': term, 'customers': [], 'orders': [], 'invoices': []})
+    return Response({'query': term, **global_search(tenant.pk, term, limit)})
@@ -8,8 +8,10 @@ from django.db import models
 from django.utils import timezone
 from django.core.validators import MinValueValidator, FileExtensionValidator
 from django.core.exceptions import ValidationError
+from django.db import transaction
 from decimal import Decimal
 from core.managers import TenantManager
+from core.sequences import allocate_number, max_existing_suffix
 from datetime import date
 
 
@@ -347,6 +349,8 @@ class PurchaseBill(models.Model):
             models.Index(fields=['tenant', 'vendor']),
             models.Index(fields=['tenant', 'bill_date']),
             models.Index(fields=['tenant', 'payment_status']),
+            # Payables aging (purchase_management.payables)
+            models.Index(fields=['tenant', 'payment_status', 'bill_date']),
         ]
         unique_together = [['tenant', 'bill_number', 'vendor']]  # Unique bill per vendor
     
@@ -651,29 +655,22 @@ class Payment(models.Model):
                 )
     
     def save(self, *args, **kwargs):
-        # Auto-generate payment number if not exists
-        if not self.payment_number:
-            today = date.today()
-            prefix = f"PAY-{today.strftime('%Y%m%d')}"
-            
-            # Get last payment for today
-            last = Payment.objects.filter(
-                tenant=self.tenant,
-                payment_number__startswith=prefix
-            ).order_by('-payment_number').first()
-            
-            if last:
-                try:
-                    last_num = int(last.payment_number.split('-')[-1])
-                    new_num = last_num + 1
-                except (ValueError, IndexError):
-                    new_num = 1
-            else:
-                new_num = 1
+        with transaction.atomic():
+            # Auto-generate payment number if not exists
+            if not self.payment_number:
+                day_code = date.today().strftime('%Y%m%d')
+                prefix = f"PAY-{day_code}-"
+                
+                new_num = allocate_number(
+                    self.tenant, 'PURCHASE_PAY', day_code,
+                    seed=lambda: max_existing_suffix(
+                        Payment.all_objects.filter(tenant=self.tenant), 'payment_number', prefix
+                    )
+                )
+                
+                self.payment_number = f"{prefix}{new_num:04d}"
             
-            self.payment_number = f"{prefix}-{new_num:04d}"
-        
-        super().save(*args, **kwargs)
+            super().save(*args, **kwargs)
     
     @property
     def vendor_name(self):
@@ -0,0 +1,154 @@
+"""
+Purchase management overview
+Date: 2026-10-17
+
+The owner's purchase dashboard (DashboardViewSet.overview) in four queries -
+one per table, with conditional aggregation (Count/Sum with filter=) instead
+of a count() or aggregate() per figure:
+
+    vendors   - counts and outstanding balance
+    bills     - counts by payment status and amounts
+    expenses  - this month, grouped by category (the total is their sum)
+    payments  - this month, total / cash / digital
+
+The result is cached in-process per tenant for PURCHASE_OVERVIEW_CACHE_SECONDS
+(default 30; 0 disables), so repeated dashboard loads cost no queries.
+Vendor, bill, expense and payment writes drop the tenant's entry
+(purchase_management.signals); other worker processes pick the write up
+within that window.
+
+purchase_management is not in INSTALLED_APPS yet, and like the app's other
+receivers the invalidation is connected only once the app is installed and
+imports its signals.
+"""
+
+import time
+from decimal import Decimal
+
+from django.conf import settings
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+
+
+DIGITAL_PAYMENT_METHODS = ['UPI', 'BANK_TRANSFER', 'CARD']
+
+# Categories listed in the expense breakdown
+TOP_EXPENSE_CATEGORIES = 5
+
+# tenant_id -> (expires_at, overview dict)
+# Plain dict as in core.entitlements - a lost race only means one extra build
+_overview_cache = {}
+
+# Entries are dropped wholesale beyond this
+MAX_CACHED_OVERVIEWS = 10000
+
+
+def _cache_seconds():
+    return getattr(settings, 'PURCHASE_OVERVIEW_CACHE_SECONDS', 30)
+
+
+def _amounts(row, *names):
+    return {name: row[name] or Decimal('0.00') for name in names}
+
+
+def vendor_stats(tenant):
+    from .models import Vendor
+
+    row = Vendor.objects.filter(tenant=tenant).aggregate(
+        total=Count('pk'),
+        active=Count('pk', filter=Q(is_active=True)),
+        with_outstanding=Count('pk', filter=Q(outstanding_balance__gt=0)),
+        total_outstanding=Sum('outstanding_balance'),
+    )
+    return {
+        'total': row['total'],
+        'active': row['active'],
+        'with_outstanding': row['with_outstanding'],
+        **_amounts(row, 'total_outstanding'),
+    }
+
+
+def bill_stats(tenant):
+    from .models import PurchaseBill
+
+    status = PurchaseBill.PaymentStatus
+    row = PurchaseBill.objects.filter(tenant=tenant).aggregate(
+        total=Count('pk'),
+        unpaid=Count('pk', filter=Q(payment_status=status.UNPAID)),
+        partially_paid=Count('pk', filter=Q(payment_status=status.PARTIALLY_PAID)),
+        fully_paid=Count('pk', filter=Q(payment_status=status.FULLY_PAID)),
+        total_amount=Sum('bill_amount'),
+        total_outstanding=Sum('balance_amount'),
+    )
+    return {
+        'total': row['total'],
+        'unpaid': row['unpaid'],
+        'partially_paid': row['partially_paid'],
+        'fully_paid': row['fully_paid'],
+        **_amounts(row, 'total_amount', 'total_outstanding'),
+    }
+
+
+def expense_stats(tenant, month_start):
+    from .models import Expense
+
+    by_category = sorted(
+        Expense.objects.filter(tenant=tenant, expense_date__gte=month_start)
+        .values('category')
+        .annotate(total=Sum('expense_amount'))
+        .order_by(),
+        key=lambda row: row['total'],
+        reverse=True
+    )
+    return {
+        'this_month': sum((row['total'] for row in by_category), Decimal('0.00')),
+        'by_category': by_category[:TOP_EXPENSE_CATEGORIES],
+    }
+
+
+def payment_stats(tenant, month_start):
+    from .models import Payment
+
+    row = Payment.objects.filter(tenant=tenant, payment_date__gte=month_start).aggregate(
+        this_month=Sum('amount'),
+        cash=Sum('amount', filter=Q(payment_method=Payment.PaymentMethod.CASH)),
+        digital=Sum('amount', filter=Q(payment_method__in=DIGITAL_PAYMENT_METHODS)),
+    )
+    return _amounts(row, 'this_month', 'cash', 'digital')
+
+
+def build_purchase_overview(tenant, today=None):
+    """Overview payload for tenant (four queries)"""
+    month_start = (today or timezone.localdate()).replace(day=1)
+    return {
+        'vendors': vendor_stats(tenant),
+        'bills': bill_stats(tenant),
+        'expenses': expense_stats(tenant, month_start),
+        'payments': payment_stats(tenant, month_start),
+    }
+
+
+def get_purchase_overview(tenant):
+    """Cached build_purchase_overview() - zero queries on a hit"""
+    ttl = _cache_seconds()
+    if not ttl:
+        return build_purchase_overview(tenant)
+
+    now = time.monotonic()
+    cached = _overview_cache.get(tenant.pk)
+    if cached is not None and cached[0] > now:
+        return cached[1]
+
+    overview = build_purchase_overview(tenant)
+    if len(_overview_cache) >= MAX_CACHED_OVERVIEWS:
+        _overview_cache.clear()
+    _overview_cache[tenant.pk] = (now + ttl, overview)
+    return overview
+
+
+def invalidate_purchase_overview(tenant_id=None):
+    """Drop the cached overview for one tenant (or all tenants)"""
+    if tenant_id is None:
+        _overview_cache.clear()
+    else:
+        _overview_cache.pop(tenant_id, None)
@@ -0,0 +1,158 @@
+"""
+Vendor payables - aging and statement
+Date: 2026-10-17
+
+    GET /api/purchase/vendors/aging/?as_of=YYYY-MM-DD
+    GET /api/purchase/vendors/{id}/statement/?from=2026-09-01&to=2026-09-30
+
+Aging buckets the balance_amount of unpaid / partially paid bills by days
+since bill_date into the same 0-30 / 31-60 / 61-90 / 90+ buckets as
+receivables (invoicing.aging) - one grouped query per report, over the
+(tenant, payment_status, bill_date) index.
+
+The vendor statement merges bills (credit) and bill payments (debit) with
+UNION ALL and a window running balance (core.ledger): positive = owed to
+the vendor. The statement response also carries the period summary and
+the vendor's aging as of the period end, so month-end reconciliation with
+a supplier is one request.
+
+purchase_management is not in INSTALLED_APPS yet (and has no migrations),
+so these endpoints are not served and the index exists only on the model -
+the app's initial migration will create it.
+"""
+
+from django.db.models import Count, F, Min, Sum
+from django.utils import timezone
+
+from core.ledger import CREDIT_BALANCE, ledger_entries, ledger_part, ledger_sql, ledger_summary
+from invoicing.aging import AGING_BUCKETS, bucket_conditions
+
+
+STATEMENT_PAGE_SIZE = 50
+MAX_STATEMENT_PAGE_SIZE = 200
+
+# Kinds in the order they are listed within a day
+LEDGER_KINDS = ('BILL', 'PAYMENT')
+
+
+# ==================== AGING ====================
+
+def payable_bills(tenant, as_of, vendor_id=None):
+    """Bills with money still owed, dated on or before as_of"""
+    from .models import PurchaseBill
+
+    status = PurchaseBill.PaymentStatus
+    queryset = PurchaseBill.all_objects.filter(
+        tenant=tenant,
+        payment_status__in=[status.UNPAID, status.PARTIALLY_PAID],
+        bill_date__lte=as_of,
+    )
+    if vendor_id is not None:
+        queryset = queryset.filter(vendor_id=vendor_id)
+    return queryset
+
+
+def payables_aging_rows(tenant, as_of, vendor_id=None):
+    """Per-vendor bucket totals, largest balance first (one grouped query)"""
+    buckets = {
+        key: Sum('balance_amount', filter=condition)
+        for key, condition in bucket_conditions(as_of, 'bill_date').items()
+    }
+    return (
+        payable_bills(tenant, as_of, vendor_id)
+        .values('vendor_id')
+        .annotate(
+            vendor_name=F('vendor__name'),
+            vendor_phone=F('vendor__phone'),
+            bills=Count('pk'),
+            oldest_bill_date=Min('bill_date'),
+            total=Sum('balance_amount'),
+            **buckets,
+        )
+        .order_by('-total', 'vendor_id')
+    )
+
+
+def payables_aging(tenant, as_of=None, vendor_id=None):
+    """
+    Payables aging report
+
+    Returns:
+        {'as_of', 'buckets': [{key, label}], 'totals': {bucket: amount, 'total', 'bills', 'vendors'},
+         'vendors': [row]}
+    """
+    as_of = as_of or timezone.localdate()
+    vendors = []
+    totals = {key: 0 for key, _, _, _ in AGING_BUCKETS}
+    totals.update(total=0, bills=0, vendors=0)
+    for row in payables_aging_rows(tenant, as_of, vendor_id):
+        for key, _, _, _ in AGING_BUCKETS:
+            row[key] = row[key] or 0
+            totals[key] += row[key]
+        totals['total'] += row['total']
+        totals['bills'] += row['bills']
+        totals['vendors'] += 1
+        vendors.append(row)
+
+    return {
+        'as_of': as_of,
+        'buckets': [{'key': key, 'label': label} for key, label, _, _ in AGING_BUCKETS],
+        'totals': totals,
+        'vendors': vendors,
+    }
+
+
+# ==================== STATEMENT ====================
+
+def vendor_ledger(vendor):
+    """(sql, params) of the vendor's ledger rows - bills UNION ALL bill payments"""
+    from .models import Payment, PurchaseBill
+
+    return ledger_sql([
+        ledger_part(
+            PurchaseBill.all_objects.filter(tenant_id=vendor.tenant_id, vendor_id=vendor.pk),
+            LEDGER_KINDS.index('BILL'), 'BILL', 'bill_date', 'bill_number', F('payment_status'),
+            credit=F('bill_amount'),
+        ),
+        ledger_part(
+            Payment.all_objects.filter(
+                tenant_id=vendor.tenant_id,
+                payment_type=Payment.PaymentType.PURCHASE_BILL,
+                purchase_bill__vendor_id=vendor.pk,
+            ),
+            LEDGER_KINDS.index('PAYMENT'), 'PAYMENT', 'payment_date', 'payment_number', F('payment_method'),
+            debit=F('amount'),
+        ),
+    ])
+
+
+def vendor_statement(vendor, date_from=None, date_to=None, after=None, limit=STATEMENT_PAGE_SIZE):
+    """
+    Reconciliation view of one vendor for a period (three queries)
+
+    Returns:
+        {'vendor', 'from', 'to', 'summary': {opening_balance, debit, credit, closing_balance},
+         'aging': {bucket: amount, 'total'}, 'entries': [...]}
+        after / limit page the entries on the keyset (core.ledger)
+    """
+    ledger = vendor_ledger(vendor)
+    as_of = date_to or timezone.localdate()
+
+    aging = {key: 0 for key, _, _, _ in AGING_BUCKETS}
+    aging['total'] = 0
+    for row in payables_aging_rows(vendor.tenant_id, as_of, vendor.pk):
+        aging.update({key: row[key] or 0 for key in aging})
+
+    return {
+        'vendor': {
+            'id': vendor.pk,
+            'name': vendor.name,
+            'phone': vendor.phone,
+            'outstanding_balance': vendor.outstanding_balance,
+        },
+        'from': date_from,
+        'to': date_to,
+        'summary': ledger_summary(ledger, date_from, date_to, balance=CREDIT_BALANCE),
+        'aging': {'as_of': as_of, **aging},
+        'entries': ledger_entries(ledger, date_from, date_to, after=after, limit=limit, balance=CREDIT_BALANCE),
+    }
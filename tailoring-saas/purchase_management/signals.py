@@ -9,6 +9,7 @@ from django.db.models import Sum
 from decimal import Decimal
 
 from .models import Payment, PurchaseBill, Expense, Vendor
+from .overview import invalidate_purchase_overview
 
 
 @receiver(post_save, sender=Payment)
@@ -39,10 +40,8 @@ def update_bill_payment_status(sender, instance, **kwargs):
             bill.payment_status = PurchaseBill.PaymentStatus.UNPAID
         
         # Save without triggering signals again
+        # (the bill's post_save - update_vendor_on_bill_change - refreshes the vendor balance)
         bill.save(update_fields=['paid_amount', 'balance_amount', 'payment_status', 'updated_at'])
-        
-        # Update vendor balance
-        update_vendor_balance(bill.vendor)
 
 
 @receiver(post_save, sender=Payment)
@@ -88,15 +87,13 @@ def update_vendor_balance(vendor):
     Recalculate vendor outstanding balance
     Called from multiple signals to keep vendor totals accurate
     """
-    # Total purchases (sum of all bill amounts)
-    total_purchases = vendor.bills.aggregate(
-        total=Sum('bill_amount')
-    )['total'] or Decimal('0.00')
-    
-    # Total paid (sum of all paid amounts)
-    total_paid = vendor.bills.aggregate(
-        total=Sum('paid_amount')
-    )['total'] or Decimal('0.00')
+    # Total purchases and total paid in one aggregate over the vendor's bills
+    totals = vendor.bills.aggregate(
+        total_purchases=Sum('bill_amount'),
+        total_paid=Sum('paid_amount')
+    )
+    total_purchases = totals['total_purchases'] or Decimal('0.00')
+    total_paid = totals['total_paid'] or Decimal('0.00')
     
     # Calculate outstanding
     outstanding = total_purchases - total_paid
@@ -107,4 +104,17 @@ def update_vendor_balance(vendor):
     vendor.outstanding_balance = outstanding
     
     # Save without triggering signals
-    vendor.save(update_fields=['total_purchases', 'total_paid', 'outstanding_balance', 'updated_at'])
\ No newline at end of file
+    vendor.save(update_fields=['total_purchases', 'total_paid', 'outstanding_balance', 'updated_at'])
+
+
+@receiver(post_save, sender=Vendor)
+@receiver(post_delete, sender=Vendor)
+@receiver(post_save, sender=PurchaseBill)
+@receiver(post_delete, sender=PurchaseBill)
+@receiver(post_save, sender=Expense)
+@receiver(post_delete, sender=Expense)
+@receiver(post_save, sender=Payment)
+@receiver(post_delete, sender=Payment)
+def invalidate_overview(sender, instance, **kwargs):
+    """Drop the tenant's cached dashboard overview (purchase_management.overview)"""
+    invalidate_purchase_overview(instance.tenant_id)
@@ -15,6 +15,7 @@ router.register(r'vendors', views.VendorViewSet, basename='vendor')
 router.register(r'bills', views.PurchaseBillViewSet, basename='bill')
 router.register(r'expenses', views.ExpenseViewSet, basename='expense')
 router.register(r'payments', views.PaymentViewSet, basename='payment')
+router.register(r'dashboard', views.DashboardViewSet, basename='dashboard')
 
 
 app_name = 'purchase_management'
@@ -35,7 +36,9 @@ VENDORS:
   DELETE /api/purchase/vendors/{id}/                - Delete vendor
   GET    /api/purchase/vendors/with_outstanding/    - Vendors with balance
   GET    /api/purchase/vendors/summary/             - Vendor summary
+  GET    /api/purchase/vendors/aging/               - Payables aging (?as_of=)
   GET    /api/purchase/vendors/{id}/bills/          - Vendor's bills
+  GET    /api/purchase/vendors/{id}/statement/      - Vendor statement (?from=&to=&cursor=)
 
 PURCHASE BILLS:
   GET    /api/purchase/bills/                       - List all bills
@@ -11,9 +11,13 @@ from rest_framework.permissions import IsAuthenticated
 from django_filters.rest_framework import DjangoFilterBackend
 from django.db.models import Sum, Q, Count
 from django.utils import timezone
+from django.utils.dateparse import parse_date
+from rest_framework.utils.urls import replace_query_param
 from decimal import Decimal
 from datetime import datetime, timedelta
 
+from core.exports import ExportRequestError, parse_date_range
+from core.ledger import LedgerCursorError, decode_ledger_cursor, encode_ledger_cursor
 from core.permissions import IsManagement  # Adjust based on your permissions
 from core.subscription_utils import (
     require_active_subscription,
@@ -22,6 +26,8 @@ from core.subscription_utils import (
 )
 
 from .models import Vendor, PurchaseBill, Expense, Payment
+from .overview import get_purchase_overview
+from .payables import MAX_STATEMENT_PAGE_SIZE, STATEMENT_PAGE_SIZE, payables_aging, vendor_statement
 from .serializers import (
     # Vendor
     VendorListSerializer,
@@ -86,6 +92,65 @@ class VendorViewSet(viewsets.ModelViewSet):
         
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     
+    @action(detail=True, methods=['get'])
+    def statement(self, request, pk=None):
+        """
+        Vendor statement for reconciliation - bills and payments with a running balance,
+        period summary and aging (purchase_management.payables)
+        GET /api/purchase/vendors/{id}/statement/?from=YYYY-MM-DD&to=YYYY-MM-DD&page_size=50
+        Follow `next` (keyset cursor) for the following pages
+        """
+        vendor = self.get_object()
+        try:
+            date_from, date_to = parse_date_range(request.query_params)
+            after = request.query_params.get('cursor')
+            after = decode_ledger_cursor(after) if after else None
+        except (ExportRequestError, LedgerCursorError) as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        try:
+            page_size = int(request.query_params.get('page_size', STATEMENT_PAGE_SIZE))
+        except ValueError:
+            page_size = STATEMENT_PAGE_SIZE
+        page_size = min(max(page_size, 1), MAX_STATEMENT_PAGE_SIZE)
+        
+        statement = vendor_statement(vendor, date_from, date_to, after=after, limit=page_size + 1)
+        entries = statement.pop('entries')
+        next_link = None
+        if len(entries) > page_size:
+            entries = entries[:page_size]
+            next_link = replace_query_param(
+                request.build_absolute_uri(), 'cursor', encode_ledger_cursor(entries[-1]['position'])
+            )
+        
+        return Response({
+            **statement,
+            'next': next_link,
+            'results': [
+                {field: value for field, value in entry.items() if field != 'position'}
+                for entry in entries
+            ],
+        })
+    
+    @action(detail=False, methods=['get'])
+    def aging(self, request):
+        """
+        Unpaid bill balances per vendor in 0-30 / 31-60 / 61-90 / 90+ day buckets
+        GET /api/purchase/vendors/aging/?as_of=YYYY-MM-DD
+        """
+        as_of = request.query_params.get('as_of')
+        try:
+            parsed = parse_date(as_of) if as_of else None
+        except ValueError:
+            parsed = None
+        if as_of and parsed is None:
+            return Response(
+                {'error': f'Invalid as_of date: {as_of} (use YYYY-MM-DD)'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        return Response(payables_aging(request.user.tenant, parsed))
+    
     @action(detail=False, methods=['get'])
     def with_outstanding(self, request):
         """Get vendors with outstanding balance"""
@@ -474,65 +539,5 @@ class DashboardViewSet(viewsets.ViewSet):
     
     @action(detail=False, methods=['get'])
     def overview(self, request):
-        """Get complete purchase management overview"""
-        tenant = request.user.tenant
-        
-        # Vendors
-        vendors = Vendor.objects.filter(tenant=tenant)
-        vendor_stats = {
-            'total': vendors.count(),
-            'active': vendors.filter(is_active=True).count(),
-            'with_outstanding': vendors.filter(outstanding_balance__gt=0).count(),
-            'total_outstanding': vendors.aggregate(
-                total=Sum('outstanding_balance')
-            )['total'] or Decimal('0.00')
-        }
-        
-        # Purchase Bills
-        bills = PurchaseBill.objects.filter(tenant=tenant)
-        bill_stats = {
-            'total': bills.count(),
-            'unpaid': bills.filter(payment_status='UNPAID').count(),
-            'partially_paid': bills.filter(payment_status='PARTIALLY_PAID').count(),
-            'fully_paid': bills.filter(payment_status='FULLY_PAID').count(),
-            'total_amount': bills.aggregate(total=Sum('bill_amount'))['total'] or Decimal('0.00'),
-            'total_outstanding': bills.aggregate(
-                total=Sum('balance_amount')
-            )['total'] or Decimal('0.00')
-        }
-        
-        # Expenses (this month)
-        today = timezone.now().date()
-        month_start = today.replace(day=1)
-        expenses = Expense.objects.filter(
-            tenant=tenant,
-            expense_date__gte=month_start
-        )
-        expense_stats = {
-            'this_month': expenses.aggregate(total=Sum('expense_amount'))['total'] or Decimal('0.00'),
-            'by_category': list(expenses.values('category').annotate(
-                total=Sum('expense_amount')
-            ).order_by('-total')[:5])
-        }
-        
-        # Payments (this month)
-        payments = Payment.objects.filter(
-            tenant=tenant,
-            payment_date__gte=month_start
-        )
-        payment_stats = {
-            'this_month': payments.aggregate(total=Sum('amount'))['total'] or Decimal('0.00'),
-            'cash': payments.filter(payment_method='CASH').aggregate(
-                total=Sum('amoun    t')
-            )['total'] or Decimal('0.00'),
-            'digital': payments.filter(
-                payment_method__in=['UPI', 'BANK_TRANSFER', 'CARD']
-            ).aggregate(total=Sum('amount'))['total'] or Decimal('0.00')
-        }
-        
-        return Response({
-            'vendors': vendor_stats,
-            'bills': bill_stats,
-            'expenses': expense_stats,
-            'payments': payment_stats
-        })
\ No newline at end of file
+        """Get complete purchase management overview (see purchase_management.overview)"""
+        return Response(get_purchase_overview(request.user.tenant))